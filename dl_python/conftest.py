@@ -0,0 +1,15 @@
+"""
+pytest configuration of dl_python.
+
+The tests (pyez_core/tests/) import the shared modules as the package pyez_core,
+as the checks do. dl_python is put first on the module search path, so they run
+from the root of the repository, from dl_python, or from any directory below it:
+pytest -q
+"""
+
+# imports
+# imports, Python standard modules
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -31,7 +31,7 @@ python icinga_junos_bgp_session.py \
     -l "2001:770:100:6836::2"
 
 # example: 2 x IPv4, explicitly indicating the routing-instance, with debug
-# Note: the script, in its current version, will ONLY return the information for the
+# Note: without -b (bulk, see below), the script will ONLY return the information for the
 # first BGP peer. It will not complain if you pass 2 or n BGP peers, but will ignore those
 # beyond the first one.
 python icinga_junos_bgp_session.py \
@@ -51,24 +51,98 @@ python icinga_junos_bgp_session.py \
     -l "2001:770:200::6" \
     -d
 
+# example: through the NETCONF session broker (see pyez_core/netconf_broker.py);
+#          the check does not open its own NETCONF session, saves 2.5 to 3 seconds
+python icinga_junos_bgp_session.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -l "2001:770:100:6836::2" \
+    -B /tmp/junos_netconf_broker.sock
+
+# example: bulk mode, 3 x BGP peers, explicitly indicating the routing-instance.
+#          A single RPC retrieves the table with all the peers in the routing-instance,
+#          all the peers given are evaluated from that reply, and the result aggregates
+#          them, with per-peer perfdata.
+python icinga_junos_bgp_session.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38 87.44.68.42 2001:770:100:6836::2" \
+    -b
+
+# example: bulk mode, reusing for 60 seconds the reply retrieved by another check;
+#          the BGP checks of the other peers of the router, within that minute, do not
+#          log in to it (see pyez_core/rpc_cache.py)
+python icinga_junos_bgp_session.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38" \
+    -b -C 60
+
+# example: bulk mode, XML reply instead of JSON, for routers with many peers;
+#          only the fields needed are extracted (see pyez_core/xml_stream.py)
+python icinga_junos_bgp_session.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38" \
+    -b -x
+
+# example: keeping the prefix counts of the peers across runs (see pyez_core/bgp_trend.py);
+#          WARNING if a count drops suddenly below the rolling baseline of the peer
+python icinga_junos_bgp_session.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38 87.44.68.42" \
+    -b -T /tmp/junos_bgp_trend.sqlite
+
+# example: with a circuit breaker (see pyez_core/circuit_breaker.py); while the router is
+#          known to be unreachable, UNKNOWN at once, instead of waiting for the timeout
+python icinga_junos_bgp_session.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38" \
+    -K /tmp/junos_circuit_breaker
+
 Note this:
 * the password has to be enclosed in single ''
 * the IP addresses to ping are to be writen separated by a single space, without ", or '
   between them, but fully enclosed in "". Example: "87.44.68.38 2001:770:100:6836::2"
 
 Version:
-    2021-01-21
+    2026-10-18
 
 The module is organized in three functions
 * get_args(). Parses the arguments passed by the user from CLI
 * check_junos_bgp_session(). This does the actual work of logging to a router
   and issuing the "show bgp neighbor <ip> instance <vrf>" command
+* check_junos_bgp_sessions_bulk(). Same outcome as check_junos_bgp_session(),
+  but issues a single "show bgp neighbor instance <vrf>" for all the peers
+* index_bgp_peers(). Indexes the BGP peers of a reply by their address
+* parse_bgp_peer(). Extracts the session state and prefix counts of one peer
+  from the RPC reply. Used by the two above
+* bgp_peer_address(). Normalizes an IP address, so that the peers given by the
+  user and the ones in the RPC reply can be matched
 * run_script(). Glues the two above. Gets the CLI arguments, passes them to the
-  working function and returns the outcome to the user.
+  working function (and the prefix counts to the trend database, if given) and
+  returns the outcome to the user.
 * __if_main__. So that serves as initiator.
 """
 
 
+# imports
+# imports, Python standard modules
+import os
+import sys
+
+# imports, this repository's shared PyEZ modules, in dl_python/pyez_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                os.pardir, os.pardir)))
+
+
 def get_args() -> tuple:
     '''Returns arguments parsed from CLI when invoking the module from CLI'''
 
@@ -90,6 +164,37 @@ def get_args() -> tuple:
                         required=False, type=str)
     parser.add_argument('-l', '--hosts', help='list of IP BGP peers to query',
                         required=True, type=str, nargs='+')
+    parser.add_argument('-b', '--bulk', help=('retrieve all the peers of the routing-instance '
+                                              'with one RPC and report on all the peers given'),
+                        required=False, action="store_true")
+    parser.add_argument('-B', '--broker', help=('Unix socket of a running '
+                                                'pyez_core.netconf_broker; if given, the RPC '
+                                                'goes through it instead of a new NETCONF '
+                                                'session'),
+                        required=False, type=str)
+    parser.add_argument('-C', '--cache-ttl', help=('with -b, seconds a cached reply of a '
+                                                   'recent check is reused instead of logging '
+                                                   'in to the router again. Default 0, no cache'),
+                        required=False, default=0, type=float)
+    parser.add_argument('-x', '--xml', help=('with -b, retrieve the reply as XML, not JSON, '
+                                             'and extract only the fields needed. Faster '
+                                             'on routers with many peers'),
+                        required=False, action="store_true")
+    parser.add_argument('-T', '--trend-db', help=('keep the prefix counts of the peers in '
+                                                  'this SQLite file, and warn if they drop '
+                                                  'suddenly'),
+                        required=False, type=str)
+    parser.add_argument('-K', '--breaker-dir', help=('keep the state of the circuit breaker '
+                                                     'of the router in this directory: while '
+                                                     'the router is known to be unreachable, '
+                                                     'return UNKNOWN at once instead of '
+                                                     'trying it'),
+                        required=False, type=str)
+    parser.add_argument('-M', '--metrics-file', help=('also save the time spent in each phase '
+                                                      'of the check to this file: Prometheus '
+                                                      'textfile if it ends in .prom, JSON '
+                                                      'lines otherwise'),
+                        required=False, type=str)
     parser.add_argument("-d", "--debug", help="enable debug mode",
                         required=False, action="store_true")
 
@@ -107,10 +212,124 @@ def get_args() -> tuple:
     else:
         ri = ''
     ips = ''.join(args.hosts).split()   # this is a list, each element is an IP address
+    # if the broker socket is explicitly given, take it; otherwise use empty ''
+    if args.broker:
+        broker_socket = args.broker
+    else:
+        broker_socket = ''
+    bulk = args.bulk
+    # the cache holds the reply for all the peers, there is no such reply without bulk
+    if args.cache_ttl and not bulk:
+        parser.error('-C/--cache-ttl requires -b/--bulk')
+    cache_ttl = args.cache_ttl
+    if args.xml and not bulk:
+        parser.error('-x/--xml requires -b/--bulk')
+    xml = args.xml
+    # if the trend database is explicitly given, take it; otherwise use empty ''
+    if args.trend_db:
+        trend_db = args.trend_db
+    else:
+        trend_db = ''
+    # if the breaker directory is explicitly given, take it; otherwise use empty ''
+    if args.breaker_dir:
+        breaker_dir = args.breaker_dir
+    else:
+        breaker_dir = ''
+    # if the metrics file is explicitly given, take it; otherwise use empty ''
+    if args.metrics_file:
+        metrics_file = args.metrics_file
+    else:
+        metrics_file = ''
     debug = args.debug
 
     # Return all variable values
-    return hostname, username, password, ri, ips, debug
+    return (hostname, username, password, ri, ips, bulk, broker_socket, cache_ttl, xml,
+            trend_db, breaker_dir, metrics_file, debug)
+
+
+def bgp_peer_address(address: str) -> str:
+    '''Returns the IP address in its canonical form, without the port JUNOS appends
+
+    JUNOS reports the peer-address as '87.44.68.38+179' and IPv6 addresses in
+    their compressed form, while the user may give '2001:0770:0100:6836::2'.
+    Both sides are passed through this function before matching them.
+    If the address is not a valid IP address it is returned as is.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import ipaddress
+
+    # drop the TCP port, e.g. '87.44.68.38+179' or '2001:770:100:6836::2+179'
+    address = address.split('+')[0]
+    try:
+        return str(ipaddress.ip_address(address))
+    except ValueError:
+        return address
+
+
+def index_bgp_peers(dict_bgp_peers: list, logger=None) -> dict:
+    '''Returns the 'bgp-peer' entries of a reply indexed by their normalized peer address
+
+    Args:
+        dict_bgp_peers (list)   ['bgp-information'][0]['bgp-peer'] in the JSON reply
+                                of get_bgp_neighbor_information
+        logger                  If given, duplicated peer addresses are logged to it
+
+    Version:
+        2026-10-18
+    '''
+
+    bgp_peers_index = {}
+    for dict_bgp_peer in dict_bgp_peers:
+        peer_address = bgp_peer_address(dict_bgp_peer['peer-address'][0]['data'])
+        if peer_address in bgp_peers_index:
+            # same IP in two routing-instances; keep the first, as JUNOS orders them
+            if logger is not None:
+                logger.warning('BGP peer {peer} found in more than one routing-instance, '
+                               'pass the routing-instance to disambiguate'
+                               .format(peer=peer_address))
+            continue
+        bgp_peers_index[peer_address] = dict_bgp_peer
+    return bgp_peers_index
+
+
+def parse_bgp_peer(dict_bgp_peer: dict, bgp_peer: str) -> dict:
+    '''Returns the BGP session state and prefixes of a peer, from its 'bgp-peer' entry
+
+    Args:
+        dict_bgp_peer (dict)    One element of ['bgp-information'][0]['bgp-peer']
+                                in the JSON reply of get_bgp_neighbor_information
+        bgp_peer (str)          The IP address of the peer, as given by the user
+
+    Returns:
+        dictionary with keys 'peer_address' and 'state'. If the session is Established,
+        also 'received_prefix_count', 'accepted_prefix_count', 'active_prefix_count'
+        and 'advertised_prefix_count'. Same shape as each value returned by
+        check_junos_bgp_session()
+
+    Version:
+        2026-10-18
+    '''
+
+    peer_stats = {}
+    peer_stats['peer_address'] = bgp_peer
+    peer_stats['state'] = dict_bgp_peer['peer-state'][0]['data']
+
+    if peer_stats['state'] == 'Established':
+        # if the peer is up, then include information on prefixes exchanged
+        # Prefixes, received/accepted/active/sent are at this height
+        # in the outcome and it is a dictionary.
+        dict_peer_rib = dict_bgp_peer['bgp-rib'][0]
+        peer_stats['received_prefix_count'] = dict_peer_rib['received-prefix-count'][0]['data']
+        peer_stats['accepted_prefix_count'] = dict_peer_rib['accepted-prefix-count'][0]['data']
+        peer_stats['active_prefix_count'] = dict_peer_rib['active-prefix-count'][0]['data']
+        peer_stats['advertised_prefix_count'] = (dict_peer_rib['advertised-prefix-count']
+                                                 [0]['data'])
+
+    return peer_stats
 
 
 def check_junos_bgp_session(ne: str,
@@ -118,7 +337,12 @@ def check_junos_bgp_session(ne: str,
                             os_password: str,
                             bgp_peers: list,
                             routing_instance: str = '',
-                            debug_level: str = 'ERROR') -> dict:
+                            debug_level: str = 'ERROR',
+                            broker_socket: str = '',
+                            timer=None,
+                            breaker_dir: str = '',
+                            dev=None,
+                            pipeline_depth: int = 4) -> dict:
     ''' Returns dictionary of dictionaries. Each dicationary contains BGP peering session
     status and prefixes received/accepted/active/sent for a given BGP peer.
 
@@ -161,6 +385,20 @@ def check_junos_bgp_session(ne: str,
                                 the IP is inside a routing-instance or not.
         debug_level(str)        Python logging level, if not set it defaults to 'WARNING'.
                                 Set to 'DEBUG' to see verbose execution.
+        broker_socket (str)     Unix socket of a running pyez_core.netconf_broker.
+                                If given, the RPCs are sent through the broker, over
+                                the NETCONF session it keeps open with the NE,
+                                instead of opening a new session.
+        timer (PhaseTimer)      pyez_core.telemetry.PhaseTimer, to which the time
+                                spent in dns, connect, auth, rpc and parse is added.
+        dev (Device)            Netconf session with the NE already open, e.g. by
+                                pyez_core/combined_check.py to run several checks in
+                                one session. Used instead of opening one, and left open.
+        pipeline_depth (int)    How many commands, one per BGP peer, are sent ahead
+                                of their reply, and the replies parsed while the next
+                                commands run; 1, one at a time. See
+                                pyez_core/rpc_pipeline.py. At most what the latency
+                                history of the NE allows, see pyez_core/latency.py
 
     Returns:
         dictionary. The keys are the IP addresses in the BGP peers input variable.
@@ -208,78 +446,67 @@ def check_junos_bgp_session(ne: str,
     # imports
     #
     # imports, Python standard modules
-    import logging                          # for debugging
-    import socket                           # to resolve FQDN to IPv4
     import time                             # to time spans of code
-    # imports, Python third party modules
-    from jnpr.junos import Device           # this is Juniper's PyEz
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_logging import get_logger
+    from pyez_core.rpc_pipeline import pipeline_rpcs
+    from pyez_core.telemetry import PhaseTimer
+    # PyEZ is imported below, only if a Netconf session is to be opened
 
     #
-    # Create a custom logger and set debug level
+    # Get the logger, with the handler shared by the checks of the process
     #
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)              # will get annoyed is not set to DEBUG here!!
-    # Create handler(s) and set the debug level
-    c_handler = logging.StreamHandler()         # console handler
-    c_handler.setLevel(debug_level)             # set debug level
-    c_format = logging.Formatter(('%(asctime)s: %(funcName)s: '
-                                  'line: ' + '%(lineno)d: %(levelname)s: %(message)s'))
-    c_handler.setFormatter(c_format)            # apply the formatter
-    logger.addHandler(c_handler)                # add handlers to the logger
+    logger = get_logger(__name__, debug_level)
 
     # timers are used to measure how long it takes to execute the code
     timer_script_start = time.perf_counter()    # start timer for whole script
     timer_netconf_start = time.perf_counter()   # start timer to open Netconf
+    if timer is None:
+        timer = PhaseTimer()                    # time spent in each phase, for the caller
 
     #
     # Open Netconf session with the NE
     #
-    try:
-        # ne_ipv4 = socket.getaddrinfo(ne, None, socket.AF_INET)[0][4][0]     # resolve FQDN to IPv4
-        # ne_ipv6 = socket.getaddrinfo(ne, None, socket.AF_INET6)[0][4][0]    # resolve FQDN to IPv6
-        # ne_ip = ne_ipv6                        uncomment if want to ensure the use of IPv4 or IPv6
-        # Deterministically, connect with IPv4
-        ne_ip = socket.gethostbyname(ne)
-        dev = Device(host=ne_ip, user=os_username, password=os_password)
-        dev.open(gather_facts=False)            # no need to gather facts, so to gain speed
-    except Exception as err:
-        raise Exception(err)                    # can't connect -> Exception
+    # a session opened by the caller is used as it is, and left open
+    own_session = dev is None
+    if own_session:
+        # imports, this repository's shared PyEZ modules
+        from pyez_core.circuit_breaker import RouterDownError
+        from pyez_core.combined_check import open_session
+        from pyez_core.latency import LatencyHistory
+
+        # commands in flight, from the latency history of the NE; see pyez_core/latency.py
+        tuning = LatencyHistory().tuning(ne, ('get_bgp_neighbor_information',),
+                                         pipeline_depth)
+        pipeline_depth = tuning.concurrency
+        try:
+            # ne_ipv4 = socket.getaddrinfo(ne, None, socket.AF_INET)[0][4][0]   # FQDN to IPv4
+            # ne_ipv6 = socket.getaddrinfo(ne, None, socket.AF_INET6)[0][4][0]  # FQDN to IPv6
+            # ne_ip = ne_ipv6                    uncomment to ensure the use of IPv4 or IPv6
+            # the address of the family that connected fastest, through the broker if
+            # given; see open_session() of pyez_core/combined_check.py
+            dev = open_session(ne, os_username, os_password, timer, breaker_dir,
+                               broker_socket=broker_socket, tuning=tuning)
+        except RouterDownError:
+            raise                                   # not tried, see pyez_core/circuit_breaker.py
+        except Exception as err:
+            raise Exception(err)                    # can't connect -> Exception
 
-    timer_netconf_end = time.perf_counter()                     # end timer to open Netconf
-    timer_netconf = timer_netconf_end - timer_netconf_start     # calculate time to bring Netconf up
-    logger.debug(('Time to open Netconf session with {ne} on {ne_ip}: {timer_netconf:0.2f} seconds'
-                 .format(ne=ne, ne_ip=ne_ip, timer_netconf=timer_netconf)))
+        timer_netconf_end = time.perf_counter()                   # end timer to open Netconf
+        timer_netconf = timer_netconf_end - timer_netconf_start   # time to bring Netconf up
+        logger.debug(('Time to open Netconf session with {ne} on {ne_ip}: '
+                      '{timer_netconf:0.2f} seconds'
+                      .format(ne=ne, ne_ip=dev.hostname, timer_netconf=timer_netconf)))
 
     #
     # Issue the command and record responses
     #
-    # initialize the dictionry that the function will be returning
-    command_results = {}
-
-    # iterate through the BGP peers, issue the command and add to the return
-    for bgp_peer in bgp_peers:
-        # each bgp_peer will have its own dictionary
-        peer_stats = {}
-
-        timer_command_start = time.perf_counter()   # start timer to execute command
-        logger.debug(("Will now issue command 'show bgp neighbor {peer} instance {instance}' "
-                     "in {ne}".format(peer=bgp_peer, instance=routing_instance, ne=ne)))
-
-        # Execute command in NE, seek the output as JSON
-        # Unless a specific routing-instance has been passed as input,
-        # # the below will default to "".
-        # JUNOS will be happy with "", the use/not of routing-instance name
-        # is optional.
-        command_outcome = (dev.rpc.
-                           get_bgp_neighbor_information({'format': 'json'},
-                                                        instance=routing_instance,
-                                                        neighbor_address=bgp_peer))
-
+    def parse_bgp_reply(index: int, command_outcome: dict) -> dict:
+        """Returns the stats of bgp_peers[index] from the reply of its command"""
+        bgp_peer = bgp_peers[index]
         try:
-            # The BGP peering session (the TCP session) state is at this height
-            # in the outcome and it is a dictionary.
-            # Put in its own variable so that lines do not grow forever in lenght, that is all.
-            dict_peer_state = command_outcome['bgp-information'][0]['bgp-peer'][0]['peer-state'][0]
+            # The BGP peer is at this height in the outcome and it is a dictionary.
+            dict_bgp_peer = command_outcome['bgp-information'][0]['bgp-peer'][0]
         except Exception as err:
             # for example, covers the eventuality of having been passed and
             # incorrectly formed IP address (e.g.: 2001:0770:0100:6844:::::2,
@@ -288,47 +515,258 @@ def check_junos_bgp_session(ne: str,
             raise Exception(err, command_error_message)
 
         # Populate the dictionary for this given BGP peer
-        peer_stats['peer_address'] = bgp_peer
-        peer_stats['state'] = dict_peer_state['data']
-        logger.debug("BGP peer {peer}, is in state: {state}"
-                     .format(peer=bgp_peer, state=peer_stats['state']))
-
-        if peer_stats['state'] == 'Established':
-            # if the peer is up, then include information on prefixes exchanged
-
-            # Prefixes, received/accepted/active/sent are at this height
-            # in the outcome and it is a dictionary.
-            # Use? so that lines do not grow forever in lenght, that is all.
-            dict_peer_rib = command_outcome['bgp-information'][0]['bgp-peer'][0]['bgp-rib'][0]
-
-            peer_stats['received_prefix_count'] = dict_peer_rib['received-prefix-count'][0]['data']
-            logger.debug("BGP peer {peer}, received prefix(es): {prefixes}"
-                         .format(peer=bgp_peer, prefixes=peer_stats['received_prefix_count']))
-
-            peer_stats['accepted_prefix_count'] = dict_peer_rib['accepted-prefix-count'][0]['data']
-            logger.debug("BGP peer {peer}, accepted prefix(es): {prefixes}"
-                         .format(peer=bgp_peer, prefixes=peer_stats['accepted_prefix_count']))
-
-            peer_stats['active_prefix_count'] = dict_peer_rib['active-prefix-count'][0]['data']
-            logger.debug("BGP peer {peer}, active prefix(es): {prefixes}"
-                         .format(peer=bgp_peer, prefixes=peer_stats['active_prefix_count']))
-
-            peer_stats['advertised_prefix_count'] = (dict_peer_rib['advertised-prefix-count']
-                                                     [0]['data'])
-            logger.debug("BGP peer {peer}, advertised prefix(es): {prefixes}"
-                         .format(peer=bgp_peer, prefixes=peer_stats['advertised_prefix_count']))
-
-        # if debugging, report how long it took to execute the command
-        timer_command_end = time.perf_counter()                    # end timer to execute command
-        timer_command = timer_command_end - timer_command_start    # compute time to execute command
+        peer_stats = parse_bgp_peer(dict_bgp_peer, bgp_peer)
+        logger.debug("BGP peer {peer}: {peer_stats}"
+                     .format(peer=bgp_peer, peer_stats=peer_stats))
+        return peer_stats
+
+    timer_command_start = time.perf_counter()   # start timer to execute commands
+    logger.debug(("Will now issue command 'show bgp neighbor <peer> instance {instance}' "
+                  "for {count} peers in {ne}"
+                  .format(instance=routing_instance, count=len(bgp_peers), ne=ne)))
+    try:
+        # the commands back-to-back over the session, each reply parsed while the next
+        # commands run; see pyez_core/rpc_pipeline.py
+        # Unless a specific routing-instance has been passed as input,
+        # the below will default to "".
+        # JUNOS will be happy with "", the use/not of routing-instance name
+        # is optional.
+        peers_stats = pipeline_rpcs(dev, 'get_bgp_neighbor_information',
+                                    [{'instance': routing_instance, 'neighbor_address': bgp_peer}
+                                     for bgp_peer in bgp_peers],
+                                    parse_bgp_reply, depth=pipeline_depth, timer=timer)
+    finally:
+        # leave orderly. Properly close the Netconf session with the NE
+        if own_session:
+            dev.close()
+
+    # if debugging, report how long it took to execute the commands
+    timer_command_end = time.perf_counter()                    # end timer to execute commands
+    timer_command = timer_command_end - timer_command_start    # compute time to execute commands
+    logger.debug(('Time to execute JUNOS commands: {timer_command:0.2f} seconds'
+                 .format(timer_command=timer_command)))
+
+    # the stats of each BGP peer, in the overall dictionary that the function returns
+    command_results = dict(zip(bgp_peers, peers_stats))
+
+    # if debugging, report how long it takes to execute the whole script
+    timer_script_end = time.perf_counter()                  # end timer for whole script
+    timer_script = timer_script_end - timer_script_start    # compute time execute the whole script
+    logger.debug("Time to execute the script, begin to end: {timer_whole_script:0.2f} seconds"
+                 .format(timer_whole_script=timer_script))
+
+    # return dictionary of dictionaries
+    return command_results
+
+
+def check_junos_bgp_sessions_bulk(ne: str,
+                                  os_username: str,
+                                  os_password: str,
+                                  bgp_peers: list,
+                                  routing_instance: str = '',
+                                  debug_level: str = 'ERROR',
+                                  broker_socket: str = '',
+                                  cache_ttl: float = 0,
+                                  xml: bool = False,
+                                  timer=None,
+                                  breaker_dir: str = '',
+                                  dev=None) -> dict:
+    ''' Returns dictionary of dictionaries. Each dicationary contains BGP peering session
+    status and prefixes received/accepted/active/sent for a given BGP peer.
+
+    Same return as check_junos_bgp_session(), but instead of issuing one command
+    per BGP peer, it issues a single one for all of them:
+    "show bgp neighbor instance <routing_instance>"
+    or, if routing_instance is not given, "show bgp neighbor", that reports the
+    peers of all the routing-instances.
+    The reply is indexed by peer address and each peer in bgp_peers is looked up
+    in that index.
+
+    Timing. check_junos_bgp_session() takes about 4.5 seconds per IP. This function
+    takes about the same for any number of IP in the same routing-instance; the
+    reply is bigger, but there is one round trip to the NE instead of one per IP.
+
+    Args:
+    Required:
+        ne (str)                Network Element, Juniper router to log to
+        os_username (str)       Username to log as in the router
+        os_password (str)       Password for the username above
+        bgp_peers (list)        List of IP address for BGP peers we want to check their session.
+                                Can be either an IPv4 or an IPv6 address.
+                                See check_junos_bgp_session()
+    Optional:
+        routing_instance (str)  The routing-instance where the BGP sessions are held.
+                                If not set, all the routing-instances are retrieved.
+                                If the same IP is a peer in several routing-instances,
+                                set it; otherwise the first one reported by JUNOS is used.
+        debug_level(str)        Python logging level, if not set it defaults to 'WARNING'.
+                                Set to 'DEBUG' to see verbose execution.
+        broker_socket (str)     Unix socket of a running pyez_core.netconf_broker.
+                                If given, the RPC is sent through the broker.
+        cache_ttl (float)       If not 0, a reply retrieved by another check less than
+                                cache_ttl seconds ago is used, without logging in to
+                                the NE; see pyez_core/rpc_cache.py. Checks of different
+                                peers in the same routing-instance share one reply.
+        xml (bool)              If True, the reply is retrieved as XML instead of
+                                JSON, and only the fields needed are extracted from
+                                it; see pyez_core/xml_stream.py. Saves the router
+                                rendering a large reply as JSON.
+        timer (PhaseTimer)      pyez_core.telemetry.PhaseTimer, to which the time
+                                spent in dns, connect, auth, rpc and parse is added.
+        dev (Device)            Netconf session with the NE already open, e.g. by
+                                pyez_core/combined_check.py to run several checks in
+                                one session. Used instead of opening one, and left open.
+
+    Returns:
+        dictionary. The keys are the IP addresses in the BGP peers input variable.
+        The values are a dictionary, as in check_junos_bgp_session().
+        A peer not found in the reply has the state 'NotFound'.
+
+    Version:
+        2026-10-18
+
+    Requires:
+        Python 3.5
+        junos-eznc 2.5
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    #
+    # imports
+    #
+    # imports, Python standard modules
+    import time                             # to time spans of code
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_logging import get_logger
+    from pyez_core.rpc_cache import RpcCache
+    from pyez_core.telemetry import PhaseTimer
+    # PyEZ is imported below, only if a Netconf session is to be opened; it takes
+    # longer to import than the rest of the check to run from the RPC cache
+
+    #
+    # Get the logger, with the handler shared by the checks of the process
+    #
+    logger = get_logger(__name__, debug_level)
+
+    # timers are used to measure how long it takes to execute the code
+    timer_script_start = time.perf_counter()    # start timer for whole script
+    if timer is None:
+        timer = PhaseTimer()                    # time spent in each phase, for the caller
+
+    #
+    # Reuse the reply retrieved by a check that ran moments ago, if asked to
+    #
+    if routing_instance:
+        bgp_rpc_kwargs = {'instance': routing_instance}
+    else:
+        bgp_rpc_kwargs = {}
+    # the cache keeps the JSON reply, or the fields extracted from the XML reply
+    if xml:
+        cache_rpc_kwargs = dict(bgp_rpc_kwargs, format='xml')
+    else:
+        cache_rpc_kwargs = bgp_rpc_kwargs
+    rpc_cache = None
+    command_outcome = None
+    if cache_ttl:
+        rpc_cache = RpcCache(cache_ttl)
+        command_outcome = rpc_cache.get(ne, 'get_bgp_neighbor_information', cache_rpc_kwargs)
+        if command_outcome is not None:
+            logger.debug('BGP peers of {ne} from the RPC cache, not logging in'.format(ne=ne))
+
+    if command_outcome is None:
+        #
+        # Open Netconf session with the NE
+        #
+        # a session opened by the caller is used as it is, and left open
+        own_session = dev is None
+        if own_session:
+            # imports, this repository's shared PyEZ modules
+            from pyez_core.circuit_breaker import RouterDownError
+            from pyez_core.combined_check import open_session
+
+            timer_netconf_start = time.perf_counter()   # start timer to open Netconf
+            try:
+                # the address of the family that connected fastest, through the broker if
+                # given, with the timeouts of the NE; see open_session() of
+                # pyez_core/combined_check.py
+                dev = open_session(ne, os_username, os_password, timer, breaker_dir,
+                                   ('get_bgp_neighbor_information',), broker_socket)
+            except RouterDownError:
+                raise                               # not tried, see pyez_core/circuit_breaker.py
+            except Exception as err:
+                raise Exception(err)                # can't connect -> Exception
+
+            timer_netconf_end = time.perf_counter()                   # end timer to open Netconf
+            timer_netconf = timer_netconf_end - timer_netconf_start   # time to bring Netconf up
+            logger.debug(('Time to open Netconf session with {ne} on {ne_ip}: '
+                          '{timer_netconf:0.2f} seconds'
+                          .format(ne=ne, ne_ip=dev.hostname, timer_netconf=timer_netconf)))
+
+        #
+        # Issue the command, once for all the peers
+        #
+        timer_command_start = time.perf_counter()   # start timer to execute command
+        logger.debug(("Will now issue command 'show bgp neighbor instance {instance}' in {ne}"
+                      .format(instance=routing_instance, ne=ne)))
+        try:
+            if xml:
+                # native XML reply, of which only the fields needed are extracted
+                from pyez_core.xml_stream import extract_bgp_peers
+                with timer.phase('rpc', 'get_bgp_neighbor_information'):
+                    bgp_peers_xml = dev.rpc.get_bgp_neighbor_information(**bgp_rpc_kwargs)
+                with timer.phase('parse'):
+                    command_outcome = extract_bgp_peers(bgp_peers_xml)
+            else:
+                with timer.phase('rpc', 'get_bgp_neighbor_information'):
+                    command_outcome = dev.rpc.get_bgp_neighbor_information({'format': 'json'},
+                                                                           **bgp_rpc_kwargs)
+        finally:
+            # leave orderly. Properly close the Netconf session with the NE
+            if own_session:
+                dev.close()
+
+        timer_command_end = time.perf_counter()                  # end timer to execute command
+        timer_command = timer_command_end - timer_command_start  # time to execute command
         logger.debug(('Time to execute JUNOS command: {timer_command:0.2f} seconds'
                      .format(timer_command=timer_command)))
 
-        # add the stats of this BGP peer to the overall dictionary
-        command_results[bgp_peer] = peer_stats
+        # for the checks that follow within cache_ttl seconds
+        if rpc_cache is not None:
+            rpc_cache.put(ne, 'get_bgp_neighbor_information', cache_rpc_kwargs,
+                          command_outcome)
+
+    try:
+        # list with all the BGP peers in the reply
+        dict_bgp_peers = command_outcome['bgp-information'][0].get('bgp-peer', [])
+    except Exception as err:
+        # e.g. the routing-instance does not exist
+        command_error_message = command_outcome['error'][0]['message'][0]['data']
+        raise Exception(err, command_error_message)
+
+    #
+    # Index the reply by peer address, so that each peer is a single lookup
+    #
+    with timer.phase('parse'):
+        bgp_peers_index = index_bgp_peers(dict_bgp_peers, logger)
+    logger.debug('{count} BGP peers in the reply from {ne}'
+                 .format(count=len(bgp_peers_index), ne=ne))
+
+    # initialize the dictionry that the function will be returning
+    command_results = {}
 
-    # leave orderly. Properly close the Netconf session with the NE
-    dev.close()
+    # evaluate each of the requested BGP peers from the index
+    with timer.phase('parse'):
+        for bgp_peer in bgp_peers:
+            dict_bgp_peer = bgp_peers_index.get(bgp_peer_address(bgp_peer))
+            if dict_bgp_peer is None:
+                peer_stats = {'peer_address': bgp_peer, 'state': 'NotFound'}
+            else:
+                peer_stats = parse_bgp_peer(dict_bgp_peer, bgp_peer)
+            logger.debug("BGP peer {peer}: {peer_stats}"
+                         .format(peer=bgp_peer, peer_stats=peer_stats))
+            command_results[bgp_peer] = peer_stats
 
     # if debugging, report how long it takes to execute the whole script
     timer_script_end = time.perf_counter()                  # end timer for whole script
@@ -340,16 +778,42 @@ def check_junos_bgp_session(ne: str,
     return command_results
 
 
+def bgp_sessions_perfdata(command_outcome: dict) -> str:
+    '''Returns Icinga perfdata with the prefix counts of each BGP peer
+
+    e.g. '87.44.68.38 received'=1 '87.44.68.38 accepted'=1 ...
+    Peers whose session is not Established are reported with 0 prefixes.
+
+    Version:
+        2026-10-18
+    '''
+
+    perfdata = []
+    for bgp_peer, stats in command_outcome.items():
+        for counter in ('received', 'accepted', 'active', 'advertised'):
+            perfdata.append("'{peer} {counter}'={value}"
+                            .format(peer=bgp_peer, counter=counter,
+                                    value=stats.get(counter + '_prefix_count', 0)))
+    return ' '.join(perfdata)
+
+
 def run_script() -> str:
     """Invokes the other functions and returns outcome values to Icinga"""
 
+    # Read arguments passed to the script. First, before importing anything else, so
+    # that --help and wrong arguments return at once; see pyez_core/import_budget.py
+    (ne, os_username, os_password, ri, hosts, bulk, broker_socket, cache_ttl, xml,
+     trend_db, breaker_dir, metrics_file, debug) = get_args()
+
     #
     # imports
     #
     # Python standard modules
     #import socket      # in case IPv6 connectivity to Netconf port is blocked
-    import sys
     from enum import Enum
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.circuit_breaker import RouterDownError
+    from pyez_core.telemetry import PhaseTimer
 
     # Icinga Status values
     class IcingaState(Enum):
@@ -357,11 +821,11 @@ def run_script() -> str:
         warning = 1
         critical = 2
         unknown = 3
-
-    # Read arguments passed to the script
-    ne, os_username, os_password, ri, hosts, debug = get_args()
     bgp_peers = hosts
 
+    # time spent in each phase of the check, rendered as perfdata
+    timer = PhaseTimer()
+
     # uncomment if it is necessary to use IPv4; e.g. IPv6 connectivity to Netconf port is blocked
     # ne = (socket.gethostbyname(ne))
 
@@ -371,22 +835,80 @@ def run_script() -> str:
     else:
         debug_level = 'WARNING'
 
+    def prefix_drops(command_outcome: dict) -> list:
+        '''The prefix counts that dropped below the baseline of their peer, as lines'''
+        if not trend_db:
+            return []
+        from pyez_core.bgp_trend import BgpTrendStore, describe_alert
+        return [describe_alert(alert)
+                for alert in BgpTrendStore(trend_db).record(ne, ri, command_outcome)]
+
+    if bulk is True:
+        # all the peers from a single RPC, one aggregated result
+        try:
+            command_outcome = check_junos_bgp_sessions_bulk(ne, os_username, os_password,
+                                                            bgp_peers, ri, debug_level,
+                                                            broker_socket, cache_ttl, xml,
+                                                            timer, breaker_dir)
+            peers_down = [bgp_peer for (bgp_peer, stats) in command_outcome.items()
+                          if stats['state'] != 'Established']
+            if peers_down:
+                outcome = IcingaState.critical
+                summary = ('{down} of {total} BGP peers not Established: {peers}'
+                           .format(down=len(peers_down), total=len(command_outcome),
+                                   peers=' '.join(peers_down)))
+            else:
+                outcome = IcingaState.ok
+                summary = ('{total} of {total} BGP peers Established'
+                           .format(total=len(command_outcome)))
+            drops = prefix_drops(command_outcome)
+            if drops and outcome == IcingaState.ok:
+                outcome = IcingaState.warning
+                summary += ', prefixes dropped: {drops}'.format(drops='; '.join(drops))
+
+            # The following lines will be rendered in the Icinga GUI for the check,
+            # the first line with the perfdata, then one line per peer
+            print(summary + ' | ' + bgp_sessions_perfdata(command_outcome) + ' ' +
+                  timer.report('bgp', ne, metrics_file))
+            for stats in command_outcome.values():
+                print(stats)
+        except RouterDownError as err:
+            # not tried: the state of the peers is unknown, not down
+            print('UNKNOWN: ' + str(err) + ' | ' + timer.report('bgp', ne, metrics_file))
+            outcome = IcingaState.unknown
+        except Exception as err:
+            # The following line will be rendered in the Icinga GUI for the check
+            print('The following error prevents me from executing the script: ' + str(err) +
+                  ' | ' + timer.report('bgp', ne, metrics_file))
+            outcome = IcingaState.critical
+        sys.exit(outcome.value)     # will be given to Icinga to render green/red in GUI
+
     # go and issue the commands
     try:
         command_outcome = check_junos_bgp_session(ne, os_username, os_password,
-                                                  bgp_peers, ri, debug_level)
+                                                  bgp_peers, ri, debug_level, broker_socket,
+                                                  timer, breaker_dir)
         stats = command_outcome[bgp_peers[0]]
 
         if stats['state'] == "Established":
             outcome = IcingaState.ok
         else:
             outcome = IcingaState.critical
+        drops = prefix_drops(command_outcome)
+        if drops and outcome == IcingaState.ok:
+            outcome = IcingaState.warning
 
         # The following line will be rendered in the Icinga GUI for the check
-        print(stats)
+        print(''.join('Prefixes dropped: {drop}. '.format(drop=drop) for drop in drops) +
+              str(stats) + ' | ' + timer.report('bgp', ne, metrics_file))
+    except RouterDownError as err:
+        # not tried: the state of the peer is unknown, not down
+        print('UNKNOWN: ' + str(err) + ' | ' + timer.report('bgp', ne, metrics_file))
+        outcome = IcingaState.unknown
     except Exception as err:
         # The following line will be rendered in the Icinga GUI for the check
-        print('The following error prevents me from executing the script: ' + str(err))
+        print('The following error prevents me from executing the script: ' + str(err) +
+              ' | ' + timer.report('bgp', ne, metrics_file))
         outcome = IcingaState.critical
 
     #print(outcome.value)       # uncomment if debuging and want to see the integer value returned
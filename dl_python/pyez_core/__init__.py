@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Shared modules for the PyEZ Icinga checks in this repository:
+    pyez_isis, pyez_bgp_session, pyez_vrf_ping
+
+The checks are standalone scripts invoked by Icinga. They make this directory
+importable by adding its parent, dl_python, to sys.path when they start.
+
+Modules:
+* netconf_broker. Long-lived daemon that keeps one NETCONF session open per
+  router, and the client (BrokerDevice) the checks use to talk to it.
+* fleet_runner. Runs the checks over an inventory of routers, in parallel.
+* check_scripts. Imports the production check scripts, to reuse their functions.
+* async_netconf. asyncio NETCONF transport, and async equivalents of the checks.
+* netconf_standin. NETCONF server with canned replies, to test without routers.
+* resolver. Cached name resolution of the routers, fastest address family first.
+* private_dir. Directories and files private to the user running the checks, for their state.
+* rpc_cache. On-disk cache of RPC replies, so checks close together share one fetch.
+* xml_stream. Streaming extraction of the fields the checks need from XML replies.
+* isis_model. Compact typed model of the IS-IS interfaces, and its consistency evaluator.
+* replay. Records the RPC replies of a router, and replays them to the checks.
+* bench. Benchmark of the checks on replayed replies, 10 to 10000 interfaces/peers/hosts.
+* telemetry. Per-phase timings of the checks, as Icinga perfdata and metrics files.
+* combined_check. IS-IS, BGP and VRF ping checks of a router over one NETCONF session.
+* collector. Daemon running the checks on a schedule, submitting passive results to Icinga.
+* import_budget. Import time of the check scripts (-X importtime), against a budget.
+* isis_state. State of the IS-IS interfaces between runs of the check, and its delta.
+* isis_topology. Consistency of the IS-IS topology of the whole network, across routers.
+* bgp_trend. Prefix counts of the BGP peers across runs, and alerts on sudden drops.
+* circuit_breaker. Fail fast, as UNKNOWN, while a router is known to be unreachable.
+* check_registry. The check types, built-in and plugins: RPC, parser, evaluation, service.
+* rpc_pipeline. RPCs sent back-to-back over one session, the replies parsed on a worker thread.
+* check_logging. Logging of the checks, one queue handler per process, as JSON lines.
+* latency. Latency history per router, and the timeouts and concurrency derived from it.
+* fleet_plan. Inventory by role, platform and VRF; the minimal RPCs per router, run in parallel.
+
+Version:
+    2026-10-18
+"""
@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+asyncio NETCONF transport for the PyEZ checks.
+
+The checks block on synchronous dev.rpc.<rpc_name>() calls: the process is
+idle while the router answers. This module drives NETCONF sessions from one
+asyncio event loop instead, so a single process can have sessions open with
+hundreds of routers at the same time, each one costing a coroutine and its
+buffers rather than a thread.
+
+It exposes async equivalents of the check functions, that return the same
+dictionaries, parsed with the same functions of the check scripts:
+* async_get_junos_isis_interfaces()     get_junos_isis_interfaces()
+* async_check_junos_bgp_session()       check_junos_bgp_session()
+* async_ping_vrf()                      ping_vrf()
+
+NETCONF is spoken directly (RFC 6241/6242): hello exchange, end-of-message
+(base:1.0) and chunked (base:1.1) framing. The SSH part is done by asyncssh,
+that has to be installed for transport='ssh'. With transport='tcp' NETCONF is
+spoken in clear over TCP, which is what the stand-in server in
+pyez_core/netconf_standin.py listens on, to test without routers.
+
+Invoke as (from the dl_python directory), to poll all the routers in an
+inventory (same format as pyez_core/fleet_runner.py) from a single process,
+with up to 200 sessions open at the same time:
+python -m pyez_core.async_netconf \
+    -i inventory.json \
+    -u heanet -p 'substiteWithActualPassword' \
+    -c 200
+
+# example, against the stand-in server, listening on TCP port 8830 of localhost
+python -m pyez_core.netconf_standin -r replies/ -P 8830 &
+python -m pyez_core.async_netconf \
+    -i inventory.json \
+    -u heanet -p 'anything' \
+    -P 8830 -T tcp
+
+Requires:
+    Python 3.5
+    asyncssh (only for transport='ssh')
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* NetconfRpcError. Raised when the router answers an RPC with an rpc-error
+* AsyncNetconfSession. A NETCONF session; connect(), rpc(), close()
+* async_get_junos_isis_interfaces(), async_check_junos_bgp_session(),
+  async_ping_vrf(). The async equivalents of the check functions
+* poll_fleet(). Runs the checks of an inventory, all from one event loop
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import asyncio
+import itertools
+import json
+import xml.etree.ElementTree as ET
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.check_scripts import load_check_module
+from pyez_core.xml_stream import extract_bgp_peers, extract_isis_interfaces
+
+
+NETCONF_NS = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+NETCONF_BASE_10 = 'urn:ietf:params:netconf:base:1.0'
+NETCONF_BASE_11 = 'urn:ietf:params:netconf:base:1.1'
+# end of message, NETCONF 1.0 framing
+NETCONF_EOM = b']]>]]>'
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Run the PyEZ checks over a fleet of '
+                                                  'routers, from one asyncio event loop'))
+
+    # Add arguments
+    parser.add_argument('-i', '--inventory',
+                        help='Inventory file, JSON or YAML, as for pyez_core.fleet_runner',
+                        required=True,
+                        type=str)
+    parser.add_argument('-u', '--username',
+                        help='NETCONF Username',
+                        required=True,
+                        type=str)
+    # nargs='+' used because current password has several special characters....
+    parser.add_argument('-p', '--password',
+                        help='NETCONF Password in single quotes...',
+                        required=True,
+                        type=str,
+                        nargs='+')
+    parser.add_argument('-c', '--concurrency',
+                        help='How many checks run at the same time. Default 200',
+                        required=False,
+                        default=200,
+                        type=int)
+    parser.add_argument('-P', '--port',
+                        help='NETCONF port. Default 830',
+                        required=False,
+                        default=830,
+                        type=int)
+    parser.add_argument('-T', '--transport',
+                        help='ssh (routers) or tcp (stand-in server). Default ssh',
+                        required=False,
+                        default='ssh',
+                        choices=['ssh', 'tcp'])
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    # because when using nargs='+', the password is a list
+    return (args.inventory, args.username, args.password[0], args.concurrency,
+            args.port, args.transport)
+
+
+class NetconfRpcError(Exception):
+    '''Raised when the router answers an RPC with an rpc-error of severity error'''
+
+
+def rpc_element(rpc_name: str, message_id: int, rpc_format: str = 'json', **kwargs) -> bytes:
+    '''
+    Returns the <rpc> to send, as PyEZ builds it for dev.rpc.<rpc_name>(**kwargs):
+        rpc_name with '_' as '-', is the operation
+        each keyword argument is a child element, with '_' as '-' in its name;
+        True is an empty element (e.g. extensive=True -> <extensive/>),
+        False and None are left out, anything else is the text of the element.
+
+    Version:
+        2026-10-18
+    '''
+
+    rpc = ET.Element('rpc', {'xmlns': NETCONF_NS, 'message-id': str(message_id)})
+    attributes = {'format': rpc_format} if rpc_format != 'xml' else {}
+    operation = ET.SubElement(rpc, rpc_name.replace('_', '-'), attributes)
+    for (argument, value) in kwargs.items():
+        if value is False or value is None:
+            continue
+        child = ET.SubElement(operation, argument.replace('_', '-'))
+        if value is not True:
+            child.text = str(value)
+    return ET.tostring(rpc, encoding='utf-8')
+
+
+class AsyncNetconfSession(object):
+    '''
+    A NETCONF session with a router, driven from asyncio.
+
+    Create it with the coroutine AsyncNetconfSession.connect(). RPCs on one
+    session are sent one at a time, as a Netconf session executes them in order
+    anyway; to have several RPCs in flight with a router, open several sessions.
+
+    Args:
+        reader, writer      Streams of the SSH subsystem or TCP connection
+        closer              Called on close(), to close the SSH connection
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, reader, writer, closer=None):
+        self._reader = reader
+        self._writer = writer
+        self._closer = closer
+        self._message_ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+        self.chunked = False
+        self.server_capabilities = []
+
+    @classmethod
+    async def connect(cls,
+                      host: str,
+                      username: str,
+                      password: str,
+                      port: int = 830,
+                      transport: str = 'ssh',
+                      connect_timeout: float = 30):
+        '''Opens the session: SSH (or TCP), netconf subsystem and hello exchange'''
+
+        async def open_streams():
+            if transport == 'ssh':
+                # asyncssh is only needed for SSH, not for the stand-in server
+                import asyncssh
+                # as PyEZ, the host key of the router is not verified
+                conn = await asyncssh.connect(host, port=port, username=username,
+                                              password=password, known_hosts=None)
+                (writer, reader, _) = await conn.open_session(subsystem='netconf',
+                                                              encoding=None)
+                return (reader, writer, conn.close)
+            if transport == 'tcp':
+                (reader, writer) = await asyncio.open_connection(host, port)
+                return (reader, writer, None)
+            raise ValueError('Unknown transport {transport}, use ssh or tcp'
+                             .format(transport=transport))
+
+        async def open_session():
+            (reader, writer, closer) = await open_streams()
+            session = cls(reader, writer, closer)
+            await session._hello()
+            return session
+
+        return await asyncio.wait_for(open_session(), connect_timeout)
+
+    async def _hello(self):
+        '''Exchanges hellos. Chunked framing if both sides speak base:1.1'''
+        hello = ('<?xml version="1.0" encoding="UTF-8"?>'
+                 '<hello xmlns="{ns}"><capabilities>'
+                 '<capability>{base_10}</capability>'
+                 '<capability>{base_11}</capability>'
+                 '</capabilities></hello>'
+                 .format(ns=NETCONF_NS, base_10=NETCONF_BASE_10, base_11=NETCONF_BASE_11))
+        self._writer.write(hello.encode('utf-8') + NETCONF_EOM)
+        await self._writer.drain()
+
+        server_hello = ET.fromstring((await self._reader.readuntil(NETCONF_EOM))
+                                     [:-len(NETCONF_EOM)].strip())
+        self.server_capabilities = [capability.text.strip() for capability
+                                    in server_hello.iter('{%s}capability' % NETCONF_NS)]
+        self.chunked = NETCONF_BASE_11 in self.server_capabilities
+
+    async def _send(self, message: bytes):
+        if self.chunked:
+            self._writer.write(('\n#{length}\n'.format(length=len(message))).encode('ascii') +
+                               message + b'\n##\n')
+        else:
+            self._writer.write(message + NETCONF_EOM)
+        await self._writer.drain()
+
+    async def _receive(self) -> bytes:
+        if not self.chunked:
+            return (await self._reader.readuntil(NETCONF_EOM))[:-len(NETCONF_EOM)]
+        # chunked: '\n#<length>\n<length bytes>' ... '\n##\n'
+        chunks = []
+        while True:
+            header = await self._reader.readuntil(b'\n#')
+            if header.strip(b'\n#'):
+                raise ConnectionError('Bad NETCONF chunk framing: {header!r}'.format(header=header))
+            size = (await self._reader.readuntil(b'\n'))[:-1]
+            if size == b'#':
+                return b''.join(chunks)
+            chunks.append(await self._reader.readexactly(int(size)))
+
+    async def rpc(self, rpc_name: str, rpc_format: str = 'json', timeout: float = None,
+                  raw: bool = False, **kwargs):
+        '''
+        Executes the RPC and returns its reply: a dictionary for rpc_format='json',
+        as dev.rpc.<rpc_name>({'format': 'json'}, **kwargs) does; otherwise the
+        <rpc-reply> as an ElementTree element.
+
+        Raises NetconfRpcError if the router answers with an rpc-error of severity error.
+        With raw=True, returns the bytes of the <rpc-reply>, not parsed nor checked for
+        rpc-error, e.g. to be read as a stream by pyez_core/xml_stream.py.
+        '''
+
+        async with self._lock:
+            message_id = next(self._message_ids)
+            await self._send(rpc_element(rpc_name, message_id, rpc_format, **kwargs))
+            reply = await asyncio.wait_for(self._receive(), timeout)
+
+        if raw:
+            return reply
+        return parse_rpc_reply(reply, rpc_format)
+
+    async def close(self):
+        '''Leave orderly. Properly close the Netconf session with the NE'''
+        try:
+            async with self._lock:
+                await self._send(('<rpc xmlns="{ns}" message-id="{message_id}">'
+                                  '<close-session/></rpc>'
+                                  .format(ns=NETCONF_NS, message_id=next(self._message_ids)))
+                                 .encode('utf-8'))
+                await asyncio.wait_for(self._receive(), 5)
+        except Exception:
+            # the router may have closed the session already, nothing to do
+            pass
+        finally:
+            self._writer.close()
+            if self._closer is not None:
+                self._closer()
+
+
+def parse_rpc_reply(reply: bytes, rpc_format: str = 'json'):
+    '''Returns the reply as a dictionary (json) or element (xml); raises NetconfRpcError'''
+    root = ET.fromstring(reply)
+    for rpc_error in root.iter():
+        if not rpc_error.tag.endswith('rpc-error'):
+            continue
+        severity = [child.text for child in rpc_error if child.tag.endswith('error-severity')]
+        if severity and severity[0].strip() == 'warning':
+            # as PyEZ, warnings are not errors
+            continue
+        message = [child.text for child in rpc_error if child.tag.endswith('error-message')]
+        raise NetconfRpcError(message[0].strip() if message else ET.tostring(rpc_error))
+    if rpc_format == 'json':
+        # the JSON is the text of the rpc-reply element
+        return json.loads(root.text)
+    return root
+
+
+class _SessionScope(object):
+    '''async with: uses the session given, or opens one and closes it at the end'''
+
+    def __init__(self, session, **connect_kwargs):
+        self._session = session
+        self._owned = session is None
+        self._connect_kwargs = connect_kwargs
+
+    async def __aenter__(self):
+        if self._owned:
+            self._session = await AsyncNetconfSession.connect(**self._connect_kwargs)
+        return self._session
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._owned:
+            await self._session.close()
+
+
+async def async_get_junos_isis_interfaces(ne: str,
+                                          os_username: str,
+                                          os_password: str,
+                                          isis_instance: str = '',
+                                          session: AsyncNetconfSession = None,
+                                          port: int = 830,
+                                          transport: str = 'ssh',
+                                          xml: bool = False) -> dict:
+    '''
+    async equivalent of get_junos_isis_interfaces() in
+    pyez_isis/production/icinga_junos_isis_interface.py; same return.
+
+    Args:
+    Required:
+        ne (str)                Network Element, Juniper router to log to
+        os_username (str)       Username to log as in the router
+        os_password (str)       Password for the username above
+    Optional:
+        isis_instance (str)     Name of the IS-IS routing instance to query
+        session                 An open AsyncNetconfSession to use. If not given,
+                                one is opened and closed
+        port (int)              NETCONF port
+        transport (str)         'ssh', or 'tcp' for the stand-in server
+        xml (bool)              If True, the reply is retrieved as XML and read as a
+                                stream, see pyez_core/xml_stream.py
+
+    Version:
+        2026-10-18
+    '''
+
+    isis_module = load_check_module('isis')
+    rpc_kwargs = {'extensive': True}
+    if isis_instance:
+        rpc_kwargs['instance'] = isis_instance
+    async with _SessionScope(session, host=ne, username=os_username, password=os_password,
+                             port=port, transport=transport) as session:
+        if xml:
+            isis_interfaces = extract_isis_interfaces(
+                await session.rpc('get_isis_interface_information', rpc_format='xml',
+                                  raw=True, **rpc_kwargs))
+        else:
+            isis_interfaces = await session.rpc('get_isis_interface_information', **rpc_kwargs)
+    return isis_module.parse_isis_interfaces(isis_interfaces)
+
+
+async def async_check_junos_bgp_session(ne: str,
+                                        os_username: str,
+                                        os_password: str,
+                                        bgp_peers: list,
+                                        routing_instance: str = '',
+                                        bulk: bool = False,
+                                        session: AsyncNetconfSession = None,
+                                        port: int = 830,
+                                        transport: str = 'ssh',
+                                        xml: bool = False) -> dict:
+    '''
+    async equivalent of check_junos_bgp_session() in
+    pyez_bgp_session/production/icinga_junos_bgp_session.py; same return.
+
+    Args:
+    Required:
+        ne (str)                Network Element, Juniper router to log to
+        os_username (str)       Username to log as in the router
+        os_password (str)       Password for the username above
+        bgp_peers (list)        List of IP address for BGP peers
+    Optional:
+        routing_instance (str)  The routing-instance where the BGP sessions are held
+        bulk (bool)             If True, one RPC for all the peers, as
+                                check_junos_bgp_sessions_bulk() does
+        session                 An open AsyncNetconfSession to use. If not given,
+                                one is opened and closed
+        port (int)              NETCONF port
+        transport (str)         'ssh', or 'tcp' for the stand-in server
+        xml (bool)              With bulk, the reply is retrieved as XML and read as a
+                                stream, see pyez_core/xml_stream.py
+
+    Version:
+        2026-10-18
+    '''
+
+    bgp_module = load_check_module('bgp')
+    command_results = {}
+    async with _SessionScope(session, host=ne, username=os_username, password=os_password,
+                             port=port, transport=transport) as session:
+        if bulk:
+            rpc_kwargs = {'instance': routing_instance} if routing_instance else {}
+            if xml:
+                command_outcome = extract_bgp_peers(
+                    await session.rpc('get_bgp_neighbor_information', rpc_format='xml',
+                                      raw=True, **rpc_kwargs))
+            else:
+                command_outcome = await session.rpc('get_bgp_neighbor_information',
+                                                    **rpc_kwargs)
+            bgp_peers_index = bgp_module.index_bgp_peers(
+                command_outcome['bgp-information'][0].get('bgp-peer', []))
+            for bgp_peer in bgp_peers:
+                dict_bgp_peer = bgp_peers_index.get(bgp_module.bgp_peer_address(bgp_peer))
+                if dict_bgp_peer is None:
+                    command_results[bgp_peer] = {'peer_address': bgp_peer, 'state': 'NotFound'}
+                else:
+                    command_results[bgp_peer] = bgp_module.parse_bgp_peer(dict_bgp_peer,
+                                                                          bgp_peer)
+            return command_results
+
+        for bgp_peer in bgp_peers:
+            command_outcome = await session.rpc('get_bgp_neighbor_information',
+                                                instance=routing_instance,
+                                                neighbor_address=bgp_peer)
+            dict_bgp_peer = command_outcome['bgp-information'][0]['bgp-peer'][0]
+            command_results[bgp_peer] = bgp_module.parse_bgp_peer(dict_bgp_peer, bgp_peer)
+    return command_results
+
+
+async def async_ping_vrf(ne: str,
+                         os_username: str,
+                         os_password: str,
+                         vrf: str,
+                         hosts: list,
+                         concurrency: int = 1,
+                         port: int = 830,
+                         transport: str = 'ssh') -> dict:
+    '''
+    async equivalent of ping_vrf() in pyez_vrf_ping/production/icinga_junos_vrf_ping.py;
+    same return.
+
+    With concurrency=n, n sessions are opened with the NE and n pings are in
+    flight at the same time, as ping_vrf() does with threads.
+
+    Version:
+        2026-10-18
+    '''
+
+    vrf_module = load_check_module('vrf_ping')
+    concurrency = max(1, min(concurrency, len(hosts)))
+    sessions = await asyncio.gather(*[AsyncNetconfSession.connect(ne, os_username, os_password,
+                                                                  port=port, transport=transport)
+                                      for _ in range(concurrency)])
+    session_pool = asyncio.Queue()
+    for session in sessions:
+        session_pool.put_nowait(session)
+
+    async def ping_host(host: str) -> str:
+        session = await session_pool.get()
+        try:
+            outcome = await session.rpc('ping', routing_instance=vrf, host=host)
+        finally:
+            session_pool.put_nowait(session)
+        return vrf_module.parse_ping_result(outcome)
+
+    try:
+        results = await asyncio.gather(*[ping_host(host) for host in hosts])
+    finally:
+        await asyncio.gather(*[session.close() for session in sessions])
+
+    # same order as the hosts were given
+    return dict(zip(hosts, results))
+
+
+async def poll_fleet(routers: list,
+                     username: str,
+                     password: str,
+                     on_result,
+                     concurrency: int = 200,
+                     port: int = 830,
+                     transport: str = 'ssh'):
+    '''
+    Runs all the checks of all the routers from this event loop, at most
+    concurrency at the same time, and calls on_result(result) as each completes.
+
+    routers is as returned by pyez_core.fleet_runner.load_inventory(), and the
+    results are evaluated and shaped as pyez_core.fleet_runner.run_check() does.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import time
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.fleet_runner import IcingaState, check_result, evaluate_check
+
+    isis_module = load_check_module('isis')
+    limit = asyncio.Semaphore(concurrency)
+
+    async def run_one(hostname: str, router_username: str, router_password: str, check: dict):
+        async with limit:
+            timer_check_start = time.perf_counter()
+            details = {}
+            try:
+                connect_kwargs = {'port': port, 'transport': transport}
+                if check['type'] == 'isis':
+                    details = isis_module.check_isis_consistency(
+                        await async_get_junos_isis_interfaces(
+                            hostname, router_username, router_password,
+                            check.get('isis_instance', ''), xml=check.get('xml', False),
+                            **connect_kwargs))
+                elif check['type'] == 'bgp':
+                    details = await async_check_junos_bgp_session(
+                        hostname, router_username, router_password, check['peers'],
+                        check.get('routing_instance', ''), bulk=True,
+                        xml=check.get('xml', False), **connect_kwargs)
+                elif check['type'] == 'vrf_ping':
+                    details = await async_ping_vrf(
+                        hostname, router_username, router_password, check['vrf'],
+                        check['hosts'], check.get('concurrency', 1), **connect_kwargs)
+                (state, summary) = evaluate_check(check, details)
+            except Exception as err:
+                state = IcingaState.critical
+                summary = ('The following error prevents me from executing the check: '
+                           '{err!r}'.format(err=err))
+            on_result(check_result(hostname, check, state, summary, details,
+                                   time.perf_counter() - timer_check_start))
+
+    await asyncio.gather(*[run_one(router['hostname'],
+                                   router.get('username', username),
+                                   router.get('password', password),
+                                   check)
+                           for router in routers
+                           for check in router.get('checks', [])])
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    import sys
+    import time
+    from pyez_core.fleet_runner import load_inventory
+
+    inventory, username, password, concurrency, port, transport = get_args()
+
+    def print_result(result):
+        print(json.dumps(result), flush=True)
+
+    timer_fleet_start = time.perf_counter()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(poll_fleet(load_inventory(inventory), username, password,
+                                           print_result, concurrency=concurrency,
+                                           port=port, transport=transport))
+    finally:
+        loop.close()
+    print('Done in {timer_fleet:0.2f} seconds'
+          .format(timer_fleet=time.perf_counter() - timer_fleet_start), file=sys.stderr)
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Benchmark of the checks, offline, on replayed replies of varying sizes.
+
+For each check type, IS-IS, BGP and VRF ping, and each size (interfaces,
+peers, hosts), a synthetic reply of that size is written to a replies directory
+(see pyez_core/replay.py), and these are timed:
+    parse       from the reply to what the check evaluates
+                isis:     isis_model.isis_interfaces_from_reply()
+                bgp:      index_bgp_peers()
+                vrf_ping: parse_ping_result() of each host
+    evaluate    from that to the outcome of the check
+                isis:     isis_model.evaluate_consistency() and to_dict()
+                bgp:      parse_bgp_peer() of each peer, bgp_sessions_perfdata()
+                vrf_ping: nothing to evaluate
+    check       the check function, end to end, on the replayed replies
+                isis:     get_junos_isis_interfaces() and evaluate
+                bgp:      check_junos_bgp_sessions_bulk() of all the peers
+                vrf_ping: ping_vrf() of all the hosts
+Each is the best of repeat runs, in seconds.
+
+The results can be saved (-o) and compared with the ones saved before a change
+(-b), to see what the change does to the performance of the checks.
+
+Requires junos-eznc, that the checks import, but no router.
+
+Invoke as (from the dl_python directory):
+python -m pyez_core.bench
+python -m pyez_core.bench -t isis bgp -s 10 1000 -o before.json
+python -m pyez_core.bench -t isis bgp -s 10 1000 -b before.json
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* get_args(). Parses the arguments passed by the user from CLI
+* write_replies(). Writes the synthetic replies of a check type and size
+* benchmark_check(). Times a check type, of a size
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import json
+import logging
+import os
+import time
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.check_scripts import CHECK_SCRIPTS, load_check_module
+from pyez_core.replay import REPLAY_DIR_VARIABLE, REPLAY_LATENCY_VARIABLE
+from pyez_core.xml_stream import synthetic_bgp_reply, synthetic_isis_reply
+
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+STAGES = ('parse', 'evaluate', 'check')
+# the replayed router
+BENCHMARK_NE = '127.0.0.1'
+BENCHMARK_VRF = 'benchmark'
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='Benchmark the checks on replayed replies')
+
+    # Add arguments
+    parser.add_argument('-t', '--check-types',
+                        help='Check types. Default all: {types}'
+                             .format(types=' '.join(sorted(CHECK_SCRIPTS))),
+                        required=False,
+                        default=sorted(CHECK_SCRIPTS),
+                        choices=sorted(CHECK_SCRIPTS),
+                        nargs='+',
+                        type=str)
+    parser.add_argument('-s', '--sizes',
+                        help='Interfaces/peers/hosts. Default {sizes}'
+                             .format(sizes=' '.join(str(size) for size in DEFAULT_SIZES)),
+                        required=False,
+                        default=DEFAULT_SIZES,
+                        nargs='+',
+                        type=int)
+    parser.add_argument('-r', '--repeat',
+                        help='Runs of each, the best is reported. Default 3',
+                        required=False,
+                        default=3,
+                        type=int)
+    parser.add_argument('-l', '--latency',
+                        help='Seconds each replayed RPC takes. Default 0',
+                        required=False,
+                        default=0.0,
+                        type=float)
+    parser.add_argument('-c', '--concurrency',
+                        help='Pings in flight at once, for vrf_ping. Default 1',
+                        required=False,
+                        default=1,
+                        type=int)
+    parser.add_argument('-o', '--output',
+                        help='Save the results to this JSON file',
+                        required=False,
+                        default='',
+                        type=str)
+    parser.add_argument('-b', '--baseline',
+                        help='Compare with the results saved in this JSON file',
+                        required=False,
+                        default='',
+                        type=str)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return (args.check_types, args.sizes, args.repeat, args.latency, args.concurrency,
+            args.output, args.baseline)
+
+
+def write_replies(replies_dir: str, check_type: str, size: int) -> list:
+    '''
+    Writes to replies_dir the synthetic reply of a router with size interfaces (isis),
+    peers (bgp) or, for vrf_ping, a reply to any ping. Returns the reply (isis, bgp),
+    or the hosts to ping (vrf_ping).
+
+    Version:
+        2026-10-18
+    '''
+
+    if check_type == 'isis':
+        (json_reply, _) = synthetic_isis_reply(size)
+        (rpc_name, replies) = ('get_isis_interface_information', {'{"extensive": true}': None})
+    elif check_type == 'bgp':
+        (json_reply, _) = synthetic_bgp_reply(size)
+        (rpc_name, replies) = ('get_bgp_neighbor_information', {'*': None})
+    else:
+        json_reply = json.dumps({'ping-results': [{'ping-success': [{'data': [None]}]}]})
+        (rpc_name, replies) = ('ping', {'*': None})
+
+    # the reply goes in as it is, not loaded and dumped again
+    with open(os.path.join(replies_dir, rpc_name + '.json'), 'w') as replies_file:
+        replies_file.write(json.dumps(replies).replace('null', json_reply))
+
+    if check_type == 'vrf_ping':
+        return ['10.{a}.{b}.{c}'.format(a=i // 65536, b=(i // 256) % 256, c=i % 256)
+                for i in range(size)]
+    return json.loads(json_reply)
+
+
+def _best_of(repeat: int, function) -> tuple:
+    '''Returns (outcome of function(), best time of repeat runs, seconds)'''
+    best = None
+    for _ in range(repeat):
+        timer_start = time.perf_counter()
+        outcome = function()
+        seconds = time.perf_counter() - timer_start
+        best = seconds if best is None else min(best, seconds)
+        # the checks add a console handler to their logger on each call; as
+        # when run from Icinga, keep one at a time
+        for logger in list(logging.Logger.manager.loggerDict.values()):
+            if isinstance(logger, logging.Logger):
+                logger.handlers = []
+    return (outcome, best)
+
+
+def benchmark_check(check_type: str, size: int, repeat: int = 3, latency: float = 0.0,
+                    concurrency: int = 1) -> dict:
+    '''
+    Returns the seconds to parse, evaluate and check, end to end, a check type
+    of size interfaces/peers/hosts, replaying synthetic replies:
+    {'parse': seconds, 'evaluate': seconds, 'check': seconds}
+
+    Args:
+    Required:
+        check_type (str)    'isis', 'bgp' or 'vrf_ping'
+        size (int)          Interfaces, peers or hosts
+    Optional:
+        repeat (int)        Runs of each, the best is returned
+        latency (float)     Seconds each replayed RPC takes
+        concurrency (int)   Pings in flight at once, for vrf_ping
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import tempfile
+    # imports, this repository's shared PyEZ modules
+    from pyez_core import isis_model
+
+    check_module = load_check_module(check_type)
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as replies_dir:
+        reply = write_replies(replies_dir, check_type, size)
+
+        if check_type == 'isis':
+            (interfaces, timings['parse']) = _best_of(
+                repeat, lambda: isis_model.isis_interfaces_from_reply(reply))
+            (_, timings['evaluate']) = _best_of(
+                repeat, lambda: isis_model.to_dict(interfaces,
+                                                   isis_model.evaluate_consistency(interfaces)))
+
+            def check():
+                interfaces = check_module.get_junos_isis_interfaces(
+                    BENCHMARK_NE, 'benchmark', 'benchmark', model=True)
+                return isis_model.to_dict(interfaces, isis_model.evaluate_consistency(interfaces))
+        elif check_type == 'bgp':
+            dict_bgp_peers = reply['bgp-information'][0]['bgp-peer']
+            bgp_peers = [check_module.bgp_peer_address(dict_bgp_peer['peer-address'][0]['data'])
+                         for dict_bgp_peer in dict_bgp_peers]
+            (bgp_peers_index, timings['parse']) = _best_of(
+                repeat, lambda: check_module.index_bgp_peers(dict_bgp_peers))
+            (_, timings['evaluate']) = _best_of(
+                repeat, lambda: check_module.bgp_sessions_perfdata(
+                    {bgp_peer: check_module.parse_bgp_peer(bgp_peers_index[bgp_peer], bgp_peer)
+                     for bgp_peer in bgp_peers}))
+
+            def check():
+                return check_module.check_junos_bgp_sessions_bulk(
+                    BENCHMARK_NE, 'benchmark', 'benchmark', bgp_peers)
+        else:
+            hosts = reply
+            with open(os.path.join(replies_dir, 'ping.json')) as replies_file:
+                ping_reply = json.load(replies_file)['*']
+            (_, timings['parse']) = _best_of(
+                repeat, lambda: [check_module.parse_ping_result(ping_reply) for _ in hosts])
+            timings['evaluate'] = 0.0
+
+            def check():
+                return check_module.ping_vrf(BENCHMARK_NE, 'benchmark', 'benchmark',
+                                             BENCHMARK_VRF, hosts, concurrency=concurrency)
+
+        # the check, on the replies just written
+        environment = {variable: os.environ.get(variable)
+                       for variable in (REPLAY_DIR_VARIABLE, REPLAY_LATENCY_VARIABLE)}
+        os.environ[REPLAY_DIR_VARIABLE] = replies_dir
+        os.environ[REPLAY_LATENCY_VARIABLE] = str(latency)
+        try:
+            (_, timings['check']) = _best_of(repeat, check)
+        finally:
+            for (variable, value) in environment.items():
+                if value is None:
+                    os.environ.pop(variable, None)
+                else:
+                    os.environ[variable] = value
+
+    return timings
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    (check_types, sizes, repeat, latency, concurrency, output, baseline_file) = get_args()
+
+    baseline = {}
+    if baseline_file:
+        with open(baseline_file) as results_file:
+            baseline = json.load(results_file)
+
+    results = {}
+    header = '{check:<9} {size:>6}'.format(check='check', size='size')
+    for stage in STAGES:
+        header += ' {stage:>10}'.format(stage=stage + ' s')
+        if baseline:
+            header += ' {versus:>8}'.format(versus='vs base')
+    print(header)
+    for check_type in check_types:
+        for size in sizes:
+            timings = benchmark_check(check_type, size, repeat, latency, concurrency)
+            key = '{check} {size}'.format(check=check_type, size=size)
+            results[key] = timings
+            line = '{check:<9} {size:>6}'.format(check=check_type, size=size)
+            for stage in STAGES:
+                line += ' {seconds:>10.4f}'.format(seconds=timings[stage])
+                if baseline:
+                    before = baseline.get(key, {}).get(stage)
+                    if before:
+                        line += ' {ratio:>7.2f}x'.format(ratio=timings[stage] / before)
+                    else:
+                        line += ' {versus:>8}'.format(versus='-')
+            print(line, flush=True)
+
+    if output:
+        with open(output, 'w') as results_file:
+            json.dump(results, results_file, indent=1, sort_keys=True)
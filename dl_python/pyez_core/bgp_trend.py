@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Prefix counts of the BGP peers across runs of the check, and alerts on sudden drops.
+
+The BGP check retrieves the prefixes received, accepted, active and advertised
+by each peer, and only checks the session is Established: a peer that goes from
+800000 prefixes to 12 is OK. With a trend database (-T of the check), each run:
+* appends the counts of each Established peer to the samples table, the time
+  series of the peer (kept for retention_days),
+* compares each count with the rolling baseline of the peer and counter: an
+  exponentially weighted moving average and variance (EWMA, weight alpha for the
+  newest sample), kept in the baselines table and updated in place, so that no
+  run reads back the history,
+* alerts (WARNING) on a count below both drop_fraction of the baseline and
+  sigmas standard deviations under it, once the baseline has min_samples.
+A drop that lasts becomes the new baseline, in some 1 / alpha runs, and the
+alert clears.
+
+One SQLite file for all the routers, in DEFAULT_TREND_DB; the checks of several
+routers and peers may write to it at the same time (WAL journal). A trend
+database that cannot be written is as none: the check goes on without it.
+
+Invoke as (from the dl_python directory), to see the trend of the peers of a router:
+python -m pyez_core.bgp_trend -H dist2-testlab.nn.hea.net
+python -m pyez_core.bgp_trend -H dist2-testlab.nn.hea.net -l 87.44.68.38 -s 86400
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* PrefixAlert. A count below its threshold
+* BgpTrendStore. The database; record(), samples(), baselines()
+* describe_alert(). An alert, as a line for the operator
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import math
+import sqlite3
+import time
+from typing import Dict, List, NamedTuple
+
+
+DEFAULT_TREND_DB = '/tmp/junos_bgp_trend.sqlite'
+# the counters of parse_bgp_peer(), as '<counter>_prefix_count'
+COUNTERS = ('received', 'accepted', 'active', 'advertised')
+# weight of the newest sample in the baseline; about the last 1 / alpha runs
+DEFAULT_ALPHA = 0.1
+# a count is a drop if below this fraction of the baseline...
+DEFAULT_DROP_FRACTION = 0.3
+# ...and this many standard deviations under it
+DEFAULT_SIGMAS = 3.0
+# samples of a baseline before it is trusted
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_RETENTION_DAYS = 30
+# seconds to wait for another check writing to the database
+SQLITE_TIMEOUT = 30
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS samples (
+    ne TEXT, ri TEXT, peer TEXT, at REAL,
+    received INTEGER, accepted INTEGER, active INTEGER, advertised INTEGER);
+CREATE INDEX IF NOT EXISTS samples_peer ON samples (ne, ri, peer, at);
+CREATE INDEX IF NOT EXISTS samples_at ON samples (at);
+CREATE TABLE IF NOT EXISTS baselines (
+    ne TEXT, ri TEXT, peer TEXT, counter TEXT,
+    mean REAL, variance REAL, samples INTEGER, updated_at REAL,
+    PRIMARY KEY (ne, ri, peer, counter));
+'''
+
+# threshold: the count below which value is a drop
+PrefixAlert = NamedTuple('PrefixAlert', [('peer', str),
+                                         ('counter', str),
+                                         ('value', int),
+                                         ('baseline', float),
+                                         ('threshold', float)])
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='Prefix counts of the BGP peers of a router')
+
+    # Add arguments
+    parser.add_argument('-H', '--hostname',
+                        help='Router name, as given to the BGP check',
+                        required=True,
+                        type=str)
+    parser.add_argument('-l', '--peers',
+                        help='Only these peers. Default all',
+                        required=False,
+                        default=[],
+                        type=str,
+                        nargs='+')
+    parser.add_argument('-s', '--since',
+                        help='Samples of the last this many seconds. Default 3600',
+                        required=False,
+                        default=3600,
+                        type=float)
+    parser.add_argument('-T', '--trend-db',
+                        help='Trend database. Default {db}'.format(db=DEFAULT_TREND_DB),
+                        required=False,
+                        default=DEFAULT_TREND_DB,
+                        type=str)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.hostname, ''.join(args.peers).split(), args.since, args.trend_db
+
+
+class BgpTrendStore(object):
+    '''
+    Time series of the prefix counts of the BGP peers, and their rolling baselines.
+
+    Args:
+    Optional:
+        path (str)              SQLite file. Created if it does not exist
+        alpha (float)           Weight of the newest sample in the baselines
+        drop_fraction (float)   A count below this fraction of the baseline...
+        sigmas (float)          ...and this many standard deviations under it is a drop
+        min_samples (int)       Samples of a baseline before it raises alerts
+        retention_days (float)  Days the samples are kept
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, path: str = DEFAULT_TREND_DB, alpha: float = DEFAULT_ALPHA,
+                 drop_fraction: float = DEFAULT_DROP_FRACTION, sigmas: float = DEFAULT_SIGMAS,
+                 min_samples: int = DEFAULT_MIN_SAMPLES,
+                 retention_days: float = DEFAULT_RETENTION_DAYS):
+        self.path = path
+        self.alpha = alpha
+        self.drop_fraction = drop_fraction
+        self.sigmas = sigmas
+        self.min_samples = min_samples
+        self.retention_days = retention_days
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(SCHEMA)
+        return connection
+
+    def record(self, ne: str, ri: str, bgp_peers: Dict[str, dict],
+               now: float = None) -> List[PrefixAlert]:
+        '''
+        Appends the prefix counts of the Established peers in bgp_peers (as returned
+        by the check functions: {peer: {'state': ..., 'received_prefix_count': ...}}),
+        updates their baselines, and returns the counts that dropped, compared with
+        the baselines before this run. [] if the database cannot be written.
+        '''
+        now = time.time() if now is None else now
+        established = {peer: stats for (peer, stats) in bgp_peers.items()
+                       if stats.get('state') == 'Established'}
+        alerts = []
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    # the baselines of the router, in one query
+                    baselines = {}
+                    for (peer, counter, mean, variance, samples) in connection.execute(
+                            'SELECT peer, counter, mean, variance, samples FROM baselines '
+                            'WHERE ne = ? AND ri = ?', (ne, ri)):
+                        baselines[(peer, counter)] = (mean, variance, samples)
+
+                    sample_rows = []
+                    baseline_rows = []
+                    for (peer, stats) in sorted(established.items()):
+                        counts = [int(stats.get(counter + '_prefix_count', 0))
+                                  for counter in COUNTERS]
+                        sample_rows.append([ne, ri, peer, now] + counts)
+                        for (counter, value) in zip(COUNTERS, counts):
+                            (mean, variance, samples) = baselines.get((peer, counter),
+                                                                      (value, 0.0, 0))
+                            if samples >= self.min_samples:
+                                threshold = min(mean * (1 - self.drop_fraction),
+                                                mean - self.sigmas * math.sqrt(variance))
+                                if value < threshold:
+                                    alerts.append(PrefixAlert(peer, counter, value, mean,
+                                                              threshold))
+                            # exponentially weighted moving average and variance
+                            difference = value - mean
+                            increment = self.alpha * difference
+                            baseline_rows.append((ne, ri, peer, counter, mean + increment,
+                                                  (1 - self.alpha) * (variance +
+                                                                      difference * increment),
+                                                  samples + 1, now))
+                    connection.executemany('INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                           sample_rows)
+                    connection.executemany('INSERT OR REPLACE INTO baselines VALUES '
+                                           '(?, ?, ?, ?, ?, ?, ?, ?)', baseline_rows)
+                    connection.execute('DELETE FROM samples WHERE ne = ? AND at < ?',
+                                       (ne, now - self.retention_days * 86400))
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            return []
+        return alerts
+
+    def samples(self, ne: str, peers: List[str] = (), since: float = 0) -> List[tuple]:
+        '''Returns the samples of ne (of peers, if given) after since, oldest first, as
+        (ri, peer, at, received, accepted, active, advertised)'''
+        connection = self._connect()
+        try:
+            return [row for row in connection.execute(
+                        'SELECT ri, peer, at, received, accepted, active, advertised '
+                        'FROM samples WHERE ne = ? AND at >= ? ORDER BY at', (ne, since))
+                    if not peers or row[1] in peers]
+        finally:
+            connection.close()
+
+    def baselines(self, ne: str) -> List[tuple]:
+        '''Returns the baselines of ne, as (ri, peer, counter, mean, standard deviation,
+        samples)'''
+        connection = self._connect()
+        try:
+            return [(ri, peer, counter, mean, math.sqrt(variance), samples)
+                    for (ri, peer, counter, mean, variance, samples) in connection.execute(
+                        'SELECT ri, peer, counter, mean, variance, samples FROM baselines '
+                        'WHERE ne = ? ORDER BY ri, peer, counter', (ne,))]
+        finally:
+            connection.close()
+
+
+def describe_alert(alert: PrefixAlert) -> str:
+    '''
+    Returns the alert as a line for the operator, e.g.
+    '87.44.68.38 received 12 prefixes, baseline 801234, below 560864'
+
+    Version:
+        2026-10-18
+    '''
+
+    return ('{peer} {counter} {value} prefixes, baseline {baseline:.0f}, below {threshold:.0f}'
+            .format(peer=alert.peer, counter=alert.counter, value=alert.value,
+                    baseline=alert.baseline, threshold=alert.threshold))
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    (hostname, peers, since, trend_db) = get_args()
+
+    store = BgpTrendStore(trend_db)
+    print('{ri:<20} {peer:<28} {counter:<10} {mean:>12} {deviation:>10} {samples:>7}'
+          .format(ri='routing-instance', peer='peer', counter='counter', mean='baseline',
+                  deviation='std dev', samples='samples'))
+    for (ri, peer, counter, mean, deviation, samples) in store.baselines(hostname):
+        if not peers or peer in peers:
+            print('{ri:<20} {peer:<28} {counter:<10} {mean:>12.1f} {deviation:>10.1f} '
+                  '{samples:>7}'.format(ri=ri or 'master', peer=peer, counter=counter,
+                                        mean=mean, deviation=deviation, samples=samples))
+    print()
+    print('{at:<19} {ri:<20} {peer:<28} {received:>9} {accepted:>9} {active:>9} {advertised:>10}'
+          .format(at='time', ri='routing-instance', peer='peer', received='received',
+                  accepted='accepted', active='active', advertised='advertised'))
+    for (ri, peer, at, received, accepted, active, advertised) in store.samples(
+            hostname, peers, time.time() - since):
+        print('{at:<19} {ri:<20} {peer:<28} {received:>9} {accepted:>9} {active:>9} '
+              '{advertised:>10}'
+              .format(at=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(at)),
+                      ri=ri or 'master', peer=peer, received=received, accepted=accepted,
+                      active=active, advertised=advertised))
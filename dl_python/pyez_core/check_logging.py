@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Logging of the PyEZ checks, set up once per process, off the hot path.
+
+Each check function used to build a StreamHandler and a Formatter, and add them
+to its logger, on every call. In a process that runs many checks (fleet_runner,
+collector, combined_check) the handlers piled up: after N checks, each message
+was formatted and written N times. get_logger() instead:
+* gives the check function its logger, with the level asked for (debug_level)
+* attaches to it, once, the one handler of the process: a message is put in a
+  queue (by a QueueHandler), with its arguments merged, and no formatting nor
+  I/O in the check
+* the first message logged starts, once, the QueueListener: a thread that takes
+  the messages from the queue, formats them as JSON lines and writes them to
+  stderr
+So whatever the number of checks, a message is handled once, and the cost of
+logging stays the same. A message below the level of its logger is dropped
+before it gets to the queue. A check that logs nothing (e.g. answered from the
+RPC cache, at the default level) starts no thread, and does not import
+logging.handlers (15 ms, with socket and pickle).
+
+One JSON line per message, e.g.:
+    {"time": 1792300000.123, "level": "DEBUG", "logger": "pyez_core.fleet_runner",
+     "function": "ping_vrfs", "line": 512, "thread": "ThreadPoolExecutor-0_1",
+     "message": "Time to ping host 87.44.68.38: 2.31 seconds"}
+
+The messages in the queue are written when the process exits (atexit).
+
+Invoke as (from the dl_python directory), to see the cost of getting the logger
+and logging a message, over many calls:
+python -m pyez_core.check_logging -n 10000
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* JsonLinesFormatter. Formats a message as one JSON line
+* SharedHandler. The one handler of the process; the queue, and its listener, from
+  the first message
+* get_logger(). The logger of a check function, with the shared handler
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import atexit
+import json
+import logging
+import os
+import threading
+
+
+# set up once per process, by the first get_logger()
+_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+_listener_pid = None
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Cost of getting the logger of a check, '
+                                                  'and logging, over many calls'))
+
+    # Add arguments
+    parser.add_argument('-n', '--calls', help='how many calls. Default 10000',
+                        required=False, type=int, default=10000)
+
+    # Array for all arguments passed to script
+    args = parser.parse_args()
+
+    return (args.calls,)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    '''Formats a message as one JSON line'''
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = {'time': round(record.created, 3),
+                'level': record.levelname,
+                'logger': record.name,
+                'function': record.funcName,
+                'line': record.lineno,
+                'thread': record.threadName,
+                'message': record.getMessage()}
+        if record.exc_info:
+            line['exception'] = self.formatException(record.exc_info)
+        return json.dumps(line)
+
+
+def _start_listener():
+    '''Starts the listener that writes the messages in the queue, and the queue handler
+    that puts them there; again in a child process, where the listener thread is not'''
+    global _queue_handler, _listener, _listener_pid
+
+    # imports, Python standard modules
+    import logging.handlers
+    import queue
+
+    message_queue = queue.Queue()
+    stream_handler = logging.StreamHandler()        # console handler, stderr
+    stream_handler.setFormatter(JsonLinesFormatter())
+    listener = logging.handlers.QueueListener(message_queue, stream_handler)
+    listener.start()
+    if _queue_handler is None:
+        _queue_handler = logging.handlers.QueueHandler(message_queue)
+        # write what is left in the queue before the process exits
+        atexit.register(_stop_listener)
+    else:
+        # the loggers keep their handler, that from now on fills the new queue
+        _queue_handler.queue = message_queue
+    _listener = listener
+    _listener_pid = os.getpid()
+
+
+def _stop_listener():
+    '''Writes what is left in the queue, and stops the listener of this process'''
+    global _listener, _listener_pid
+
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+            _listener = None
+            _listener_pid = None
+
+
+class SharedHandler(logging.Handler):
+    '''
+    The one handler of the process, attached to the loggers of the checks. Hands the
+    messages to the QueueHandler; the queue, and the listener writing it, are started
+    with the first message of the process (again with the first one of a child).
+    '''
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if _listener_pid != os.getpid():
+            with _lock:
+                if _listener_pid != os.getpid():
+                    _start_listener()
+        return _queue_handler.handle(record)
+
+    def emit(self, record: logging.LogRecord):
+        self.handle(record)
+
+
+_shared_handler = SharedHandler()
+
+
+def get_logger(name: str, debug_level: str = 'WARNING') -> logging.Logger:
+    '''
+    Returns the logger name, with the shared handler and the level debug_level
+
+    The handler is attached once, however many times the logger is asked for; the
+    level is set on each call, the last one asked for wins. The logger does not
+    propagate its messages, so that they are not written again by the handlers of
+    the root logger, if any.
+
+    Args:
+    Required:
+        name (str)          The name of the logger, e.g. __name__ of the module
+    Optional:
+        debug_level (str)   The level below which the messages are dropped, e.g.
+                            'DEBUG' or 'WARNING' (default)
+
+    Returns:
+        logging.Logger
+
+    Version:
+        2026-10-18
+    '''
+
+    logger = logging.getLogger(name)
+    logger.setLevel(debug_level)
+    if _shared_handler not in logger.handlers:
+        with _lock:
+            if _shared_handler not in logger.handlers:
+                logger.addHandler(_shared_handler)
+                logger.propagate = False
+    return logger
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    # imports, Python standard modules
+    import time
+
+    (calls,) = get_args()
+
+    # as the checks do: the logger on each call, a message below the level and one above
+    timer_start = time.perf_counter()
+    for call in range(calls):
+        logger = get_logger('pyez_core.check_logging.bench', 'WARNING')
+        logger.debug('call {call}: dropped'.format(call=call))
+        logger.warning('call {call}: logged'.format(call=call))
+    timer_calls = time.perf_counter() - timer_start
+    _stop_listener()        # wait for the messages to be written, before the report
+    timer_written = time.perf_counter() - timer_start
+
+    print('{calls} calls: {per_call:.1f} us per call in the caller, {written:.2f} s until '
+          'written; {handlers} handler(s) on the logger'
+          .format(calls=calls, per_call=timer_calls / calls * 1e6, written=timer_written,
+                  handlers=len(logger.handlers)))
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Registry of the check types the shared modules run, and the plugins that add them.
+
+A check type is a CheckPlugin: the RPC it sends to the router, the parser that
+turns the reply into the details of the check, and how the details evaluate to
+an Icinga state. Once registered with register_check(), a check type is run by
+the shared modules as the built-in ones are:
+* fleet_runner, over an inventory, in parallel, with the per-router cap, rate
+  limit and timeout
+* combined_check, over the one Netconf session of the router, with its other checks
+* collector, on a schedule, submitted as a passive check result of its service
+and gets, from run_rpc_check(), the RPC cache ("cache_ttl"), the circuit breaker
+("breaker_dir"), the resolver, replay and per-phase timings, as the check
+scripts do.
+
+The built-in check types are registered by this module: isis, bgp and vrf_ping.
+They run the functions of their production check scripts (see
+pyez_core/check_scripts.py), that do all the above themselves. A plugin instead
+declares only its RPC and its parser, e.g. in my_checks.py:
+
+    from pyez_core.check_registry import CheckPlugin, IcingaState, register_check
+
+    def parse_alarms(reply: dict, check: dict) -> dict:
+        alarms = reply['alarm-information'][0].get('alarm-detail', [])
+        return {alarm['alarm-description'][0]['data']: alarm['alarm-class'][0]['data']
+                for alarm in alarms}
+
+    def evaluate_alarms(check: dict, details: dict) -> tuple:
+        if details:
+            return (IcingaState.critical, 'Chassis alarms: ' + ', '.join(sorted(details)))
+        return (IcingaState.ok, 'No chassis alarms')
+
+    register_check(CheckPlugin('chassis_alarms', rpc='get_alarm_information',
+                               parse=parse_alarms, evaluate=evaluate_alarms))
+
+and in the inventory of fleet_runner/collector, "plugins": ["my_checks"] and
+{"type": "chassis_alarms", "cache_ttl": 30}.
+
+Invoke as (from the dl_python directory), to list the check types, with those of
+the plugin modules given:
+python -m pyez_core.check_registry -l my_checks
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* IcingaState. Icinga status values
+* CheckPlugin. A check type: its RPC, parser, evaluation and Icinga service
+* register_check(). Adds a check type to the registry
+* get_check_plugin(). The check type of a name
+* load_plugins(). Imports the modules that register check types
+* run_rpc_check(). Runs the RPC of a check type, from the cache or the router, parses it
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+from collections import OrderedDict
+from enum import Enum
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.check_scripts import CHECK_SCRIPTS, load_check_module
+
+
+# Icinga Status values
+class IcingaState(Enum):
+    ok = 0
+    warning = 1
+    critical = 2
+    unknown = 3
+
+
+# the check types, by name, in the order they were registered
+CHECK_PLUGINS = OrderedDict()
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='List the check types of the PyEZ checks')
+
+    # Add arguments
+    parser.add_argument('-l', '--plugins',
+                        help='Modules that register more check types, e.g. my_checks',
+                        required=False,
+                        default=[],
+                        nargs='+',
+                        type=str)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    return (args.plugins,)
+
+
+class CheckPlugin(object):
+    '''
+    A check type.
+
+    Args:
+    Required:
+        name (str)          The check type, as "type" in the inventories
+        rpc (str)           The RPC the check sends, as the method of dev.rpc,
+                            e.g. 'get_isis_interface_information'
+        evaluate            function(check, details) -> (IcingaState, summary)
+    Optional:
+        rpc_kwargs          function(check) -> the arguments of the RPC, e.g.
+                            {'instance': check['routing_instance']}. Default none
+        parse               function(reply, check) -> details, from the JSON reply
+                            of the RPC. Required unless run is given
+        run                 function(ne, username, password, check, debug_level,
+                            timer, dev) -> details, to run the check in its own way
+                            instead of run_rpc_check(), as the built-in ones do
+        service (str)       The Icinga service the results are submitted as.
+                            Default junos-<name>, with - for _
+        cacheable (bool)    Whether the reply can be taken from the RPC cache, if
+                            the check has "cache_ttl". Not for e.g. pings
+        script (str)        The check script of the type, relative to dl_python
+
+    Version:
+        2026-10-18
+    '''
+
+    def __init__(self, name: str, rpc: str, evaluate, rpc_kwargs=None, parse=None, run=None,
+                 service: str = '', cacheable: bool = True, script: str = ''):
+        if parse is None and run is None:
+            raise Exception('The check type {name} has neither parse nor run'
+                            .format(name=name))
+        self.name = name
+        self.rpc = rpc
+        self.evaluate = evaluate
+        self.rpc_kwargs = rpc_kwargs or (lambda check: {})
+        self.parse = parse
+        self.run = run
+        self.service = service or 'junos-' + name.replace('_', '-')
+        self.cacheable = cacheable
+        self.script = script
+
+    def execute(self, ne: str, username: str, password: str, check: dict,
+                debug_level: str, timer, dev=None) -> dict:
+        '''Runs the check against ne, over the session dev if given, and returns its details'''
+        if self.run is not None:
+            return self.run(ne, username, password, check, debug_level, timer, dev)
+        return run_rpc_check(self, ne, username, password, check, timer, dev)
+
+
+def register_check(plugin: CheckPlugin) -> CheckPlugin:
+    '''Adds the check type to the registry, and returns it. Raises Exception if its
+    name is taken'''
+    if plugin.name in CHECK_PLUGINS:
+        raise Exception('The check type {name} is already registered'.format(name=plugin.name))
+    CHECK_PLUGINS[plugin.name] = plugin
+    return plugin
+
+
+def get_check_plugin(name: str) -> CheckPlugin:
+    '''Returns the check type name. Raises Exception if there is none'''
+    try:
+        return CHECK_PLUGINS[name]
+    except KeyError:
+        raise Exception('Unknown check type {name}, it has to be one of: {names}'
+                        .format(name=name, names=', '.join(sorted(CHECK_PLUGINS))))
+
+
+def load_plugins(module_names: list):
+    '''Imports the modules, by name, e.g. my_checks; each registers its check types
+    when imported. A module already imported is not imported again'''
+
+    # imports, Python standard modules
+    import importlib
+
+    for module_name in module_names:
+        importlib.import_module(module_name)
+
+
+def run_rpc_check(plugin: CheckPlugin,
+                  ne: str,
+                  username: str,
+                  password: str,
+                  check: dict,
+                  timer,
+                  dev=None) -> dict:
+    '''
+    Runs the RPC of the check type against ne and returns the reply, parsed.
+
+    As the check scripts do: the reply is taken from the RPC cache if the check
+    has "cache_ttl" and the check type is cacheable, and otherwise retrieved over
+    the session dev, if given, or a session of its own, opened as combined_check
+    does (the resolver, the circuit breaker of "breaker_dir", replay), and closed.
+
+    Args:
+    Required:
+        plugin (CheckPlugin)    The check type
+        ne (str)                Router to log to
+        username (str)          Username to log as in the router
+        password (str)          Password for the username above
+        check (dict)            The check, as in the inventory
+        timer (PhaseTimer)      To which dns, connect, auth, rpc and parse are added
+    Optional:
+        dev (Device)            Netconf session with the router already open; left open
+
+    Returns:
+        The details of the check, as returned by the parser of the check type
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.rpc_cache import RpcCache
+
+    rpc_kwargs = plugin.rpc_kwargs(check)
+    reply = None
+    rpc_cache = None
+    if plugin.cacheable and check.get('cache_ttl', 0) > 0:
+        rpc_cache = RpcCache(check['cache_ttl'])
+        reply = rpc_cache.get(ne, plugin.rpc, rpc_kwargs)
+
+    if reply is None:
+        own_session = dev is None
+        try:
+            if own_session:
+                # PyEZ is imported by open_session(), only when not in the cache
+                from pyez_core.combined_check import open_session
+                dev = open_session(ne, username, password, timer, check.get('breaker_dir', ''),
+                                   (plugin.rpc,))
+            try:
+                with timer.phase('rpc', plugin.rpc):
+                    reply = getattr(dev.rpc, plugin.rpc)({'format': 'json'}, **rpc_kwargs)
+            finally:
+                if own_session:
+                    dev.close()     # leave orderly. Properly close the Netconf session
+        except Exception:
+            if rpc_cache is not None:
+                rpc_cache.release(ne, plugin.rpc, rpc_kwargs)   # others fetch it themselves
+            raise
+        if rpc_cache is not None:
+            rpc_cache.put(ne, plugin.rpc, rpc_kwargs, reply)
+
+    with timer.phase('parse'):
+        return plugin.parse(reply, check)
+
+
+#
+# The built-in check types, run by the functions of their production check scripts
+#
+def _run_isis(ne: str, username: str, password: str, check: dict, debug_level: str,
+              timer, dev=None) -> dict:
+    module = load_check_module('isis')
+    isis_interfaces = module.get_junos_isis_interfaces(
+        ne=ne, os_username=username, os_password=password,
+        isis_instance=check.get('isis_instance', ''),
+        debug_level=debug_level, cache_ttl=check.get('cache_ttl', 0),
+        xml=check.get('xml', False), breaker_dir=check.get('breaker_dir', ''),
+        timer=timer, dev=dev)
+    return module.check_isis_consistency(isis_interfaces=isis_interfaces,
+                                         debug_level=debug_level)
+
+
+def _evaluate_isis(check: dict, details: dict) -> tuple:
+    '''consistent -> ok, otherwise critical'''
+    inconsistent = sorted('{interface} {level}'.format(interface=interface, level=level)
+                          for (interface, levels) in details.items()
+                          if isinstance(levels, dict)
+                          for (level, level_data) in levels.items()
+                          if isinstance(level_data, dict) and
+                          level_data.get('isis_if_level_consistency') is False)
+    if details['isis_interfaces_consistency'] is True:
+        return (IcingaState.ok,
+                '{count} IS-IS interfaces, all consistent'
+                .format(count=len(details) - 1))
+    return (IcingaState.critical,
+            'IS-IS interface/level(s) not consistent: {inconsistent}'
+            .format(inconsistent=', '.join(inconsistent)))
+
+
+def _run_bgp(ne: str, username: str, password: str, check: dict, debug_level: str,
+             timer, dev=None) -> dict:
+    module = load_check_module('bgp')
+    return module.check_junos_bgp_sessions_bulk(
+        ne, username, password, check['peers'],
+        check.get('routing_instance', ''), debug_level,
+        cache_ttl=check.get('cache_ttl', 0), xml=check.get('xml', False),
+        timer=timer, breaker_dir=check.get('breaker_dir', ''), dev=dev)
+
+
+def _evaluate_bgp(check: dict, details: dict) -> tuple:
+    '''all peers Established -> ok, otherwise critical'''
+    peers_down = [bgp_peer for (bgp_peer, stats) in details.items()
+                  if stats['state'] != 'Established']
+    if peers_down:
+        return (IcingaState.critical,
+                '{down} of {total} BGP peers not Established: {peers}'
+                .format(down=len(peers_down), total=len(details),
+                        peers=' '.join(peers_down)))
+    return (IcingaState.ok,
+            '{total} of {total} BGP peers Established'.format(total=len(details)))
+
+
+def _run_vrf_ping(ne: str, username: str, password: str, check: dict, debug_level: str,
+                  timer, dev=None) -> dict:
+    module = load_check_module('vrf_ping')
+    return module.ping_vrf(ne, username, password, check['vrf'], check['hosts'],
+                           debug_level, concurrency=check.get('concurrency', 1), timer=timer,
+                           breaker_dir=check.get('breaker_dir', ''), dev=dev)
+
+
+def _evaluate_vrf_ping(check: dict, details: dict) -> tuple:
+    '''all hosts reply -> ok, otherwise critical'''
+    hosts_down = [host for (host, result) in details.items() if result == 'failure']
+    if hosts_down:
+        return (IcingaState.critical,
+                '{down} of {total} hosts in {vrf} do not reply: {hosts}'
+                .format(down=len(hosts_down), total=len(details),
+                        vrf=check['vrf'], hosts=' '.join(hosts_down)))
+    return (IcingaState.ok,
+            '{total} of {total} hosts in {vrf} reply'
+            .format(total=len(details), vrf=check['vrf']))
+
+
+register_check(CheckPlugin('isis', rpc='get_isis_interface_information',
+                           rpc_kwargs=lambda check: dict({'extensive': True},
+                                                         **({'instance': check['isis_instance']}
+                                                            if check.get('isis_instance')
+                                                            else {})),
+                           run=_run_isis, evaluate=_evaluate_isis,
+                           service='junos-isis-interface', script=CHECK_SCRIPTS['isis']))
+register_check(CheckPlugin('bgp', rpc='get_bgp_neighbor_information',
+                           rpc_kwargs=lambda check: ({'instance': check['routing_instance']}
+                                                     if check.get('routing_instance') else {}),
+                           run=_run_bgp, evaluate=_evaluate_bgp,
+                           service='junos-bgp-session', script=CHECK_SCRIPTS['bgp']))
+register_check(CheckPlugin('vrf_ping', rpc='ping',
+                           run=_run_vrf_ping, evaluate=_evaluate_vrf_ping,
+                           service='junos-vrf-ping', cacheable=False,
+                           script=CHECK_SCRIPTS['vrf_ping']))
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    (plugins,) = get_args()
+    load_plugins(plugins)
+
+    for plugin in CHECK_PLUGINS.values():
+        print('{name:<16} rpc {rpc:<34} service {service:<24} {how}'
+              .format(name=plugin.name, rpc=plugin.rpc, service=plugin.service,
+                      how=plugin.script or 'RPC and parser'))
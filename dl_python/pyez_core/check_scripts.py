@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Access, from the shared modules, to the production Icinga check scripts.
+
+The checks are standalone scripts, not a package; this module imports them
+from their path, so that their functions (retrieve, parse, evaluate) are
+reused as they are, and not copied.
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* load_check_module(). Imports the production Icinga check script of a check type
+"""
+
+# imports
+# imports, Python standard modules
+import os
+
+
+# Where the production Icinga check scripts are, for each check type,
+# relative to dl_python
+CHECK_SCRIPTS = {
+    'isis': os.path.join('pyez_isis', 'production', 'icinga_junos_isis_interface.py'),
+    'bgp': os.path.join('pyez_bgp_session', 'production', 'icinga_junos_bgp_session.py'),
+    'vrf_ping': os.path.join('pyez_vrf_ping', 'production', 'icinga_junos_vrf_ping.py'),
+}
+
+
+def load_check_module(check_type: str):
+    '''
+    Imports and returns the production Icinga check script of the check type,
+    e.g. pyez_isis/production/icinga_junos_isis_interface.py for 'isis'.
+
+    The scripts are not in a package, hence they are imported from their path.
+    Each one is imported once; later calls return the same module.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import importlib.util
+    import sys
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                        CHECK_SCRIPTS[check_type])
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[module_name] = module
+    return module
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Circuit breaker per router, shared by the PyEZ checks: fail fast while a router
+is known to be unreachable.
+
+A check that cannot reach its router waits for the NETCONF probe to time out
+(29 seconds) before it fails. In an outage, every check of every router that is
+down does so, and the monitoring host fills with checks waiting. With a breaker
+directory (-K of the checks), the first check that cannot connect opens the
+breaker of the router; until the backoff expires, the checks of that router fail
+at once, as UNKNOWN, with the reason of that failure, without trying. When the
+backoff expires, one check (the first to take the probe lock) tries the router
+again, while the others keep failing fast:
+* it connects: the breaker is closed, the checks go on as usual
+* it does not: the breaker is opened again, with twice the backoff, up to
+  max_backoff seconds (30, 60, 120... 900 seconds by default).
+
+Only a router that does not answer opens the breaker (connection refused, timed
+out, or the probe failed); a wrong password, a failing RPC, do not.
+
+The state of a router is a JSON file in DEFAULT_BREAKER_DIR; no file, closed.
+A breaker directory that is not private to the user running the checks (e.g.
+another user created it first, see pyez_core/private_dir.py) is not used: the
+checks try their routers, as without -K.
+
+Invoke as (from the dl_python directory), to list the routers known to be down:
+python -m pyez_core.circuit_breaker
+# close the breaker of a router, e.g. after the outage, for its checks to try again
+python -m pyez_core.circuit_breaker -r dist2-testlab.nn.hea.net
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* RouterDownError. Raised instead of trying a router known to be down
+* CircuitBreaker. The breakers; allow(), record_failure(), record_success()
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import fcntl
+import hashlib
+import json
+import os
+import time
+
+# imports, own modules
+from pyez_core.private_dir import private_dir, user_state_dir, write_private_file
+
+
+DEFAULT_BREAKER_DIR = user_state_dir('junos_circuit_breaker')
+# seconds a router is not tried after the first failure, doubled on each one after
+DEFAULT_BASE_BACKOFF = 30
+DEFAULT_MAX_BACKOFF = 900
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='List the routers known to be unreachable')
+
+    # Add arguments
+    parser.add_argument('-K', '--breaker-dir',
+                        help='Breaker directory. Default {breaker}'
+                             .format(breaker=DEFAULT_BREAKER_DIR),
+                        required=False,
+                        default=DEFAULT_BREAKER_DIR,
+                        type=str)
+    parser.add_argument('-r', '--reset',
+                        help='Close the breaker of these routers',
+                        required=False,
+                        default=[],
+                        type=str,
+                        nargs='+')
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.breaker_dir, ''.join(args.reset).split()
+
+
+class RouterDownError(Exception):
+    '''The router is known to be unreachable; it was not tried'''
+
+
+class CircuitBreaker(object):
+    '''
+    Circuit breakers of the routers, on disk, shared by the checks.
+
+    allow(ne) before connecting to ne: raises RouterDownError if its breaker is
+    open; then record_failure(ne, reason) if the router did not answer, or
+    record_success(ne) if connected.
+
+    Args:
+    Optional:
+        breaker_dir (str)       Directory for the states. Created if it does not exist
+        base_backoff (float)    Seconds the router is not tried after the first failure
+        max_backoff (float)     Seconds the router is not tried, at most
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, breaker_dir: str = DEFAULT_BREAKER_DIR,
+                 base_backoff: float = DEFAULT_BASE_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF):
+        self.breaker_dir = breaker_dir
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        # ne: open probe lock file, for the routers this object is trying again
+        self._probes = {}
+
+    def _path(self, ne: str) -> str:
+        return os.path.join(self.breaker_dir,
+                            hashlib.sha256(ne.encode('utf-8')).hexdigest()[:32])
+
+    def _read(self, ne: str):
+        '''Returns the state of the breaker of ne, None if closed'''
+        try:
+            # states only from a directory no other user can write to
+            private_dir(self.breaker_dir)
+            with open(self._path(ne) + '.json') as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return None
+
+    def allow(self, ne: str):
+        '''
+        Returns if ne may be tried: its breaker is closed, or its backoff expired
+        and this is the one check to try it again. Raises RouterDownError otherwise.
+        '''
+        state = self._read(ne)
+        if state is None:
+            return
+        now = time.time()
+        if now >= state['retry_at']:
+            # backoff expired: one check tries again, the others wait for its outcome
+            try:
+                private_dir(self.breaker_dir)
+                probe = open(os.open(self._path(ne) + '.probe',
+                                     os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600), 'w')
+                fcntl.flock(probe, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._probes[ne] = probe
+                return
+            except OSError:
+                pass
+        raise RouterDownError(
+            '{ne} is known to be unreachable, not tried: {failures} attempts failed since '
+            '{since}, the last with: {reason}. Next attempt in {retry:.0f} seconds'
+            .format(ne=ne, failures=state['failures'],
+                    since=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(state['since'])),
+                    reason=state['reason'], retry=max(0, state['retry_at'] - now)))
+
+    def _release(self, ne: str):
+        probe = self._probes.pop(ne, None)
+        if probe is not None:
+            probe.close()
+
+    def record_failure(self, ne: str, reason):
+        '''ne did not answer: opens its breaker, with the backoff doubled'''
+        state = self._read(ne) or {'failures': 0, 'since': time.time()}
+        failures = state['failures'] + 1
+        now = time.time()
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (failures - 1))
+        path = self._path(ne)
+        try:
+            private_dir(self.breaker_dir)
+            state = {'ne': ne, 'failures': failures, 'since': state['since'],
+                     'failed_at': now, 'retry_at': now + backoff, 'reason': str(reason)}
+            # atomic, a check reading it sees the old or the new state, never half of it
+            write_private_file(path + '.json', lambda temporary: json.dump(state, temporary))
+        except OSError:
+            pass
+        finally:
+            self._release(ne)
+
+    def record_success(self, ne: str):
+        '''ne answered: closes its breaker'''
+        try:
+            os.remove(self._path(ne) + '.json')
+        except OSError:
+            pass
+        finally:
+            self._release(ne)
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    breaker_dir, reset = get_args()
+
+    breaker = CircuitBreaker(breaker_dir)
+    for ne in reset:
+        breaker.record_success(ne)
+
+    file_names = sorted(os.listdir(breaker_dir)) if os.path.isdir(breaker_dir) else []
+    for file_name in file_names:
+        if not file_name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(breaker_dir, file_name)) as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            continue
+        print('{ne}  down since {since}, {failures} attempts failed, next in {retry:.0f} s: '
+              '{reason}'
+              .format(ne=state['ne'],
+                      since=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(state['since'])),
+                      failures=state['failures'],
+                      retry=max(0, state['retry_at'] - time.time()), reason=state['reason']))
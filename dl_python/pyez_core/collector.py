@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Collector: long-running daemon that runs the PyEZ checks on a schedule, and
+submits their results to Icinga as passive check results.
+
+Run as active checks, Icinga forks a new Python interpreter for every check,
+that imports jnpr.junos (ncclient, paramiko, lxml...) again each time; that is
+CPU and start up time on the monitoring host, for every check. The collector
+is one process: it imports everything once, and runs the checks of an
+inventory (as in pyez_core/fleet_runner.py), each every interval seconds, in a
+pool of threads. The services in Icinga are then passive, without a check
+command; set their check_interval/freshness to a bit more than the interval,
+so that a collector that stops reporting turns them UNKNOWN.
+
+The results are submitted to:
+* the Icinga external command file (-P), e.g. /var/run/icinga2/cmd/icinga2.cmd
+* the Icinga 2 API (-A), action process-check-result, e.g. https://localhost:5665
+  (or anything that stands in for it, with the same request)
+* otherwise, printed, one JSON line per result, as fleet_runner does
+
+The inventory is the one of pyez_core/fleet_runner.py, with, optionally:
+    per router:  "icinga_host": the Icinga host of its services; default hostname
+    per check:   "interval": seconds between runs; default -i
+                 "service": the Icinga service; default junos-isis-interface,
+                            junos-bgp-session or junos-vrf-ping
+The first run of the checks is spread over the first interval, so not all
+the routers are logged in to at the same time.
+
+Invoke as (from the dl_python directory):
+python -m pyez_core.collector \
+    -I inventory.json \
+    -u heanet -p 'substiteWithActualPassword' \
+    -P /var/run/icinga2/cmd/icinga2.cmd
+
+# example, to the Icinga 2 API, every 120 seconds, 32 checks at a time
+python -m pyez_core.collector \
+    -I inventory.json \
+    -u heanet -p 'substiteWithActualPassword' \
+    -A https://localhost:5665 -a 'collector:apiPassword' --ca-file /etc/icinga2/ca.crt \
+    -i 120 -w 32
+
+Stop it with SIGTERM or SIGINT (Ctrl-C); the checks running are let finish
+and submitted.
+
+Requires:
+    Python 3.5
+    junos-eznc 2.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* CommandFileSubmitter. Submits results to the Icinga external command file
+* ApiSubmitter. Submits results to the Icinga 2 API
+* print_submitter(). Prints results, one JSON line each
+* schedule_checks(). The checks of the inventory, with the time of their first run
+* run_collector(). Runs the checks on schedule, submits their results, until stopped
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import importlib
+import logging
+import threading
+import time
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.check_registry import get_check_plugin
+from pyez_core.combined_check import passive_check_command
+from pyez_core.fleet_runner import IcingaState, check_result, load_inventory, run_check
+
+
+# seconds between runs of a check, unless set per check in the inventory
+DEFAULT_INTERVAL = 300.0
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Run the PyEZ checks on a schedule and '
+                                                  'submit them to Icinga as passive checks'))
+
+    # Add arguments
+    parser.add_argument('-I', '--inventory',
+                        help='Inventory file, JSON or YAML',
+                        required=True,
+                        type=str)
+    parser.add_argument('-u', '--username',
+                        help='NETCONF Username',
+                        required=True,
+                        type=str)
+    # nargs='+' used because current password has several special characters....
+    parser.add_argument('-p', '--password',
+                        help='NETCONF Password in single quotes...',
+                        required=True,
+                        type=str,
+                        nargs='+')
+    parser.add_argument('-P', '--command-file',
+                        help='Submit the results to this Icinga external command file',
+                        required=False,
+                        default='',
+                        type=str)
+    parser.add_argument('-A', '--api-url',
+                        help='Submit the results to the Icinga 2 API at this URL, '
+                             'e.g. https://localhost:5665',
+                        required=False,
+                        default='',
+                        type=str)
+    parser.add_argument('-a', '--api-user',
+                        help='With -A, API user and password as user:password',
+                        required=False,
+                        default='',
+                        type=str)
+    parser.add_argument('--ca-file',
+                        help='With -A, CA certificate of the Icinga 2 API',
+                        required=False,
+                        default='',
+                        type=str)
+    parser.add_argument('-i', '--interval',
+                        help='Seconds between runs of a check, unless set per check. '
+                             'Default {interval:.0f}'.format(interval=DEFAULT_INTERVAL),
+                        required=False,
+                        default=DEFAULT_INTERVAL,
+                        type=float)
+    parser.add_argument('-w', '--workers',
+                        help='How many checks run at the same time, overall. Default 16',
+                        required=False,
+                        default=16,
+                        type=int)
+    parser.add_argument('-c', '--per-router',
+                        help='How many checks run at the same time with one router. Default 1',
+                        required=False,
+                        default=1,
+                        type=int)
+    parser.add_argument('-t', '--timeout',
+                        help='Seconds after which a check is reported as UNKNOWN. Default 300',
+                        required=False,
+                        default=300.0,
+                        type=float)
+    parser.add_argument('-M', '--metrics-file',
+                        help='Also save the time spent in each phase of each check to this '
+                             'file: Prometheus textfile if it ends in .prom, JSON lines '
+                             'otherwise',
+                        required=False,
+                        default='',
+                        type=str)
+    parser.add_argument("-d", "--debug",
+                        help="enable debug mode",
+                        required=False,
+                        action="store_true")
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # due diligence
+    if args.command_file and args.api_url:
+        parser.error('submit either to the command file (-P) or to the API (-A), not both')
+    for (name, value) in (('interval', args.interval), ('workers', args.workers),
+                          ('per-router', args.per_router), ('timeout', args.timeout)):
+        if value <= 0:
+            parser.error('--{name} has to be greater than 0'.format(name=name))
+
+    # Return all variable values
+    # because when using nargs='+', the password is a list
+    return (args.inventory, args.username, args.password[0], args.command_file,
+            args.api_url, args.api_user, args.ca_file, args.interval, args.workers,
+            args.per_router, args.timeout, args.metrics_file, args.debug)
+
+
+class CommandFileSubmitter(object):
+    '''
+    Submits results to the Icinga external command file (a named pipe, e.g.
+    /var/run/icinga2/cmd/icinga2.cmd), as PROCESS_SERVICE_CHECK_RESULT commands.
+    The file is opened for each result, so Icinga can be restarted in between.
+
+    submitter(result, icinga_host, service)
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, command_file: str):
+        self.command_file = command_file
+
+    def __call__(self, result: dict, icinga_host: str, service: str):
+        # imports, Python standard modules
+        import os
+
+        command = passive_check_command(result, icinga_host, service)
+        # a single write, so the commands of concurrent checks do not mix
+        file_descriptor = os.open(self.command_file, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(file_descriptor, command.encode('utf-8'))
+        finally:
+            os.close(file_descriptor)
+
+
+class ApiSubmitter(object):
+    '''
+    Submits results to the Icinga 2 API, POST /v1/actions/process-check-result.
+
+    submitter(result, icinga_host, service)
+
+    Args:
+    Required:
+        api_url (str)       e.g. https://localhost:5665
+    Optional:
+        api_user (str)      user:password of the ApiUser, with permission
+                            actions/process-check-result
+        ca_file (str)       CA certificate to verify the API with
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, api_url: str, api_user: str = '', ca_file: str = '',
+                 timeout: float = 10.0):
+        # imports, Python standard modules
+        import base64
+        import ssl
+
+        self.url = api_url.rstrip('/') + '/v1/actions/process-check-result'
+        self.headers = {'Accept': 'application/json', 'Content-Type': 'application/json'}
+        if api_user:
+            self.headers['Authorization'] = 'Basic ' + base64.b64encode(
+                api_user.encode('utf-8')).decode('ascii')
+        self.context = None
+        if self.url.startswith('https'):
+            self.context = ssl.create_default_context(cafile=ca_file or None)
+        self.timeout = timeout
+
+    def __call__(self, result: dict, icinga_host: str, service: str):
+        # imports, Python standard modules
+        import json
+        import urllib.request
+
+        body = {'type': 'Service',
+                'filter': 'host.name==host_name && service.name==service_name',
+                'filter_vars': {'host_name': icinga_host, 'service_name': service},
+                'exit_status': result['exit_code'],
+                'plugin_output': result['summary'],
+                'performance_data': ["'{phase}'={seconds}s".format(phase=phase, seconds=seconds)
+                                     for (phase, seconds) in sorted(result['phases'].items())],
+                'check_source': 'pyez_core.collector'}
+        request = urllib.request.Request(self.url, data=json.dumps(body).encode('utf-8'),
+                                         headers=self.headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout,
+                                    context=self.context) as response:
+            reply = json.loads(response.read().decode('utf-8'))
+        # a filter that matches no service is not an HTTP error, but an empty reply
+        if not reply.get('results'):
+            raise Exception('The Icinga 2 API knows no service {service} of {host}'
+                            .format(service=service, host=icinga_host))
+
+
+def print_submitter(result: dict, icinga_host: str, service: str):
+    '''Prints the result as one JSON line, with the Icinga host and service'''
+    # imports, Python standard modules
+    import json
+
+    print(json.dumps(dict(result, icinga_host=icinga_host, service=service)), flush=True)
+
+
+def schedule_checks(routers: list, username: str, password: str,
+                    interval: float = DEFAULT_INTERVAL, start: float = None) -> list:
+    '''
+    Returns the checks of the inventory, to be run by run_collector(), as a heap
+    of (time of the first run, sequence number, task); task is a dictionary with
+    the keys hostname, username, password, check, icinga_host, service and interval.
+    The first runs are spread evenly over the first interval.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import heapq
+
+    if start is None:
+        start = time.monotonic()
+    tasks = [{'hostname': router['hostname'],
+              'username': router.get('username', username),
+              'password': router.get('password', password),
+              'check': check,
+              'icinga_host': router.get('icinga_host', router['hostname']),
+              'service': check.get('service', get_check_plugin(check['type']).service),
+              'interval': float(check.get('interval', interval))}
+             for router in routers
+             for check in router.get('checks', [])]
+    heap = [(start + sequence * task['interval'] / len(tasks), sequence, task)
+            for (sequence, task) in enumerate(tasks)]
+    heapq.heapify(heap)
+    return heap
+
+
+def run_collector(routers: list,
+                  username: str,
+                  password: str,
+                  submit=print_submitter,
+                  interval: float = DEFAULT_INTERVAL,
+                  workers: int = 16,
+                  per_router: int = 1,
+                  timeout: float = 300.0,
+                  debug_level: str = 'ERROR',
+                  stop: threading.Event = None,
+                  check_function=run_check):
+    '''
+    Runs the checks of the inventory, each every interval seconds, and submits
+    each result as soon as it is in, until stop is set.
+
+    A check is next run interval seconds after its last run started; if it took
+    longer than that, as soon as it completes. A check due while its router is at
+    the per-router cap waits for a slot. A check taking longer than timeout is
+    submitted as UNKNOWN; its thread can not be killed, so it is next run once it
+    does complete. A result that cannot be submitted is logged, and the collector
+    carries on.
+
+    Args:
+    Required:
+        routers (list)          As returned by fleet_runner.load_inventory()
+        username (str)          Username to log as in the routers, unless set per router
+        password (str)          Password for the username above, unless set per router
+    Optional:
+        submit                  Called as submit(result, icinga_host, service); a
+                                CommandFileSubmitter, an ApiSubmitter, or print_submitter()
+        interval (float)        Seconds between runs of a check, unless set per check
+        workers (int)           How many checks run at the same time, overall
+        per_router (int)        How many checks run at the same time with one router
+        timeout (float)         Seconds after which a check is reported as UNKNOWN
+        debug_level(str)        Python logging level, passed to the check functions
+        stop (Event)            threading.Event; once set, no more checks are started,
+                                the running ones are let finish and submitted
+        check_function          The function that runs one check; run_check()
+                                unless testing/replaying
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    # imports, Python standard modules
+    import collections
+    import concurrent.futures
+    import heapq
+
+    logger = logging.getLogger(__name__)
+    if stop is None:
+        stop = threading.Event()
+
+    def submit_result(result: dict, task: dict):
+        try:
+            submit(result, task['icinga_host'], task['service'])
+        except Exception as err:
+            logger.error('Cannot submit the result of {service} of {host}: {err}'
+                         .format(service=task['service'], host=task['icinga_host'], err=err))
+
+    due = schedule_checks(routers, username, password, interval)
+    in_flight_per_router = collections.Counter()
+    running = {}        # future -> (sequence, task, started, deadline)
+    abandoned = {}      # future -> (sequence, task, started), timed out but still busy
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        while not stop.is_set() or running:
+            # start the checks that are due, as the caps allow
+            now = time.monotonic()
+            waiting = []
+            while (not stop.is_set() and due and due[0][0] <= now and
+                   len(running) + len(abandoned) < workers):
+                (when, sequence, task) = heapq.heappop(due)
+                if in_flight_per_router[task['hostname']] >= per_router:
+                    waiting.append((when, sequence, task))
+                    continue
+                in_flight_per_router[task['hostname']] += 1
+                future = executor.submit(check_function, task['hostname'], task['username'],
+                                         task['password'], task['check'],
+                                         debug_level=debug_level)
+                running[future] = (sequence, task, now, now + timeout)
+            # the ones waiting for their router keep their place
+            for item in waiting:
+                heapq.heappush(due, item)
+
+            # wait until a check completes, a check times out, or the next one is due
+            wakeups = [deadline - now for (_, _, _, deadline) in running.values()]
+            if due and not waiting and len(running) + len(abandoned) < workers:
+                wakeups.append(due[0][0] - now)
+            # so that a stop is seen, and a waiting check started, within a second
+            wait_timeout = max(0.0, min(wakeups + [1.0]))
+            done, _ = concurrent.futures.wait(list(running) + list(abandoned),
+                                              timeout=wait_timeout,
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                if future in abandoned:
+                    # already submitted as UNKNOWN; now it frees its slot, and is rescheduled
+                    (sequence, task, started) = abandoned.pop(future)
+                else:
+                    (sequence, task, started, _) = running.pop(future)
+                    submit_result(future.result(), task)
+                in_flight_per_router[task['hostname']] -= 1
+                heapq.heappush(due, (max(started + task['interval'], time.monotonic()),
+                                     sequence, task))
+
+            # submit as UNKNOWN the ones that run out of time
+            now = time.monotonic()
+            for future in [future for (future, (_, _, _, deadline)) in running.items()
+                           if deadline <= now]:
+                (sequence, task, started, _) = running.pop(future)
+                abandoned[future] = (sequence, task, started)
+                submit_result(check_result(task['hostname'], task['check'], IcingaState.unknown,
+                                           ('The check did not complete within {timeout} '
+                                            'seconds'.format(timeout=timeout)),
+                                           {}, timeout),
+                              task)
+    finally:
+        # do not wait for the abandoned ones
+        executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    import functools
+    import signal
+
+    (inventory, username, password, command_file, api_url, api_user, ca_file, interval,
+     workers, per_router, timeout, metrics_file, debug) = get_args()
+
+    # Whether we want console output while the collector runs. In production do not use DEBUG
+    if debug is True:
+        debug_level = 'DEBUG'
+    else:
+        debug_level = 'WARNING'
+    # the collector's own messages, e.g. a result that cannot be submitted
+    logger = logging.getLogger(__name__)
+    c_handler = logging.StreamHandler()         # console handler
+    c_handler.setFormatter(logging.Formatter('%(asctime)s: %(levelname)s: %(message)s'))
+    logger.addHandler(c_handler)
+
+    # imported now, once, and not by each check; so a missing one is seen at start up
+    importlib.import_module('jnpr.junos')
+
+    if command_file:
+        submit = CommandFileSubmitter(command_file)
+    elif api_url:
+        submit = ApiSubmitter(api_url, api_user, ca_file)
+    else:
+        submit = print_submitter
+
+    # stop orderly on SIGTERM (systemd stop) and SIGINT (Ctrl-C)
+    stop = threading.Event()
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signal_number, lambda signal_number, frame: stop.set())
+
+    run_collector(load_inventory(inventory), username, password, submit=submit,
+                  interval=interval, workers=workers, per_router=per_router, timeout=timeout,
+                  debug_level=debug_level, stop=stop,
+                  check_function=functools.partial(run_check, metrics_file=metrics_file))
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Icinga check of a PE router: IS-IS interfaces, BGP sessions and VRF
+reachability, over one NETCONF session.
+
+Run one by one, the three check scripts each open their own NETCONF session
+with the router, and each pays the 2.5 to 3 seconds of connect and SSH
+authentication. This check opens one session, runs the checks asked for in it,
+one after the other, and closes it: one login per router instead of three.
+
+The checks are the same functions the check scripts use (run_check() of
+pyez_core/fleet_runner.py), so the outcome of each is the same. The results
+are either:
+* one multi-line Icinga result (default): the first line is the worst state
+  of the checks, with the perfdata of the session; then a line per check
+* separate passive check results (-P), one per service, written to the Icinga
+  external command file. This check then reports on the session only
+
+Invoke as (from the dl_python directory):
+python -m pyez_core.combined_check \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -i \
+    -b "87.44.68.38 2001:770:100:6836::2" -r testlab.2020081013 \
+    -f testlab.2020081013 -t "87.44.68.38 87.44.68.42"
+
+# example, as passive check results of the services junos-isis-interface,
+#          junos-bgp-session and junos-vrf-ping of the host dist2-testlab
+python -m pyez_core.combined_check \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -i -b "87.44.68.38" -f testlab.2020081013 -t "87.44.68.38" \
+    -P /var/run/icinga2/cmd/icinga2.cmd -n dist2-testlab
+
+# example, the same, with other service names
+    ... -P /var/run/icinga2/cmd/icinga2.cmd -S isis=isis bgp=bgp-customers
+
+# example, with a circuit breaker (see pyez_core/circuit_breaker.py): while the router
+#          is known to be unreachable, every check is UNKNOWN at once
+    ... -K /tmp/junos_circuit_breaker
+
+Requires:
+    Python 3.5
+    junos-eznc 2.5
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* get_args(). Parses the arguments passed by the user from CLI
+* open_session(). Opens a Netconf session with the router, for all the checks
+* run_combined(). Runs the checks over one session, returns their results
+* worst_state(). The state of several results, the worst of them
+* icinga_output(). The results as one multi-line Icinga result
+* passive_check_command(). A result as an Icinga external command
+* submit_passive_results(). The results as passive check results
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import time
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.check_registry import CHECK_PLUGINS, get_check_plugin
+from pyez_core.circuit_breaker import RouterDownError
+from pyez_core.fleet_runner import IcingaState, check_result, run_check
+from pyez_core.telemetry import PhaseTimer
+
+
+# from the best to the worst, for the state of several results
+STATE_SEVERITY = (IcingaState.ok, IcingaState.unknown, IcingaState.warning,
+                  IcingaState.critical)
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('IS-IS, BGP and VRF ping checks of a '
+                                                  'router, over one NETCONF session'))
+
+    # Add arguments
+    parser.add_argument('-H', '--hostname', help='Router name',
+                        required=True, type=str)
+    parser.add_argument('-u', '--username', help='NETCONF Username',
+                        required=True, type=str)
+    # nargs='+' used because current password has several special characters....
+    parser.add_argument('-p', '--password', help='NETCONF Password in single quotes...',
+                        required=True, type=str, nargs='+')
+    parser.add_argument('-i', '--isis', help='check the consistency of the IS-IS interfaces',
+                        required=False, action='store_true')
+    parser.add_argument('-b', '--bgp-peers', help='list of IP BGP peers to check',
+                        required=False, type=str, nargs='+')
+    parser.add_argument('-r', '--ri', help='routing-instance of the BGP peers',
+                        required=False, type=str)
+    parser.add_argument('-f', '--vrf', help='VRF to ping the hosts from',
+                        required=False, type=str)
+    parser.add_argument('-t', '--ping-hosts', help='list of IP hosts to ping from the VRF',
+                        required=False, type=str, nargs='+')
+    parser.add_argument('-x', '--xml', help=('retrieve the IS-IS and BGP replies as XML, not '
+                                             'JSON, and extract only the fields needed'),
+                        required=False, action='store_true')
+    parser.add_argument('-P', '--passive', help=('Icinga external command file; if given, the '
+                                                 'result of each check is written to it as a '
+                                                 'passive check result of its service'),
+                        required=False, type=str)
+    parser.add_argument('-n', '--icinga-host', help=('with -P, the Icinga host of the services. '
+                                                     'Default the router name'),
+                        required=False, type=str)
+    parser.add_argument('-S', '--services', help=('with -P, the service of a check type as '
+                                                  'type=service, e.g. isis=isis-interfaces. '
+                                                  'Default {services}'
+                                                  .format(services=' '.join(
+                                                      '{check}={service}'.format(
+                                                          check=plugin.name,
+                                                          service=plugin.service)
+                                                      for plugin in CHECK_PLUGINS.values()))),
+                        required=False, type=str, nargs='+')
+    parser.add_argument('-K', '--breaker-dir', help=('keep the state of the circuit breaker '
+                                                     'of the router in this directory: while '
+                                                     'the router is known to be unreachable, '
+                                                     'return UNKNOWN at once instead of '
+                                                     'trying it'),
+                        required=False, type=str)
+    parser.add_argument('-M', '--metrics-file', help=('also save the time spent in each phase '
+                                                      'to this file: Prometheus textfile if it '
+                                                      'ends in .prom, JSON lines otherwise'),
+                        required=False, type=str)
+    parser.add_argument("-d", "--debug", help="enable debug mode",
+                        required=False, action="store_true")
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # the checks, as in the inventory of pyez_core/fleet_runner.py
+    checks = []
+    if args.isis:
+        checks.append({'type': 'isis', 'xml': args.xml})
+    if args.bgp_peers:
+        checks.append({'type': 'bgp',
+                       'routing_instance': args.ri or '',
+                       'peers': ''.join(args.bgp_peers).split(),
+                       'xml': args.xml})
+    if args.ping_hosts or args.vrf:
+        if not (args.ping_hosts and args.vrf):
+            parser.error('-f/--vrf and -t/--ping-hosts go together')
+        checks.append({'type': 'vrf_ping',
+                       'vrf': args.vrf,
+                       'hosts': ''.join(args.ping_hosts).split()})
+    if not checks:
+        parser.error('nothing to check, give -i, -b and/or -f with -t')
+
+    # the services not given are those of the check types
+    services = {}
+    for service in args.services or []:
+        (check_type, _, service_name) = service.partition('=')
+        if check_type not in CHECK_PLUGINS or not service_name:
+            parser.error('-S/--services is as type=service, type one of {types}'
+                         .format(types=', '.join(sorted(CHECK_PLUGINS))))
+        services[check_type] = service_name
+
+    # if the command file, host and metrics file are explicitly given, take them;
+    # otherwise use empty ''
+    if args.passive:
+        command_file = args.passive
+    else:
+        command_file = ''
+    if args.icinga_host:
+        icinga_host = args.icinga_host
+    else:
+        icinga_host = args.hostname
+    if args.breaker_dir:
+        breaker_dir = args.breaker_dir
+    else:
+        breaker_dir = ''
+    if args.metrics_file:
+        metrics_file = args.metrics_file
+    else:
+        metrics_file = ''
+
+    # Return all variable values
+    # because when using nargs='+', the password is a list
+    return (args.hostname, args.username, args.password[0], checks, command_file,
+            icinga_host, services, breaker_dir, metrics_file, args.debug)
+
+
+def open_session(ne: str, os_username: str, os_password: str, timer: PhaseTimer,
+                 breaker_dir: str = '', rpc_names: tuple = (), broker_socket: str = '',
+                 tuning=None):
+    '''
+    Opens a Netconf session with the NE, as all the checks do, timing dns, connect
+    and auth into timer:
+    * the recorded replies instead of the NE, or recording them, if asked to in the
+      environment; see pyez_core/replay.py
+    * fail fast, without trying, while the NE is known to be unreachable, if
+      breaker_dir is given (RouterDownError); see pyez_core/circuit_breaker.py
+    * the address of the family that connected fastest; see pyez_core/resolver.py
+    * through the broker, if broker_socket is given; see pyez_core/netconf_broker.py
+    * no facts gathered, and the timeouts of the NE for the RPCs rpc_names to send;
+      see pyez_core/latency.py
+    A connection refused or timed out is recorded against the address, and the
+    circuit breaker; a session opened, for both.
+    Returns the session, a jnpr.junos.Device or stand-in.
+
+    Args:
+    Required:
+        ne (str)            Router to log to
+        os_username (str)   Username to log as in the router
+        os_password (str)   Password for the username above
+        timer (PhaseTimer)  To which dns, connect and auth are added
+    Optional:
+        breaker_dir (str)   Directory of the circuit breakers
+        rpc_names (tuple)   The RPCs to send over the session, for its timeouts
+        broker_socket (str) Unix socket of a running pyez_core.netconf_broker
+        tuning (Tuning)     The timeouts, as LatencyHistory().tuning() returns them,
+                            for the checks that also take from it how many RPCs they
+                            keep in flight. Default those of the NE for rpc_names
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python third party modules
+    from jnpr.junos import Device           # this is Juniper's PyEz
+    import jnpr.junos.exception as JUNOS_EXCEPTION
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.latency import LatencyHistory
+    from pyez_core.replay import junos_device
+    from pyez_core.resolver import Resolver
+    from pyez_core.telemetry import open_device
+
+    # the recorded replies instead of the NE, or recording them, if asked to in the
+    # environment
+    Device = junos_device(Device)
+
+    # fail fast, without trying, while the NE is known to be unreachable
+    breaker = None
+    if breaker_dir:
+        from pyez_core.circuit_breaker import CircuitBreaker
+        breaker = CircuitBreaker(breaker_dir)
+        breaker.allow(ne)
+
+    timer_netconf_start = time.perf_counter()
+    resolver = Resolver()
+    with timer.phase('dns'):
+        ne_ip = resolver.preferred_address(ne)
+    # timeouts from the latency history of the NE
+    if tuning is None:
+        tuning = LatencyHistory().tuning(ne, rpc_names)
+    if broker_socket:
+        # reuse the session the broker keeps open with the NE; the broker probes the
+        # NE, if it has to open the session
+        from pyez_core.netconf_broker import BrokerDevice
+        dev = BrokerDevice(broker_socket, host=ne_ip, user=os_username, password=os_password,
+                           auto_probe=int(tuning.probe_timeout))
+    else:
+        dev = Device(host=ne_ip, user=os_username, password=os_password)
+    try:
+        open_device(dev, timer, tuning.probe_timeout, tuning.rpc_timeout)
+    except (JUNOS_EXCEPTION.ConnectRefusedError, JUNOS_EXCEPTION.ConnectTimeoutError,
+            JUNOS_EXCEPTION.ProbeError) as err:
+        # next time, connect over the other address family first
+        resolver.record_failure(ne, ne_ip)
+        if breaker is not None:
+            breaker.record_failure(ne, err)
+        raise
+    if not broker_socket:
+        # through the broker, the session was most likely open already
+        resolver.record_connect(ne, ne_ip, time.perf_counter() - timer_netconf_start)
+    if breaker is not None:
+        breaker.record_success(ne)
+    return dev
+
+
+def run_combined(ne: str,
+                 os_username: str,
+                 os_password: str,
+                 checks: list,
+                 debug_level: str = 'ERROR',
+                 timer: PhaseTimer = None,
+                 breaker_dir: str = '') -> list:
+    '''
+    Runs the checks against the NE, all over one Netconf session, one after the
+    other, and returns their results.
+
+    If the session cannot be opened, every check is critical, with the reason;
+    unknown if the NE was not tried, known to be unreachable.
+
+    Args:
+    Required:
+        ne (str)            Router to log to
+        os_username (str)   Username to log as in the router
+        os_password (str)   Password for the username above
+        checks (list)       The checks, as in the inventory of pyez_core/fleet_runner.py,
+                            e.g. [{'type': 'isis'}, {'type': 'bgp', 'peers': ['10.0.0.1']}]
+    Optional:
+        debug_level(str)    Python logging level, passed to the check functions
+        timer (PhaseTimer)  To which the time spent in dns, connect and auth (of the
+                            session), rpc and parse (of all the checks) is added
+        breaker_dir (str)   Directory of the circuit breakers; see
+                            pyez_core/circuit_breaker.py
+
+    Returns:
+        list of dictionaries, one per check, as returned by run_check()
+
+    Version:
+        2026-10-18
+    '''
+
+    if timer is None:
+        timer = PhaseTimer()
+
+    timer_session_start = time.perf_counter()
+    try:
+        dev = open_session(ne, os_username, os_password, timer, breaker_dir,
+                           tuple(get_check_plugin(check['type']).rpc for check in checks))
+    except RouterDownError as err:
+        duration = time.perf_counter() - timer_session_start
+        return [check_result(ne, check, IcingaState.unknown, str(err), {}, duration,
+                             timer.seconds)
+                for check in checks]
+    except Exception as err:
+        summary = ('The following error prevents me from executing the check: '
+                   'Error connecting to {ne}: {err}'.format(ne=ne, err=err))
+        duration = time.perf_counter() - timer_session_start
+        return [check_result(ne, check, IcingaState.critical, summary, {}, duration,
+                             timer.seconds)
+                for check in checks]
+
+    results = []
+    try:
+        for check in checks:
+            result = run_check(ne, os_username, os_password, check, debug_level, dev=dev)
+            for phase in ('rpc', 'parse'):
+                if phase in result['phases']:
+                    timer.record(phase, result['phases'][phase])
+            results.append(result)
+    finally:
+        # leave orderly. Properly close the Netconf session with the NE
+        dev.close()
+
+    return results
+
+
+def worst_state(results: list) -> IcingaState:
+    '''Returns the worst state of the results: critical, warning, unknown, ok'''
+    return max((IcingaState[result['state']] for result in results),
+               key=STATE_SEVERITY.index, default=IcingaState.ok)
+
+
+def icinga_output(results: list, perfdata: str) -> tuple:
+    '''
+    Returns (IcingaState, text) of the results as one multi-line Icinga result:
+    the worst state, with perfdata, then a line per check, e.g.
+        1 of 3 checks not OK: bgp | 'dns'=0.0004s 'connect'=0.0213s ...
+        [OK] isis: 12 IS-IS interfaces, all consistent
+        [CRITICAL] bgp: 1 of 2 BGP peers not Established: 87.44.68.38
+        [OK] vrf_ping: 2 of 2 hosts in testlab.2020081013 reply
+
+    Version:
+        2026-10-18
+    '''
+
+    state = worst_state(results)
+    not_ok = [result['check'] for result in results if result['state'] != IcingaState.ok.name]
+    if not_ok:
+        first_line = '{count} of {total} checks not OK: {checks}'.format(
+            count=len(not_ok), total=len(results), checks=' '.join(not_ok))
+    else:
+        first_line = '{total} of {total} checks OK'.format(total=len(results))
+    lines = [first_line + ' | ' + perfdata]
+    lines += ['[{state}] {check}: {summary}'.format(state=result['state'].upper(),
+                                                    check=result['check'],
+                                                    summary=result['summary'])
+              for result in results]
+    return (state, '\n'.join(lines))
+
+
+def passive_check_command(result: dict, icinga_host: str, service: str,
+                          now: float = None) -> str:
+    '''
+    Returns the result, as returned by run_check(), as the Icinga external command
+    that submits it as the passive check result of the service of icinga_host:
+    [<time>] PROCESS_SERVICE_CHECK_RESULT;<host>;<service>;<exit code>;<output>|<perfdata>
+
+    Version:
+        2026-10-18
+    '''
+
+    if now is None:
+        now = time.time()
+    perfdata = ' '.join("'{phase}'={seconds}s".format(phase=phase, seconds=seconds)
+                        for (phase, seconds) in sorted(result['phases'].items()))
+    # the output is one line, and ; separates the fields of the command
+    output = result['summary'].replace('\n', ' ').replace(';', ',')
+    return ('[{now}] PROCESS_SERVICE_CHECK_RESULT;{host};{service};{code};'
+            '{output}|{perfdata}\n'
+            .format(now=int(now), host=icinga_host, service=service,
+                    code=result['exit_code'], output=output, perfdata=perfdata))
+
+
+def submit_passive_results(results: list, command_file: str, icinga_host: str,
+                           services: dict = None):
+    '''
+    Writes each result to the Icinga external command file (a named pipe, e.g.
+    /var/run/icinga2/cmd/icinga2.cmd) as the passive check result of its service,
+    see passive_check_command(). The service of a check type is that in services,
+    if there, otherwise that of the check type; see pyez_core/check_registry.py.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import os
+
+    now = time.time()
+    services = services or {}
+    commands = [passive_check_command(result, icinga_host,
+                                      services.get(result['check'],
+                                                   get_check_plugin(result['check']).service),
+                                      now)
+                for result in results]
+
+    # a single write, so the commands of concurrent checks do not mix
+    file_descriptor = os.open(command_file, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(file_descriptor, ''.join(commands).encode('utf-8'))
+    finally:
+        os.close(file_descriptor)
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    import sys
+    import warnings
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    (hostname, username, password, checks, command_file, icinga_host, services,
+     breaker_dir, metrics_file, debug) = get_args()
+
+    # Whether we want console output while the script progresses. In production do not use DEBUG
+    if debug is True:
+        debug_level = 'DEBUG'
+    else:
+        debug_level = 'WARNING'
+
+    # time spent in each phase, of the session and all the checks, rendered as perfdata
+    timer = PhaseTimer()
+    results = run_combined(hostname, username, password, checks, debug_level, timer,
+                           breaker_dir)
+    perfdata = timer.report('combined', hostname, metrics_file)
+
+    if command_file:
+        # each service gets its own result; this check is on the submission
+        try:
+            submit_passive_results(results, command_file, icinga_host, services)
+            outcome = IcingaState.ok
+            print('{count} passive check results of {host} submitted: {states} | {perfdata}'
+                  .format(count=len(results), host=icinga_host,
+                          states=', '.join('{check} {state}'.format(check=result['check'],
+                                                                    state=result['state'].upper())
+                                           for result in results),
+                          perfdata=perfdata))
+        except OSError as err:
+            outcome = IcingaState.unknown
+            print('Cannot submit the passive check results to {command_file}: {err} | {perfdata}'
+                  .format(command_file=command_file, err=err, perfdata=perfdata))
+    else:
+        (outcome, output) = icinga_output(results, perfdata)
+        print(output)
+
+    sys.exit(outcome.value)     # will be given to Icinga to render green/red in GUI
@@ -0,0 +1,630 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Fleet inventory, indexed by role, platform and VRF, and the plan of the RPCs its
+checks need, per router, run in parallel.
+
+The check scripts take one -H hostname at a time, and fleet_runner runs each
+check of the inventory on its own: a login per check, and an RPC per check even
+when two checks of a router need the same reply (e.g. two BGP checks of the same
+routing-instance, for different customers). Here:
+* the inventory of fleet_runner gets, optionally, per router its "role",
+  "platform" and "vrfs"; the checks every router of a role gets ("roles"); and
+  the options of the checks on a platform ("platforms"), e.g. the XML replies
+  for IS-IS on the ACX, whose routing engine is slow to render JSON
+* FleetIndex indexes the routers by role, platform and VRF, to select a part
+  of the fleet (-R, -F, -V)
+* discover() fills the inventory, in a one-off run, from the routers: their
+  platform, their VRFs, an isis check if they have IS-IS interfaces, and a bgp
+  check per routing-instance with BGP peers. VRF ping hosts are not discovered
+* plan_router() derives, for a router, the minimal set of RPCs covering its
+  checks: checks repeated (by role and by router) run once; checks that send
+  the same RPC share one reply, through the RPC cache (see
+  pyez_core/rpc_cache.py); and the pings of all its vrf_ping checks are sent
+  once per (VRF, host), with ping_vrfs()
+* run_plans() hands the plans to the parallel executor of fleet_runner, one task
+  per router: one login, over which all its checks run, as combined_check does
+The results are those of fleet_runner, one per check of the inventory.
+
+The inventory, in JSON or YAML, as that of pyez_core/fleet_runner.py, and:
+{
+    "roles": {
+        "pe": {"checks": [{"type": "isis"}]}
+    },
+    "platforms": {
+        "acx2200": {"isis": {"xml": true}, "vrf_ping": {"concurrency": 1}}
+    },
+    "routers": [
+        {"hostname": "dist2-testlab.nn.hea.net", "role": "pe", "platform": "acx2200",
+         "vrfs": ["testlab.2020081013"],
+         "checks": [{"type": "bgp", "routing_instance": "testlab.2020081013",
+                     "peers": ["87.44.68.38"]}]}
+    ]
+}
+The options of a platform apply to the checks of its type, unless the check
+gives them itself.
+
+Invoke as (from the dl_python directory), to see the plan, without running it:
+python -m pyez_core.fleet_plan -i inventory.yaml -u heanet -p 'substiteWithActualPassword' -s
+
+# example, run the checks of the PE routers in a VRF, 16 routers at a time
+python -m pyez_core.fleet_plan -i inventory.yaml -u heanet -p 'substiteWithActualPassword' \
+    -R pe -V testlab.2020081013 -w 16
+
+# example, one-off discovery: the inventory, filled from the routers, to a new file
+python -m pyez_core.fleet_plan -i inventory.yaml -u heanet -p 'substiteWithActualPassword' \
+    -D discovered.json
+
+Requires:
+    Python 3.5
+    junos-eznc 2.5 (to run the checks, and the discovery)
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* expand_inventory(). The routers, with the checks of their role and platform
+* router_vrfs(). The VRFs of a router, given and of its checks
+* FleetIndex. The routers, by role, platform and VRF; select()
+* discover_router(). Platform, VRFs and checks of a router, from its replies
+* discover(). The inventory, filled from the routers
+* plan_router(). The minimal set of RPCs covering the checks of a router
+* run_router_plan(). Runs the plan of a router, over one session
+* run_plans(). Runs the plans of the routers in parallel, yields the results
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import copy
+import json
+import time
+from collections import OrderedDict
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.check_registry import get_check_plugin
+from pyez_core.circuit_breaker import RouterDownError
+from pyez_core.fleet_runner import IcingaState, check_result, evaluate_check, run_check
+from pyez_core.telemetry import PhaseTimer
+
+
+# seconds the reply of an RPC is kept for the other checks of the router that send it
+SHARED_REPLY_TTL = 60
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Plan the RPCs of the checks of a fleet '
+                                                  'of routers, and run them in parallel'))
+
+    # Add arguments
+    parser.add_argument('-i', '--inventory', help='Inventory file, JSON or YAML',
+                        required=True, type=str)
+    parser.add_argument('-u', '--username', help='NETCONF Username',
+                        required=True, type=str)
+    # nargs='+' used because current password has several special characters....
+    parser.add_argument('-p', '--password', help='NETCONF Password in single quotes...',
+                        required=True, type=str, nargs='+')
+    parser.add_argument('-R', '--role', help='Only the routers of this role',
+                        required=False, default='', type=str)
+    parser.add_argument('-F', '--platform', help='Only the routers of this platform',
+                        required=False, default='', type=str)
+    parser.add_argument('-V', '--vrf', help='Only the routers with this VRF',
+                        required=False, default='', type=str)
+    parser.add_argument('-s', '--show', help='Print the plan of each router, do not run it',
+                        required=False, action='store_true')
+    parser.add_argument('-D', '--discover', help=('Discover the routers, and write the '
+                                                  'inventory, filled, to this file'),
+                        required=False, default='', type=str)
+    parser.add_argument('-w', '--workers', help='How many routers at the same time. Default 16',
+                        required=False, default=16, type=int)
+    parser.add_argument('-r', '--rate', help='How many routers start per second, at most. '
+                                             'Default 10',
+                        required=False, default=10.0, type=float)
+    parser.add_argument('-t', '--timeout', help=('Seconds after which the checks of a router '
+                                                 'are reported as UNKNOWN. Default 600'),
+                        required=False, default=600.0, type=float)
+    parser.add_argument('-M', '--metrics-file', help=('also save the time spent in each phase '
+                                                      'to this file: Prometheus textfile if it '
+                                                      'ends in .prom, JSON lines otherwise'),
+                        required=False, default='', type=str)
+    parser.add_argument("-d", "--debug", help="enable debug mode",
+                        required=False, action="store_true")
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # due diligence, these have to be positive
+    for (name, value) in (('workers', args.workers), ('rate', args.rate),
+                          ('timeout', args.timeout)):
+        if value <= 0:
+            parser.error('--{name} has to be greater than 0'.format(name=name))
+
+    # Return all variable values
+    # because when using nargs='+', the password is a list
+    return (args.inventory, args.username, args.password[0], args.role, args.platform,
+            args.vrf, args.show, args.discover, args.workers, args.rate, args.timeout,
+            args.metrics_file, args.debug)
+
+
+def _check_key(check: dict) -> str:
+    '''The check, as a string, the same for the same check whatever the order of its keys'''
+    return json.dumps(check, sort_keys=True)
+
+
+def expand_inventory(inventory: dict) -> list:
+    '''
+    Returns the routers of the inventory, each with, before its own checks, the
+    checks of its role, and in each check the options of its platform for the
+    type of the check, unless the check gives them. The inventory is not changed.
+
+    Version:
+        2026-10-18
+    '''
+
+    roles = inventory.get('roles', {})
+    platforms = inventory.get('platforms', {})
+    routers = []
+    for router in inventory.get('routers', []):
+        router = copy.deepcopy(router)
+        checks = copy.deepcopy(roles.get(router.get('role'), {}).get('checks', []))
+        checks += router.get('checks', [])
+        options = platforms.get(router.get('platform'), {})
+        router['checks'] = [dict(options.get(check.get('type'), {}), **check)
+                            for check in checks]
+        routers.append(router)
+    return routers
+
+
+def router_vrfs(router: dict) -> list:
+    '''The VRFs of the router: those given, and those of its checks'''
+    vrfs = list(router.get('vrfs', []))
+    for check in router.get('checks', []):
+        vrf = check.get('vrf') or check.get('routing_instance')
+        if vrf and vrf not in vrfs:
+            vrfs.append(vrf)
+    return vrfs
+
+
+class FleetIndex(object):
+    '''
+    The routers of an inventory, as returned by expand_inventory(), indexed by
+    their role, platform and VRFs.
+
+    index = FleetIndex(expand_inventory(inventory))
+    index.by_platform['acx2200']                # the hostnames
+    index.select(role='pe', vrf='testlab.2020081013')   # the routers
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, routers: list):
+        self.routers = OrderedDict((router['hostname'], router) for router in routers)
+        # role/platform/VRF: [hostname, ...], in the order of the inventory
+        self.by_role = OrderedDict()
+        self.by_platform = OrderedDict()
+        self.by_vrf = OrderedDict()
+        for (hostname, router) in self.routers.items():
+            if router.get('role'):
+                self.by_role.setdefault(router['role'], []).append(hostname)
+            if router.get('platform'):
+                self.by_platform.setdefault(router['platform'], []).append(hostname)
+            for vrf in router_vrfs(router):
+                self.by_vrf.setdefault(vrf, []).append(hostname)
+
+    def select(self, role: str = '', platform: str = '', vrf: str = '') -> list:
+        '''The routers of the role, platform and VRF given; all of them if none is'''
+        hostnames = list(self.routers)
+        for (index, value) in ((self.by_role, role), (self.by_platform, platform),
+                               (self.by_vrf, vrf)):
+            if value:
+                selected = set(index.get(value, []))
+                hostnames = [hostname for hostname in hostnames if hostname in selected]
+        return [self.routers[hostname] for hostname in hostnames]
+
+
+def _data(element: list, field: str, default=None):
+    '''The value of field in the first element of a JSON reply of Junos, e.g.
+    [{'product-model': [{'data': 'mx480'}]}] -> 'mx480' '''
+    try:
+        return element[0][field][0]['data']
+    except (IndexError, KeyError, TypeError):
+        return default
+
+
+def discover_router(dev) -> dict:
+    '''
+    Returns what a router has, over its open Netconf session dev:
+        {'platform': 'mx480', 'vrfs': ['testlab.2020081013', ...],
+         'checks': [{'type': 'isis'},
+                    {'type': 'bgp', 'routing_instance': '', 'peers': [...]}, ...]}
+    an isis check if it has IS-IS interfaces, a bgp check per routing-instance, the
+    master ('') and each VRF, with BGP peers.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_scripts import load_check_module
+
+    bgp_peer_address = load_check_module('bgp').bgp_peer_address
+
+    software = dev.rpc.get_software_information({'format': 'json'})
+    platform = _data(software.get('software-information', []), 'product-model', '')
+    if not platform:
+        # a router with several routing engines answers per routing engine
+        engines = (software.get('multi-routing-engine-results', [{}])[0]
+                   .get('multi-routing-engine-item', []))
+        platform = _data([engine.get('software-information', [{}])[0]
+                          for engine in engines[:1]], 'product-model', '')
+
+    instances = dev.rpc.get_instance_information({'format': 'json'})
+    vrfs = [_data([instance], 'instance-name')
+            for instance in (instances.get('instance-information', [{}])[0]
+                             .get('instance-core', []))
+            if _data([instance], 'instance-type') == 'vrf']
+
+    checks = []
+    isis = dev.rpc.get_isis_interface_information({'format': 'json'})
+    if isis.get('isis-interface-information', [{}])[0].get('isis-interface'):
+        checks.append({'type': 'isis'})
+    for routing_instance in [''] + vrfs:
+        rpc_kwargs = {'instance': routing_instance} if routing_instance else {}
+        bgp = dev.rpc.get_bgp_neighbor_information({'format': 'json'}, **rpc_kwargs)
+        peers = [bgp_peer_address(_data([bgp_peer], 'peer-address', ''))
+                 for bgp_peer in bgp.get('bgp-information', [{}])[0].get('bgp-peer', [])]
+        if peers:
+            checks.append({'type': 'bgp', 'routing_instance': routing_instance,
+                           'peers': peers})
+
+    return {'platform': platform, 'vrfs': vrfs, 'checks': checks}
+
+
+def discover(inventory: dict, username: str, password: str, workers: int = 16,
+             debug_level: str = 'ERROR') -> dict:
+    '''
+    Returns the inventory filled from its routers, with discover_router(), in
+    parallel: the platform and VRFs of a router, if not given, and the checks
+    discovered that are not in the inventory yet (as the same type and RPC). A
+    router that cannot be discovered is left as it is, and logged.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import concurrent.futures
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_logging import get_logger
+    from pyez_core.combined_check import open_session
+
+    logger = get_logger(__name__, debug_level)
+
+    def discover_one(router: dict) -> dict:
+        dev = open_session(router['hostname'], router.get('username', username),
+                           router.get('password', password), PhaseTimer())
+        try:
+            return discover_router(dev)
+        finally:
+            dev.close()     # leave orderly. Properly close the Netconf session
+
+    inventory = copy.deepcopy(inventory)
+    routers = inventory.get('routers', [])
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        discovering = [executor.submit(discover_one, router) for router in routers]
+        for (router, future) in zip(routers, discovering):
+            try:
+                discovered = future.result()
+            except Exception as err:
+                logger.warning('Cannot discover {ne}: {err}'
+                               .format(ne=router['hostname'], err=err))
+                continue
+            router.setdefault('platform', discovered['platform'])
+            router.setdefault('vrfs', discovered['vrfs'])
+            known = set((check['type'], _check_key(get_check_plugin(check['type'])
+                                                   .rpc_kwargs(check)))
+                        for check in router.get('checks', []))
+            router.setdefault('checks', []).extend(
+                check for check in discovered['checks']
+                if (check['type'], _check_key(get_check_plugin(check['type'])
+                                              .rpc_kwargs(check))) not in known)
+    return inventory
+
+
+def plan_router(router: dict) -> dict:
+    '''
+    Returns the plan of the checks of a router, as returned by expand_inventory():
+        {'type': 'plan', 'hostname': 'mx1', 'checks': [...],
+         'vrf_hosts': {vrf: [host, ...]},
+         'rpcs': [(rpc, rpc_kwargs, [index of the checks that use its reply]), ...],
+         'logins': 1, 'unplanned_logins': 3, 'unplanned_rpcs': 5}
+    The checks are those of the router, the repeated ones only once. Those that
+    send the same RPC as another check, and can take its reply from the RPC cache,
+    get "cache_ttl" of at least SHARED_REPLY_TTL: the first one run retrieves the
+    reply, the others take it from the cache. The vrf_ping checks are not run on
+    their own: their hosts are in vrf_hosts, each pinged once, by ping_vrfs().
+    rpcs is the minimal set of RPCs sent, and unplanned_logins/_rpcs what running
+    the checks one by one would take.
+
+    Version:
+        2026-10-18
+    '''
+
+    checks = []
+    seen = set()
+    for check in router.get('checks', []):
+        if _check_key(check) not in seen:
+            seen.add(_check_key(check))
+            checks.append(copy.deepcopy(check))
+
+    # one by one, each check sends its RPC, or a ping per host
+    unplanned_rpcs = sum(len(check['hosts']) if check['type'] == 'vrf_ping' else 1
+                         for check in router.get('checks', []))
+
+    rpcs = OrderedDict()                # (rpc, arguments as a key): (rpc, rpc_kwargs, [index])
+    vrf_hosts = OrderedDict()
+    for (index, check) in enumerate(checks):
+        plugin = get_check_plugin(check['type'])
+        if check['type'] == 'vrf_ping':
+            hosts = vrf_hosts.setdefault(check['vrf'], [])
+            for host in check['hosts']:
+                if host not in hosts:
+                    hosts.append(host)
+                rpc_kwargs = {'routing_instance': check['vrf'], 'host': host}
+                rpcs.setdefault((plugin.rpc, _check_key(rpc_kwargs)),
+                                (plugin.rpc, rpc_kwargs, []))[2].append(index)
+            continue
+        rpc_kwargs = plugin.rpc_kwargs(check)
+        if check.get('xml'):
+            # the reply as XML is another reply, cached apart
+            rpc_kwargs = dict(rpc_kwargs, format='xml')
+        rpcs.setdefault((plugin.rpc, _check_key(rpc_kwargs)),
+                        (plugin.rpc, rpc_kwargs, []))[2].append(index)
+
+    # the checks of a shared reply take it from the RPC cache, but the first
+    for (rpc, rpc_kwargs, indexes) in rpcs.values():
+        if len(indexes) > 1 and get_check_plugin(checks[indexes[0]]['type']).cacheable:
+            for index in indexes:
+                checks[index]['cache_ttl'] = max(checks[index].get('cache_ttl', 0),
+                                                 SHARED_REPLY_TTL)
+
+    return {'type': 'plan',
+            'hostname': router['hostname'],
+            'checks': checks,
+            'vrf_hosts': vrf_hosts,
+            'rpcs': list(rpcs.values()),
+            'logins': 1,
+            'unplanned_logins': len(router.get('checks', [])),
+            'unplanned_rpcs': unplanned_rpcs}
+
+
+def run_router_plan(hostname: str,
+                    username: str,
+                    password: str,
+                    plan: dict,
+                    debug_level: str = 'ERROR',
+                    metrics_file: str = '') -> list:
+    '''
+    Runs the plan of a router over one Netconf session, as returned by
+    plan_router(), and returns the results of its checks, in their order, as
+    run_check() does. The checks, but vrf_ping, run with run_check(); the pings
+    of all the vrf_ping checks with one ping_vrfs(), each check then evaluated
+    on the replies of its hosts.
+
+    If the session cannot be opened, every check is critical, with the reason;
+    unknown if the router was not tried, known to be unreachable. The breaker
+    directory is that of the first check with "breaker_dir".
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_scripts import load_check_module
+    from pyez_core.combined_check import open_session
+
+    checks = plan['checks']
+    breaker_dir = next((check['breaker_dir'] for check in checks
+                        if check.get('breaker_dir')), '')
+    timer = PhaseTimer()
+    timer_session_start = time.perf_counter()
+    try:
+        dev = open_session(hostname, username, password, timer, breaker_dir,
+                           tuple(get_check_plugin(check['type']).rpc for check in checks))
+    except RouterDownError as err:
+        duration = time.perf_counter() - timer_session_start
+        return [check_result(hostname, check, IcingaState.unknown, str(err), {}, duration,
+                             timer.seconds)
+                for check in checks]
+    except Exception as err:
+        summary = ('The following error prevents me from executing the check: '
+                   'Error connecting to {ne}: {err}'.format(ne=hostname, err=err))
+        duration = time.perf_counter() - timer_session_start
+        return [check_result(hostname, check, IcingaState.critical, summary, {}, duration,
+                             timer.seconds)
+                for check in checks]
+
+    results = [None] * len(checks)
+    try:
+        for (index, check) in enumerate(checks):
+            if check['type'] != 'vrf_ping':
+                results[index] = run_check(hostname, username, password, check, debug_level,
+                                           dev=dev)
+
+        if plan['vrf_hosts']:
+            ping_timer = PhaseTimer()
+            timer_pings_start = time.perf_counter()
+            try:
+                pings = load_check_module('vrf_ping').ping_vrfs(
+                    hostname, username, password, plan['vrf_hosts'], debug_level,
+                    timer=ping_timer, dev=dev)
+                error = None
+            except Exception as err:
+                error = err
+            duration = time.perf_counter() - timer_pings_start
+            for (index, check) in enumerate(checks):
+                if check['type'] != 'vrf_ping':
+                    continue
+                if error is not None:
+                    results[index] = check_result(
+                        hostname, check, IcingaState.critical,
+                        'The following error prevents me from executing the check: {err}'
+                        .format(err=error), {}, duration, ping_timer.seconds)
+                    continue
+                details = OrderedDict((host, pings[check['vrf']][host])
+                                      for host in check['hosts'])
+                (state, summary) = evaluate_check(check, details)
+                results[index] = check_result(hostname, check, state, summary, details,
+                                              duration, ping_timer.seconds)
+            ping_timer.report('vrf_ping', hostname, metrics_file)
+    finally:
+        # leave orderly. Properly close the Netconf session with the NE
+        dev.close()
+
+    for result in results:
+        for phase in ('rpc', 'parse'):
+            if phase in result['phases']:
+                timer.record(phase, result['phases'][phase])
+    timer.report('plan', hostname, metrics_file)
+    return results
+
+
+def run_plans(plans: list,
+              username: str,
+              password: str,
+              workers: int = 16,
+              rate: float = 10.0,
+              timeout: float = 600.0,
+              debug_level: str = 'ERROR',
+              metrics_file: str = ''):
+    '''
+    Runs the plans, as returned by plan_router(), with the parallel executor of
+    pyez_core/fleet_runner.py (run_fleet()), one task per router, and yields the
+    results of their checks as each router completes.
+
+    Args:
+    Required:
+        plans (list)            The plans, with 'username'/'password' of the router, if any
+        username (str)          Username to log as in the routers, unless set per router
+        password (str)          Password for the username above, unless set per router
+    Optional:
+        workers (int)           How many routers at the same time
+        rate (float)            How many routers start per second, at most
+        timeout (float)         Seconds after which the checks of a router are UNKNOWN
+        debug_level(str)        Python logging level, passed to the check functions
+        metrics_file (str)      If given, the time spent in each phase is saved to it
+
+    Yields:
+        dictionary, one per check, as returned by run_check()
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import functools
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.fleet_runner import run_fleet
+
+    plans_by_hostname = {plan['hostname']: plan for plan in plans}
+    # a router, with its plan as its one check
+    tasks = [{'hostname': plan['hostname'],
+              'username': plan.get('username', username),
+              'password': plan.get('password', password),
+              'checks': [plan]}
+             for plan in plans]
+    for outcome in run_fleet(tasks, username, password, workers=workers, per_router=1,
+                             rate=rate, timeout=timeout, debug_level=debug_level,
+                             check_function=functools.partial(run_router_plan,
+                                                              metrics_file=metrics_file)):
+        if isinstance(outcome, list):
+            for result in outcome:
+                yield result
+            continue
+        # the router did not complete in time: each of its checks is unknown
+        for check in plans_by_hostname[outcome['hostname']]['checks']:
+            yield check_result(outcome['hostname'], check, IcingaState.unknown,
+                               outcome['summary'], {}, outcome['duration'])
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    import sys
+
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.fleet_runner import load_inventory, read_inventory
+
+    (inventory_file, username, password, role, platform, vrf, show, discover_file,
+     workers, rate, timeout, metrics_file, debug) = get_args()
+
+    # Whether we want console output while the script progresses.
+    if debug is True:
+        debug_level = 'DEBUG'
+    else:
+        debug_level = 'WARNING'
+
+    inventory = read_inventory(inventory_file)
+
+    if discover_file:
+        with open(discover_file, 'w') as discovered_file:
+            json.dump(discover(inventory, username, password, workers, debug_level),
+                      discovered_file, indent=4)
+        sys.exit(0)
+
+    # the checks of the roles and platforms in each router, verified as fleet_runner does
+    routers = load_inventory(inventory_file,
+                             dict(inventory, routers=expand_inventory(inventory)))
+    plans = []
+    for router in FleetIndex(routers).select(role, platform, vrf):
+        plan = plan_router(router)
+        for credential in ('username', 'password'):
+            if credential in router:
+                plan[credential] = router[credential]
+        plans.append(plan)
+
+    if show:
+        for plan in plans:
+            print('{ne}: {checks} checks, {logins} login (not {unplanned_logins}), '
+                  '{rpcs} RPCs (not {unplanned_rpcs})'
+                  .format(ne=plan['hostname'], checks=len(plan['checks']),
+                          logins=plan['logins'], unplanned_logins=plan['unplanned_logins'],
+                          rpcs=len(plan['rpcs']), unplanned_rpcs=plan['unplanned_rpcs']))
+            for (rpc, rpc_kwargs, indexes) in plan['rpcs']:
+                print('    {rpc} {rpc_kwargs} for {checks}'
+                      .format(rpc=rpc, rpc_kwargs=json.dumps(rpc_kwargs, sort_keys=True),
+                              checks=', '.join(plan['checks'][index]['type']
+                                               for index in indexes)))
+        sys.exit(0)
+
+    timer_fleet_start = time.perf_counter()
+    states = {}
+    for result in run_plans(plans, username, password, workers=workers, rate=rate,
+                            timeout=timeout, debug_level=debug_level,
+                            metrics_file=metrics_file):
+        print(json.dumps(result), flush=True)
+        states[result['state']] = states.get(result['state'], 0) + 1
+
+    # summary at the end, on stderr so that stdout stays one JSON per line
+    print('{count} checks of {routers} routers in {timer_fleet:0.2f} seconds: {states}'
+          .format(count=sum(states.values()), routers=len(plans),
+                  timer_fleet=time.perf_counter() - timer_fleet_start,
+                  states=', '.join('{state} {count}'.format(state=state, count=count)
+                                   for (state, count) in sorted(states.items()))),
+          file=sys.stderr)
@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Fleet runner for the PyEZ checks: runs the IS-IS interface, BGP session and
+VRF ping checks over a whole inventory of routers, in parallel.
+
+Each check is the same function the Icinga check scripts use, so the outcome
+is the same as running the scripts one by one; only faster. Results are
+printed as they complete, one JSON line per check, so a sweep of the network
+can be followed (or piped somewhere) while it runs.
+
+The work is I/O bound (waiting for the routers), so the checks run in a pool
+of threads, not processes. To not hammer the network:
+* per-router cap, at most this many checks at the same time with one router
+  (each check is one NETCONF session, or more for VRF ping with concurrency)
+* global rate limit, at most this many checks started per second
+* per-check timeout, a check taking longer is reported as UNKNOWN. The thread
+  can not be killed; it is left to finish in the background, still counting
+  against the per-router cap, and its late result is discarded.
+
+Invoke as (from the dl_python directory):
+python -m pyez_core.fleet_runner \
+    -i inventory.json \
+    -u heanet -p 'substiteWithActualPassword'
+
+# example, for a big network: 32 checks at a time, at most 5 new ones per second,
+#          2 at a time per router, give up on a check after 120 seconds
+python -m pyez_core.fleet_runner \
+    -i inventory.json \
+    -u heanet -p 'substiteWithActualPassword' \
+    -w 32 -r 5 -c 2 -t 120
+
+The inventory is a JSON file (or YAML, if PyYAML is installed) as:
+{
+    "routers": [
+        {"hostname": "dist2-testlab.nn.hea.net",
+         "checks": [
+            {"type": "isis"},
+            {"type": "bgp",
+             "routing_instance": "testlab.2020081013",
+             "peers": ["87.44.68.38", "2001:770:100:6836::2"]},
+            {"type": "vrf_ping",
+             "vrf": "testlab.2020081013",
+             "hosts": ["87.44.68.38", "87.44.68.42"],
+             "concurrency": 4}
+         ]},
+        {"hostname": "edge3-testlab.nn.hea.net",
+         "username": "otheruser", "password": "otherpassword",
+         "checks": [{"type": "isis", "isis_instance": ""}]}
+    ]
+}
+Username and password given per router override the ones given from CLI.
+Check types other than these are added by plugin modules, listed as
+"plugins": ["my_checks"] next to "routers"; see pyez_core/check_registry.py.
+The isis and bgp checks take "cache_ttl": <seconds>, to reuse a reply retrieved
+by another check less than that ago (see pyez_core/rpc_cache.py), and
+"xml": true, to retrieve the reply as XML (see pyez_core/xml_stream.py).
+All the checks take "breaker_dir": <directory>, to fail fast, as UNKNOWN, while
+their router is known to be unreachable (see pyez_core/circuit_breaker.py).
+Each check runs on its own, with its own login; to run all the checks of a
+router over one login, sharing the RPCs they have in common, and to select the
+routers by role, platform or VRF, see pyez_core/fleet_plan.py.
+
+Each line of the output is as:
+{"hostname": "dist2-testlab.nn.hea.net", "check": "bgp", "state": "ok", "exit_code": 0,
+ "summary": "2 of 2 BGP peers Established", "details": {...}, "duration": 4.52,
+ "phases": {"dns": 0.0004, "connect": 0.0213, "auth": 2.6102, "rpc": 1.8377, ...}}
+With -M <file>, the phases of each check are also saved to that file, see
+pyez_core/telemetry.py.
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* read_inventory(). Reads the inventory file, as it is
+* load_inventory(). Reads the inventory file, the routers in it, verified
+* evaluate_check(). Turns the outcome of a check function into an Icinga state
+* run_check(). Runs one check against one router, returns its result
+* RateLimiter. Token bucket, to limit how many checks start per second
+* run_fleet(). Runs all the checks in the inventory, yields results as they complete
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import time
+
+# imports, this repository's shared PyEZ modules
+# IcingaState is imported from here by the other shared modules, too
+from pyez_core.check_registry import CHECK_PLUGINS, IcingaState, get_check_plugin, load_plugins
+from pyez_core.circuit_breaker import RouterDownError
+from pyez_core.telemetry import PhaseTimer
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='Run the PyEZ checks over a fleet of routers')
+
+    # Add arguments
+    parser.add_argument('-i', '--inventory',
+                        help='Inventory file, JSON or YAML',
+                        required=True,
+                        type=str)
+    parser.add_argument('-u', '--username',
+                        help='NETCONF Username',
+                        required=True,
+                        type=str)
+    # nargs='+' used because current password has several special characters....
+    parser.add_argument('-p', '--password',
+                        help='NETCONF Password in single quotes...',
+                        required=True,
+                        type=str,
+                        nargs='+')
+    parser.add_argument('-w', '--workers',
+                        help='How many checks run at the same time, overall. Default 16',
+                        required=False,
+                        default=16,
+                        type=int)
+    parser.add_argument('-c', '--per-router',
+                        help='How many checks run at the same time with one router. Default 1',
+                        required=False,
+                        default=1,
+                        type=int)
+    parser.add_argument('-r', '--rate',
+                        help='How many checks start per second, at most. Default 10',
+                        required=False,
+                        default=10.0,
+                        type=float)
+    parser.add_argument('-t', '--timeout',
+                        help='Seconds after which a check is reported as UNKNOWN. Default 300',
+                        required=False,
+                        default=300.0,
+                        type=float)
+    parser.add_argument('-M', '--metrics-file',
+                        help='Also save the time spent in each phase of each check to this '
+                             'file: Prometheus textfile if it ends in .prom, JSON lines '
+                             'otherwise',
+                        required=False,
+                        default='',
+                        type=str)
+    parser.add_argument("-d", "--debug",
+                        help="enable debug mode",
+                        required=False,
+                        action="store_true")
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # due diligence, these have to be positive
+    for (name, value) in (('workers', args.workers), ('per-router', args.per_router),
+                          ('rate', args.rate), ('timeout', args.timeout)):
+        if value <= 0:
+            parser.error('--{name} has to be greater than 0'.format(name=name))
+
+    # Return all variable values
+    # because when using nargs='+', the password is a list
+    return (args.inventory, args.username, args.password[0], args.workers,
+            args.per_router, args.rate, args.timeout, args.metrics_file, args.debug)
+
+
+def read_inventory(path: str) -> dict:
+    '''
+    Returns the inventory file, as it is: read as YAML if its name ends in .yaml or
+    .yml (requires PyYAML), otherwise as JSON. The modules of its "plugins" are
+    imported, so that its check types are known.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import json
+
+    with open(path) as inventory_file:
+        if path.endswith(('.yaml', '.yml')):
+            # PyYAML is only needed if the inventory is in YAML
+            import yaml
+            inventory = yaml.safe_load(inventory_file)
+        else:
+            inventory = json.load(inventory_file)
+
+    # the modules of the check types other than the built-in ones, if any
+    load_plugins(inventory.get('plugins', []))
+    return inventory
+
+
+def load_inventory(path: str, inventory: dict = None) -> list:
+    '''
+    Returns the list of routers in the inventory file.
+
+    The file is read with read_inventory(), unless the inventory is given, already
+    read (and e.g. expanded, see pyez_core/fleet_plan.py). See the format in the
+    documentation of the module.
+
+    Version:
+        2026-10-18
+    '''
+
+    if inventory is None:
+        inventory = read_inventory(path)
+
+    # due diligence, verify the inventory is as expected
+    routers = inventory.get('routers')
+    if not isinstance(routers, list):
+        raise Exception('The inventory {path} has no list of "routers"'.format(path=path))
+    for router in routers:
+        if 'hostname' not in router:
+            raise Exception('Router without hostname in the inventory {path}: {router}'
+                            .format(path=path, router=router))
+        for check in router.get('checks', []):
+            if check.get('type') not in CHECK_PLUGINS:
+                raise Exception('Unknown check type {check_type} for {hostname}, '
+                                'it has to be one of: {check_types}'
+                                .format(check_type=check.get('type'),
+                                        hostname=router['hostname'],
+                                        check_types=', '.join(sorted(CHECK_PLUGINS))))
+    return routers
+
+
+def evaluate_check(check: dict, details: dict) -> tuple:
+    '''
+    Returns (IcingaState, summary) for the outcome of a check function.
+
+    The outcome is evaluated by the check type, see pyez_core/check_registry.py;
+    the built-in ones the same way the Icinga check scripts do:
+        isis        consistent -> ok, otherwise critical
+        bgp         all peers Established -> ok, otherwise critical
+        vrf_ping    all hosts reply -> ok, otherwise critical
+
+    Args:
+        check (dict)        The check, as in the inventory
+        details (dict)      The outcome of the check function:
+                            isis        check_isis_consistency()
+                            bgp         check_junos_bgp_sessions_bulk()
+                            vrf_ping    ping_vrf()
+                            others      the parser of the check type
+
+    Version:
+        2026-10-18
+    '''
+
+    return get_check_plugin(check['type']).evaluate(check, details)
+
+
+def check_result(hostname: str,
+                 check: dict,
+                 state: IcingaState,
+                 summary: str,
+                 details: dict,
+                 duration: float,
+                 phases: dict = None) -> dict:
+    '''Returns the result of a check, as yielded by run_fleet() and printed by the CLI'''
+    return {'hostname': hostname,
+            'check': check['type'],
+            'state': state.name,
+            'exit_code': state.value,
+            'summary': summary,
+            'details': details,
+            'duration': round(duration, 2),
+            'phases': {phase: round(seconds, 4) for (phase, seconds)
+                       in (phases or {}).items()}}
+
+
+def run_check(hostname: str,
+              username: str,
+              password: str,
+              check: dict,
+              debug_level: str = 'ERROR',
+              metrics_file: str = '',
+              dev=None) -> dict:
+    '''
+    Runs one check against one router and returns its result.
+
+    The outcome is evaluated with evaluate_check(). If the check raises an
+    exception (e.g. cannot connect) -> critical, as the Icinga check scripts do;
+    unknown if the router was not tried, known to be unreachable.
+
+    Args:
+    Required:
+        hostname (str)      Router to log to
+        username (str)      Username to log as in the router
+        password (str)      Password for the username above
+        check (dict)        The check, as in the inventory, e.g.
+                            {'type': 'bgp', 'routing_instance': 'vrf', 'peers': ['10.0.0.1']}
+    Optional:
+        debug_level(str)    Python logging level, passed to the check functions
+        metrics_file (str)  If given, the time spent in each phase of the check is
+                            saved to it; see pyez_core/telemetry.py
+        dev (Device)        Netconf session with the router already open, to run the
+                            check in it instead of opening one; left open. See
+                            pyez_core/combined_check.py
+
+    Returns:
+        dictionary with keys 'hostname', 'check', 'state', 'exit_code', 'summary',
+        'details', 'duration' and 'phases' (seconds spent in dns, connect, auth,
+        rpc, parse and total)
+
+    Version:
+        2026-10-18
+    '''
+
+    timer_check_start = time.perf_counter()
+    check_type = check['type']
+    details = {}
+    # time spent in each phase of the check
+    timer = PhaseTimer()
+    try:
+        plugin = get_check_plugin(check_type)
+        details = plugin.execute(hostname, username, password, check, debug_level, timer,
+                                 dev=dev)
+        (state, summary) = evaluate_check(check, details)
+    except RouterDownError as err:
+        state = IcingaState.unknown
+        summary = str(err)
+    except Exception as err:
+        state = IcingaState.critical
+        summary = ('The following error prevents me from executing the check: {err}'
+                   .format(err=err))
+
+    timer.report(check_type, hostname, metrics_file)
+    return check_result(hostname, check, state, summary, details,
+                        time.perf_counter() - timer_check_start, timer.seconds)
+
+
+class RateLimiter(object):
+    '''
+    Token bucket. Allows rate events per second, in bursts of up to burst events.
+
+    try_acquire() does not block: it takes a token and returns 0 if there is one,
+    otherwise returns how many seconds until there will be one.
+
+    Version:
+        2026-10-18
+    '''
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+
+    def try_acquire(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+
+def run_fleet(routers: list,
+              username: str,
+              password: str,
+              workers: int = 16,
+              per_router: int = 1,
+              rate: float = 10.0,
+              timeout: float = 300.0,
+              debug_level: str = 'ERROR',
+              check_function=run_check):
+    '''
+    Runs all the checks of all the routers and yields their results as they complete.
+
+    The checks are started in the order of the inventory, skipping over those
+    of routers already at their per-router cap, so that a router with many
+    checks does not hold back the others.
+
+    Args:
+    Required:
+        routers (list)          As returned by load_inventory()
+        username (str)          Username to log as in the routers, unless set per router
+        password (str)          Password for the username above, unless set per router
+    Optional:
+        workers (int)           How many checks run at the same time, overall
+        per_router (int)        How many checks run at the same time with one router
+        rate (float)            How many checks start per second, at most
+        timeout (float)         Seconds after which a check is reported as UNKNOWN
+        debug_level(str)        Python logging level, passed to the check functions
+        check_function          The function that runs one check; run_check()
+                                unless testing/replaying
+
+    Yields:
+        dictionary, one per check, as returned by run_check()
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    # imports, Python standard modules
+    import collections
+    import concurrent.futures
+
+    # flatten the inventory into a list of tasks: (hostname, username, password, check)
+    pending = collections.deque(
+        (router['hostname'],
+         router.get('username', username),
+         router.get('password', password),
+         check)
+        for router in routers
+        for check in router.get('checks', []))
+
+    limiter = RateLimiter(rate, burst=max(1, int(rate)))
+    in_flight_per_router = collections.Counter()
+    running = {}        # future -> (task, deadline)
+    abandoned = {}      # future -> task, timed out but the thread is still busy
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        while pending or running:
+            # start as many tasks as the caps and the rate allow
+            wait_for_token = None
+            busy = len(running) + len(abandoned)
+            skipped = collections.deque()
+            while pending and busy < workers:
+                task = pending.popleft()
+                if in_flight_per_router[task[0]] >= per_router:
+                    skipped.append(task)
+                    continue
+                wait_for_token = limiter.try_acquire()
+                if wait_for_token > 0:
+                    skipped.append(task)
+                    break
+                wait_for_token = None
+                in_flight_per_router[task[0]] += 1
+                future = executor.submit(check_function, *task, debug_level=debug_level)
+                running[future] = (task, time.monotonic() + timeout)
+                busy += 1
+            # keep the inventory order for the ones not started yet
+            skipped.extend(pending)
+            pending = skipped
+
+            # wait until a task completes, a task times out, or a token is available
+            now = time.monotonic()
+            wakeups = [deadline - now for (task, deadline) in running.values()]
+            if wait_for_token is not None:
+                wakeups.append(wait_for_token)
+            wait_timeout = max(0.0, min(wakeups)) if wakeups else None
+            done, _ = concurrent.futures.wait(list(running) + list(abandoned),
+                                              timeout=wait_timeout,
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                if future in abandoned:
+                    # already reported as UNKNOWN; now it frees its slot
+                    task = abandoned.pop(future)
+                    in_flight_per_router[task[0]] -= 1
+                    continue
+                (task, deadline) = running.pop(future)
+                in_flight_per_router[task[0]] -= 1
+                yield future.result()
+
+            # report the ones that run out of time
+            now = time.monotonic()
+            for future in [future for (future, (task, deadline)) in running.items()
+                           if deadline <= now]:
+                (task, deadline) = running.pop(future)
+                abandoned[future] = task
+                yield check_result(task[0], task[3], IcingaState.unknown,
+                                   ('The check did not complete within {timeout} seconds'
+                                    .format(timeout=timeout)),
+                                   {}, timeout)
+    finally:
+        # do not wait for the abandoned ones
+        executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    import functools
+    import json
+    import sys
+
+    (inventory, username, password, workers, per_router,
+     rate, timeout, metrics_file, debug) = get_args()
+
+    # Whether we want console output while the script progresses.
+    if debug is True:
+        debug_level = 'DEBUG'
+    else:
+        debug_level = 'WARNING'
+
+    timer_fleet_start = time.perf_counter()
+    states = {}
+    for result in run_fleet(load_inventory(inventory), username, password,
+                            workers=workers, per_router=per_router, rate=rate,
+                            timeout=timeout, debug_level=debug_level,
+                            check_function=functools.partial(run_check,
+                                                             metrics_file=metrics_file)):
+        print(json.dumps(result), flush=True)
+        states[result['state']] = states.get(result['state'], 0) + 1
+
+    # summary at the end, on stderr so that stdout stays one JSON per line
+    print('{count} checks in {timer_fleet:0.2f} seconds: {states}'
+          .format(count=sum(states.values()),
+                  timer_fleet=time.perf_counter() - timer_fleet_start,
+                  states=', '.join('{state} {count}'.format(state=state, count=count)
+                                   for (state, count) in sorted(states.items()))),
+          file=sys.stderr)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Import-time budget of the check scripts, measured with python -X importtime.
+
+Icinga starts a new interpreter for every check, so what a check imports is
+paid on every run. PyEZ (jnpr.junos, and with it ncclient, paramiko,
+cryptography, lxml, yaml, jinja2...) is by far the heaviest; the checks import
+it only when they are to open a Netconf session with the router. This measures,
+for each check script, in a new interpreter each time:
+    help        <script> --help; nothing is checked, nothing heavy is to be imported
+    cache_hit   the check answered from the RPC cache (-C, see pyez_core/rpc_cache.py),
+                without logging in to the router; PyEZ is not to be imported
+                (isis and bgp, the checks with a cache)
+and reports the wall time of the run, the time spent importing (the sum of the
+top level imports of -X importtime), and any heavy module that was imported.
+
+It fails (exit status 1) if a scenario takes longer to import than its budget,
+or imports a heavy module: run it after a change to the checks to see that their
+start up did not get slower.
+
+Invoke as (from the dl_python directory):
+python -m pyez_core.import_budget
+python -m pyez_core.import_budget -t isis -s cache_hit -v
+python -m pyez_core.import_budget -r 10 -b help=20 cache_hit=40
+
+Requires:
+    Python 3.7, for -X importtime; the checks themselves still run on 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* get_args(). Parses the arguments passed by the user from CLI
+* parse_importtime(). Reads the -X importtime report of a run
+* measure_scenario(). Runs a check script in a scenario, measures its imports
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import json
+import os
+import subprocess
+import sys
+import time
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.check_scripts import CHECK_SCRIPTS
+
+
+SCENARIOS = ('help', 'cache_hit')
+# milliseconds spent importing, at most, in each scenario. Best of 5 runs, the checks
+# take up to 40 ms (help) and 90 ms (cache_hit; isis the slowest, with typing for the
+# NamedTuples of pyez_core/isis_model.py, and pprint) on a busy single CPU host
+DEFAULT_BUDGETS = {'help': 50.0, 'cache_hit': 110.0}
+# not to be imported in any of the scenarios
+HEAVY_MODULES = ('jnpr', 'ncclient', 'paramiko', 'cryptography', 'lxml', 'yaml', 'jinja2',
+                 'asyncio')
+# the router of the cache_hit scenario, never logged in to
+BUDGET_NE = 'import-budget.invalid'
+# the arguments of each check script, for the cache_hit scenario, and the reply cached
+CACHE_HIT_RUNS = {
+    'isis': (['-C', '60'], 'get_isis_interface_information', {'extensive': True}),
+    'bgp': (['-l', '10.0.0.1', '-b', '-C', '60'], 'get_bgp_neighbor_information', {}),
+}
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='Import-time budget of the check scripts')
+
+    # Add arguments
+    parser.add_argument('-t', '--check-types',
+                        help='Check types. Default all: {types}'
+                             .format(types=' '.join(sorted(CHECK_SCRIPTS))),
+                        required=False,
+                        default=sorted(CHECK_SCRIPTS),
+                        choices=sorted(CHECK_SCRIPTS),
+                        nargs='+',
+                        type=str)
+    parser.add_argument('-s', '--scenarios',
+                        help='Scenarios. Default all: {scenarios}'
+                             .format(scenarios=' '.join(SCENARIOS)),
+                        required=False,
+                        default=list(SCENARIOS),
+                        choices=SCENARIOS,
+                        nargs='+',
+                        type=str)
+    parser.add_argument('-r', '--repeat',
+                        help='Runs of each, the best is reported. Default 5',
+                        required=False,
+                        default=5,
+                        type=int)
+    parser.add_argument('-b', '--budgets',
+                        help='Budget of a scenario, in milliseconds of imports, as '
+                             'scenario=ms. Default {budgets}'
+                             .format(budgets=' '.join('{scenario}={ms:.0f}'
+                                                      .format(scenario=scenario, ms=ms)
+                                                      for (scenario, ms)
+                                                      in sorted(DEFAULT_BUDGETS.items()))),
+                        required=False,
+                        default=[],
+                        nargs='+',
+                        type=str)
+    parser.add_argument('-v', '--verbose',
+                        help='Also list the slowest top level imports of each',
+                        required=False,
+                        action='store_true')
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS)
+    for budget in args.budgets:
+        (scenario, _, milliseconds) = budget.partition('=')
+        try:
+            budgets[scenario] = float(milliseconds)
+        except ValueError:
+            parser.error('a budget is as scenario=milliseconds, e.g. help=30')
+        if scenario not in SCENARIOS:
+            parser.error('unknown scenario {scenario}'.format(scenario=scenario))
+
+    # Return all variable values
+    return args.check_types, args.scenarios, args.repeat, budgets, args.verbose
+
+
+def parse_importtime(report: str) -> tuple:
+    '''
+    Returns (milliseconds importing, [(milliseconds, module)] of the top level
+    imports, set of all the modules imported) from the stderr of a run with
+    python -X importtime, whose lines are as:
+        import time: self [us] | cumulative | imported package
+        import time:       161 |        161 |   _io
+
+    Version:
+        2026-10-18
+    '''
+
+    top_level = []
+    modules = set()
+    for line in report.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            # the header line
+            continue
+        name = fields[2].rstrip()
+        modules.add(name.strip())
+        # the nesting is shown by indentation, after the one space that separates
+        if not name[1:].startswith(' '):
+            top_level.append((int(fields[1]) / 1000, name.strip()))
+    return (sum(milliseconds for (milliseconds, _) in top_level), top_level, modules)
+
+
+def measure_scenario(check_type: str, scenario: str, repeat: int = 5) -> dict:
+    '''
+    Runs the check script of check_type in scenario, repeat times, each in a new
+    interpreter, and returns the best run:
+    {'wall_ms': ..., 'import_ms': ..., 'top_level': [(ms, module)], 'heavy': [modules]}
+    or None if the check type has no such scenario.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.rpc_cache import RpcCache
+    from pyez_core.xml_stream import synthetic_bgp_reply, synthetic_isis_reply
+
+    dl_python = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+    script = os.path.normpath(os.path.join(dl_python, CHECK_SCRIPTS[check_type]))
+
+    cache = None
+    if scenario == 'help':
+        arguments = ['--help']
+    elif check_type in CACHE_HIT_RUNS:
+        (arguments, rpc_name, rpc_kwargs) = CACHE_HIT_RUNS[check_type]
+        arguments = ['-H', BUDGET_NE, '-u', 'budget', '-p', 'budget'] + arguments
+        # a reply in the cache, as a check that ran moments ago would have left
+        if check_type == 'isis':
+            (json_reply, _) = synthetic_isis_reply(10)
+        else:
+            (json_reply, _) = synthetic_bgp_reply(10)
+        cache = RpcCache(60)
+        cache.put(BUDGET_NE, rpc_name, rpc_kwargs, json.loads(json_reply))
+    else:
+        return None
+
+    best = None
+    try:
+        for _ in range(repeat):
+            timer_run_start = time.perf_counter()
+            run = subprocess.run([sys.executable, '-X', 'importtime', script] + arguments,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                 universal_newlines=True,
+                                 cwd=os.path.dirname(script))
+            wall_ms = (time.perf_counter() - timer_run_start) * 1000
+            (import_ms, top_level, modules) = parse_importtime(run.stderr)
+            if best is None or import_ms < best['import_ms']:
+                best = {'wall_ms': wall_ms,
+                        'import_ms': import_ms,
+                        'top_level': sorted(top_level, reverse=True),
+                        'heavy': sorted(module for module in modules
+                                        if module.split('.')[0] in HEAVY_MODULES)}
+    finally:
+        if cache is not None:
+            # leave the cache as it was
+            for extension in ('.json', '.lock'):
+                try:
+                    os.remove(cache._path(BUDGET_NE, rpc_name, rpc_kwargs) + extension)
+                except OSError:
+                    pass
+    return best
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    (check_types, scenarios, repeat, budgets, verbose) = get_args()
+
+    over_budget = False
+    print('{check:<9} {scenario:<10} {wall:>8} {imports:>10} {budget:>9}  heavy modules'
+          .format(check='check', scenario='scenario', wall='wall ms', imports='import ms',
+                  budget='budget'))
+    for check_type in check_types:
+        for scenario in scenarios:
+            measure = measure_scenario(check_type, scenario, repeat)
+            if measure is None:
+                continue
+            failed = measure['import_ms'] > budgets[scenario] or measure['heavy']
+            over_budget = over_budget or bool(failed)
+            print('{check:<9} {scenario:<10} {wall:>8.1f} {imports:>10.1f} {budget:>9.0f}  '
+                  '{heavy}{failed}'
+                  .format(check=check_type, scenario=scenario, wall=measure['wall_ms'],
+                          imports=measure['import_ms'], budget=budgets[scenario],
+                          heavy=' '.join(sorted(set(module.split('.')[0]
+                                                    for module in measure['heavy']))) or '-',
+                          failed='  OVER BUDGET' if failed else ''), flush=True)
+            if verbose:
+                for (milliseconds, module) in measure['top_level'][:8]:
+                    print('{indent}{milliseconds:>8.1f} ms  {module}'
+                          .format(indent=' ' * 21, milliseconds=milliseconds, module=module))
+
+    sys.exit(1 if over_budget else 0)
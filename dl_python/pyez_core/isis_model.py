@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Compact, typed model of the IS-IS interfaces, and its consistency evaluator.
+
+get_junos_isis_interfaces() returns a dictionary of dictionaries of dictionaries,
+with strings such as 'yes'/'no'/'n/a' for every interface and level, and
+check_isis_consistency() walks and modifies those dictionaries one level at a
+time. On routers with thousands of logical interfaces both add up.
+
+Here each interface is an IsisInterface and each of its levels an IsisLevel;
+both are NamedTuples (no per-instance __dict__), with bool and int fields:
+    IsisInterface(name='xe-0/0/0.0',
+                  level_1=IsisLevel(level=1, enabled=True, passive=False, adjacencies=1),
+                  level_2=IsisLevel(level=2, enabled=False, passive=None, adjacencies=0))
+passive is None where the dictionaries have 'n/a' (the level is disabled), and a
+level the interface does not have is None.
+
+evaluate_consistency() evaluates all the levels of all the interfaces at once:
+the levels are transposed into columns (zip), and the columns combined with
+map()/compress() and the operator functions, so that the per-level work is done
+in C, not in Python bytecode, and nothing is modified.
+
+to_dict() renders the model as the dictionaries returned by
+get_junos_isis_interfaces() and check_isis_consistency(), which stay the
+serialization of the check; from_dict() reads them back.
+
+Each neighbour in the reply of get_isis_adjacency_information ('show isis
+adjacency extensive') is an IsisAdjacency. cross_check_adjacencies() joins them
+with the interfaces: the adjacencies are indexed once by (interface, level), and
+each level of each interface looks its own up in the index, instead of scanning
+all the adjacencies for every interface. It reports the neighbours not Up, those
+whose hold time is running low (hellos being missed), and the levels whose
+adjacency count does not match the neighbours Up on them.
+
+Invoke as (from the dl_python directory), to compare with check_isis_consistency()
+on a synthetic router of 10000 interfaces:
+python -m pyez_core.isis_model -n 10000
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* IsisLevel, IsisInterface. The model
+* IsisConsistency. Result of evaluate_consistency()
+* isis_interfaces_from_reply(). The model, from the reply of get_isis_interface_information
+* evaluate_consistency(). Consistency of all the interfaces and levels
+* to_dict(), from_dict(). From/to the dictionaries of the IS-IS check
+* IsisAdjacency, IsisAdjacencyCheck. A neighbour, and the result of cross_check_adjacencies()
+* isis_adjacencies_from_reply(). The neighbours, from the reply of
+  get_isis_adjacency_information
+* cross_check_adjacencies(). The neighbours, joined with the interfaces
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import operator
+from collections import Counter
+from itertools import compress, repeat
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# passive as in the dictionaries of the IS-IS check, and back
+PASSIVE_TO_DICT = {True: 'yes', False: 'no', None: 'n/a'}
+PASSIVE_FROM_DICT = {'yes': True, 'no': False, 'n/a': None}
+
+IsisLevel = NamedTuple('IsisLevel', [('level', int),
+                                     ('enabled', bool),
+                                     ('passive', Optional[bool]),
+                                     ('adjacencies', int)])
+
+IsisInterface = NamedTuple('IsisInterface', [('name', str),
+                                             ('level_1', Optional[IsisLevel]),
+                                             ('level_2', Optional[IsisLevel])])
+
+# consistent: overall; inconsistent: (interface name, level) of the levels that are not
+IsisConsistency = NamedTuple('IsisConsistency', [('consistent', bool),
+                                                 ('inconsistent', List[Tuple[str, int]])])
+
+# seconds of hold time left below which hellos are being missed; Junos sends hellos
+# every 9 seconds (3 on the DIS) and holds an adjacency for 27 (9)
+DEFAULT_MIN_HOLDTIME = 10
+# 'Level' of an adjacency of both levels, as in 'show isis adjacency'
+BOTH_LEVELS = 3
+
+# transitions and last_transition are only in the extensive reply (None, '' otherwise)
+IsisAdjacency = NamedTuple('IsisAdjacency', [('interface', str),
+                                             ('level', int),
+                                             ('system_name', str),
+                                             ('state', str),
+                                             ('holdtime', int),
+                                             ('transitions', Optional[int]),
+                                             ('last_transition', str)])
+
+# down: neighbours not Up; low_holdtime: Up, with less than min_holdtime seconds of
+# hold time left; mismatched: (interface, level, adjacencies of the interface level,
+# neighbours Up on it) where the two differ
+IsisAdjacencyCheck = NamedTuple('IsisAdjacencyCheck',
+                                [('down', List[IsisAdjacency]),
+                                 ('low_holdtime', List[IsisAdjacency]),
+                                 ('mismatched', List[Tuple[str, int, int, int]])])
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Compare evaluate_consistency() with '
+                                                  'check_isis_consistency()'))
+
+    # Add arguments
+    parser.add_argument('-n', '--interfaces',
+                        help='Interfaces of the synthetic router. Default 10000',
+                        required=False,
+                        default=10000,
+                        type=int)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return (args.interfaces,)
+
+
+def isis_interfaces_from_reply(isis_interfaces_reply: dict) -> List[IsisInterface]:
+    '''
+    Returns the IS-IS interfaces in the reply of get_isis_interface_information
+    (JSON, or as extracted by pyez_core/xml_stream.py), with the same logic as
+    parse_isis_interfaces() of pyez_isis/production/icinga_junos_isis_interface.py,
+    but without building the dictionaries.
+
+    Version:
+        2026-10-18
+    '''
+
+    isis_interfaces = []
+    for isis_interface in (isis_interfaces_reply['isis-interface-information'][0]
+                           .get('isis-interface', [])):
+        levels = {}
+        for level in isis_interface['interface-level-data']:
+            if 'passive' in level:
+                passive_status = level['passive'][0]['data']
+                # 'Passive': enabled and passive; 'Disabled': not enabled
+                enabled = passive_status == 'Passive'
+                passive = True if enabled else None
+            else:
+                enabled = True
+                passive = False
+            level_number = int(level['level'][0]['data'])
+            levels[level_number] = IsisLevel(level_number, enabled, passive,
+                                             int(level['adjacency-count'][0]['data']))
+        isis_interfaces.append(IsisInterface(isis_interface['interface-name'][0]['data'],
+                                             levels.get(1), levels.get(2)))
+    return isis_interfaces
+
+
+def evaluate_consistency(isis_interfaces: List[IsisInterface]) -> IsisConsistency:
+    '''
+    Returns the consistency of the IS-IS interfaces, with the logic of
+    check_isis_consistency() of pyez_isis/production/icinga_junos_isis_interface.py:
+    a level is inconsistent if enabled, not passive and without adjacencies.
+
+    Version:
+        2026-10-18
+    '''
+
+    owners = []
+    levels = []
+    for isis_interface in isis_interfaces:
+        for isis_level in isis_interface[1:]:
+            if isis_level is not None:
+                owners.append(isis_interface.name)
+                levels.append(isis_level)
+    if not levels:
+        return IsisConsistency(True, [])
+
+    # the levels as columns
+    (numbers, enabled, passive, adjacencies) = zip(*levels)
+    # enabled AND passive is False (not True, not None) AND no adjacencies
+    inconsistent = map(operator.and_,
+                       map(operator.and_, enabled, map(operator.is_, passive, repeat(False))),
+                       map(operator.not_, adjacencies))
+    inconsistent_levels = list(compress(zip(owners, numbers), inconsistent))
+    return IsisConsistency(not inconsistent_levels, inconsistent_levels)
+
+
+def to_dict(isis_interfaces: List[IsisInterface],
+            consistency: IsisConsistency = None) -> Dict[str, dict]:
+    '''
+    Returns the dictionary of get_junos_isis_interfaces() or, if consistency is given,
+    the dictionary of check_isis_consistency(): with 'isis_if_level_consistency' in
+    each level, and 'isis_interfaces_consistency' on top.
+
+    Version:
+        2026-10-18
+    '''
+
+    isis_interfaces_dict = {}
+    if consistency is not None:
+        isis_interfaces_dict['isis_interfaces_consistency'] = consistency.consistent
+        inconsistent = set(consistency.inconsistent)
+    for isis_interface in isis_interfaces:
+        isis_interface_dict = {'interface_name': isis_interface.name}
+        for isis_level in isis_interface[1:]:
+            if isis_level is None:
+                continue
+            level_dict = {'enabled': 'yes' if isis_level.enabled else 'no',
+                          'adjacencies': str(isis_level.adjacencies),
+                          'passive': PASSIVE_TO_DICT[isis_level.passive],
+                          'level': str(isis_level.level)}
+            if consistency is not None:
+                level_dict['isis_if_level_consistency'] = ((isis_interface.name,
+                                                            isis_level.level)
+                                                           not in inconsistent)
+            isis_interface_dict['level_{level}'.format(level=isis_level.level)] = level_dict
+        isis_interfaces_dict[isis_interface.name] = isis_interface_dict
+    return isis_interfaces_dict
+
+
+def from_dict(isis_interfaces_dict: Dict[str, dict]) -> List[IsisInterface]:
+    '''
+    Returns the model of the dictionary returned by get_junos_isis_interfaces() or
+    check_isis_consistency() (its consistency keys are ignored).
+
+    Version:
+        2026-10-18
+    '''
+
+    isis_interfaces = []
+    for (name, isis_interface_dict) in isis_interfaces_dict.items():
+        if not isinstance(isis_interface_dict, dict):
+            # 'isis_interfaces_consistency', 'SUMMARY'
+            continue
+        levels = {}
+        for level_number in (1, 2):
+            level_dict = isis_interface_dict.get('level_{level}'.format(level=level_number))
+            if level_dict is not None:
+                levels[level_number] = IsisLevel(level_number,
+                                                 level_dict['enabled'] == 'yes',
+                                                 PASSIVE_FROM_DICT[level_dict['passive']],
+                                                 int(level_dict['adjacencies']))
+        isis_interfaces.append(IsisInterface(name, levels.get(1), levels.get(2)))
+    return isis_interfaces
+
+
+def isis_adjacencies_from_reply(isis_adjacencies_reply: dict) -> List[IsisAdjacency]:
+    '''
+    Returns the IS-IS neighbours in the JSON reply of get_isis_adjacency_information,
+    extensive or not.
+
+    Version:
+        2026-10-18
+    '''
+
+    isis_adjacencies = []
+    for isis_adjacency in (isis_adjacencies_reply['isis-adjacency-information'][0]
+                           .get('isis-adjacency', [])):
+        transitions = isis_adjacency.get('transition-count')
+        last_transition = isis_adjacency.get('last-transition-time')
+        isis_adjacencies.append(IsisAdjacency(
+            isis_adjacency['interface-name'][0]['data'],
+            int(isis_adjacency['level'][0]['data']),
+            isis_adjacency['system-name'][0]['data'],
+            isis_adjacency['adjacency-state'][0]['data'],
+            int(isis_adjacency['holdtime'][0]['data']),
+            int(transitions[0]['data']) if transitions else None,
+            last_transition[0]['data'] if last_transition else ''))
+    return isis_adjacencies
+
+
+def cross_check_adjacencies(isis_interfaces: List[IsisInterface],
+                            isis_adjacencies: List[IsisAdjacency],
+                            min_holdtime: int = DEFAULT_MIN_HOLDTIME) -> IsisAdjacencyCheck:
+    '''
+    Returns the neighbours not Up, those Up with less than min_holdtime seconds of
+    hold time left, and the interface levels whose adjacency count differs from the
+    neighbours Up on them (also those with neighbours, not in isis_interfaces).
+
+    Version:
+        2026-10-18
+    '''
+
+    down = []
+    low_holdtime = []
+    # (interface, level): neighbours Up on it; the index of the join
+    up = Counter()
+    for isis_adjacency in isis_adjacencies:
+        if isis_adjacency.state != 'Up':
+            down.append(isis_adjacency)
+            continue
+        if isis_adjacency.holdtime < min_holdtime:
+            low_holdtime.append(isis_adjacency)
+        if isis_adjacency.level == BOTH_LEVELS:
+            up[(isis_adjacency.interface, 1)] += 1
+            up[(isis_adjacency.interface, 2)] += 1
+        else:
+            up[(isis_adjacency.interface, isis_adjacency.level)] += 1
+
+    mismatched = []
+    for isis_interface in isis_interfaces:
+        for isis_level in isis_interface[1:]:
+            if isis_level is None:
+                continue
+            neighbours_up = up.pop((isis_interface.name, isis_level.level), 0)
+            if neighbours_up != isis_level.adjacencies:
+                mismatched.append((isis_interface.name, isis_level.level,
+                                   isis_level.adjacencies, neighbours_up))
+    # neighbours on interface levels that are not in the interfaces
+    for ((interface, level), neighbours_up) in up.items():
+        mismatched.append((interface, level, 0, neighbours_up))
+    mismatched.sort()
+    return IsisAdjacencyCheck(down, low_holdtime, mismatched)
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    import json
+    import time
+    import tracemalloc
+    from pyez_core.check_scripts import load_check_module
+    from pyez_core.xml_stream import synthetic_isis_reply
+
+    (interfaces,) = get_args()
+    isis_module = load_check_module('isis')
+    reply = json.loads(synthetic_isis_reply(interfaces)[0])
+
+    def measure(function):
+        tracemalloc.start()
+        timer_start = time.perf_counter()
+        outcome = function()
+        seconds = time.perf_counter() - timer_start
+        (_, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (outcome, seconds, peak)
+
+    (isis_dict, dict_parse, dict_parse_peak) = measure(
+        lambda: isis_module.parse_isis_interfaces(reply))
+    (isis_dict_consistency, dict_evaluate, _) = measure(
+        lambda: isis_module.check_isis_consistency(isis_dict))
+    (model, model_parse, model_parse_peak) = measure(lambda: isis_interfaces_from_reply(reply))
+    (consistency, model_evaluate, _) = measure(lambda: evaluate_consistency(model))
+
+    if to_dict(model, consistency) != isis_dict_consistency:
+        raise Exception('The model and the dictionaries give different results')
+    print('{interfaces} interfaces, {inconsistent} inconsistent levels'
+          .format(interfaces=interfaces, inconsistent=len(consistency.inconsistent)))
+    print('    dictionaries  parse {parse:6.3f} s {peak:6.1f} MB   evaluate {evaluate:6.3f} s'
+          .format(parse=dict_parse, peak=dict_parse_peak / 1e6, evaluate=dict_evaluate))
+    print('    model         parse {parse:6.3f} s {peak:6.1f} MB   evaluate {evaluate:6.3f} s'
+          .format(parse=model_parse, peak=model_parse_peak / 1e6, evaluate=model_evaluate))
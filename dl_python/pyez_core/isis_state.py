@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+State of the IS-IS interfaces of a router between runs of the check, and its delta.
+
+Without it, every run of the IS-IS check evaluates every interface and level
+from scratch, and reports all of them, with nothing about what changed since
+the run before. With a state directory (-S of the check), each run saves the
+interfaces and levels it saw, and the run that follows:
+* compares them with its own, interface by interface (equal NamedTuples, the
+  vast majority on a stable router, compare in C and are not looked into),
+* evaluates the consistency only of the interfaces that were added or changed;
+  the others keep the consistency saved,
+* reports the transitions: levels added or removed, adjacencies up (from none)
+  or down (to none), and any other change (adjacency count, enabled, passive),
+* counts the up/down transitions of each level over the last flap_window
+  seconds; a level with flap_threshold of them or more is flapping.
+
+The state of a router is one JSON file in DEFAULT_STATE_DIR, per router,
+IS-IS instance and interfaces asked for, only readable by the user running
+the checks. A state that cannot be read is as no state: the run evaluates
+everything, and saves a new one.
+
+Invoke as (from the dl_python directory), to list the states saved:
+python -m pyez_core.isis_state
+python -m pyez_core.isis_state -S /var/tmp/junos_isis_state
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* IsisChange. A change in a level of an interface, between two runs
+* IsisDelta. Result of diff_state()
+* diff_state(). The changes and consistency of a run, from the state of the run before
+* describe_change(). A change, as a line for the operator
+* IsisStateStore. The state files; load(), save()
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.isis_model import IsisConsistency, IsisInterface, IsisLevel, evaluate_consistency
+
+
+DEFAULT_STATE_DIR = '/tmp/junos_isis_state'
+# seconds over which the up/down transitions of a level are counted
+DEFAULT_FLAP_WINDOW = 3600
+# up/down transitions within the window for a level to be flapping
+DEFAULT_FLAP_THRESHOLD = 3
+
+# change: 'added', 'removed', 'up', 'down' or 'changed'; before/after None if there
+# was/is no such level
+IsisChange = NamedTuple('IsisChange', [('interface', str),
+                                       ('level', int),
+                                       ('change', str),
+                                       ('before', Optional[IsisLevel]),
+                                       ('after', Optional[IsisLevel])])
+
+# first_run: there was no state to compare with; flapping: (interface, level) with
+# flap_threshold up/down transitions or more; transitions: '<interface> <level>':
+# [times of its up/down transitions within the window], to be saved
+IsisDelta = NamedTuple('IsisDelta', [('first_run', bool),
+                                     ('changes', List[IsisChange]),
+                                     ('consistency', IsisConsistency),
+                                     ('flapping', List[Tuple[str, int]]),
+                                     ('transitions', Dict[str, List[float]])])
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='List the IS-IS states saved by the check')
+
+    # Add arguments
+    parser.add_argument('-S', '--state-dir',
+                        help='State directory. Default {state}'.format(state=DEFAULT_STATE_DIR),
+                        required=False,
+                        default=DEFAULT_STATE_DIR,
+                        type=str)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return (args.state_dir,)
+
+
+def _level_change(before: Optional[IsisLevel], after: Optional[IsisLevel]) -> str:
+    '''The change of a level between two runs, as in IsisChange; '' if none'''
+    if before == after:
+        return ''
+    if before is None:
+        return 'added'
+    if after is None:
+        return 'removed'
+    if not before.adjacencies and after.adjacencies:
+        return 'up'
+    if before.adjacencies and not after.adjacencies:
+        return 'down'
+    return 'changed'
+
+
+def diff_state(previous: Optional[dict],
+               isis_interfaces: List[IsisInterface],
+               now: float = None,
+               flap_window: float = DEFAULT_FLAP_WINDOW,
+               flap_threshold: int = DEFAULT_FLAP_THRESHOLD) -> IsisDelta:
+    '''
+    Returns the changes and the consistency of isis_interfaces, from the state
+    loaded of the run before (IsisStateStore.load(), None if there is none).
+    Only the interfaces added or changed are evaluated.
+
+    Version:
+        2026-10-18
+    '''
+
+    now = time.time() if now is None else now
+    if previous is None:
+        return IsisDelta(True, [], evaluate_consistency(isis_interfaces), [], {})
+
+    current = {isis_interface.name: isis_interface for isis_interface in isis_interfaces}
+    before = previous['interfaces']
+    if current == before:
+        # nothing changed, the most common run of all
+        changed_names = []
+    else:
+        changed_names = [name for (name, isis_interface) in current.items()
+                         if before.get(name) != isis_interface]
+    removed_names = before.keys() - current.keys()
+
+    changes = []
+    for name in sorted(changed_names):
+        previous_interface = before.get(name, IsisInterface(name, None, None))
+        for (level_before, level_after) in zip(previous_interface[1:], current[name][1:]):
+            change = _level_change(level_before, level_after)
+            if change:
+                level = (level_after or level_before).level
+                changes.append(IsisChange(name, level, change, level_before, level_after))
+    for name in sorted(removed_names):
+        for level_before in before[name][1:]:
+            if level_before is not None:
+                changes.append(IsisChange(name, level_before.level, 'removed',
+                                          level_before, None))
+
+    # the consistency saved, but for the interfaces that changed or are no more
+    stale = set(changed_names) | removed_names
+    inconsistent = [(name, level) for (name, level) in previous['inconsistent']
+                    if name not in stale]
+    inconsistent += evaluate_consistency([current[name] for name in changed_names]).inconsistent
+    inconsistent.sort()
+
+    # the up/down transitions within the window, with those of this run
+    transitions = {}
+    for (level_key, times) in previous['transitions'].items():
+        times = [at for at in times if now - at <= flap_window]
+        if times:
+            transitions[level_key] = times
+    for change in changes:
+        if change.change in ('up', 'down'):
+            level_key = '{interface} {level}'.format(interface=change.interface,
+                                                     level=change.level)
+            transitions.setdefault(level_key, []).append(now)
+    flapping = sorted((level_key.rsplit(' ', 1)[0], int(level_key.rsplit(' ', 1)[1]))
+                      for (level_key, times) in transitions.items()
+                      if len(times) >= flap_threshold)
+
+    return IsisDelta(False, changes, IsisConsistency(not inconsistent, inconsistent),
+                     flapping, transitions)
+
+
+def describe_change(change: IsisChange) -> str:
+    '''
+    Returns the change as a line for the operator, e.g.
+    'xe-0/1/0.0 level 2: adjacencies down, 1 -> 0'
+
+    Version:
+        2026-10-18
+    '''
+
+    if change.change in ('added', 'removed'):
+        what = change.change
+    elif change.change in ('up', 'down'):
+        what = 'adjacencies {change}, {before} -> {after}'.format(
+            change=change.change, before=change.before.adjacencies,
+            after=change.after.adjacencies)
+    else:
+        what = ', '.join('{field} {before} -> {after}'.format(field=field, before=before,
+                                                              after=after)
+                         for (field, before, after) in zip(IsisLevel._fields, change.before,
+                                                           change.after)
+                         if before != after)
+    return '{interface} level {level}: {what}'.format(interface=change.interface,
+                                                      level=change.level, what=what)
+
+
+class IsisStateStore(object):
+    '''
+    The state of the IS-IS interfaces of the routers, saved by each run of the
+    check for the next one; one file per router, IS-IS instance and interfaces.
+
+    Args:
+    Optional:
+        state_dir (str)         Directory for the states. Created if it does not exist
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, state_dir: str = DEFAULT_STATE_DIR):
+        self.state_dir = state_dir
+
+    def _path(self, ne: str, isis_instance: str, isis_interfaces: List[str]) -> str:
+        key = json.dumps([ne, isis_instance, sorted(isis_interfaces)])
+        return os.path.join(self.state_dir,
+                            hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def load(self, ne: str, isis_instance: str = '',
+             isis_interfaces: List[str] = ()) -> Optional[dict]:
+        '''
+        Returns the state saved by the run before, as:
+        {'saved_at': ..., 'interfaces': {name: IsisInterface},
+         'inconsistent': [(interface, level)], 'transitions': {'<interface> <level>': [times]}}
+        or None if there is none, or it cannot be read.
+        '''
+        try:
+            with open(self._path(ne, isis_instance, list(isis_interfaces))) as state_file:
+                state = json.load(state_file)
+            interfaces = {}
+            for (name, level_1, level_2) in state['interfaces']:
+                interfaces[name] = IsisInterface(name,
+                                                 IsisLevel(*level_1) if level_1 else None,
+                                                 IsisLevel(*level_2) if level_2 else None)
+            return {'saved_at': state['saved_at'],
+                    'interfaces': interfaces,
+                    'inconsistent': [tuple(level) for level in state['inconsistent']],
+                    'transitions': state['transitions']}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, ne: str, isis_instance: str, isis_interfaces: List[str],
+             interfaces: List[IsisInterface], delta: IsisDelta, now: float = None):
+        '''Saves the interfaces of this run, and their consistency, for the next one'''
+        path = self._path(ne, isis_instance, list(isis_interfaces))
+        try:
+            os.makedirs(self.state_dir, mode=0o700, exist_ok=True)
+            temporary_file = '{path}.{pid}'.format(path=path, pid=os.getpid())
+            with open(os.open(temporary_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600),
+                      'w') as temporary:
+                # NamedTuples are saved as JSON lists
+                json.dump({'ne': ne, 'isis_instance': isis_instance,
+                           'saved_at': time.time() if now is None else now,
+                           'interfaces': interfaces,
+                           'inconsistent': delta.consistency.inconsistent,
+                           'transitions': delta.transitions}, temporary)
+            # atomic, a check reading it sees the old or the new state, never half of it
+            os.replace(temporary_file, path)
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    (state_dir,) = get_args()
+
+    file_names = sorted(os.listdir(state_dir)) if os.path.isdir(state_dir) else []
+    for file_name in file_names:
+        if not file_name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(state_dir, file_name)) as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            continue
+        print('{age:>8.1f}s ago  {ne} {instance}  {interfaces} interfaces, '
+              '{inconsistent} inconsistent levels, {transitions} levels with recent '
+              'transitions'
+              .format(age=time.time() - state['saved_at'], ne=state['ne'],
+                      instance=state['isis_instance'] or '(default instance)',
+                      interfaces=len(state['interfaces']),
+                      inconsistent=len(state['inconsistent']),
+                      transitions=len(state['transitions'])))
@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Consistency of the IS-IS topology of the whole network, across routers.
+
+The IS-IS check looks at one router at a time: a level enabled, not passive and
+without adjacencies is inconsistent. Some faults are only seen with the routers
+at both ends of a link, or with all the interfaces of a router at once, as in
+the to-do of check_isis_consistency() ("lo0 must be passive", "if all nni are 2,
+then lo0 must be 2", "something along the lines of a matrix"). This:
+* collects the IS-IS interfaces and adjacencies of all the routers in the
+  inventory of pyez_core/fleet_runner.py, in parallel, with run_fleet() and
+  get_junos_isis_interfaces(..., model=True, adjacencies=True),
+* builds the topology as columns (array), one row per interface and one per
+  adjacency, with the levels as bitmasks (level 1: 1, level 2: 2, both: 3, as
+  the Level of 'show isis adjacency'), the routers as row indexes,
+* and evaluates the rules over whole columns, in passes of set operations and
+  map()/compress(), not router by router:
+    asymmetric      a router sees a neighbour Up at a level, the neighbour does
+                    not see it back (both in the inventory)
+    link levels     the levels the two ends of a link run towards each other differ
+    loopback        the loopback is in none of the levels the NNIs of the router
+                    run (if they all run one level, the loopback is in it)
+    loopback passive  the loopback is not passive (warning)
+    not collected   a router could not be checked (warning)
+
+The routers are matched with the system names the neighbours report: the first
+label of the hostname in the inventory, unless given as "system_name".
+
+Invoke as (from the dl_python directory):
+python -m pyez_core.isis_topology \
+    -i inventory.json \
+    -u heanet -p 'substiteWithActualPassword'
+
+# example, without routers: a synthetic network of 500 routers, with faults
+python -m pyez_core.isis_topology -n 500
+
+Each finding is printed as one JSON line, and then the verdict, as Icinga would:
+IS-IS topology of 42 routers: 2 findings, critical 1, warning 1
+with exit status 0 (ok), 1 (warning) or 2 (critical).
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* IsisTopology. The topology, as columns
+* TopologyFinding. A fault, found by one of the rules
+* collect_router(). Retrieves the interfaces and adjacencies of a router, for run_fleet()
+* build_topology(). The topology, from what was collected
+* asymmetric_adjacencies(), link_level_mismatches(), loopback_levels(). The rules
+* evaluate_topology(). All the rules, and the verdict
+* synthetic_fleet(). A network to evaluate without routers
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import operator
+import time
+from array import array
+from itertools import compress
+from typing import Dict, List, NamedTuple, Tuple
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.fleet_runner import IcingaState, check_result
+from pyez_core.isis_model import BOTH_LEVELS, IsisAdjacency, IsisInterface, IsisLevel
+
+
+LOOPBACK_PREFIX = 'lo0.'
+# the levels, as bits of a level mask
+LEVEL_BITS = (1, 2)
+
+# the rows of the interfaces (if_*) and of the adjacencies (adj_*); routers are
+# indexes into routers: the collected first, up to collected, then the others of the
+# inventory, up to inventory, then the neighbours that are not in the inventory
+IsisTopology = NamedTuple('IsisTopology', [('routers', List[str]),
+                                           ('collected', int),
+                                           ('inventory', int),
+                                           ('if_router', array),
+                                           ('if_name', List[str]),
+                                           ('if_enabled', array),
+                                           ('if_active', array),
+                                           ('if_loopback', array),
+                                           ('adj_router', array),
+                                           ('adj_neighbour', array),
+                                           ('adj_level', array),
+                                           ('adj_interface', array)])
+
+# rule: 'asymmetric', 'link levels', 'loopback', 'loopback passive', 'not collected';
+# state: IcingaState
+TopologyFinding = NamedTuple('TopologyFinding', [('rule', str),
+                                                 ('state', IcingaState),
+                                                 ('routers', Tuple[str, ...]),
+                                                 ('detail', str)])
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='IS-IS topology consistency of the network')
+
+    # Add arguments
+    parser.add_argument('-i', '--inventory',
+                        help='Inventory file of pyez_core/fleet_runner.py, JSON or YAML. '
+                             'The routers with an isis check are collected',
+                        required=False,
+                        type=str)
+    parser.add_argument('-u', '--username',
+                        help='NETCONF Username',
+                        required=False,
+                        type=str)
+    # nargs='+' used because current password has several special characters....
+    parser.add_argument('-p', '--password',
+                        help='NETCONF Password in single quotes...',
+                        required=False,
+                        type=str,
+                        nargs='+')
+    parser.add_argument('-w', '--workers',
+                        help='How many routers are collected at the same time. Default 16',
+                        required=False,
+                        default=16,
+                        type=int)
+    parser.add_argument('-r', '--rate',
+                        help='How many routers are logged in to per second, at most. '
+                             'Default 10',
+                        required=False,
+                        default=10.0,
+                        type=float)
+    parser.add_argument('-t', '--timeout',
+                        help='Seconds after which a router is given up. Default 300',
+                        required=False,
+                        default=300.0,
+                        type=float)
+    parser.add_argument('-n', '--synthetic',
+                        help='Instead of an inventory, a synthetic network of this many '
+                             'routers',
+                        required=False,
+                        default=0,
+                        type=int)
+    parser.add_argument("-d", "--debug",
+                        help="enable debug mode",
+                        required=False,
+                        action="store_true")
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    if not args.synthetic and not (args.inventory and args.username and args.password):
+        parser.error('give an inventory, username and password (-i -u -p), or -n')
+
+    # Return all variable values
+    # because when using nargs='+', the password is a list
+    return (args.inventory, args.username, args.password[0] if args.password else '',
+            args.workers, args.rate, args.timeout, args.synthetic, args.debug)
+
+
+def _level_mask(isis_level: IsisLevel) -> int:
+    return 1 << (isis_level.level - 1)
+
+
+def collect_router(hostname: str,
+                   username: str,
+                   password: str,
+                   check: dict,
+                   debug_level: str = 'ERROR') -> dict:
+    '''
+    Retrieves the IS-IS interfaces and adjacencies of a router, in one NETCONF
+    session; the check_function of run_fleet(). Returns the result as run_check()
+    does, with details {'interfaces': [IsisInterface], 'adjacencies': [IsisAdjacency]}.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_scripts import load_check_module
+    from pyez_core.telemetry import PhaseTimer
+
+    timer_collect_start = time.perf_counter()
+    timer = PhaseTimer()
+    details = {}
+    try:
+        (isis_interfaces, isis_adjacencies) = (
+            load_check_module('isis').get_junos_isis_interfaces(
+                ne=hostname, os_username=username, os_password=password,
+                isis_instance=check.get('isis_instance', ''), debug_level=debug_level,
+                cache_ttl=check.get('cache_ttl', 0), xml=check.get('xml', False),
+                model=True, adjacencies=True, timer=timer))
+        details = {'interfaces': isis_interfaces, 'adjacencies': isis_adjacencies}
+        state = IcingaState.ok
+        summary = ('{interfaces} IS-IS interfaces, {adjacencies} adjacencies'
+                   .format(interfaces=len(isis_interfaces), adjacencies=len(isis_adjacencies)))
+    except Exception as err:
+        state = IcingaState.critical
+        summary = ('The following error prevents me from collecting the router: {err}'
+                   .format(err=err))
+    return check_result(hostname, check, state, summary, details,
+                        time.perf_counter() - timer_collect_start, timer.seconds)
+
+
+def build_topology(collected: Dict[str, Tuple[List[IsisInterface], List[IsisAdjacency]]],
+                   routers: List[str] = None) -> IsisTopology:
+    '''
+    Returns the topology of the routers collected, {system name: (interfaces,
+    adjacencies)}. routers are the system names of all the routers in the
+    inventory, collected or not; by default those collected.
+
+    Version:
+        2026-10-18
+    '''
+
+    names = sorted(collected)
+    names += sorted(set(routers or ()) - set(collected))
+    inventory = len(names)
+    index = {name: position for (position, name) in enumerate(names)}
+
+    if_router = array('I')
+    if_name = []
+    if_enabled = array('B')
+    if_active = array('B')
+    if_loopback = array('B')
+    adj_router = array('I')
+    adj_neighbour = array('I')
+    adj_level = array('B')
+    adj_interface = array('l')
+    for name in sorted(collected):
+        router = index[name]
+        (isis_interfaces, isis_adjacencies) = collected[name]
+        # (router, interface name): its row, to join the adjacencies with
+        rows = {}
+        for isis_interface in isis_interfaces:
+            enabled = 0
+            active = 0
+            for isis_level in isis_interface[1:]:
+                if isis_level is not None and isis_level.enabled:
+                    enabled |= _level_mask(isis_level)
+                    if not isis_level.passive:
+                        active |= _level_mask(isis_level)
+            rows[isis_interface.name] = len(if_name)
+            if_router.append(router)
+            if_name.append(isis_interface.name)
+            if_enabled.append(enabled)
+            if_active.append(active)
+            if_loopback.append(isis_interface.name.startswith(LOOPBACK_PREFIX))
+        for isis_adjacency in isis_adjacencies:
+            if isis_adjacency.state != 'Up':
+                continue
+            if isis_adjacency.system_name not in index:
+                index[isis_adjacency.system_name] = len(names)
+                names.append(isis_adjacency.system_name)
+            adj_router.append(router)
+            adj_neighbour.append(index[isis_adjacency.system_name])
+            adj_level.append(BOTH_LEVELS if isis_adjacency.level == BOTH_LEVELS
+                             else 1 << (isis_adjacency.level - 1))
+            adj_interface.append(rows.get(isis_adjacency.interface, -1))
+
+    return IsisTopology(names, len(collected), inventory, if_router, if_name, if_enabled, if_active,
+                        if_loopback, adj_router, adj_neighbour, adj_level, adj_interface)
+
+
+def asymmetric_adjacencies(topology: IsisTopology) -> List[TopologyFinding]:
+    '''
+    A router sees a neighbour Up at a level, and the neighbour, collected too,
+    does not see the router Up at that level.
+
+    Version:
+        2026-10-18
+    '''
+
+    # (router, neighbour, level bit), of the adjacencies between collected routers
+    adjacencies = set()
+    for bit in LEVEL_BITS:
+        in_level = map(operator.and_, topology.adj_level, [bit] * len(topology.adj_level))
+        adjacencies.update(compress(zip(topology.adj_router, topology.adj_neighbour,
+                                        [bit] * len(topology.adj_level)), in_level))
+    adjacencies = set(adjacency for adjacency in adjacencies
+                      if adjacency[1] < topology.collected)
+    reverse = set((neighbour, router, bit) for (router, neighbour, bit) in adjacencies)
+
+    return [TopologyFinding('asymmetric', IcingaState.critical,
+                            (topology.routers[router], topology.routers[neighbour]),
+                            '{router} sees {neighbour} Up at level {level}, {neighbour} does '
+                            'not see {router}'
+                            .format(router=topology.routers[router],
+                                    neighbour=topology.routers[neighbour],
+                                    level=bit))
+            for (router, neighbour, bit) in sorted(adjacencies - reverse)]
+
+
+def _levels(mask: int) -> str:
+    return ' and '.join(str(bit) for bit in LEVEL_BITS if mask & bit) or 'none'
+
+
+def link_level_mismatches(topology: IsisTopology) -> List[TopologyFinding]:
+    '''
+    The levels a router runs (enabled, not passive) on its interfaces to a
+    neighbour, collected too, differ from those the neighbour runs towards it.
+
+    Version:
+        2026-10-18
+    '''
+
+    # (router, neighbour): levels run on the interfaces with adjacencies to the neighbour
+    towards = {}
+    joined = compress(zip(topology.adj_router, topology.adj_neighbour, topology.adj_interface),
+                      map(operator.ge, topology.adj_interface,
+                          [0] * len(topology.adj_interface)))
+    for (router, neighbour, row) in joined:
+        if neighbour < topology.collected:
+            towards[(router, neighbour)] = (towards.get((router, neighbour), 0)
+                                            | topology.if_active[row])
+
+    findings = []
+    for ((router, neighbour), levels) in sorted(towards.items()):
+        neighbour_levels = towards.get((neighbour, router))
+        # once per link; without the way back, the adjacency is asymmetric
+        if router < neighbour and neighbour_levels is not None and levels != neighbour_levels:
+            findings.append(TopologyFinding(
+                'link levels', IcingaState.critical,
+                (topology.routers[router], topology.routers[neighbour]),
+                '{router} runs level {levels} towards {neighbour}, {neighbour} runs level '
+                '{neighbour_levels} towards {router}'
+                .format(router=topology.routers[router], neighbour=topology.routers[neighbour],
+                        levels=_levels(levels), neighbour_levels=_levels(neighbour_levels))))
+    return findings
+
+
+def loopback_levels(topology: IsisTopology) -> List[TopologyFinding]:
+    '''
+    The loopback of a router is in none of the levels its NNIs (interfaces
+    enabled and not passive) run; or the loopback is not passive.
+
+    Version:
+        2026-10-18
+    '''
+
+    nni = [0] * topology.collected
+    loopback = [0] * topology.collected
+    loopback_active = [0] * topology.collected
+    for (router, active) in compress(zip(topology.if_router, topology.if_active),
+                                     map(operator.not_, topology.if_loopback)):
+        nni[router] |= active
+    for (router, enabled, active) in compress(zip(topology.if_router, topology.if_enabled,
+                                                  topology.if_active),
+                                              topology.if_loopback):
+        loopback[router] |= enabled
+        loopback_active[router] |= active
+
+    findings = []
+    # NNIs in some level, and the loopback in none of those
+    for router in compress(range(topology.collected),
+                           map(operator.and_, map(bool, nni),
+                               map(operator.not_, map(operator.and_, nni, loopback)))):
+        findings.append(TopologyFinding(
+            'loopback', IcingaState.critical, (topology.routers[router],),
+            'the loopback of {router} is in level {loopback}, its NNIs run level {nni}'
+            .format(router=topology.routers[router], loopback=_levels(loopback[router]),
+                    nni=_levels(nni[router]))))
+    for router in compress(range(topology.collected), loopback_active):
+        findings.append(TopologyFinding(
+            'loopback passive', IcingaState.warning, (topology.routers[router],),
+            'the loopback of {router} is not passive in level {levels}'
+            .format(router=topology.routers[router], levels=_levels(loopback_active[router]))))
+    return findings
+
+
+def evaluate_topology(topology: IsisTopology) -> tuple:
+    '''
+    Returns (IcingaState, [TopologyFinding]): all the rules, and the worst of their
+    findings. A router in the inventory that was not collected is a warning.
+
+    Version:
+        2026-10-18
+    '''
+
+    findings = [TopologyFinding('not collected', IcingaState.warning, (router,),
+                                '{router} could not be collected'.format(router=router))
+                for router in topology.routers[topology.collected:topology.inventory]]
+    findings += asymmetric_adjacencies(topology)
+    findings += link_level_mismatches(topology)
+    findings += loopback_levels(topology)
+    state = max((finding.state for finding in findings), key=lambda state: state.value,
+                default=IcingaState.ok)
+    return (state, findings)
+
+
+def synthetic_fleet(routers: int) -> Dict[str, Tuple[List[IsisInterface], List[IsisAdjacency]]]:
+    '''
+    Returns a network of routers r0, r1... to evaluate without routers: a ring
+    with chords, level 2, each router with 200 passive customer interfaces; and
+    faults: r3 with its loopback in level 1 only, levels 1 and 2 on the r5 end of
+    r5-r6, and r11 not seeing r10.
+
+    Version:
+        2026-10-18
+    '''
+
+    links = {}
+    for router in range(routers):
+        for step in (1, 7):
+            neighbour = (router + step) % routers
+            if neighbour != router:
+                links.setdefault(router, []).append(neighbour)
+                links.setdefault(neighbour, []).append(router)
+
+    level_1_passive = IsisLevel(1, True, True, 0)
+    level_2_passive = IsisLevel(2, True, True, 0)
+    collected = {}
+    for router in range(routers):
+        name = 'r{router}'.format(router=router)
+        isis_interfaces = [IsisInterface('lo0.0',
+                                         level_1_passive if router == 3 else None,
+                                         None if router == 3 else level_2_passive)]
+        isis_interfaces += [IsisInterface('ge-1/0/{port}.0'.format(port=port), None,
+                                          level_2_passive)
+                            for port in range(200)]
+        isis_adjacencies = []
+        for (port, neighbour) in enumerate(sorted(set(links.get(router, ())))):
+            interface = 'xe-0/0/{port}.0'.format(port=port)
+            level_1 = None
+            if (router, neighbour) == (5, 6):
+                level_1 = IsisLevel(1, True, False, 0)
+            isis_interfaces.append(IsisInterface(interface, level_1,
+                                                 IsisLevel(2, True, False, 1)))
+            if (router, neighbour) == (11, 10):
+                continue
+            isis_adjacencies.append(IsisAdjacency(interface, 2,
+                                                  'r{neighbour}'.format(neighbour=neighbour),
+                                                  'Up', 24, 1, ''))
+        collected[name] = (isis_interfaces, isis_adjacencies)
+    return collected
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    import json
+    import sys
+
+    (inventory, username, password, workers, rate, timeout, synthetic, debug) = get_args()
+
+    # Whether we want console output while the script progresses.
+    if debug is True:
+        debug_level = 'DEBUG'
+    else:
+        debug_level = 'WARNING'
+
+    timer_collect_start = time.perf_counter()
+    if synthetic:
+        collected = synthetic_fleet(synthetic)
+        all_routers = list(collected)
+    else:
+        from pyez_core.fleet_runner import load_inventory, run_fleet
+        # the isis check of each router, for its instance, cache...
+        isis_routers = []
+        system_names = {}
+        for router in load_inventory(inventory):
+            isis_checks = [check for check in router.get('checks', [])
+                           if check['type'] == 'isis']
+            if isis_checks:
+                isis_routers.append(dict(router, checks=isis_checks[:1]))
+                system_names[router['hostname']] = router.get(
+                    'system_name', router['hostname'].split('.')[0])
+        collected = {}
+        for result in run_fleet(isis_routers, username, password, workers=workers,
+                                per_router=1, rate=rate, timeout=timeout,
+                                debug_level=debug_level, check_function=collect_router):
+            if result['state'] == IcingaState.ok.name:
+                collected[system_names[result['hostname']]] = (
+                    result['details']['interfaces'], result['details']['adjacencies'])
+            else:
+                print('{hostname}: {summary}'.format(hostname=result['hostname'],
+                                                     summary=result['summary']),
+                      file=sys.stderr)
+        all_routers = list(system_names.values())
+    timer_collect = time.perf_counter() - timer_collect_start
+
+    timer_evaluate_start = time.perf_counter()
+    topology = build_topology(collected, all_routers)
+    (state, findings) = evaluate_topology(topology)
+    timer_evaluate = time.perf_counter() - timer_evaluate_start
+
+    for finding in findings:
+        print(json.dumps({'rule': finding.rule, 'state': finding.state.name,
+                          'routers': finding.routers, 'detail': finding.detail}))
+    states = {}
+    for finding in findings:
+        states[finding.state.name] = states.get(finding.state.name, 0) + 1
+    print('IS-IS topology of {routers} routers: {count} findings{states} | '
+          "'routers'={routers} 'interfaces'={interfaces} 'adjacencies'={adjacencies} "
+          "'findings'={count} 'collect'={collect:.4f}s 'evaluate'={evaluate:.4f}s"
+          .format(routers=len(all_routers), count=len(findings),
+                  states=''.join(', {state} {count}'.format(state=state, count=count)
+                                 for (state, count) in sorted(states.items())),
+                  interfaces=len(topology.if_name), adjacencies=len(topology.adj_router),
+                  collect=timer_collect, evaluate=timer_evaluate))
+    sys.exit(state.value)
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Latency history per router, shared by the PyEZ checks, and the timeouts and
+concurrency derived from it.
+
+The checks waited the same for every router: 29 seconds for the NETCONF port to
+accept the connection (auto_probe=29), and the PyEZ default of 30 seconds for the
+reply of each RPC. Too long for an MX that answers in a fraction of that, so a
+router that is down holds its check for half a minute; too short for an ACX2200,
+that takes up to 25 seconds to open the session over IPv6 (see
+sandbox/checks_junos_vrf_with_name_resolution.py). Now each check, when it reports
+its timings (PhaseTimer.report(), see pyez_core/telemetry.py), adds them to the
+history of its router:
+    connect     seconds for the NETCONF port to accept the connection, when it did
+    rpc         seconds each RPC took, per RPC name (PhaseTimer.phase('rpc', name)).
+                Pipelined RPCs (pyez_core/rpc_pipeline.py) count from when the
+                router could start on them: their reply, less the later of when
+                they were sent and when the previous reply came in
+and the next check of the router, given the RPCs it is going to send, takes from
+the p50/p95 of the latest samples:
+    probe_timeout   p95 of connect x TIMEOUT_HEADROOM, within
+                    [MIN_PROBE_TIMEOUT, MAX_PROBE_TIMEOUT]
+    rpc_timeout     the longest of the RPCs: p95 of the RPC x TIMEOUT_HEADROOM,
+                    within [MIN_RPC_TIMEOUT, MAX_RPC_TIMEOUT]. Some RPCs take long
+                    whatever the router, and have a higher minimum,
+                    RPC_MIN_TIMEOUTS: a ping to a host that does not answer takes
+                    13.5 seconds, however fast the pings before it were
+    concurrency     RPCs in flight at the same time with the router (pings of
+                    ping_vrf(), pipeline depth): CONCURRENT_RPC_SECONDS / p50 of
+                    the slowest of the RPCs, within [1, MAX_CONCURRENT_RPCS]. A
+                    router slow to answer is a router busy, it gets fewer RPCs at a
+                    time; the p50, as a few pings to hosts that are down do not make
+                    the router busy
+So fast routers get tight timeouts, and slow platforms get headroom, without
+tuning them by hand. Until a router has MIN_SAMPLES samples (of connect, of an
+RPC), its checks use the defaults, as they did: 29 seconds to connect, 30 per RPC,
+the concurrency asked for.
+
+The history of a router is a JSON file in DEFAULT_LATENCY_DIR, private to the user
+running the checks (see pyez_core/private_dir.py), with its latest DEFAULT_WINDOW
+samples of each:
+{"ne": "mx1.example.net", "connect": [0.021, 0.019, ...],
+ "rpc": {"get_isis_interface_information": [0.84, 0.91, ...], "ping": [...]}}
+
+Invoke as (from the dl_python directory), to list the routers, their p50/p95 and
+the timeouts and concurrency their checks use:
+python -m pyez_core.latency
+python -m pyez_core.latency -r mx1.example.net acx1.example.net
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* percentile(). The p-th percentile of some samples
+* Tuning. Timeouts and concurrency for the checks of a router
+* LatencyHistory. The histories; record(), record_timer(), stats(), tuning()
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import collections
+import fcntl
+import hashlib
+import json
+import os
+
+# imports, own modules
+from pyez_core.private_dir import private_dir, user_state_dir, write_private_file
+
+
+DEFAULT_LATENCY_DIR = user_state_dir('junos_latency')
+# latest samples of each kind kept per router
+DEFAULT_WINDOW = 200
+# samples a router needs before its timeouts are derived from them
+MIN_SAMPLES = 5
+# the timeout is this times the p95 of the samples
+TIMEOUT_HEADROOM = 3.0
+# seconds, the defaults when there is no history, and the limits when there is
+DEFAULT_PROBE_TIMEOUT = 29
+MIN_PROBE_TIMEOUT = 5
+MAX_PROBE_TIMEOUT = 60
+DEFAULT_RPC_TIMEOUT = 30        # PyEZ default
+MIN_RPC_TIMEOUT = 10
+MAX_RPC_TIMEOUT = 300
+# RPC: its minimum timeout, if higher than MIN_RPC_TIMEOUT. A ping to a host that
+# does not answer takes 13.5 seconds
+RPC_MIN_TIMEOUTS = {'ping': DEFAULT_RPC_TIMEOUT}
+# RPCs in flight with a router: CONCURRENT_RPC_SECONDS / p50 of its RPCs, at most
+CONCURRENT_RPC_SECONDS = 20.0
+MAX_CONCURRENT_RPCS = 8
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Latency of the routers, and the timeouts '
+                                                  'and concurrency derived from it'))
+
+    # Add arguments
+    parser.add_argument('-L', '--latency-dir',
+                        help='Latency history directory. Default {latency}'
+                             .format(latency=DEFAULT_LATENCY_DIR),
+                        required=False,
+                        default=DEFAULT_LATENCY_DIR,
+                        type=str)
+    parser.add_argument('-r', '--routers',
+                        help='Only these routers. Default all in the history',
+                        required=False,
+                        default=[],
+                        type=str,
+                        nargs='+')
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.latency_dir, ''.join(args.routers).split()
+
+
+def percentile(samples: list, p: float) -> float:
+    '''The p-th percentile (0 to 100) of samples, nearest rank; None if no samples'''
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, int(-(-p * len(ordered) // 100)))     # ceil, at least the first
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _within(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+# Timeouts, in seconds, and RPCs in flight at the same time, for the checks of a router
+Tuning = collections.namedtuple('Tuning', ['probe_timeout', 'rpc_timeout', 'concurrency'])
+
+
+class LatencyHistory(object):
+    '''
+    Latency history of the routers, on disk, shared by the checks.
+
+    tuning(ne, rpc_names) before connecting to ne, for its timeouts and concurrency;
+    then record_timer(ne, timer) with the timings of the check, which
+    PhaseTimer.report() does.
+
+    A history that cannot be read counts as none; one that cannot be written is
+    left as it was. Neither fails the check.
+
+    Args:
+    Optional:
+        latency_dir (str)   Directory for the histories. Created if it does not exist;
+                            not used if not private to the user
+        window (int)        Latest samples of each kind kept per router
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, latency_dir: str = DEFAULT_LATENCY_DIR, window: int = DEFAULT_WINDOW):
+        self.latency_dir = latency_dir
+        self.window = window
+
+    def _path(self, ne: str) -> str:
+        return os.path.join(self.latency_dir,
+                            hashlib.sha256(ne.encode('utf-8')).hexdigest()[:32])
+
+    def _read(self, ne: str) -> dict:
+        '''Returns the history of ne; without samples if it has none'''
+        try:
+            # only from a directory no other user can write to
+            private_dir(self.latency_dir)
+            with open(self._path(ne) + '.json') as history_file:
+                history = json.load(history_file)
+        except (OSError, ValueError):
+            history = {}
+        rpc = history.get('rpc', {})
+        return {'ne': ne,
+                'connect': history.get('connect', []),
+                # samples of all the RPCs together, before they were kept per RPC, dropped
+                'rpc': rpc if isinstance(rpc, dict) else {}}
+
+    def record(self, ne: str, connect: list = (), rpc: dict = None):
+        '''
+        Adds to the history of ne the samples given, in seconds, keeping the latest:
+        connect, [seconds, ...]; rpc, {rpc name: [seconds, ...]}
+        '''
+        rpc = {rpc_name: samples for (rpc_name, samples) in (rpc or {}).items() if samples}
+        if not connect and not rpc:
+            return
+        path = self._path(ne)
+        try:
+            private_dir(self.latency_dir)
+            with open(os.open(path + '.lock', os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600),
+                      'w') as lock:
+                # other checks of the router add to the same history
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                history = self._read(ne)
+                history['connect'] = (history['connect'] +
+                                      [round(seconds, 4) for seconds in connect])[-self.window:]
+                for (rpc_name, samples) in rpc.items():
+                    history['rpc'][rpc_name] = (history['rpc'].get(rpc_name, []) +
+                                                [round(seconds, 4)
+                                                 for seconds in samples])[-self.window:]
+                # atomic, a check reading it sees the old or the new history
+                write_private_file(path + '.json',
+                                   lambda temporary: json.dump(history, temporary))
+        except OSError:
+            pass
+
+    def record_timer(self, ne: str, timer):
+        '''
+        Adds to the history of ne the timings of a check, a PhaseTimer: its connect
+        phase, if it connected once, and each RPC it timed, per RPC name. What did
+        not run adds nothing.
+        '''
+        seconds = dict(timer.seconds)
+        counts = dict(timer.counts)
+        connect = [seconds['connect']] if counts.get('connect') == 1 else []
+        self.record(ne, connect, timer.rpc_seconds())
+
+    def stats(self, ne: str) -> dict:
+        '''
+        Returns {'connect': {'samples': n, 'p50': s, 'p95': s},
+                 'rpc': {rpc name: {'samples': n, 'p50': s, 'p95': s}}} for ne;
+        p50 and p95 are None without samples
+        '''
+        def summary(samples: list) -> dict:
+            return {'samples': len(samples),
+                    'p50': percentile(samples, 50),
+                    'p95': percentile(samples, 95)}
+
+        history = self._read(ne)
+        return {'connect': summary(history['connect']),
+                'rpc': {rpc_name: summary(samples)
+                        for (rpc_name, samples) in history['rpc'].items()}}
+
+    def tuning(self, ne: str, rpc_names: tuple = (),
+               concurrency: int = MAX_CONCURRENT_RPCS) -> Tuning:
+        '''
+        Returns the Tuning for the checks of ne that send the RPCs rpc_names (e.g.
+        ('ping',)): the timeouts from its history, and concurrency (what the check
+        asks for) capped by what ne is allowed. The defaults for what has fewer
+        than MIN_SAMPLES samples.
+        '''
+        stats = self.stats(ne)
+        probe_timeout = DEFAULT_PROBE_TIMEOUT
+        if stats['connect']['samples'] >= MIN_SAMPLES:
+            probe_timeout = _within(stats['connect']['p95'] * TIMEOUT_HEADROOM,
+                                    MIN_PROBE_TIMEOUT, MAX_PROBE_TIMEOUT)
+        # the session waits as long as the slowest of the RPCs needs
+        rpc_timeouts = []
+        rpc_p50s = []
+        for rpc_name in rpc_names:
+            rpc_stats = stats['rpc'].get(rpc_name, {'samples': 0})
+            min_rpc_timeout = RPC_MIN_TIMEOUTS.get(rpc_name, MIN_RPC_TIMEOUT)
+            if rpc_stats['samples'] < MIN_SAMPLES:
+                rpc_timeouts.append(max(DEFAULT_RPC_TIMEOUT, min_rpc_timeout))
+                continue
+            rpc_timeouts.append(_within(rpc_stats['p95'] * TIMEOUT_HEADROOM,
+                                        min_rpc_timeout, MAX_RPC_TIMEOUT))
+            rpc_p50s.append(rpc_stats['p50'])
+        rpc_timeout = max(rpc_timeouts, default=DEFAULT_RPC_TIMEOUT)
+        if rpc_p50s:
+            rpc_p50 = max(max(rpc_p50s), 0.001)
+            allowed = int(_within(CONCURRENT_RPC_SECONDS // rpc_p50, 1, MAX_CONCURRENT_RPCS))
+            concurrency = min(concurrency, allowed)
+        return Tuning(int(-(-probe_timeout // 1)), int(-(-rpc_timeout // 1)),
+                      max(1, concurrency))
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    latency_dir, routers = get_args()
+
+    history = LatencyHistory(latency_dir)
+    if not routers:
+        file_names = sorted(os.listdir(latency_dir)) if os.path.isdir(latency_dir) else []
+        for file_name in file_names:
+            if not file_name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(latency_dir, file_name)) as history_file:
+                    routers.append(json.load(history_file)['ne'])
+            except (OSError, ValueError, KeyError):
+                continue
+
+    def seconds(value) -> str:
+        return '-' if value is None else '{value:.3f}'.format(value=value)
+
+    def samples(stats: dict) -> str:
+        return '{n}/{p50}/{p95}'.format(n=stats['samples'], p50=seconds(stats['p50']),
+                                        p95=seconds(stats['p95']))
+
+    print('{ne:<40} {samples:>22}  {tuning}'
+          .format(ne='router, RPC', samples='n/p50/p95',
+                  tuning='probe timeout; rpc timeout, concurrency'))
+    for ne in sorted(routers):
+        stats = history.stats(ne)
+        tuning = history.tuning(ne)
+        print('{ne:<40} {samples:>22}  {probe} s'
+              .format(ne=ne, samples=samples(stats['connect']), probe=tuning.probe_timeout))
+        for rpc_name in sorted(stats['rpc']):
+            tuning = history.tuning(ne, (rpc_name,))
+            print('    {rpc_name:<36} {samples:>22}  {rpc_timeout} s, {concurrency}'
+                  .format(rpc_name=rpc_name, samples=samples(stats['rpc'][rpc_name]),
+                          rpc_timeout=tuning.rpc_timeout, concurrency=tuning.concurrency))
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+NETCONF session broker for the PyEZ Icinga checks.
+
+Opening a NETCONF session with a Juniper router (TCP, SSH, authentication,
+NETCONF hello) takes 2.5 to 3 seconds, and every run of an Icinga check
+pays it before the RPC it actually wants is sent. This module is a
+long-lived local daemon that keeps one authenticated session open per
+router and executes RPCs on behalf of the checks. The checks talk to it
+over a Unix socket.
+
+The module has two sides:
+* the daemon, NetconfBroker, started from CLI and left running.
+* the client, BrokerDevice, used by the checks instead of jnpr.junos.Device.
+  It has the same open()/rpc.<rpc_name>()/close() interface, so the code of
+  the checks does not need to change beyond how the device is created.
+
+Invoke the daemon as (from the dl_python directory):
+python -m pyez_core.netconf_broker \
+    -s /tmp/junos_netconf_broker.sock
+
+# example, for troubleshooting: close sessions idle for more than 5 minutes,
+#                               WITH debug
+python -m pyez_core.netconf_broker \
+    -s /tmp/junos_netconf_broker.sock \
+    -i 300 \
+    -d
+
+Then pass the same socket to the checks, e.g.:
+python icinga_junos_isis_interface.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -B /tmp/junos_netconf_broker.sock
+
+Protocol, between client and daemon:
+    One request per connection. The client sends one line with a JSON
+    object and the daemon answers with one line with a JSON object.
+    Request:
+        {'op': 'open' or 'rpc',
+         'host': '87.44.48.99', 'user': 'heanet', 'password': '...',
+         'auto_probe': 29,                              # op open/rpc
+         'rpc_timeout': 30,                             # op rpc only
+         'rpc': 'get_isis_interface_information',       # op rpc only
+         'args': [{'format': 'json'}],                  # op rpc only
+         'kwargs': {'extensive': True}}                 # op rpc only
+    Response:
+        {'status': 'ok', 'format': 'json' or 'xml', 'reply': ...}
+        or
+        {'status': 'error', 'error_type': 'ConnectAuthError', 'message': '...'}
+
+Security:
+    The socket is created with permissions 0600; only the user running the
+    daemon (the Icinga user) can talk to it. A session is only reused by
+    requests carrying the same password that opened it; a request with another
+    password makes the daemon log in again, and the router decides.
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* BrokerError. Exception raised in the client when the daemon reports an error.
+* BrokerDevice. Client, stands in for jnpr.junos.Device in the checks.
+* NetconfBroker. Daemon logic, keeps the NETCONF sessions and executes RPCs.
+* run_broker(). Starts the daemon and serves until interrupted.
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import json
+import socket
+
+
+# Default path of the Unix socket the daemon listens on
+DEFAULT_SOCKET = '/tmp/junos_netconf_broker.sock'
+# the errors of the daemon raised in the client as the jnpr.junos.exception they are
+JUNOS_ERRORS = ('ConnectError', 'ConnectAuthError', 'ConnectClosedError',
+                'ConnectNotMasterError', 'ConnectRefusedError', 'ConnectTimeoutError',
+                'ConnectUnknownHostError', 'ProbeError', 'RpcTimeoutError')
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Daemon that keeps NETCONF sessions '
+                                                  'open to Juniper routers for the checks'))
+
+    # Add arguments
+    parser.add_argument('-s', '--socket',
+                        help='Path of the Unix socket to listen on',
+                        required=False,
+                        default=DEFAULT_SOCKET,
+                        type=str)
+    parser.add_argument('-i', '--idle-timeout',
+                        help='Seconds after which an unused NETCONF session is closed',
+                        required=False,
+                        default=600,
+                        type=int)
+    parser.add_argument("-d", "--debug",
+                        help="enable debug mode",
+                        required=False,
+                        action="store_true")
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.socket, args.idle_timeout, args.debug
+
+
+class BrokerError(Exception):
+    '''Raised in the client when the daemon cannot execute the request.
+
+    The attribute error_type carries the name of the exception raised in the
+    daemon, e.g. 'RpcError'. The errors connecting to the router, and the RPC
+    timeouts, are raised in the client as the jnpr.junos.exception the daemon
+    got instead (see JUNOS_ERRORS), so that the checks handle them as they do
+    without the broker: the resolver, the circuit breaker, their messages.
+    '''
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__('{error_type}: {message}'.format(error_type=error_type,
+                                                          message=message))
+        self.error_type = error_type
+
+
+class _BrokerRpc(object):
+    '''Stands in for jnpr.junos.Device.rpc; dev.rpc.<rpc_name>(...) goes to the daemon'''
+
+    def __init__(self, device):
+        self._device = device
+
+    def __getattr__(self, rpc_name):
+        def rpc_through_broker(*args, **kwargs):
+            return self._device._request({'op': 'rpc',
+                                          'rpc': rpc_name,
+                                          'args': list(args),
+                                          'kwargs': kwargs})
+        return rpc_through_broker
+
+
+class BrokerDevice(object):
+    '''
+    Client of the NETCONF broker. Stands in for jnpr.junos.Device.
+
+    Instead of opening a NETCONF session with the router, it sends the RPCs
+    to the broker daemon over its Unix socket. The daemon executes them on
+    the session it keeps open with the router.
+
+    Only the parts of jnpr.junos.Device used by the checks are implemented:
+        open(), close(), rpc.<rpc_name>(), connected, hostname, user, timeout
+    timeout is, as in jnpr.junos.Device, the seconds the RPCs wait for their
+    reply; the daemon applies it to the session with the router.
+
+    Args:
+    Required:
+        socket_path (str)   Unix socket the broker daemon listens on
+        host (str)          Router to log to, IP or FQDN
+        user (str)          Username to log as in the router
+        password (str)      Password for the username above
+    Optional:
+        auto_probe (int)    Passed to the daemon, used if it has to open the session
+        timeout (int)       Seconds the RPCs wait for the reply of the router
+        socket_timeout (int) Seconds to wait for the daemon to answer a request.
+                            It includes the time to open the session, if the daemon
+                            has none open with the router yet, so it is kept longer
+                            than auto_probe and timeout together.
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self,
+                 socket_path: str,
+                 host: str,
+                 user: str,
+                 password: str,
+                 auto_probe: int = 0,
+                 timeout: int = 30,
+                 socket_timeout: int = 120):
+        self.socket_path = socket_path
+        self.hostname = host
+        self.user = user
+        self.timeout = timeout
+        self.socket_timeout = socket_timeout
+        self.connected = False
+        self._password = password
+        self._auto_probe = auto_probe
+        self.rpc = _BrokerRpc(self)
+
+    def open(self, gather_facts: bool = False):
+        '''Ensures the daemon has a session open with the router. gather_facts is ignored.'''
+        self._request({'op': 'open'})
+        self.connected = True
+        return self
+
+    def close(self):
+        '''The session belongs to the daemon, it is kept open for the next check'''
+        self.connected = False
+
+    def _request(self, request: dict):
+        '''Sends one request to the daemon and returns the RPC reply'''
+        request.update({'host': self.hostname,
+                        'user': self.user,
+                        'password': self._password,
+                        'auto_probe': self._auto_probe,
+                        'rpc_timeout': self.timeout})
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            # the daemon may have to open the session, and then wait for the RPC
+            conn.settimeout(max(self.socket_timeout,
+                                self._auto_probe + self.timeout + 30))
+            try:
+                conn.connect(self.socket_path)
+            except OSError as err:
+                raise BrokerError('BrokerUnavailable',
+                                  'cannot reach the broker at {path}: {err}. '
+                                  'Is the daemon running?'
+                                  .format(path=self.socket_path, err=err))
+            conn.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            conn.shutdown(socket.SHUT_WR)
+            with conn.makefile('rb') as conn_file:
+                line = conn_file.readline()
+
+        if not line:
+            raise BrokerError('BrokerUnavailable',
+                              'the broker at {path} closed the connection without answering'
+                              .format(path=self.socket_path))
+        response = json.loads(line.decode('utf-8'))
+
+        if response['status'] != 'ok':
+            raise self._error(request, response['error_type'], response['message'])
+        if response.get('format') == 'xml':
+            # same as what PyEZ returns when the RPC is not asked for JSON
+            from lxml import etree
+            return etree.fromstring(response['reply'])
+        return response['reply']
+
+    def _error(self, request: dict, error_type: str, message: str) -> Exception:
+        '''Returns the exception of an error of the daemon: the jnpr.junos.exception
+        of the same name if in JUNOS_ERRORS, otherwise BrokerError'''
+        if error_type in JUNOS_ERRORS:
+            try:
+                # imports, Python third party modules
+                import jnpr.junos.exception as JUNOS_EXCEPTION
+            except ImportError:
+                return BrokerError(error_type, message)
+            if error_type == 'RpcTimeoutError':
+                return JUNOS_EXCEPTION.RpcTimeoutError(self, request.get('rpc'), self.timeout)
+            return getattr(JUNOS_EXCEPTION, error_type)(self, message)
+        return BrokerError(error_type, message)
+
+
+class _BrokerSession(object):
+    '''One NETCONF session kept open by the daemon, for a (host, user)'''
+
+    def __init__(self, host: str, user: str, password_digest: bytes):
+        import threading
+        import time
+
+        self.host = host
+        self.user = user
+        self.password_digest = password_digest
+        self.dev = None
+        # PyEZ devices are not thread safe; one RPC at a time per session
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class NetconfBroker(object):
+    '''
+    Keeps one NETCONF session open per (router, user) and executes RPCs on it.
+
+    Sessions are opened on the first request for a router and closed after
+    idle_timeout seconds without requests. If a session is found dead when
+    executing an RPC (router rebooted, connection dropped), it is reopened and
+    the RPC retried once.
+
+    Args:
+    Optional:
+        idle_timeout (int)  Seconds after which an unused session is closed
+        debug_level(str)    Python logging level, if not set it defaults to 'ERROR'.
+                            Set to 'DEBUG' to see verbose execution.
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, idle_timeout: int = 600, debug_level: str = 'ERROR'):
+        import logging
+        import os
+        import threading
+
+        self.idle_timeout = idle_timeout
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        # salt for the password digests, so that these are not kept in clear
+        self._salt = os.urandom(16)
+
+        #
+        # Create a custom logger and set debug level
+        #
+        self.logger = logging.getLogger(NetconfBroker.__qualname__)
+        self.logger.setLevel(logging.DEBUG)          # Gets annoyed DEBUG is not here!!
+        if not self.logger.handlers:
+            # Create handler(s) and set the debug level
+            c_handler = logging.StreamHandler()     # console handler
+            c_handler.setLevel(debug_level)
+            # Create formatter and apply formatter and handler
+            c_format = logging.Formatter(('%(asctime)s: %(funcName)s: '
+                                          'line: ' + '%(lineno)d: '
+                                          '%(levelname)s: %(message)s'))
+            c_handler.setFormatter(c_format)
+            self.logger.addHandler(c_handler)
+
+    def _digest(self, password: str) -> bytes:
+        import hashlib
+        return hashlib.sha256(self._salt + password.encode('utf-8')).digest()
+
+    def _get_session(self, host: str, user: str) -> _BrokerSession:
+        '''Returns the session for (host, user), creating its placeholder if needed'''
+        with self._sessions_lock:
+            session = self._sessions.get((host, user))
+            if session is None:
+                session = _BrokerSession(host, user, b'')
+                self._sessions[(host, user)] = session
+        return session
+
+    def _open(self, session: _BrokerSession, password: str, auto_probe: int):
+        '''Opens the NETCONF session with the router. Call holding session.lock
+
+        The previous session, if any, is only replaced once the new one is open;
+        a request with a wrong password does not break the session of the others.
+        '''
+        import time
+        from jnpr.junos import Device
+
+        timer_netconf_start = time.perf_counter()
+        dev = Device(host=session.host, user=session.user, password=password,
+                     auto_probe=auto_probe)
+        # no need to gather facts, so to gain speed
+        dev.open(gather_facts=False)
+        if session.dev is not None and session.dev.connected:
+            session.dev.close()
+        session.dev = dev
+        session.password_digest = self._digest(password)
+        self.logger.debug('Opened Netconf session with {host} in {timer_netconf:0.2f} seconds'
+                          .format(host=session.host,
+                                  timer_netconf=time.perf_counter() - timer_netconf_start))
+
+    def _execute(self, session: _BrokerSession, request: dict):
+        '''Executes the RPC in the request. Call holding session.lock'''
+        rpc = getattr(session.dev.rpc, request['rpc'])
+        return rpc(*request.get('args', []), **request.get('kwargs', {}))
+
+    def handle_request(self, request: dict) -> dict:
+        '''Executes one request from a client and returns the response to send back'''
+        import hmac
+        import time
+
+        try:
+            # imported in the try: the client gets the error, it does not wait for a reply
+            import jnpr.junos.exception as JUNOS_EXCEPTION
+
+            host = request['host']
+            user = request['user']
+            password = request['password']
+            auto_probe = int(request.get('auto_probe', 0))
+            session = self._get_session(host, user)
+
+            with session.lock:
+                session.last_used = time.monotonic()
+                if (session.dev is None or not session.dev.connected or
+                        not hmac.compare_digest(session.password_digest,
+                                                self._digest(password))):
+                    # no session yet, or it died, or the password is not the one
+                    # that opened it (changed?); the router decides if it is valid
+                    self._open(session, password, auto_probe)
+                if request['op'] == 'open':
+                    return {'status': 'ok', 'format': 'json', 'reply': True}
+
+                # the RPC timeout of the client, as it would set it on its own session
+                if request.get('rpc_timeout'):
+                    session.dev.timeout = int(request['rpc_timeout'])
+                timer_rpc_start = time.perf_counter()
+                try:
+                    reply = self._execute(session, request)
+                except (JUNOS_EXCEPTION.ConnectClosedError,
+                        JUNOS_EXCEPTION.ConnectError) as err:
+                    # the session died under us; reopen and retry once
+                    self.logger.warning('Session with {host} lost ({err}), reopening'
+                                        .format(host=host, err=err))
+                    self._open(session, password, auto_probe)
+                    reply = self._execute(session, request)
+                self.logger.debug('RPC {rpc} on {host} in {timer_rpc:0.2f} seconds'
+                                  .format(rpc=request['rpc'], host=host,
+                                          timer_rpc=time.perf_counter() - timer_rpc_start))
+                session.last_used = time.monotonic()
+        except Exception as err:
+            self.logger.error('Request {op} on {host} failed: {err}'
+                              .format(op=request.get('op'), host=request.get('host'), err=err))
+            return {'status': 'error',
+                    'error_type': type(err).__name__,
+                    'message': str(err)}
+
+        # JSON replies come as dictionaries; the rest as lxml elements
+        if isinstance(reply, (dict, list, bool)):
+            return {'status': 'ok', 'format': 'json', 'reply': reply}
+        from lxml import etree
+        return {'status': 'ok', 'format': 'xml',
+                'reply': etree.tostring(reply, encoding='unicode')}
+
+    def reap_idle(self):
+        '''Closes the sessions that have not been used for idle_timeout seconds'''
+        import time
+
+        now = time.monotonic()
+        with self._sessions_lock:
+            idle = [key for (key, session) in self._sessions.items()
+                    if now - session.last_used > self.idle_timeout]
+            idle_sessions = [self._sessions.pop(key) for key in idle]
+        for session in idle_sessions:
+            with session.lock:
+                if session.dev is not None and session.dev.connected:
+                    self.logger.debug('Closing idle Netconf session with {host}'
+                                      .format(host=session.host))
+                    session.dev.close()
+
+    def close_all(self):
+        '''Closes all the sessions, leave the routers orderly'''
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            with session.lock:
+                if session.dev is not None and session.dev.connected:
+                    session.dev.close()
+
+
+def run_broker(socket_path: str = DEFAULT_SOCKET,
+               idle_timeout: int = 600,
+               debug_level: str = 'ERROR'):
+    '''
+    Starts the broker daemon on socket_path and serves until interrupted.
+
+    Each client connection is handled in its own thread. RPCs to different
+    routers run in parallel; RPCs to the same router are serialized on its
+    session.
+
+    Version:
+        2026-10-18
+    '''
+
+    #
+    # imports
+    #
+    # imports, Python standard modules
+    import os
+    import signal
+    import socketserver
+    import threading
+
+    broker = NetconfBroker(idle_timeout=idle_timeout, debug_level=debug_level)
+
+    class BrokerRequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                request = json.loads(line.decode('utf-8'))
+                response = broker.handle_request(request)
+            except ValueError as err:
+                response = {'status': 'error', 'error_type': 'BadRequest', 'message': str(err)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+    class BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    # a socket file left behind by a daemon that died is removed;
+    # one that belongs to a running daemon is not touched
+    if os.path.exists(socket_path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(socket_path)
+                raise SystemExit('A broker is already listening on {path}'
+                                 .format(path=socket_path))
+            except ConnectionRefusedError:
+                os.unlink(socket_path)
+
+    # only the user running the daemon can use the socket
+    old_umask = os.umask(0o177)
+    try:
+        server = BrokerServer(socket_path, BrokerRequestHandler)
+    finally:
+        os.umask(old_umask)
+
+    # close idle sessions in the background
+    stop_reaper = threading.Event()
+
+    def reaper():
+        while not stop_reaper.wait(min(60, idle_timeout)):
+            broker.reap_idle()
+    threading.Thread(target=reaper, daemon=True).start()
+
+    # systemd and friends stop daemons with SIGTERM
+    def on_sigterm(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+    broker.logger.info('NETCONF broker listening on {path}'.format(path=socket_path))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_reaper.set()
+        server.server_close()
+        broker.close_all()
+        os.unlink(socket_path)
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    socket_path, idle_timeout, debug = get_args()
+    run_broker(socket_path=socket_path,
+               idle_timeout=idle_timeout,
+               debug_level='DEBUG' if debug is True else 'WARNING')
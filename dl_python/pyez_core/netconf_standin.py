@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+NETCONF stand-in server, to test pyez_core.async_netconf without routers.
+
+Speaks NETCONF over plain TCP (no SSH): hello exchange, end-of-message and
+chunked framing, and answers each RPC with a canned JSON reply, as a router
+does for an RPC with format="json". Many clients can be connected at once,
+which is what is needed to exercise hundreds of concurrent sessions.
+
+Replies directory: one file per RPC, named <rpc_name>.json, e.g.
+get_isis_interface_information.json. Each file is a dictionary of
+    reply_key(arguments of the RPC): JSON reply
+    "*": JSON reply to any other arguments
+e.g. ping.json
+{"{\"host\": \"1.1.1.1\", \"routing_instance\": \"v\"}": {"ping-results": [{"ping-failure": ...}]},
+ "*": {"ping-results": [{"ping-success": [{"data": [null]}]}]}}
+An RPC without format="json" is answered with the XML in <rpc_name>.xml, if there
+is such a file, whatever its arguments.
+An RPC without a file, or without a reply for its arguments, gets an rpc-error.
+
+Invoke as (from the dl_python directory):
+python -m pyez_core.netconf_standin -r replies/ -P 8830 -l 0.2
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* get_args(). Parses the arguments passed by the user from CLI
+* reply_key(). The key of the reply to an RPC, from its arguments
+* serve_standin(). Runs the stand-in server
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import asyncio
+import json
+import os
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+# imports, this repository's shared PyEZ modules
+from pyez_core.async_netconf import NETCONF_BASE_10, NETCONF_BASE_11, NETCONF_EOM, NETCONF_NS
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='NETCONF stand-in server, canned replies')
+
+    # Add arguments
+    parser.add_argument('-r', '--replies',
+                        help='Directory with the <rpc_name>.json (and .xml) replies of each RPC',
+                        required=True,
+                        type=str)
+    parser.add_argument('-a', '--address',
+                        help='Address to listen on. Default 127.0.0.1',
+                        required=False,
+                        default='127.0.0.1',
+                        type=str)
+    parser.add_argument('-P', '--port',
+                        help='TCP port to listen on. Default 8830',
+                        required=False,
+                        default=8830,
+                        type=int)
+    parser.add_argument('-l', '--latency',
+                        help='Seconds to wait before each reply, as a router would. Default 0',
+                        required=False,
+                        default=0.0,
+                        type=float)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.replies, args.address, args.port, args.latency
+
+
+def reply_key(rpc_kwargs: dict) -> str:
+    '''Returns the key of the reply to an RPC called with rpc_kwargs, as PyEZ keyword arguments'''
+    return json.dumps(rpc_kwargs, sort_keys=True)
+
+
+def rpc_kwargs_of(operation) -> dict:
+    '''Returns the PyEZ keyword arguments of an RPC operation element, e.g. <extensive/> is
+    extensive=True, <neighbor-address>x</neighbor-address> is neighbor_address='x'
+    '''
+    rpc_kwargs = {}
+    for child in operation:
+        argument = child.tag.split('}')[-1].replace('-', '_')
+        rpc_kwargs[argument] = child.text if child.text else True
+    return rpc_kwargs
+
+
+async def serve_standin(replies_dir: str,
+                        address: str = '127.0.0.1',
+                        port: int = 8830,
+                        latency: float = 0.0):
+    '''
+    Starts the stand-in server and returns the asyncio server object,
+    close() it to stop.
+
+    Version:
+        2026-10-18
+    '''
+
+    session_ids = iter(range(1, 2 ** 31))
+
+    def load_reply(rpc_name: str, rpc_kwargs: dict):
+        path = os.path.join(replies_dir, rpc_name + '.json')
+        if not os.path.isfile(path):
+            return None
+        with open(path) as replies_file:
+            replies = json.load(replies_file)
+        return replies.get(reply_key(rpc_kwargs), replies.get('*'))
+
+    async def handle_client(reader, writer):
+        hello = ('<?xml version="1.0" encoding="UTF-8"?>'
+                 '<hello xmlns="{ns}"><capabilities>'
+                 '<capability>{base_10}</capability>'
+                 '<capability>{base_11}</capability>'
+                 '</capabilities><session-id>{session_id}</session-id></hello>'
+                 .format(ns=NETCONF_NS, base_10=NETCONF_BASE_10, base_11=NETCONF_BASE_11,
+                         session_id=next(session_ids)))
+        writer.write(hello.encode('utf-8') + NETCONF_EOM)
+        try:
+            client_hello = ET.fromstring((await reader.readuntil(NETCONF_EOM))
+                                         [:-len(NETCONF_EOM)].strip())
+            chunked = NETCONF_BASE_11 in [capability.text.strip() for capability
+                                          in client_hello.iter('{%s}capability' % NETCONF_NS)]
+
+            while True:
+                if chunked:
+                    chunks = []
+                    while True:
+                        await reader.readuntil(b'\n#')
+                        size = (await reader.readuntil(b'\n'))[:-1]
+                        if size == b'#':
+                            break
+                        chunks.append(await reader.readexactly(int(size)))
+                    message = b''.join(chunks)
+                else:
+                    message = (await reader.readuntil(NETCONF_EOM))[:-len(NETCONF_EOM)]
+
+                rpc = ET.fromstring(message)
+                operation = rpc[0]
+                rpc_name = operation.tag.split('}')[-1].replace('-', '_')
+                xml_file = os.path.join(replies_dir, rpc_name + '.xml')
+                if rpc_name == 'close_session':
+                    body = '<ok/>'
+                elif operation.get('format') != 'json' and os.path.isfile(xml_file):
+                    with open(xml_file) as reply_file:
+                        body = reply_file.read()
+                    # the reply goes inside <rpc-reply>, without its XML declaration
+                    if body.startswith('<?xml'):
+                        body = body[body.index('?>') + 2:]
+                else:
+                    reply = load_reply(rpc_name, rpc_kwargs_of(operation))
+                    if reply is None:
+                        body = ('<rpc-error><error-type>protocol</error-type>'
+                                '<error-severity>error</error-severity>'
+                                '<error-message>syntax error, expecting &lt;rpc&gt;: '
+                                '{rpc}</error-message></rpc-error>'
+                                .format(rpc=escape(operation.tag.split('}')[-1])))
+                    else:
+                        body = escape(json.dumps(reply))
+                if latency and rpc_name != 'close_session':
+                    await asyncio.sleep(latency)
+
+                rpc_reply = ('<rpc-reply xmlns="{ns}" message-id="{message_id}">{body}'
+                             '</rpc-reply>'
+                             .format(ns=NETCONF_NS, message_id=rpc.get('message-id', ''),
+                                     body=body)).encode('utf-8')
+                if chunked:
+                    writer.write(('\n#{length}\n'.format(length=len(rpc_reply)))
+                                 .encode('ascii') + rpc_reply + b'\n##\n')
+                else:
+                    writer.write(rpc_reply + NETCONF_EOM)
+                await writer.drain()
+                if rpc_name == 'close_session':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # the client went away
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle_client, address, port)
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    replies_dir, address, port, latency = get_args()
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = loop.run_until_complete(serve_standin(replies_dir, address, port, latency))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.close()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Directories where the shared modules keep their state between runs of the checks
+(resolver cache, RPC cache, circuit breakers, latency history).
+
+What is in them decides which address gets the NETCONF password, and what the
+checks report, so they are private to the user running the checks: a directory
+is only used if it is a directory (not a symlink), owned by that user, and with
+mode 0700. A directory created first by another user, e.g. in /tmp, is refused,
+and the check goes on without it. The files in them are created with mode 0600,
+with O_EXCL, so that nothing planted there is written through.
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* user_state_dir(). The directory of the user running the checks, for a module
+* private_dir(). Creates a directory 0700, or verifies it is private
+* write_private_file(). Writes a file atomically, mode 0600
+"""
+
+# imports
+# imports, Python standard modules
+import os
+import stat
+
+
+def user_state_dir(name: str) -> str:
+    '''Returns the directory name of the user running the checks, e.g.
+    /tmp/junos_resolver-1001 for 'junos_resolver' '''
+    return os.path.join(os.environ.get('TMPDIR', '/tmp'),
+                        '{name}-{uid}'.format(name=name, uid=os.getuid()))
+
+
+def private_dir(path: str) -> str:
+    '''
+    Creates the directory path with mode 0700 if it does not exist, and returns it.
+    Raises PermissionError if it is not a directory owned by the user running the
+    checks with mode 0700 (e.g. another user created it first, or it is a symlink).
+
+    Version:
+        2026-10-18
+    '''
+
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    status = os.lstat(path)
+    if (not stat.S_ISDIR(status.st_mode) or status.st_uid != os.getuid() or
+            stat.S_IMODE(status.st_mode) != 0o700):
+        raise PermissionError('{path} is not a directory private to this user (owned by '
+                              'uid {uid}, mode {mode:o}); not used'
+                              .format(path=path, uid=status.st_uid,
+                                      mode=stat.S_IMODE(status.st_mode)))
+    return path
+
+
+def write_private_file(path: str, write_function):
+    '''
+    Writes path, mode 0600, with write_function(file): to a temporary file next to
+    it, created with O_EXCL, that then replaces path, atomically. Readers see the
+    old or the new file, never half of it. Raises OSError if it cannot be written.
+
+    Version:
+        2026-10-18
+    '''
+
+    temporary_file = '{path}.{pid}'.format(path=path, pid=os.getpid())
+    try:
+        # left behind by a process with the same pid that died writing it
+        os.remove(temporary_file)
+    except FileNotFoundError:
+        pass
+    file_descriptor = os.open(temporary_file,
+                              os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    try:
+        with open(file_descriptor, 'w') as temporary:
+            write_function(temporary)
+        os.replace(temporary_file, path)
+    except BaseException:
+        try:
+            os.remove(temporary_file)
+        except OSError:
+            pass
+        raise
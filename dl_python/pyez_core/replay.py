@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Recorded RPC replies, to run the checks without a router.
+
+RecordingDevice is a jnpr.junos.Device that, on top of talking to the router,
+writes every RPC reply it gets to a directory. ReplayDevice answers the RPCs
+from such a directory, without a router, optionally taking as long as a router
+would. Both are used by the checks instead of jnpr.junos.Device when these are
+set in the environment:
+    JUNOS_RECORD_DIR        record the replies of the router into this directory
+    JUNOS_REPLAY_DIR        answer from the replies in this directory, no router
+    JUNOS_REPLAY_LATENCY    seconds each replayed RPC takes. Default 0
+
+The directory has the format of the replies of pyez_core/netconf_standin.py,
+so the same recordings serve the async transport: one <rpc_name>.json per RPC,
+a dictionary of
+    reply_key(arguments of the RPC): JSON reply
+    "*": JSON reply to any other arguments
+and one <rpc_name>.xml with the XML reply of the RPC, for the RPCs retrieved
+as XML (-x). Arguments that are False are left out of the key, as PyEZ does
+not send them to the router.
+
+pyez_isis/replies/dist1-testlab/ has the replies pasted in pyez_isis/notes.md.
+
+The replayed checks still resolve the name of the router, so give them an
+address, e.g. (from the pyez_isis/production directory):
+JUNOS_REPLAY_DIR=../replies/dist1-testlab \
+python icinga_junos_isis_interface.py -H 127.0.0.1 -u heanet -p 'x'
+
+Invoke as (from the dl_python directory), to list what is recorded:
+python -m pyez_core.replay pyez_isis/replies/dist1-testlab
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* replay_key(). The key of the reply to an RPC, from its arguments
+* ReplayError. An RPC without a recorded reply
+* RecordingDevice. jnpr.junos.Device, recording the replies
+* ReplayDevice. Stands in for jnpr.junos.Device, with the recorded replies
+* junos_device(). What the checks use as jnpr.junos.Device
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import json
+import os
+import threading
+import time
+
+
+RECORD_DIR_VARIABLE = 'JUNOS_RECORD_DIR'
+REPLAY_DIR_VARIABLE = 'JUNOS_REPLAY_DIR'
+REPLAY_LATENCY_VARIABLE = 'JUNOS_REPLAY_LATENCY'
+
+# the sessions of a check (e.g. the VRF ping pool) record into the same files
+_record_lock = threading.Lock()
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='List the RPC replies recorded in a directory')
+
+    # Add arguments
+    parser.add_argument('replies_dir',
+                        help='Directory with the recorded replies',
+                        type=str)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return (args.replies_dir,)
+
+
+def replay_key(rpc_kwargs: dict) -> str:
+    '''Returns the key of the reply to an RPC called with rpc_kwargs, as PyEZ keyword
+    arguments; the arguments that are False are not sent to the router, so not in the key
+    '''
+    # imported here, not with the module: every check imports this module, and
+    # netconf_standin imports asyncio; only recording and replaying need it
+    from pyez_core.netconf_standin import reply_key
+    return reply_key({argument: value for (argument, value) in rpc_kwargs.items()
+                      if value is not False})
+
+
+def _is_json(rpc_args: tuple) -> bool:
+    '''Whether the RPC was called as dev.rpc.<rpc_name>({'format': 'json'}, ...)'''
+    return bool(rpc_args) and rpc_args[0].get('format') == 'json'
+
+
+def _xml_bytes(element) -> bytes:
+    '''Returns the XML of a reply, as lxml (PyEZ) or ElementTree element'''
+    # imports, Python standard modules
+    import xml.etree.ElementTree as ET
+    try:
+        from lxml import etree
+        if isinstance(element, etree._Element):
+            return etree.tostring(element)
+    except ImportError:
+        pass
+    return ET.tostring(element)
+
+
+class ReplayError(Exception):
+    '''Raised by ReplayDevice for an RPC without a recorded reply'''
+    pass
+
+
+class _RecordingRpc(object):
+    '''Stands in for jnpr.junos.Device.rpc; dev.rpc.<rpc_name>(...) goes to the router,
+    and its reply is recorded'''
+
+    def __init__(self, rpc, record_dir: str):
+        self._rpc = rpc
+        self._record_dir = record_dir
+
+    def __getattr__(self, rpc_name: str):
+        def call(*rpc_args, **rpc_kwargs):
+            reply = getattr(self._rpc, rpc_name)(*rpc_args, **rpc_kwargs)
+            self._record(rpc_name, rpc_args, rpc_kwargs, reply)
+            return reply
+        return call
+
+    def _record(self, rpc_name: str, rpc_args: tuple, rpc_kwargs: dict, reply):
+        path = os.path.join(self._record_dir, rpc_name)
+        with _record_lock:
+            os.makedirs(self._record_dir, exist_ok=True)
+            if not _is_json(rpc_args):
+                with open(path + '.xml', 'wb') as reply_file:
+                    reply_file.write(_xml_bytes(reply))
+                return
+            try:
+                with open(path + '.json') as replies_file:
+                    replies = json.load(replies_file)
+            except (OSError, ValueError):
+                replies = {}
+            replies[replay_key(rpc_kwargs)] = reply
+            temporary_file = '{path}.json.{pid}'.format(path=path, pid=os.getpid())
+            with open(temporary_file, 'w') as replies_file:
+                json.dump(replies, replies_file, indent=1, sort_keys=True)
+                replies_file.write('\n')
+            os.replace(temporary_file, path + '.json')
+
+
+class RecordingDevice(object):
+    '''
+    jnpr.junos.Device that writes the replies of its RPCs to record_dir.
+
+    Args:
+    Required:
+        record_dir (str)    Directory for the replies. Created if it does not exist.
+                            A reply already recorded for the same RPC and arguments
+                            is replaced
+        device_class        jnpr.junos.Device
+    Optional:
+        **device_kwargs     As for jnpr.junos.Device; host, user, password...
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, record_dir: str, device_class, **device_kwargs):
+        self._dev = device_class(**device_kwargs)
+        self.rpc = _RecordingRpc(self._dev.rpc, record_dir)
+
+    def open(self, *args, **kwargs):
+        self._dev.open(*args, **kwargs)
+        return self
+
+    def close(self):
+        self._dev.close()
+
+    def __getattr__(self, name: str):
+        # anything else (timeout, facts, connected...) as the Device
+        return getattr(self._dev, name)
+
+
+class _ReplayRpc(object):
+    '''Stands in for jnpr.junos.Device.rpc; dev.rpc.<rpc_name>(...) is answered from
+    the recorded replies'''
+
+    def __init__(self, replies_dir: str, latency: float):
+        self._replies_dir = replies_dir
+        self._latency = latency
+        # rpc_name: the replies in <rpc_name>.json, read once
+        self._replies = {}
+
+    def __getattr__(self, rpc_name: str):
+        def call(*rpc_args, **rpc_kwargs):
+            if self._latency:
+                time.sleep(self._latency)
+            path = os.path.join(self._replies_dir, rpc_name)
+            if not _is_json(rpc_args):
+                if not os.path.isfile(path + '.xml'):
+                    raise ReplayError('No XML reply recorded for {rpc} in {replies_dir}'
+                                      .format(rpc=rpc_name, replies_dir=self._replies_dir))
+                # imports, Python standard modules
+                import xml.etree.ElementTree as ET
+                return ET.parse(path + '.xml').getroot()
+            if rpc_name not in self._replies:
+                try:
+                    with open(path + '.json') as replies_file:
+                        self._replies[rpc_name] = json.load(replies_file)
+                except OSError:
+                    self._replies[rpc_name] = {}
+            replies = self._replies[rpc_name]
+            key = replay_key(rpc_kwargs)
+            reply = replies.get(key, replies.get('*'))
+            if reply is None:
+                raise ReplayError('No reply recorded for {rpc}({rpc_kwargs}) in {replies_dir}'
+                                  .format(rpc=rpc_name, rpc_kwargs=key,
+                                          replies_dir=self._replies_dir))
+            return reply
+        return call
+
+
+class ReplayDevice(object):
+    '''
+    Stands in for jnpr.junos.Device, answering the RPCs with the replies recorded
+    in replies_dir, by RecordingDevice or by hand.
+
+    Args:
+    Required:
+        replies_dir (str)   Directory with the replies
+    Optional:
+        latency (float)     Seconds each RPC takes, as a router would. Default 0
+        host, user          As for jnpr.junos.Device, reported as dev.hostname/dev.user
+        password, auto_probe...
+                            As for jnpr.junos.Device, ignored
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, replies_dir: str, latency: float = 0.0, host: str = '',
+                 user: str = '', **device_kwargs):
+        self.hostname = host
+        self.user = user
+        self.connected = False
+        self.timeout = 30
+        self.rpc = _ReplayRpc(replies_dir, latency)
+
+    def open(self, *args, **kwargs):
+        self.connected = True
+        return self
+
+    def close(self):
+        self.connected = False
+
+
+def junos_device(device_class):
+    '''
+    Returns what the checks are to use as jnpr.junos.Device (device_class):
+    ReplayDevice if JUNOS_REPLAY_DIR is set, RecordingDevice if JUNOS_RECORD_DIR
+    is set, otherwise device_class itself.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import functools
+
+    replay_dir = os.environ.get(REPLAY_DIR_VARIABLE)
+    if replay_dir:
+        return functools.partial(ReplayDevice, replay_dir,
+                                 float(os.environ.get(REPLAY_LATENCY_VARIABLE, 0)))
+    record_dir = os.environ.get(RECORD_DIR_VARIABLE)
+    if record_dir:
+        return functools.partial(RecordingDevice, record_dir, device_class)
+    return device_class
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    (replies_dir,) = get_args()
+
+    for file_name in sorted(os.listdir(replies_dir)):
+        path = os.path.join(replies_dir, file_name)
+        (rpc_name, extension) = os.path.splitext(file_name)
+        if extension == '.xml':
+            print('{rpc} (XML)  {size} bytes'.format(rpc=rpc_name, size=os.path.getsize(path)))
+        elif extension == '.json':
+            with open(path) as replies_file:
+                replies = json.load(replies_file)
+            for (key, reply) in sorted(replies.items()):
+                print('{rpc} {rpc_kwargs}  {size} bytes'
+                      .format(rpc=rpc_name, rpc_kwargs=key, size=len(json.dumps(reply))))
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Cached name resolution of the routers, shared by the PyEZ checks.
+
+Each check used to resolve the router with socket.gethostbyname() every time
+it runs, and always connected over IPv4. Now:
+* the addresses of a router, IPv4 and IPv6, are kept in a cache file for
+  DEFAULT_TTL seconds, so most checks do not query DNS at all. When DNS fails,
+  the addresses in the cache are used even if older than that.
+* the time it took to open the Netconf session is recorded per router and
+  address family. The next check connects with the family that connected
+  fastest. E.g. Netconf over IPv6 takes 25 seconds to open in ACX2200
+  (see sandbox/checks_junos_vrf_with_name_resolution.py): once measured, those
+  routers are queried over IPv4.
+
+A family that has not been measured yet counts as UNMEASURED_CONNECT_SECONDS,
+and IPv4 goes before IPv6 on a tie, so until there are measurements the checks
+connect over IPv4, as they did. A family that failed to connect goes last
+for DEFAULT_TTL seconds.
+
+The cache is a JSON file, updated under a lock, as many checks run at once. It
+decides where the checks send the NETCONF password, so it is in a directory
+private to the user running the checks, DEFAULT_CACHE_DIR (see
+pyez_core/private_dir.py); a cache file in a directory that is not private to the
+user is not used. JUNOS_RESOLVER_CACHE, if set, is the cache file to use instead;
+set to an empty value, there is no cache: the checks resolve the router every time,
+and connect over IPv4, as they did:
+{"<ne>": {"resolved_at": 1760000000.0,
+          "addresses": {"inet": ["87.44.68.38"], "inet6": ["2001:770:100:6836::2"]},
+          "connect": {"inet": {"seconds": 2.61, "at": 1760000000.0},
+                      "inet6": {"seconds": null, "failed_at": 1760000000.0}}}}
+
+Invoke as (from the dl_python directory), to see what a check would use:
+python -m pyez_core.resolver mx1.example.net mx2.example.net
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* Resolver. The cache; addresses(), preferred_address(), record_connect(),
+  record_failure()
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import json
+import os
+import socket
+import time
+
+# imports, own modules
+from pyez_core.private_dir import private_dir, user_state_dir, write_private_file
+
+
+DEFAULT_CACHE_DIR = user_state_dir('junos_resolver')
+DEFAULT_CACHE_FILE = os.path.join(DEFAULT_CACHE_DIR, 'cache.json')
+# environment variable with the cache file to use instead; empty, no cache
+CACHE_FILE_ENVIRONMENT = 'JUNOS_RESOLVER_CACHE'
+# seconds the addresses of a router, and a failure to connect, are remembered
+DEFAULT_TTL = 3600
+# what a family that has not connected yet is assumed to take, in seconds
+UNMEASURED_CONNECT_SECONDS = 5.0
+# IPv4 first, as socket.gethostbyname() did
+ADDRESS_FAMILIES = (('inet', socket.AF_INET), ('inet6', socket.AF_INET6))
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Show the addresses of routers in the '
+                                                  'resolver cache of the PyEZ checks'))
+
+    # Add arguments
+    parser.add_argument('ne',
+                        help='Routers to resolve',
+                        nargs='+',
+                        type=str)
+    parser.add_argument('-c', '--cache-file',
+                        help='Cache file. Default ${variable}, or {cache}'
+                             .format(variable=CACHE_FILE_ENVIRONMENT, cache=DEFAULT_CACHE_FILE),
+                        required=False,
+                        default=None,
+                        type=str)
+    parser.add_argument('-f', '--flush',
+                        help='Forget the routers given, so they are resolved again',
+                        required=False,
+                        action='store_true')
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.ne, args.cache_file, args.flush
+
+
+class Resolver(object):
+    '''
+    Addresses of the routers, cached on disk, ordered by how fast each family connects.
+
+    Args:
+    Optional:
+        cache_file (str)    JSON file with the cache. Created if it does not exist.
+                            Default $JUNOS_RESOLVER_CACHE, or DEFAULT_CACHE_FILE;
+                            empty, no cache
+        ttl (int)           Seconds the addresses of a router are used without
+                            resolving it again
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, cache_file: str = None, ttl: int = DEFAULT_TTL):
+        if cache_file is None:
+            cache_file = os.environ.get(CACHE_FILE_ENVIRONMENT, DEFAULT_CACHE_FILE)
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    def _load(self) -> dict:
+        if not self.cache_file:
+            return {}
+        try:
+            # only from a directory no other user can write to
+            private_dir(os.path.dirname(os.path.abspath(self.cache_file)))
+            with open(self.cache_file) as cache:
+                return json.load(cache)
+        except (OSError, ValueError):
+            # no cache yet, unreadable, or not private: start an empty one
+            return {}
+
+    def _update(self, update_function):
+        '''Read, update_function(cache), write; locked, so that concurrent checks do not
+        lose each other's updates. The cache is only an optimization: if it can not
+        be written, the check carries on'''
+
+        # imports, Python standard modules
+        import fcntl
+
+        if not self.cache_file:
+            return
+        try:
+            private_dir(os.path.dirname(os.path.abspath(self.cache_file)))
+            lock_descriptor = os.open(self.cache_file + '.lock',
+                                      os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+            with open(lock_descriptor, 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                cache = self._load()
+                update_function(cache)
+                # atomic, readers see the old or the new file, never half of it
+                write_private_file(self.cache_file,
+                                   lambda temporary: json.dump(cache, temporary, indent=1,
+                                                               sort_keys=True))
+        except OSError:
+            pass
+
+    def addresses(self, ne: str) -> list:
+        '''
+        Returns the addresses of ne, [(family, address), ...], the one to connect to first.
+        From the cache if resolved less than ttl seconds ago; from DNS otherwise.
+
+        ne can be an IP address, in which case it is the only address returned.
+        Raises socket.gaierror if ne can not be resolved and is not in the cache.
+        '''
+
+        # imports, Python standard modules
+        import ipaddress
+
+        try:
+            ip = ipaddress.ip_address(ne)
+            return [('inet' if ip.version == 4 else 'inet6', str(ip))]
+        except ValueError:
+            pass
+
+        entry = self._load().get(ne)
+        now = time.time()
+        if entry is None or now - entry.get('resolved_at', 0) > self.ttl:
+            try:
+                resolved = self._resolve(ne)
+            except socket.gaierror:
+                if entry is None:
+                    raise
+                # DNS is down, the addresses in the cache are better than nothing
+                resolved = None
+            if resolved is not None:
+                def store(cache):
+                    cache.setdefault(ne, {})
+                    cache[ne]['resolved_at'] = now
+                    cache[ne]['addresses'] = resolved
+                self._update(store)
+                entry = dict(entry or {}, resolved_at=now, addresses=resolved)
+
+        return self._order(entry)
+
+    @staticmethod
+    def _resolve(ne: str) -> dict:
+        '''Returns {'inet': [addresses], 'inet6': [addresses]} from DNS'''
+        resolved = {}
+        for (family_name, family) in ADDRESS_FAMILIES:
+            try:
+                addresses = [sockaddr[0] for (_, _, _, _, sockaddr)
+                             in socket.getaddrinfo(ne, None, family, socket.SOCK_STREAM)]
+            except socket.gaierror:
+                continue
+            # getaddrinfo may return the same address more than once, keep the order
+            resolved[family_name] = sorted(set(addresses), key=addresses.index)
+        if not resolved:
+            raise socket.gaierror(socket.EAI_NONAME, 'No address for {ne}'.format(ne=ne))
+        return resolved
+
+    def _order(self, entry: dict) -> list:
+        '''Sorts the families of entry: not failed recently, fastest, IPv4 first'''
+        now = time.time()
+        connect = entry.get('connect', {})
+
+        def rank(family_name: str) -> tuple:
+            measure = connect.get(family_name, {})
+            failed = now - measure.get('failed_at', 0) < self.ttl
+            seconds = measure.get('seconds')
+            return (failed, UNMEASURED_CONNECT_SECONDS if seconds is None else seconds,
+                    [name for (name, _) in ADDRESS_FAMILIES].index(family_name))
+
+        return [(family_name, address)
+                for family_name in sorted(entry.get('addresses', {}), key=rank)
+                for address in entry['addresses'][family_name]]
+
+    def preferred_address(self, ne: str) -> str:
+        '''Returns the address to connect to ne, what socket.gethostbyname(ne) was used for'''
+        return self.addresses(ne)[0][1]
+
+    def _record(self, ne: str, address: str, measure: dict):
+        family_name = 'inet6' if ':' in address else 'inet'
+
+        def store(cache):
+            if ne in cache:
+                cache[ne].setdefault('connect', {})[family_name] = measure
+        self._update(store)
+
+    def record_connect(self, ne: str, address: str, seconds: float):
+        '''Records that the Netconf session with ne, on address, opened in seconds'''
+        self._record(ne, address, {'seconds': round(seconds, 3), 'at': time.time()})
+
+    def record_failure(self, ne: str, address: str):
+        '''Records that the Netconf session with ne, on address, could not be opened'''
+        self._record(ne, address, {'seconds': None, 'failed_at': time.time()})
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    nes, cache_file, flush = get_args()
+    resolver = Resolver(cache_file)
+
+    if flush:
+        def forget(cache):
+            for ne in nes:
+                cache.pop(ne, None)
+        resolver._update(forget)
+
+    for ne in nes:
+        try:
+            addresses = resolver.addresses(ne)
+        except socket.gaierror as err:
+            print('{ne}: {err}'.format(ne=ne, err=err))
+            continue
+        measures = resolver._load().get(ne, {}).get('connect', {})
+        print('{ne}:'.format(ne=ne))
+        for (family_name, address) in addresses:
+            print('    {address:<40} {measure}'.format(address=address,
+                                                       measure=measures.get(family_name, '')))
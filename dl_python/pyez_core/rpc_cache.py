@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+On-disk cache of RPC replies, shared by the PyEZ checks.
+
+Icinga often schedules the IS-IS, BGP and VRF checks of a router within
+seconds of each other, and several checks retrieve the same, expensive, reply
+(e.g. 'show isis interface extensive'). With this cache, the first check logs
+in and runs the RPC; the checks that follow within the freshness window
+(ttl, seconds) use its reply and do not log in to the router at all.
+
+Replies are keyed by (router, RPC, arguments of the RPC), one JSON file per key
+in DEFAULT_CACHE_DIR, only readable by the user running the checks. A cache
+directory that is not private to that user (another user created it first, see
+pyez_core/private_dir.py) is not used: the check fetches its replies itself.
+
+Checks firing at the same time share one fetch: on a miss, get() takes a lock
+on the key, so the other checks wanting the same reply wait for the first one
+to put() it, rather than all logging in at once. The lock is released by put(),
+by release(), when the RpcCache object is discarded (e.g. the check failed) or
+when the process ends; and no check waits for it longer than lock_timeout.
+
+Only for replies that describe state, that a few seconds old are as good as
+new: IS-IS interfaces, BGP neighbors. Never for pings.
+
+Invoke as (from the dl_python directory), to list what is cached:
+python -m pyez_core.rpc_cache
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* RpcCache. The cache; get(), put(), release()
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import fcntl
+import hashlib
+import json
+import os
+import time
+
+# imports, own modules
+from pyez_core.private_dir import private_dir, user_state_dir, write_private_file
+
+
+DEFAULT_CACHE_DIR = user_state_dir('junos_rpc_cache')
+# seconds a check waits for another one fetching the same reply
+DEFAULT_LOCK_TIMEOUT = 60
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description='List the RPC replies cached by the PyEZ checks')
+
+    # Add arguments
+    parser.add_argument('-c', '--cache-dir',
+                        help='Cache directory. Default {cache}'.format(cache=DEFAULT_CACHE_DIR),
+                        required=False,
+                        default=DEFAULT_CACHE_DIR,
+                        type=str)
+    parser.add_argument('-f', '--flush',
+                        help='Delete all the cached replies',
+                        required=False,
+                        action='store_true')
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.cache_dir, args.flush
+
+
+class RpcCache(object):
+    '''
+    On-disk cache of RPC replies, keyed by (router, RPC, arguments).
+
+    Args:
+    Required:
+        ttl (float)             Seconds a reply is fresh, and used instead of
+                                running the RPC again
+    Optional:
+        cache_dir (str)         Directory for the replies. Created if it does not exist
+        lock_timeout (float)    Seconds to wait for another check fetching the same reply
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self, ttl: float, cache_dir: str = DEFAULT_CACHE_DIR,
+                 lock_timeout: float = DEFAULT_LOCK_TIMEOUT):
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.lock_timeout = lock_timeout
+        # key: open lock file, for the keys this object is fetching
+        self._locks = {}
+
+    def _path(self, ne: str, rpc_name: str, rpc_kwargs: dict) -> str:
+        key = json.dumps([ne, rpc_name, rpc_kwargs], sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest())
+
+    def _read(self, path: str):
+        '''Returns the reply in path if fresh, None otherwise'''
+        try:
+            with open(path + '.json') as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry['fetched_at'] > self.ttl:
+            return None
+        return entry['reply']
+
+    def get(self, ne: str, rpc_name: str, rpc_kwargs: dict):
+        '''
+        Returns the reply of rpc_name(**rpc_kwargs) in ne if fetched less than ttl
+        seconds ago. Otherwise returns None, and the caller is to run the RPC and
+        put() the reply; until then, other checks asking for it wait.
+        '''
+
+        path = self._path(ne, rpc_name, rpc_kwargs)
+        try:
+            # replies only from a directory no other user can write to
+            private_dir(self.cache_dir)
+        except OSError:
+            # no cache directory, the check goes on without it
+            return None
+        reply = self._read(path)
+        if reply is not None:
+            return reply
+
+        try:
+            lock = open(os.open(path + '.lock', os.O_WRONLY | os.O_CREAT | os.O_NOFOLLOW, 0o600),
+                        'w')
+        except OSError:
+            return None
+
+        # wait for whoever is fetching this reply, if anyone
+        waiting_since = time.time()
+        while True:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.time() - waiting_since > self.lock_timeout:
+                    # the other check is taking too long, fetch without the lock
+                    lock.close()
+                    return None
+                time.sleep(0.1)
+
+        # the check holding the lock may have just fetched it
+        reply = self._read(path)
+        if reply is not None:
+            lock.close()
+            return reply
+        self._locks[path] = lock
+        return None
+
+    def put(self, ne: str, rpc_name: str, rpc_kwargs: dict, reply):
+        '''Stores the reply of rpc_name(**rpc_kwargs) in ne, and releases its lock'''
+        path = self._path(ne, rpc_name, rpc_kwargs)
+        try:
+            private_dir(self.cache_dir)
+            entry = {'ne': ne, 'rpc': rpc_name, 'rpc_kwargs': rpc_kwargs,
+                     'fetched_at': time.time(), 'reply': reply}
+            # atomic, readers see the old or the new reply, never half of it
+            write_private_file(path + '.json', lambda temporary: json.dump(entry, temporary))
+        except OSError:
+            pass
+        finally:
+            self.release(ne, rpc_name, rpc_kwargs)
+
+    def release(self, ne: str, rpc_name: str, rpc_kwargs: dict):
+        '''Lets other checks fetch the reply, when this one could not'''
+        lock = self._locks.pop(self._path(ne, rpc_name, rpc_kwargs), None)
+        if lock is not None:
+            lock.close()
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    cache_dir, flush = get_args()
+
+    file_names = sorted(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else []
+    for file_name in file_names:
+        path = os.path.join(cache_dir, file_name)
+        if flush:
+            os.remove(path)
+            continue
+        if not file_name.endswith('.json'):
+            continue
+        try:
+            with open(path) as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            continue
+        print('{age:>8.1f}s ago  {ne}  {rpc} {rpc_kwargs}'
+              .format(age=time.time() - entry['fetched_at'], ne=entry['ne'],
+                      rpc=entry['rpc'], rpc_kwargs=entry['rpc_kwargs']))
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Pipelined RPCs over one NETCONF session, for the checks that send one RPC per
+item: a ping per host (ping_vrf), a BGP neighbor per peer (check_junos_bgp_session);
+or more than one RPC: the IS-IS interfaces and adjacencies (get_junos_isis_interfaces).
+
+Sent one by one, each RPC waits for the reply of the previous one, and for it to
+be parsed: the session sits idle for a round trip and a parse per item. Here:
+* the RPCs are sent back-to-back, up to depth of them waiting for their reply
+  at the same time (RFC 6241 lets a client send an rpc before the reply of the
+  previous one; the router executes them in order, one after the other)
+* each reply is parsed on a worker thread, while the next ones are in flight
+So the router always has the next RPC queued, and per item the check costs the
+time the router takes to execute it, not that plus a round trip plus a parse.
+
+The RPCs are pipelined over the ncclient session of a jnpr.junos.Device, in its
+async mode. Over a session that cannot (the broker, see
+pyez_core/netconf_broker.py, or replayed/recorded replies, see
+pyez_core/replay.py), they are sent one by one as before, and only the parsing
+is taken off the way of the next RPC.
+
+Invoke as (from the dl_python directory), to see what it saves on a replayed
+session where each RPC takes the latency given, and parsing the time given:
+python -m pyez_core.rpc_pipeline -n 50 -l 0.05 -t 0.02
+
+Requires:
+    Python 3.5
+    junos-eznc 2.5, ncclient (for the pipelining proper)
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* get_args(). Parses the arguments passed by the user from CLI
+* can_pipeline(). Whether the RPCs over a session can be pipelined
+* pipeline_rpcs(). Sends RPCs over one session, pipelined, and parses the replies
+* pipeline_requests(). The same, for different RPCs, in JSON or XML
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import collections
+import concurrent.futures
+import time
+
+
+# how many RPCs wait for their reply at the same time, by default
+DEFAULT_PIPELINE_DEPTH = 4
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('RPCs one by one, and with the replies '
+                                                  'parsed on a worker thread, on a replayed '
+                                                  'session'))
+
+    # Add arguments
+    parser.add_argument('-n', '--rpcs', help='How many RPCs. Default 50',
+                        required=False, default=50, type=int)
+    parser.add_argument('-l', '--latency', help='Seconds each RPC takes. Default 0.05',
+                        required=False, default=0.05, type=float)
+    parser.add_argument('-t', '--parse-time', help='Seconds parsing each reply takes. '
+                                                   'Default 0.02',
+                        required=False, default=0.02, type=float)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    return args.rpcs, args.latency, args.parse_time
+
+
+def can_pipeline(dev) -> bool:
+    '''Whether the RPCs over the session dev can be pipelined: a jnpr.junos.Device,
+    open, whose ncclient session has an async mode'''
+    if not type(dev).__module__.startswith('jnpr.junos'):
+        return False
+    return hasattr(getattr(dev, '_conn', None), 'async_mode')
+
+
+def _operation(rpc_name: str, rpc_kwargs: dict, rpc_format: str = 'json') -> str:
+    '''Returns the operation of the RPC, as PyEZ builds it for
+    dev.rpc.<rpc_name>({'format': 'json'}, **rpc_kwargs), or without the format
+    for the native XML reply'''
+
+    # imports, Python standard modules
+    import xml.etree.ElementTree as ET
+
+    operation = ET.Element(rpc_name.replace('_', '-'),
+                           {'format': 'json'} if rpc_format == 'json' else {})
+    for (argument, value) in rpc_kwargs.items():
+        if value is False or value is None:
+            continue
+        child = ET.SubElement(operation, argument.replace('_', '-'))
+        if value is not True:
+            child.text = str(value)
+    return ET.tostring(operation, encoding='unicode')
+
+
+def _send_pipelined(dev, requests: list, depth: int, on_reply, timer, rpc_format: str):
+    '''Sends the RPCs, [(rpc name, arguments)], over the ncclient session of dev, in
+    its async mode, up to depth of them waiting for their reply; on_reply(index,
+    reply) as each arrives, in order. Each RPC is timed into timer from when the
+    router could start on it, the later of when it was sent and when the previous
+    reply came in, as the router executes them one after the other'''
+
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.async_netconf import parse_rpc_reply
+
+    conn = dev._conn
+    timeout = dev.timeout
+    async_mode = conn.async_mode
+    conn.async_mode = True
+    in_flight = collections.deque()     # (index, sent at, ncclient RPC), oldest first
+    replied_at = None                   # when the previous reply came in
+    try:
+        for (index, (rpc_name, rpc_kwargs)) in enumerate(requests):
+            sent_at = time.perf_counter()
+            in_flight.append((index, sent_at,
+                              conn.rpc(_operation(rpc_name, rpc_kwargs, rpc_format))))
+            # the oldest reply is taken as soon as the pipeline is full, or at the end
+            while in_flight and (len(in_flight) >= depth or index == len(requests) - 1):
+                (reply_index, sent_at, rpc) = in_flight.popleft()
+                reply_rpc_name = requests[reply_index][0]
+                if not rpc.event.wait(timeout):
+                    raise Exception('No reply to {rpc_name} in {timeout} seconds'
+                                    .format(rpc_name=reply_rpc_name, timeout=timeout))
+                replied = time.perf_counter()
+                if rpc.error is not None:
+                    raise Exception(rpc.error)
+                timer.record_rpc(reply_rpc_name, replied - max(sent_at, replied_at or sent_at))
+                replied_at = replied
+                on_reply(reply_index, parse_rpc_reply(rpc.reply.xml.encode('utf-8'),
+                                                      rpc_format))
+    finally:
+        conn.async_mode = async_mode
+
+
+def pipeline_rpcs(dev,
+                  rpc_name: str,
+                  calls: list,
+                  parse,
+                  depth: int = DEFAULT_PIPELINE_DEPTH,
+                  timer=None) -> list:
+    '''
+    Sends the RPC rpc_name once per item of calls, over the session dev, pipelined,
+    and returns the replies as parsed by parse, in the same order.
+
+    Args:
+    Required:
+        dev (Device)        Open Netconf session, a jnpr.junos.Device or stand-in
+        rpc_name (str)      The RPC, as the method of dev.rpc, e.g. 'ping'
+        calls (list)        The arguments of each RPC, e.g.
+                            [{'routing_instance': 'vrf', 'host': '10.0.0.1'}, ...]
+        parse               function(index, reply) -> result, called on a worker
+                            thread with the JSON reply of calls[index]
+    Optional:
+        depth (int)         How many RPCs wait for their reply at the same time;
+                            1 sends each RPC when the reply of the previous one is
+                            in. Pipelining needs can_pipeline(dev); otherwise, the
+                            RPCs are sent one by one
+        timer (PhaseTimer)  To which rpc (from the first RPC sent to the last reply,
+                            counted once per reply) and parse (of all the replies)
+                            are added, and each RPC, as rpc_name
+
+    Returns:
+        list, the result of parse for each of calls. If an RPC or a parse raises an
+        exception, no more RPCs are sent, and it is raised
+
+    Version:
+        2026-10-18
+    '''
+
+    return pipeline_requests(dev, [(rpc_name, rpc_kwargs) for rpc_kwargs in calls], parse,
+                             depth, timer)
+
+
+def pipeline_requests(dev,
+                      requests: list,
+                      parse,
+                      depth: int = DEFAULT_PIPELINE_DEPTH,
+                      timer=None,
+                      rpc_format: str = 'json') -> list:
+    '''
+    As pipeline_rpcs(), for RPCs that are not all the same, e.g. the IS-IS
+    interfaces and adjacencies of the check, back-to-back over one session.
+
+    Args:
+    Required:
+        dev (Device)        Open Netconf session, a jnpr.junos.Device or stand-in
+        requests (list)     The RPCs, as the method of dev.rpc, and their arguments,
+                            e.g. [('get_isis_interface_information', {'extensive': True}),
+                                  ('get_isis_adjacency_information', {'extensive': True})]
+        parse               function(index, reply) -> result, called on a worker
+                            thread with the reply of requests[index]
+    Optional:
+        depth (int)         As in pipeline_rpcs()
+        timer (PhaseTimer)  As in pipeline_rpcs(); each RPC is added as its name
+        rpc_format (str)    'json', the replies as dictionaries; or 'xml', the native
+                            XML replies, as elements
+
+    Returns:
+        list, the result of parse for each of requests. If an RPC or a parse raises
+        an exception, no more RPCs are sent, and it is raised
+
+    Version:
+        2026-10-18
+    '''
+
+    if timer is None:
+        # imports, this repository's shared PyEZ modules
+        from pyez_core.telemetry import PhaseTimer
+        timer = PhaseTimer()
+
+    failed = []     # the exception of a parse that failed, if any
+
+    def timed_parse(index: int, reply):
+        try:
+            with timer.phase('parse'):
+                return parse(index, reply)
+        except Exception as err:
+            failed.append(err)
+            raise
+
+    parsing = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as parser:
+        def on_reply(index: int, reply):
+            # a parse that failed stops the RPCs not sent yet
+            if failed:
+                raise failed[0]
+            parsing.append(parser.submit(timed_parse, index, reply))
+
+        timer_rpc_start = time.perf_counter()
+        try:
+            if depth > 1 and len(requests) > 1 and can_pipeline(dev):
+                _send_pipelined(dev, requests, depth, on_reply, timer, rpc_format)
+            else:
+                rpc_args = ({'format': 'json'},) if rpc_format == 'json' else ()
+                for (index, (rpc_name, rpc_kwargs)) in enumerate(requests):
+                    timer_start = time.perf_counter()
+                    reply = getattr(dev.rpc, rpc_name)(*rpc_args, **rpc_kwargs)
+                    timer.record_rpc(rpc_name, time.perf_counter() - timer_start)
+                    on_reply(index, reply)
+        finally:
+            # counted as one RPC per item sent
+            timer.record('rpc', time.perf_counter() - timer_rpc_start, len(parsing))
+
+    return [future.result() for future in parsing]
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.telemetry import PhaseTimer
+
+    rpcs, latency, parse_time = get_args()
+
+    class _SlowRpc(object):
+        '''Answers every RPC after latency seconds, as a replayed session does'''
+        def __getattr__(self, rpc_name: str):
+            def call(*rpc_args, **rpc_kwargs):
+                time.sleep(latency)
+                return {'rpc': rpc_name, 'arguments': rpc_kwargs}
+            return call
+
+    class _SlowDevice(object):
+        rpc = _SlowRpc()
+
+    def slow_parse(index: int, reply: dict) -> dict:
+        time.sleep(parse_time)
+        return reply['arguments']
+
+    calls = [{'host': '10.0.{high}.{low}'.format(high=index // 256, low=index % 256)}
+             for index in range(rpcs)]
+
+    # one by one: each RPC, then its parse
+    timer_start = time.perf_counter()
+    for (index, rpc_kwargs) in enumerate(calls):
+        slow_parse(index, _SlowDevice.rpc.ping({'format': 'json'}, **rpc_kwargs))
+    one_by_one = time.perf_counter() - timer_start
+
+    timer = PhaseTimer()
+    timer_start = time.perf_counter()
+    results = pipeline_rpcs(_SlowDevice(), 'ping', calls, slow_parse, timer=timer)
+    pipelined = time.perf_counter() - timer_start
+    assert results == calls
+
+    print('{rpcs} RPCs of {latency} s, parsed in {parse_time} s: one by one {one_by_one:.2f} s, '
+          'parsed on a worker thread {pipelined:.2f} s'
+          .format(rpcs=rpcs, latency=latency, parse_time=parse_time, one_by_one=one_by_one,
+                  pipelined=pipelined))
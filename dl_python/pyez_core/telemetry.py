@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Per-phase timings of the checks, as Icinga perfdata and as metrics.
+
+The checks time each phase of their work with a PhaseTimer:
+    dns         name resolution of the router (pyez_core/resolver.py)
+    connect     TCP connection to the NETCONF port (dev.probe()), when it connected
+    auth        SSH, authentication and NETCONF hello (dev.open())
+    rpc         the RPC(s), until the reply is in
+    parse       from the reply to what the check evaluates
+    total       the whole check
+A phase that runs several times (e.g. one ping RPC per host) is summed, and
+how many times it ran is counted. A phase that did not run (e.g. the reply came
+from the RPC cache, or through the broker there is no connect) is not reported.
+
+perfdata() renders the timings as Icinga perfdata, that the checks print
+after their output:
+    'dns'=0.0004s 'connect'=0.0213s 'auth'=2.6102s 'rpc'=2.8377s 'parse'=0.0151s ...
+so Icinga graphs them per router and check.
+
+Each RPC is also timed on its own, by name, with timer.phase('rpc', rpc_name).
+report() adds the connect timing, and that of each RPC, to the latency history
+of the router, from which its next checks take their timeouts; see
+pyez_core/latency.py. Not when replaying recorded replies (pyez_core/replay.py),
+whose timings are not the router's.
+
+write_metrics() also saves them, if the check is given a metrics file (-M):
+    *.prom      Prometheus textfile, for the textfile collector of node_exporter:
+                the latest timings of each (check, router), as the gauge
+                junos_check_phase_seconds{check="isis",ne="mx1",phase="rpc"}
+    otherwise   JSON lines, one line per check run, appended:
+                {"time": 1792300000.1, "check": "isis", "ne": "mx1",
+                 "phases": {"dns": 0.0004, ...}}
+
+Invoke as (from the dl_python directory), to see the slowest routers in a JSON
+lines metrics file:
+python -m pyez_core.telemetry /var/tmp/junos_checks.jsonl -p rpc
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions/classes:
+* get_args(). Parses the arguments passed by the user from CLI
+* PhaseTimer. Times the phases of a check; report() renders perfdata, writes metrics
+* open_device(). Opens a Netconf session, timing connect and auth apart, with the
+  timeouts of the router
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+
+
+# the phases, in the order they are reported
+PHASES = ('dns', 'connect', 'auth', 'rpc', 'parse', 'diff', 'total')
+# seconds to wait for the NETCONF port to accept the connection
+DEFAULT_PROBE_TIMEOUT = 29
+PROMETHEUS_METRIC = 'junos_check_phase_seconds'
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Slowest routers in a JSON lines metrics '
+                                                  'file written by the checks'))
+
+    # Add arguments
+    parser.add_argument('metrics_file',
+                        help='JSON lines metrics file, as given to the checks with -M',
+                        type=str)
+    parser.add_argument('-p', '--phase',
+                        help='Phase to rank the routers by. Default total',
+                        required=False,
+                        default='total',
+                        choices=PHASES,
+                        type=str)
+    parser.add_argument('-n', '--top',
+                        help='How many routers to list. Default 20',
+                        required=False,
+                        default=20,
+                        type=int)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+
+    # Return all variable values
+    return args.metrics_file, args.phase, args.top
+
+
+class PhaseTimer(object):
+    '''
+    Seconds spent in each phase of a check. Thread safe, the phases of
+    concurrent RPCs (e.g. pings) are added up.
+
+    with timer.phase('rpc', 'get_isis_interface_information'):
+        reply = dev.rpc.get_isis_interface_information(...)
+
+    Version:
+        2026-10-18
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
+
+    def __init__(self):
+        # phase: seconds
+        self.seconds = {}
+        # phase: times it ran, e.g. RPCs sent
+        self.counts = {}
+        # RPC name: [seconds each of them took]
+        self.rpcs = {}
+        self._lock = threading.Lock()
+        # for the total
+        self._created = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, rpc_name: str = ''):
+        '''Times the block of code in the with statement as the phase name; and, if
+        rpc_name is given and the block did not raise, as one RPC rpc_name. An RPC
+        that failed or timed out is not a sample of how long the router takes'''
+        timer_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - timer_start
+            self.record(name, seconds)
+        if rpc_name:
+            self.record_rpc(rpc_name, seconds)
+
+    def record(self, name: str, seconds: float, count: int = 1):
+        '''Adds seconds to the phase name, which ran count times in them'''
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + count
+
+    def record_rpc(self, rpc_name: str, seconds: float):
+        '''Records that one RPC rpc_name took seconds; the rpc phase is not added to'''
+        with self._lock:
+            self.rpcs.setdefault(rpc_name, []).append(seconds)
+
+    def rpc_seconds(self) -> dict:
+        '''Returns {RPC name: [seconds each of them took]}'''
+        with self._lock:
+            return {rpc_name: list(samples) for (rpc_name, samples) in self.rpcs.items()}
+
+    def _ordered(self) -> list:
+        '''[(phase, seconds)], the known phases first, in their order'''
+        with self._lock:
+            seconds = dict(self.seconds)
+        names = [name for name in PHASES if name in seconds]
+        names += sorted(name for name in seconds if name not in PHASES)
+        return [(name, seconds[name]) for name in names]
+
+    def perfdata(self) -> str:
+        '''Returns the timings as Icinga perfdata, e.g. 'dns'=0.0004s 'rpc'=2.8377s'''
+        return ' '.join("'{phase}'={seconds:.4f}s".format(phase=name, seconds=seconds)
+                        for (name, seconds) in self._ordered())
+
+    def write_metrics(self, metrics_file: str, check: str, ne: str):
+        '''
+        Saves the timings of check (e.g. 'isis') in ne: to a Prometheus textfile
+        if metrics_file ends in .prom, otherwise appended as a JSON line.
+        '''
+        if metrics_file.endswith('.prom'):
+            self._write_prometheus(metrics_file, check, ne)
+            return
+        line = json.dumps({'time': time.time(), 'check': check, 'ne': ne,
+                           'phases': dict(self._ordered())}) + '\n'
+        # a single write in append mode, lines of concurrent checks do not mix
+        file_descriptor = os.open(metrics_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(file_descriptor, line.encode('utf-8'))
+        finally:
+            os.close(file_descriptor)
+
+    def report(self, check: str, ne: str, metrics_file: str = '') -> str:
+        '''
+        Records as total the time since the timer was created, adds the timings to
+        the latency history of ne, saves them to metrics_file if given, and returns
+        them as perfdata. A metrics file that cannot be written is logged, it does
+        not fail the check.
+        '''
+        # imports, this repository's shared PyEZ modules
+        from pyez_core.latency import LatencyHistory
+        from pyez_core.replay import REPLAY_DIR_VARIABLE
+
+        self.record('total', time.perf_counter() - self._created)
+        if not os.environ.get(REPLAY_DIR_VARIABLE):
+            LatencyHistory().record_timer(ne, self)
+        if metrics_file:
+            try:
+                self.write_metrics(metrics_file, check, ne)
+            except OSError as err:
+                logging.getLogger(__name__).warning('Cannot write the metrics to {file}: {err}'
+                                                    .format(file=metrics_file, err=err))
+        return self.perfdata()
+
+    def _write_prometheus(self, metrics_file: str, check: str, ne: str):
+        '''Replaces the samples of (check, ne) in the textfile, keeping the others'''
+        labels = 'check="{check}",ne="{ne}",'.format(check=check, ne=ne)
+        samples = ['{metric}{{{labels}phase="{phase}"}} {seconds:.6f}\n'
+                   .format(metric=PROMETHEUS_METRIC, labels=labels, phase=name, seconds=seconds)
+                   for (name, seconds) in self._ordered()]
+        with open(metrics_file + '.lock', 'a') as lock:
+            # other checks write the same file
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(metrics_file) as textfile:
+                    kept = [sample for sample in textfile
+                            if sample.startswith(PROMETHEUS_METRIC + '{')
+                            and not sample.startswith(PROMETHEUS_METRIC + '{' + labels)]
+            except OSError:
+                kept = []
+            temporary_file = '{path}.{pid}'.format(path=metrics_file, pid=os.getpid())
+            with open(temporary_file, 'w') as textfile:
+                textfile.write('# HELP {metric} Seconds spent in each phase of the last run '
+                               'of a Junos check.\n# TYPE {metric} gauge\n'
+                               .format(metric=PROMETHEUS_METRIC))
+                textfile.writelines(sorted(kept + samples))
+            # atomic, the collector never reads half a file
+            os.replace(temporary_file, metrics_file)
+
+
+def open_device(dev, timer: PhaseTimer, probe_timeout: float = DEFAULT_PROBE_TIMEOUT,
+                rpc_timeout: float = 0):
+    '''
+    Opens the Netconf session of dev, a jnpr.junos.Device (without gather facts,
+    so to gain speed), timing as connect the TCP connection to the NETCONF port,
+    and as auth the SSH, authentication and NETCONF hello. If rpc_timeout is
+    given, the RPCs over the session wait that many seconds for their reply,
+    instead of the PyEZ default (30).
+
+    The timeouts of a router are taken from its latency history, for the RPCs the
+    check sends:
+        tuning = LatencyHistory().tuning(ne, ('get_isis_interface_information',))
+        open_device(dev, timer, tuning.probe_timeout, tuning.rpc_timeout)
+    see pyez_core/latency.py.
+
+    dev.open() does both in one go, so the connection is first probed (as
+    Device(auto_probe=...) does). A device without probe() (e.g. the broker's,
+    whose session is already open) is just opened, and timed as auth. A probe
+    that failed is not timed as connect: what it waited is the probe timeout,
+    not how long the router takes to accept the connection.
+
+    Raises jnpr.junos.exception.ProbeError if the NETCONF port does not accept
+    the connection within probe_timeout seconds.
+
+    Version:
+        2026-10-18
+    '''
+
+    probe = getattr(dev, 'probe', None)
+    if probe is not None and probe_timeout:
+        timer_connect_start = time.perf_counter()
+        reachable = probe(timeout=probe_timeout)
+        if reachable:
+            timer.record('connect', time.perf_counter() - timer_connect_start)
+        else:
+            # imports, Python third party modules
+            from jnpr.junos.exception import ProbeError
+            raise ProbeError(dev)
+    with timer.phase('auth'):
+        dev.open(gather_facts=False)
+    if rpc_timeout:
+        dev.timeout = rpc_timeout
+    return dev
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    metrics_file, phase, top = get_args()
+
+    # the latest run of each (check, router)
+    latest = {}
+    with open(metrics_file) as lines:
+        for line in lines:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if phase in run['phases']:
+                latest[(run['check'], run['ne'])] = run['phases'][phase]
+
+    for ((check, ne), seconds) in sorted(latest.items(), key=lambda item: -item[1])[:top]:
+        print('{seconds:>9.3f}s  {check:<9} {ne}'.format(seconds=seconds, check=check, ne=ne))
@@ -0,0 +1,45 @@
+from pyez_core.bgp_trend import DEFAULT_MIN_SAMPLES, BgpTrendStore
+
+
+def _peers(received: int, state: str = 'Established') -> dict:
+    return {'10.0.0.1': {'state': state, 'received_prefix_count': str(received),
+                         'accepted_prefix_count': str(received),
+                         'active_prefix_count': '100', 'advertised_prefix_count': '10'}}
+
+
+def test_drop_alerts_once_the_baseline_is_trusted(tmp_path):
+    store = BgpTrendStore(str(tmp_path / 'trend.sqlite'))
+    for run in range(DEFAULT_MIN_SAMPLES):
+        # a drop before the baseline has min_samples is not an alert
+        received = 12 if run == 1 else 800000
+        assert store.record('mx1', 'master', _peers(received), now=run * 300) == []
+    for run in range(DEFAULT_MIN_SAMPLES, DEFAULT_MIN_SAMPLES + 5):
+        assert store.record('mx1', 'master', _peers(800000), now=run * 300) == []
+
+    alerts = store.record('mx1', 'master', _peers(12), now=3600)
+    assert sorted(alert.counter for alert in alerts) == ['accepted', 'received']
+    assert all(alert.peer == '10.0.0.1' and alert.value == 12 for alert in alerts)
+    assert all(alert.threshold < alert.baseline for alert in alerts)
+    # the unchanged counters still match their baselines
+    assert [(counter, round(mean), samples) for (_, _, counter, mean, _, samples)
+            in store.baselines('mx1') if counter in ('active', 'advertised')] == \
+        [('active', 100, 11), ('advertised', 10, 11)]
+
+
+def test_only_established_peers_are_recorded(tmp_path):
+    store = BgpTrendStore(str(tmp_path / 'trend.sqlite'))
+    store.record('mx1', 'master', _peers(800000, state='Active'), now=0)
+    assert store.samples('mx1') == []
+    assert store.baselines('mx1') == []
+
+
+def test_old_samples_are_deleted(tmp_path):
+    store = BgpTrendStore(str(tmp_path / 'trend.sqlite'), retention_days=1)
+    store.record('mx1', 'master', _peers(800000), now=0)
+    store.record('mx1', 'master', _peers(800000), now=2 * 86400)
+    assert [at for (_, _, at, _, _, _, _) in store.samples('mx1')] == [2 * 86400]
+
+
+def test_unwritable_database_is_as_none(tmp_path):
+    store = BgpTrendStore(str(tmp_path / 'missing' / 'trend.sqlite'))
+    assert store.record('mx1', 'master', _peers(12)) == []
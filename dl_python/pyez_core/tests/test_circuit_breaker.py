@@ -0,0 +1,47 @@
+import os
+import time
+
+import pytest
+
+from pyez_core.circuit_breaker import CircuitBreaker, RouterDownError
+
+
+def test_closed_until_a_failure(tmp_path):
+    breaker = CircuitBreaker(str(tmp_path / 'breaker'))
+    breaker.allow('mx1')
+    breaker.record_failure('mx1', 'ConnectTimeoutError(mx1)')
+    with pytest.raises(RouterDownError, match='ConnectTimeoutError'):
+        breaker.allow('mx1')
+    breaker.allow('mx2')
+
+
+def test_backoff_doubles_up_to_the_maximum(tmp_path):
+    breaker = CircuitBreaker(str(tmp_path / 'breaker'), base_backoff=30, max_backoff=100)
+    backoffs = []
+    for _ in range(4):
+        breaker.record_failure('mx1', 'ConnectRefusedError(mx1)')
+        state = breaker._read('mx1')
+        backoffs.append(round(state['retry_at'] - state['failed_at']))
+    assert backoffs == [30, 60, 100, 100]
+    assert breaker._read('mx1')['failures'] == 4
+
+
+def test_one_check_probes_after_the_backoff(tmp_path):
+    first = CircuitBreaker(str(tmp_path / 'breaker'), base_backoff=0.1)
+    second = CircuitBreaker(str(tmp_path / 'breaker'), base_backoff=0.1)
+    first.record_failure('mx1', 'ProbeError(mx1)')
+    time.sleep(0.2)
+    first.allow('mx1')
+    with pytest.raises(RouterDownError):
+        second.allow('mx1')
+    first.record_success('mx1')
+    assert first._read('mx1') is None
+    second.allow('mx1')
+
+
+def test_directory_not_private_is_not_used(tmp_path):
+    breaker_dir = str(tmp_path / 'breaker')
+    breaker = CircuitBreaker(breaker_dir)
+    breaker.record_failure('mx1', 'ConnectTimeoutError(mx1)')
+    os.chmod(breaker_dir, 0o777)
+    breaker.allow('mx1')
@@ -0,0 +1,57 @@
+from pyez_core.fleet_plan import SHARED_REPLY_TTL, expand_inventory, plan_router
+
+
+def _router(checks: list, **router) -> dict:
+    return dict(router, hostname='mx1', checks=checks)
+
+
+def test_repeated_checks_run_once():
+    isis = {'type': 'isis'}
+    plan = plan_router(_router([isis, dict(isis)]))
+    assert plan['checks'] == [isis]
+    assert plan['rpcs'] == [('get_isis_interface_information', {'extensive': True}, [0])]
+    assert (plan['logins'], plan['unplanned_logins'], plan['unplanned_rpcs']) == (1, 2, 2)
+    # a reply used by one check is not cached for the others
+    assert 'cache_ttl' not in plan['checks'][0]
+
+
+def test_checks_of_the_same_rpc_share_the_reply():
+    checks = [{'type': 'bgp', 'routing_instance': 'vrf1', 'peers': ['10.0.0.1']},
+              {'type': 'bgp', 'routing_instance': 'vrf1', 'peers': ['10.0.0.2'],
+               'cache_ttl': 2 * SHARED_REPLY_TTL},
+              {'type': 'bgp', 'routing_instance': 'vrf2', 'peers': ['10.0.0.3']}]
+    plan = plan_router(_router(checks))
+    assert plan['rpcs'] == [('get_bgp_neighbor_information', {'instance': 'vrf1'}, [0, 1]),
+                            ('get_bgp_neighbor_information', {'instance': 'vrf2'}, [2])]
+    assert [check.get('cache_ttl') for check in plan['checks']] == \
+        [SHARED_REPLY_TTL, 2 * SHARED_REPLY_TTL, None]
+
+
+def test_xml_reply_is_another_rpc():
+    plan = plan_router(_router([{'type': 'isis'}, {'type': 'isis', 'xml': True}]))
+    assert [rpc_kwargs for (_, rpc_kwargs, _) in plan['rpcs']] == \
+        [{'extensive': True}, {'extensive': True, 'format': 'xml'}]
+
+
+def test_each_vrf_host_is_pinged_once():
+    checks = [{'type': 'vrf_ping', 'vrf': 'vrf1', 'hosts': ['10.0.0.1', '10.0.0.2']},
+              {'type': 'vrf_ping', 'vrf': 'vrf1', 'hosts': ['10.0.0.2', '10.0.0.3']}]
+    plan = plan_router(_router(checks))
+    assert plan['vrf_hosts'] == {'vrf1': ['10.0.0.1', '10.0.0.2', '10.0.0.3']}
+    assert [(rpc_kwargs['host'], indexes) for (_, rpc_kwargs, indexes) in plan['rpcs']] == \
+        [('10.0.0.1', [0]), ('10.0.0.2', [0, 1]), ('10.0.0.3', [1])]
+    assert plan['unplanned_rpcs'] == 4
+    # pings are never taken from the cache
+    assert all('cache_ttl' not in check for check in plan['checks'])
+
+
+def test_role_and_platform_checks_are_planned():
+    inventory = {'roles': {'pe': {'checks': [{'type': 'isis'}]}},
+                 'platforms': {'acx2200': {'isis': {'xml': True}}},
+                 'routers': [_router([{'type': 'isis', 'xml': True}], role='pe',
+                                     platform='acx2200')]}
+    (router,) = expand_inventory(inventory)
+    plan = plan_router(router)
+    # the check of the role, with the options of the platform, is that of the router
+    assert plan['checks'] == [{'type': 'isis', 'xml': True}]
+    assert plan['unplanned_logins'] == 2
@@ -0,0 +1,68 @@
+from pyez_core.isis_model import (BOTH_LEVELS, DEFAULT_MIN_HOLDTIME, IsisAdjacency,
+                                  IsisAdjacencyCheck, IsisConsistency, IsisInterface, IsisLevel,
+                                  cross_check_adjacencies, evaluate_consistency, from_dict,
+                                  to_dict)
+
+
+def _interface(name: str, level_1: IsisLevel = None, level_2: IsisLevel = None):
+    return IsisInterface(name, level_1, level_2)
+
+
+def test_no_interfaces_is_consistent():
+    assert evaluate_consistency([]) == IsisConsistency(True, [])
+
+
+def test_enabled_level_without_adjacencies_is_inconsistent():
+    isis_interfaces = [
+        _interface('xe-0/0/0.0', IsisLevel(1, True, False, 1), IsisLevel(2, True, False, 0)),
+        # passive, or not enabled: no adjacencies expected
+        _interface('lo0.0', level_2=IsisLevel(2, True, True, 0)),
+        _interface('xe-0/0/1.0', IsisLevel(1, False, None, 0)),
+    ]
+    assert evaluate_consistency(isis_interfaces) == IsisConsistency(False,
+                                                                    [('xe-0/0/0.0', 2)])
+
+
+def test_to_dict_and_back():
+    isis_interfaces = [
+        _interface('xe-0/0/0.0', IsisLevel(1, True, False, 0), IsisLevel(2, True, False, 1)),
+        _interface('lo0.0', level_2=IsisLevel(2, True, True, 0)),
+    ]
+    consistency = evaluate_consistency(isis_interfaces)
+    isis_interfaces_dict = to_dict(isis_interfaces, consistency)
+    assert isis_interfaces_dict['isis_interfaces_consistency'] is False
+    assert isis_interfaces_dict['xe-0/0/0.0']['level_1']['isis_if_level_consistency'] is False
+    assert isis_interfaces_dict['xe-0/0/0.0']['level_2']['isis_if_level_consistency'] is True
+    assert isis_interfaces_dict['lo0.0']['level_2']['passive'] == 'yes'
+    assert from_dict(isis_interfaces_dict) == isis_interfaces
+
+
+def _adjacency(interface: str, level: int, state: str = 'Up', holdtime: int = 25):
+    return IsisAdjacency(interface, level, 'mx2', state, holdtime, None, '')
+
+
+def test_cross_check_adjacencies():
+    isis_interfaces = [
+        _interface('xe-0/0/0.0', IsisLevel(1, True, False, 1), IsisLevel(2, True, False, 1)),
+        _interface('xe-0/0/1.0', level_2=IsisLevel(2, True, False, 1)),
+        _interface('xe-0/0/2.0', level_2=IsisLevel(2, True, False, 1)),
+    ]
+    isis_adjacencies = [
+        # level 3 counts for both levels
+        _adjacency('xe-0/0/0.0', BOTH_LEVELS),
+        _adjacency('xe-0/0/1.0', 2, holdtime=DEFAULT_MIN_HOLDTIME - 1),
+        _adjacency('xe-0/0/2.0', 2, state='Initializing'),
+        # on an interface level that is not in the interfaces
+        _adjacency('xe-0/0/3.0', 1),
+    ]
+    adjacency_check = cross_check_adjacencies(isis_interfaces, isis_adjacencies)
+    assert adjacency_check.down == [isis_adjacencies[2]]
+    assert adjacency_check.low_holdtime == [isis_adjacencies[1]]
+    assert adjacency_check.mismatched == [('xe-0/0/2.0', 2, 1, 0), ('xe-0/0/3.0', 1, 0, 1)]
+
+
+def test_cross_check_adjacencies_all_up():
+    isis_interfaces = [_interface('xe-0/0/0.0', level_2=IsisLevel(2, True, False, 2))]
+    isis_adjacencies = [_adjacency('xe-0/0/0.0', 2), _adjacency('xe-0/0/0.0', 2)]
+    assert cross_check_adjacencies(isis_interfaces, isis_adjacencies) == \
+        IsisAdjacencyCheck([], [], [])
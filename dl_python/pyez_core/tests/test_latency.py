@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from pyez_core.latency import (DEFAULT_PROBE_TIMEOUT, DEFAULT_RPC_TIMEOUT, LatencyHistory,
+                               Tuning, percentile)
+from pyez_core.telemetry import PhaseTimer, open_device
+
+
+def test_percentile():
+    assert percentile([], 95) is None
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+def test_defaults_without_history(tmp_path):
+    history = LatencyHistory(str(tmp_path / 'latency'))
+    assert history.tuning('mx1', ('get_isis_interface_information',), 4) == \
+        Tuning(DEFAULT_PROBE_TIMEOUT, DEFAULT_RPC_TIMEOUT, 4)
+
+
+def test_fast_router_gets_tight_timeouts(tmp_path):
+    history = LatencyHistory(str(tmp_path / 'latency'))
+    history.record('mx1', [0.02] * 10, {'get_isis_interface_information': [0.6] * 10})
+    assert history.tuning('mx1', ('get_isis_interface_information',), 4) == Tuning(5, 10, 4)
+    # an RPC without history yet waits the default
+    assert history.tuning('mx1', ('get_isis_interface_information',
+                                  'get_isis_adjacency_information')).rpc_timeout == \
+        DEFAULT_RPC_TIMEOUT
+
+
+def test_pings_to_hosts_down_keep_timeout_and_concurrency(tmp_path):
+    history = LatencyHistory(str(tmp_path / 'latency'))
+    history.record('mx1', [0.02] * 10, {'ping': [0.6] * 10})
+    assert history.tuning('mx1', ('ping',), 4) == Tuning(5, DEFAULT_RPC_TIMEOUT, 4)
+    history.record('mx1', rpc={'ping': [13.5] * 3})
+    assert history.tuning('mx1', ('ping',), 4) == Tuning(5, 41, 4)
+
+
+def test_slow_router_gets_fewer_rpcs(tmp_path):
+    history = LatencyHistory(str(tmp_path / 'latency'))
+    history.record('acx1', [12.0] * 10, {'get_bgp_neighbor_information': [6.0] * 10})
+    assert history.tuning('acx1', ('get_bgp_neighbor_information',), 8) == Tuning(36, 18, 3)
+
+
+def test_record_timer_per_rpc(tmp_path):
+    history = LatencyHistory(str(tmp_path / 'latency'))
+    timer = PhaseTimer()
+    timer.record('connect', 0.02)
+    with timer.phase('rpc', 'ping'):
+        pass
+    with timer.phase('rpc', 'ping'):
+        pass
+    history.record_timer('mx1', timer)
+    stats = history.stats('mx1')
+    assert stats['connect']['samples'] == 1
+    assert list(stats['rpc']) == ['ping']
+    assert stats['rpc']['ping']['samples'] == 2
+
+
+def test_failed_probe_is_not_a_connect_sample():
+    class UnreachableDevice(object):
+        def probe(self, timeout):
+            return False
+
+    timer = PhaseTimer()
+    with pytest.raises(Exception):
+        open_device(UnreachableDevice(), timer, 29)
+    assert 'connect' not in timer.seconds
+
+
+def test_failed_rpc_is_not_a_latency_sample(tmp_path):
+    timer = PhaseTimer()
+    with pytest.raises(Exception):
+        with timer.phase('rpc', 'ping'):
+            raise Exception('No reply to ping in 30 seconds')
+    assert timer.rpc_seconds() == {}
+    # still part of the time the check spent
+    assert timer.counts['rpc'] == 1
+    history = LatencyHistory(str(tmp_path / 'latency'))
+    history.record_timer('mx1', timer)
+    assert history.stats('mx1')['rpc'] == {}
+
+
+def test_directory_not_private_is_not_used(tmp_path):
+    latency_dir = str(tmp_path / 'latency')
+    history = LatencyHistory(latency_dir)
+    history.record('mx1', [0.02] * 10)
+    os.chmod(latency_dir, 0o755)
+    assert history.stats('mx1')['connect']['samples'] == 0
+    history.record('mx1', [0.02])
+    os.chmod(latency_dir, 0o700)
+    assert history.stats('mx1')['connect']['samples'] == 10
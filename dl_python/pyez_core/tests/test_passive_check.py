@@ -0,0 +1,31 @@
+from pyez_core.combined_check import passive_check_command, submit_passive_results
+
+
+def _result(check: str = 'isis', summary: str = 'OK: 4 interfaces', exit_code: int = 0) -> dict:
+    return {'check': check, 'summary': summary, 'exit_code': exit_code,
+            'phases': {'rpc': 0.25, 'parse': 0.01}}
+
+
+def test_passive_check_command():
+    assert passive_check_command(_result(), 'mx1', 'junos-isis-interface', now=1792300000.7) == \
+        ("[1792300000] PROCESS_SERVICE_CHECK_RESULT;mx1;junos-isis-interface;0;"
+         "OK: 4 interfaces|'parse'=0.01s 'rpc'=0.25s\n")
+
+
+def test_passive_check_command_is_one_line_of_fields():
+    command = passive_check_command(_result(summary='CRITICAL: xe-0/0/0.0;\nlevel 2 down',
+                                            exit_code=2),
+                                    'mx1', 'junos-isis-interface', now=0)
+    assert command.count('\n') == 1 and command.endswith('\n')
+    assert command.split(';')[3] == '2'
+    assert command.split(';')[4].startswith('CRITICAL: xe-0/0/0.0, level 2 down|')
+
+
+def test_submit_passive_results(tmp_path):
+    command_file = tmp_path / 'icinga2.cmd'
+    command_file.write_text('')
+    submit_passive_results([_result(), _result('bgp', 'OK: 2 peers')], str(command_file),
+                           'mx1', {'bgp': 'bgp-peers'})
+    commands = command_file.read_text().splitlines()
+    assert [command.split(';')[1:3] for command in commands] == \
+        [['mx1', 'junos-isis-interface'], ['mx1', 'bgp-peers']]
@@ -0,0 +1,80 @@
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from pyez_core.check_scripts import load_check_module
+from pyez_core.isis_model import cross_check_adjacencies, evaluate_consistency
+from pyez_core.replay import (REPLAY_DIR_VARIABLE, RecordingDevice, ReplayDevice, ReplayError,
+                              junos_device)
+
+REPLIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir,
+                           'pyez_isis', 'replies', 'dist1-testlab')
+
+
+class _Rpc(object):
+    '''Answers every RPC in JSON with its arguments, otherwise in XML'''
+    def __getattr__(self, rpc_name: str):
+        def call(*rpc_args, **rpc_kwargs):
+            if rpc_args:
+                return {'rpc': rpc_name, 'arguments': rpc_kwargs}
+            return ET.fromstring('<{tag}/>'.format(tag=rpc_name.replace('_', '-')))
+        return call
+
+
+class _Device(object):
+    def __init__(self, **device_kwargs):
+        self.rpc = _Rpc()
+        self.timeout = 30
+
+    def open(self, *args, **kwargs):
+        return self
+
+    def close(self):
+        pass
+
+
+def test_isis_check_on_the_recorded_replies():
+    isis_module = load_check_module('isis')
+    dev = ReplayDevice(REPLIES_DIR, host='127.0.0.1').open()
+    (isis_interfaces, isis_adjacencies) = isis_module.get_junos_isis_interfaces(
+        'dist1-testlab', 'heanet', 'x', dev=dev, adjacencies=True, model=True)
+    assert [isis_interface.name for isis_interface in isis_interfaces] == \
+        ['lo0.0', 'xe-0/0/0.0', 'xe-0/1/0.0', 'xe-2/0/0.0']
+    # level 2 is enabled on the core interfaces, but their neighbours are level 1
+    assert evaluate_consistency(isis_interfaces).inconsistent == \
+        [('xe-0/0/0.0', 2), ('xe-0/1/0.0', 2), ('xe-2/0/0.0', 2)]
+    assert [isis_adjacency.system_name for isis_adjacency in isis_adjacencies] == \
+        ['edge1-testlab', 'dist2-testlab', 'edge4-testlab']
+    assert cross_check_adjacencies(isis_interfaces, isis_adjacencies) == ([], [], [])
+
+
+def test_reply_not_recorded():
+    dev = ReplayDevice(REPLIES_DIR)
+    with pytest.raises(ReplayError):
+        dev.rpc.get_isis_interface_information({'format': 'json'}, instance='other')
+    with pytest.raises(ReplayError):
+        dev.rpc.get_bgp_neighbor_information({'format': 'json'})
+    with pytest.raises(ReplayError):
+        dev.rpc.get_isis_interface_information(extensive=True)
+
+
+def test_recorded_replies_are_replayed(tmp_path):
+    record_dir = str(tmp_path / 'replies')
+    dev = RecordingDevice(record_dir, _Device, host='mx1').open()
+    recorded = dev.rpc.ping({'format': 'json'}, host='10.0.0.1', rapid=True, strict=False)
+    dev.rpc.get_isis_interface_information(extensive=True)
+    assert dev.timeout == 30
+    dev.close()
+
+    replayed = ReplayDevice(record_dir).open()
+    # the arguments that are False are not in the key
+    assert replayed.rpc.ping({'format': 'json'}, host='10.0.0.1', rapid=True) == recorded
+    assert replayed.rpc.get_isis_interface_information().tag == 'get-isis-interface-information'
+
+
+def test_junos_device(monkeypatch):
+    monkeypatch.delenv(REPLAY_DIR_VARIABLE, raising=False)
+    assert junos_device(_Device) is _Device
+    monkeypatch.setenv(REPLAY_DIR_VARIABLE, REPLIES_DIR)
+    assert isinstance(junos_device(_Device)(host='mx1'), ReplayDevice)
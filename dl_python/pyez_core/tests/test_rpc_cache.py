@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+
+from pyez_core.rpc_cache import RpcCache
+
+
+def test_miss_then_hit(tmp_path):
+    cache = RpcCache(60, str(tmp_path / 'cache'))
+    assert cache.get('mx1', 'get_isis_interface_information', {}) is None
+    cache.put('mx1', 'get_isis_interface_information', {}, '<reply/>')
+    assert cache.get('mx1', 'get_isis_interface_information', {}) == '<reply/>'
+    assert cache.get('mx1', 'get_isis_interface_information', {'detail': True}) is None
+
+
+def test_stale_reply_is_a_miss(tmp_path):
+    cache = RpcCache(60, str(tmp_path / 'cache'))
+    cache.put('mx1', 'get_bgp_neighbor_information', {}, '<reply/>')
+    disabled = RpcCache(0, str(tmp_path / 'cache'))
+    assert disabled.get('mx1', 'get_bgp_neighbor_information', {}) is None
+
+
+def test_concurrent_check_waits_for_the_fetch(tmp_path):
+    first = RpcCache(60, str(tmp_path / 'cache'))
+    second = RpcCache(60, str(tmp_path / 'cache'), lock_timeout=10)
+    assert first.get('mx1', 'get_isis_interface_information', {}) is None
+    replies = []
+    waiting = threading.Thread(target=lambda: replies.append(
+        second.get('mx1', 'get_isis_interface_information', {})))
+    waiting.start()
+    time.sleep(0.3)
+    assert waiting.is_alive(), 'Should wait for the check holding the lock'
+    first.put('mx1', 'get_isis_interface_information', {}, '<reply/>')
+    waiting.join(5)
+    assert replies == ['<reply/>']
+
+
+def test_lock_timeout_and_release(tmp_path):
+    first = RpcCache(60, str(tmp_path / 'cache'))
+    second = RpcCache(60, str(tmp_path / 'cache'), lock_timeout=0.2)
+    assert first.get('mx1', 'get_isis_interface_information', {}) is None
+    started = time.time()
+    assert second.get('mx1', 'get_isis_interface_information', {}) is None
+    assert time.time() - started < 2
+    first.release('mx1', 'get_isis_interface_information', {})
+    # the lock is free, this check fetches and holds it now
+    assert second.get('mx1', 'get_isis_interface_information', {}) is None
+    assert second._locks
+
+
+def test_directory_not_private_is_not_used(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    cache = RpcCache(60, cache_dir)
+    cache.put('mx1', 'get_isis_interface_information', {}, '<reply/>')
+    assert [oct(os.stat(os.path.join(cache_dir, name)).st_mode & 0o777)
+            for name in os.listdir(cache_dir) if name.endswith('.json')] == ['0o600']
+    os.chmod(cache_dir, 0o755)
+    assert cache.get('mx1', 'get_isis_interface_information', {}) is None
+    assert not cache._locks
@@ -0,0 +1,165 @@
+import json
+from xml.sax.saxutils import escape
+
+import pytest
+
+from pyez_core.isis_model import isis_adjacencies_from_reply
+from pyez_core.rpc_pipeline import can_pipeline, pipeline_requests, pipeline_rpcs
+from pyez_core.telemetry import PhaseTimer
+from pyez_core.xml_stream import extract_isis_adjacencies
+
+
+ADJACENCY_REPLY = b'''<isis-adjacency-information xmlns="http://xml.juniper.net/junos/isis">
+<isis-adjacency>
+<interface-name>xe-0/0/0.0</interface-name>
+<system-name>mx2</system-name>
+<level>2</level>
+<adjacency-state>Up</adjacency-state>
+<holdtime>24</holdtime>
+<transition-count>1</transition-count>
+<last-transition-time>2w1d 03:04:05 ago</last-transition-time>
+<ip-address>10.0.0.2</ip-address>
+</isis-adjacency>
+</isis-adjacency-information>'''
+
+
+class _Rpc(object):
+    '''Answers every RPC with its name, arguments and format, and logs the calls'''
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, rpc_name: str):
+        def call(*rpc_args, **rpc_kwargs):
+            self.calls.append((rpc_name, rpc_args, rpc_kwargs))
+            return {'rpc': rpc_name, 'arguments': rpc_kwargs, 'format': rpc_args}
+        return call
+
+
+class _Device(object):
+    def __init__(self):
+        self.rpc = _Rpc()
+
+
+def test_pipeline_requests_keeps_order_and_format():
+    dev = _Device()
+    timer = PhaseTimer()
+    requests = [('get_isis_interface_information', {'extensive': True}),
+                ('get_isis_adjacency_information', {'extensive': True})]
+    replies = pipeline_requests(dev, requests, lambda index, reply: (index, reply['rpc']),
+                                timer=timer)
+    assert replies == [(0, 'get_isis_interface_information'),
+                       (1, 'get_isis_adjacency_information')]
+    assert all(rpc_args == ({'format': 'json'},) for (_, rpc_args, _) in dev.rpc.calls)
+    assert sorted(timer.rpc_seconds()) == ['get_isis_adjacency_information',
+                                           'get_isis_interface_information']
+    assert timer.counts['rpc'] == 2
+
+
+def test_pipeline_requests_xml_sends_no_format():
+    dev = _Device()
+    pipeline_requests(dev, [('get_isis_adjacency_information', {'extensive': True})],
+                      lambda index, reply: reply, rpc_format='xml')
+    assert dev.rpc.calls == [('get_isis_adjacency_information', (), {'extensive': True})]
+
+
+def test_extract_isis_adjacencies_as_json():
+    adjacencies = isis_adjacencies_from_reply(extract_isis_adjacencies(ADJACENCY_REPLY))
+    assert len(adjacencies) == 1
+    assert adjacencies[0].interface == 'xe-0/0/0.0'
+    assert adjacencies[0].level == 2
+    assert adjacencies[0].state == 'Up'
+    assert adjacencies[0].holdtime == 24
+    assert adjacencies[0].transitions == 1
+
+
+class _AsyncReply(object):
+    '''The reply of an RPC sent in async mode, as ncclient's: event, reply.xml, error'''
+    def __init__(self, conn, operation: str, replied: bool, error):
+        self._conn = conn
+        self._replied = replied
+        self.error = error
+        self.event = self
+        self.reply = self
+        self.xml = '<rpc-reply>{json}</rpc-reply>'.format(
+            json=escape(json.dumps({'operation': operation})))
+
+    def wait(self, timeout: float) -> bool:
+        self._conn.waits.append(timeout)
+        self._conn.in_flight -= 1
+        return self._replied
+
+
+class _AsyncConnection(object):
+    '''ncclient session: the RPCs sent in async mode are answered at once, the one
+    numbered no_reply never, the one numbered error with an error'''
+    def __init__(self, no_reply: int = None, error: int = None):
+        self.async_mode = False
+        self.sent = []
+        self.waits = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._no_reply = no_reply
+        self._error = error
+
+    def rpc(self, operation: str) -> _AsyncReply:
+        assert self.async_mode is True
+        number = len(self.sent)
+        self.sent.append(operation)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        return _AsyncReply(self, operation, number != self._no_reply,
+                           'rpc-error' if number == self._error else None)
+
+
+class _JunosDevice(object):
+    '''jnpr.junos.Device, open, as can_pipeline() sees it'''
+    def __init__(self, conn: _AsyncConnection):
+        self._conn = conn
+        self.timeout = 12
+
+
+_JunosDevice.__module__ = 'jnpr.junos.device'
+
+
+def _calls(count: int) -> list:
+    return [{'host': '10.0.0.{low}'.format(low=low)} for low in range(1, count + 1)]
+
+
+def test_pipelined_replies_in_order_depth_bounded():
+    conn = _AsyncConnection()
+    dev = _JunosDevice(conn)
+    assert can_pipeline(dev)
+    timer = PhaseTimer()
+    replies = pipeline_rpcs(dev, 'ping', _calls(10), lambda index, reply: (index, reply),
+                            depth=3, timer=timer)
+    assert [index for (index, _) in replies] == list(range(10))
+    # each reply is that of its own RPC
+    assert [reply['operation'] for (_, reply) in replies] == conn.sent
+    assert '<host>10.0.0.1</host>' in conn.sent[0] and 'format="json"' in conn.sent[0]
+    assert conn.max_in_flight == 3
+    assert len(timer.rpc_seconds()['ping']) == 10
+    assert conn.async_mode is False
+
+
+def test_pipelined_reply_missing_raises_after_the_timeout():
+    conn = _AsyncConnection(no_reply=2)
+    with pytest.raises(Exception, match='No reply to ping in 12 seconds'):
+        pipeline_rpcs(_JunosDevice(conn), 'ping', _calls(10), lambda index, reply: reply,
+                      depth=4)
+    # waited dev.timeout for each reply, the last one in vain
+    assert conn.waits == [12, 12, 12]
+    # no more RPCs sent after the one without a reply
+    assert len(conn.sent) == 6
+    assert conn.async_mode is False
+
+
+def test_pipelined_error_restores_async_mode():
+    conn = _AsyncConnection(error=1)
+    conn.async_mode = 'as it was'
+    timer = PhaseTimer()
+    with pytest.raises(Exception, match='rpc-error'):
+        pipeline_rpcs(_JunosDevice(conn), 'ping', _calls(5), lambda index, reply: reply,
+                      depth=2, timer=timer)
+    assert conn.async_mode == 'as it was'
+    # the failed RPC is not a latency sample
+    assert len(timer.rpc_seconds()['ping']) == 1
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from pyez_core.check_scripts import load_check_module
+
+
+def load_vrf_map(items):
+    return load_check_module('vrf_ping').load_vrf_map(items)
+
+
+def test_vrf_map_from_cli_in_order():
+    vrf_hosts = load_vrf_map(['blue=10.0.0.1,10.0.0.2', 'red=10.1.0.1', 'blue=10.0.0.3'])
+    assert list(vrf_hosts.items()) == [('blue', ['10.0.0.1', '10.0.0.2', '10.0.0.3']),
+                                       ('red', ['10.1.0.1'])]
+
+
+def test_vrf_map_from_json_file(tmp_path):
+    vrf_map_file = tmp_path / 'vrfs.json'
+    vrf_map_file.write_text(json.dumps({'red': ['10.1.0.1'], 'blue': '10.0.0.1 10.0.0.2'}))
+    vrf_hosts = load_vrf_map([str(vrf_map_file)])
+    assert list(vrf_hosts.items()) == [('red', ['10.1.0.1']),
+                                       ('blue', ['10.0.0.1', '10.0.0.2'])]
+
+
+@pytest.mark.parametrize('items', [['blue='], ['=10.0.0.1'], []])
+def test_vrf_map_without_hosts(items):
+    with pytest.raises(Exception):
+        load_vrf_map(items)
+
+
+def test_vrf_map_file_not_a_map(tmp_path):
+    vrf_map_file = tmp_path / 'vrfs.json'
+    vrf_map_file.write_text(json.dumps(['10.0.0.1']))
+    with pytest.raises(Exception, match='does not map'):
+        load_vrf_map([str(vrf_map_file)])
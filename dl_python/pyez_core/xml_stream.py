@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+"""
+Streaming extraction, from the native XML replies, of the fields the checks need.
+
+The checks ask the router for {'format': 'json'} and walk the whole reply. On big
+PE routers 'show isis interface extensive' and 'show bgp neighbor' are large, and
+rendering them as JSON is slow on the router, as is loading them in Python.
+
+The functions here read the XML reply incrementally (iterparse), keep only the
+fields the checks use, and free each record (interface, peer) once read, so the
+memory used does not grow with the size of the reply. They return the same
+nested shape as the JSON reply ({'tag': [{'data': 'text'}]}), pruned, so the
+parsers of the checks (parse_isis_interfaces(), parse_bgp_peer()) are used
+unchanged, and give the same result.
+
+The source can be:
+* the bytes of the reply, or a file object (e.g. a recorded reply), read as a stream
+* an element already parsed, as dev.rpc.<rpc_name>() returns without
+  {'format': 'json'}; walked, not modified. The gain is then on the router side.
+
+Invoke as (from the dl_python directory), to benchmark the JSON and the XML
+paths; on synthetic replies of 5000 interfaces/peers:
+python -m pyez_core.xml_stream -n 5000
+or on replies recorded from a router, the same RPC in both formats:
+python -m pyez_core.xml_stream -t isis -j isis_reply.json -x isis_reply.xml
+
+Requires:
+    Python 3.5
+
+Version:
+    2026-10-18
+
+This module has these functions:
+* get_args(). Parses the arguments passed by the user from CLI
+* extract_isis_interfaces(). Fields of get_isis_interface_information(extensive=True)
+* extract_isis_adjacencies(). Fields of get_isis_adjacency_information(extensive=True)
+* extract_bgp_peers(). Fields of get_bgp_neighbor_information()
+* synthetic_isis_reply(), synthetic_bgp_reply(). Replies of any size, JSON and XML
+* benchmark(). Times both paths on the same replies
+* __if_main__. So that serves as initiator.
+"""
+
+# imports
+# imports, Python standard modules
+import io
+import xml.etree.ElementTree as ET
+
+
+# fields kept, for each record, as the checks read them
+ISIS_INTERFACE_FIELDS = ('interface-name',)
+ISIS_LEVEL_FIELDS = ('level', 'adjacency-count', 'passive')
+ISIS_ADJACENCY_FIELDS = ('interface-name', 'level', 'system-name', 'adjacency-state',
+                         'holdtime', 'transition-count', 'last-transition-time')
+BGP_PEER_FIELDS = ('peer-address', 'peer-state')
+BGP_RIB_FIELDS = ('received-prefix-count', 'accepted-prefix-count',
+                  'active-prefix-count', 'advertised-prefix-count')
+
+
+def get_args() -> tuple:
+    '''Returns arguments parsed from CLI when invoking the module from CLI
+
+        Version:
+            2026-10-18
+        '''
+
+    # imports, Python standard modules
+    import argparse
+
+    # Assign description to the help doc
+    parser = argparse.ArgumentParser(description=('Benchmark the JSON and the streaming XML '
+                                                  'parsing of the IS-IS and BGP replies'))
+
+    # Add arguments
+    parser.add_argument('-t', '--type',
+                        help='Reply to benchmark: isis, bgp or both. Default both',
+                        required=False,
+                        default='both',
+                        choices=['isis', 'bgp', 'both'])
+    parser.add_argument('-n', '--records',
+                        help='Interfaces/peers in the synthetic replies. Default 5000',
+                        required=False,
+                        default=5000,
+                        type=int)
+    parser.add_argument('-j', '--json-reply',
+                        help='Recorded JSON reply, instead of a synthetic one',
+                        required=False,
+                        type=str)
+    parser.add_argument('-x', '--xml-reply',
+                        help='Recorded XML reply of the same RPC, instead of a synthetic one',
+                        required=False,
+                        type=str)
+    parser.add_argument('-r', '--repeat',
+                        help='Times each path is run, the best is reported. Default 3',
+                        required=False,
+                        default=3,
+                        type=int)
+
+    # Array for all arguments passed to the module from CLI
+    args = parser.parse_args()
+    if bool(args.json_reply) != bool(args.xml_reply):
+        parser.error('-j and -x go together, the same reply in JSON and in XML')
+    if args.json_reply and args.type == 'both':
+        parser.error('with recorded replies, give their -t, isis or bgp')
+
+    # Return all variable values
+    return args.type, args.records, args.json_reply, args.xml_reply, args.repeat
+
+
+def _local_name(tag) -> str:
+    '''Tag without its namespace; '' for comments and processing instructions'''
+    if not isinstance(tag, str):
+        return ''
+    return tag.rpartition('}')[2]
+
+
+def _record_elements(source, record_tag: str):
+    '''
+    Yields the record_tag elements of the reply, each one complete. Bytes and file
+    objects are parsed as a stream, and each record is cleared once the caller is
+    done with it; an element already parsed is walked, not modified.
+
+    An rpc-error of severity error in the reply raises an Exception.
+    '''
+
+    if hasattr(source, 'tag'):
+        elements = source.iter()
+        streaming = False
+    else:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        # 'end' events only: an element is complete when its end tag is read
+        elements = (element for (_, element) in ET.iterparse(source))
+        streaming = True
+
+    # tag -> tag without namespace, as the same few tags repeat thousands of times
+    local_names = {}
+    for element in elements:
+        tag = local_names.get(element.tag)
+        if tag is None:
+            tag = local_names.setdefault(element.tag, _local_name(element.tag))
+        if tag == record_tag:
+            yield element
+            if streaming:
+                # done with it, free the memory of this record
+                element.clear()
+        elif tag == 'rpc-error':
+            fields = {_local_name(child.tag): (child.text or '').strip() for child in element}
+            if fields.get('error-severity') != 'warning':
+                raise Exception('rpc-error: {message}'
+                                .format(message=fields.get('error-message', '')))
+
+
+def _extract(source, record_tag: str, record_fields: tuple, sub_tag: str,
+             sub_fields: tuple, first_sub_only: bool = False) -> list:
+    '''
+    Returns the records (record_tag elements) of the reply, each one as
+    {field: [{'data': text}], sub_tag: [{field: [{'data': text}]}, ...]}
+    with only record_fields and, of its sub_tag children, sub_fields. Without
+    sub_tag, the records are only their record_fields.
+    '''
+
+    records = []
+    for element in _record_elements(source, record_tag):
+        record = {sub_tag: []} if sub_tag else {}
+        for child in element:
+            tag = _local_name(child.tag)
+            if tag in record_fields:
+                record[tag] = [{'data': (child.text or '').strip()}]
+            elif tag == sub_tag and not (first_sub_only and record[sub_tag]):
+                record[sub_tag].append({_local_name(field.tag): [{'data': (field.text or '')
+                                                                  .strip()}]
+                                        for field in child
+                                        if _local_name(field.tag) in sub_fields})
+        records.append(record)
+    return records
+
+
+def extract_isis_interfaces(source) -> dict:
+    '''
+    Returns, from the XML reply of get_isis_interface_information(extensive=True),
+    the pruned JSON shape that parse_isis_interfaces() of
+    pyez_isis/production/icinga_junos_isis_interface.py takes:
+    {'isis-interface-information': [{'isis-interface': [
+        {'interface-name': [{'data': 'xe-0/0/0.0'}],
+         'interface-level-data': [{'level': [{'data': '1'}],
+                                   'adjacency-count': [{'data': '1'}],
+                                   'passive': [{'data': 'Passive'}]}, ...]}, ...]}]}
+
+    Version:
+        2026-10-18
+    '''
+
+    isis_interfaces = _extract(source, 'isis-interface', ISIS_INTERFACE_FIELDS,
+                               'interface-level-data', ISIS_LEVEL_FIELDS)
+    return {'isis-interface-information': [{'isis-interface': isis_interfaces}]}
+
+
+def extract_isis_adjacencies(source) -> dict:
+    '''
+    Returns, from the XML reply of get_isis_adjacency_information(extensive=True),
+    the pruned JSON shape that isis_adjacencies_from_reply() of
+    pyez_core/isis_model.py takes:
+    {'isis-adjacency-information': [{'isis-adjacency': [
+        {'interface-name': [{'data': 'xe-0/0/0.0'}], 'level': [{'data': '2'}],
+         'system-name': [{'data': 'mx2'}], 'adjacency-state': [{'data': 'Up'}],
+         'holdtime': [{'data': '24'}], 'transition-count': [{'data': '1'}]}, ...]}]}
+
+    Version:
+        2026-10-18
+    '''
+
+    isis_adjacencies = _extract(source, 'isis-adjacency', ISIS_ADJACENCY_FIELDS, '', ())
+    return {'isis-adjacency-information': [{'isis-adjacency': isis_adjacencies}]}
+
+
+def extract_bgp_peers(source) -> dict:
+    '''
+    Returns, from the XML reply of get_bgp_neighbor_information(), the pruned
+    JSON shape that index_bgp_peers() and parse_bgp_peer() of
+    pyez_bgp_session/production/icinga_junos_bgp_session.py take:
+    {'bgp-information': [{'bgp-peer': [
+        {'peer-address': [{'data': '87.44.68.38+179'}],
+         'peer-state': [{'data': 'Established'}],
+         'bgp-rib': [{'received-prefix-count': [{'data': '3'}], ...}]}, ...]}]}
+    Only the first bgp-rib of each peer is kept, the one parse_bgp_peer() reads.
+
+    Version:
+        2026-10-18
+    '''
+
+    bgp_peers = _extract(source, 'bgp-peer', BGP_PEER_FIELDS, 'bgp-rib', BGP_RIB_FIELDS,
+                         first_sub_only=True)
+    return {'bgp-information': [{'bgp-peer': bgp_peers}]}
+
+
+def synthetic_isis_reply(interfaces: int) -> tuple:
+    '''
+    Returns (JSON reply as a string, XML reply as bytes) of
+    get_isis_interface_information(extensive=True) with that many interfaces,
+    with the fields of a real reply that the checks do not read, so that
+    the sizes are realistic.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import json
+
+    json_interfaces = []
+    xml_interfaces = []
+    for i in range(interfaces):
+        name = 'xe-{fpc}/{pic}/{port}.0'.format(fpc=i // 480, pic=(i // 48) % 10, port=i % 48)
+        passive = 'Passive' if i % 10 == 0 else ''
+        levels = []
+        xml_levels = []
+        for level in ('1', '2'):
+            adjacencies = '0' if passive or (i % 7 == 0 and level == '1') else '1'
+            fields = [('level', level), ('adjacency-count', adjacencies),
+                      ('interface-priority', '64'), ('metric', '10'),
+                      ('hello-time', '9'), ('holdtime', '27')]
+            if passive:
+                fields.append(('passive', passive))
+            levels.append({tag: [{'data': value}] for (tag, value) in fields})
+            xml_levels.append('<interface-level-data>\n{fields}\n</interface-level-data>'
+                              .format(fields='\n'.join('<{tag}>{value}</{tag}>'
+                                                       .format(tag=tag, value=value)
+                                                       for (tag, value) in fields)))
+        fields = [('interface-name', name), ('interface-state-value', '0'),
+                  ('circuit-id', '0x{i:x}'.format(i=i + 1)), ('circuit-type', '3'),
+                  ('lsp-interval', '100'), ('csnp-interval', '10'),
+                  ('hello-padding', 'Adaptive'), ('interface-type', 'Point to Point')]
+        json_interface = {tag: [{'data': value}] for (tag, value) in fields}
+        json_interface['interface-level-data'] = levels
+        json_interfaces.append(json_interface)
+        xml_interfaces.append('<isis-interface>\n{fields}\n{levels}\n</isis-interface>'
+                              .format(fields='\n'.join('<{tag}>{value}</{tag}>'
+                                                       .format(tag=tag, value=value)
+                                                       for (tag, value) in fields),
+                                      levels='\n'.join(xml_levels)))
+
+    json_reply = json.dumps({'isis-interface-information': [
+        {'attributes': {'xmlns': 'http://xml.juniper.net/junos/18.4R3/junos-routing'},
+         'isis-interface': json_interfaces}]})
+    xml_reply = ('<isis-interface-information '
+                 'xmlns="http://xml.juniper.net/junos/18.4R3/junos-routing">\n'
+                 '{interfaces}\n</isis-interface-information>'
+                 .format(interfaces='\n'.join(xml_interfaces))).encode('utf-8')
+    return (json_reply, xml_reply)
+
+
+def synthetic_bgp_reply(peers: int) -> tuple:
+    '''
+    Returns (JSON reply as a string, XML reply as bytes) of
+    get_bgp_neighbor_information() with that many peers, two RIBs each.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import json
+
+    json_peers = []
+    xml_peers = []
+    for i in range(peers):
+        address = '10.{a}.{b}.{c}+179'.format(a=i // 65536, b=(i // 256) % 256, c=i % 256)
+        state = 'Established' if i % 20 else 'Active'
+        fields = [('peer-address', address), ('peer-as', str(64512 + i % 1000)),
+                  ('local-address', '10.255.0.1+50000'), ('peer-group', 'customers'),
+                  ('peer-type', 'External'), ('peer-state', state),
+                  ('last-state', 'OpenConfirm'), ('last-event', 'RecvKeepAlive'),
+                  ('last-error', 'None'), ('peer-flags', 'Sync'),
+                  ('holdtime', '90'), ('preference', '170')]
+        ribs = []
+        for (rib, count) in (('inet.0', i % 1000), ('inet6.0', i % 100)):
+            ribs.append([('name', rib), ('rib-bit', '20000'), ('bgp-rib-state', 'complete'),
+                         ('send-state', 'in sync'), ('active-prefix-count', str(count)),
+                         ('received-prefix-count', str(count + 1)),
+                         ('accepted-prefix-count', str(count)),
+                         ('suppressed-prefix-count', '0'),
+                         ('advertised-prefix-count', '10')])
+        json_peer = {tag: [{'data': value}] for (tag, value) in fields}
+        if state == 'Established':
+            json_peer['bgp-rib'] = [{tag: [{'data': value}] for (tag, value) in rib}
+                                    for rib in ribs]
+        json_peers.append(json_peer)
+        xml_ribs = ''
+        if state == 'Established':
+            xml_ribs = '\n'.join('<bgp-rib>\n{fields}\n</bgp-rib>'
+                                 .format(fields='\n'.join('<{tag}>{value}</{tag}>'
+                                                          .format(tag=tag, value=value)
+                                                          for (tag, value) in rib))
+                                 for rib in ribs)
+        xml_peers.append('<bgp-peer>\n{fields}\n{ribs}\n</bgp-peer>'
+                         .format(fields='\n'.join('<{tag}>{value}</{tag}>'
+                                                  .format(tag=tag, value=value)
+                                                  for (tag, value) in fields),
+                                 ribs=xml_ribs))
+
+    json_reply = json.dumps({'bgp-information': [{'bgp-peer': json_peers}]})
+    xml_reply = ('<bgp-information xmlns="http://xml.juniper.net/junos/18.4R3/junos-routing">\n'
+                 '{peers}\n</bgp-information>'
+                 .format(peers='\n'.join(xml_peers))).encode('utf-8')
+    return (json_reply, xml_reply)
+
+
+def benchmark(reply_type: str, json_reply: str, xml_reply: bytes, repeat: int = 3) -> dict:
+    '''
+    Times, on the same reply, loading the JSON and parsing it as the checks do, and
+    extracting from the XML stream and parsing it the same way. Checks that both
+    give the same result.
+
+    Returns dictionary with, for 'json' and 'xml', the best time in seconds and the
+    peak memory in bytes (from tracemalloc) of one run.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import json
+    import time
+    import tracemalloc
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_scripts import load_check_module
+
+    if reply_type == 'isis':
+        isis_module = load_check_module('isis')
+
+        def from_json():
+            return isis_module.parse_isis_interfaces(json.loads(json_reply))
+
+        def from_xml():
+            return isis_module.parse_isis_interfaces(
+                extract_isis_interfaces(io.BytesIO(xml_reply)))
+    else:
+        bgp_module = load_check_module('bgp')
+
+        def parse_bgp(reply):
+            index = bgp_module.index_bgp_peers(reply['bgp-information'][0].get('bgp-peer', []))
+            return {peer: bgp_module.parse_bgp_peer(dict_bgp_peer, peer)
+                    for (peer, dict_bgp_peer) in index.items()}
+
+        def from_json():
+            return parse_bgp(json.loads(json_reply))
+
+        def from_xml():
+            return parse_bgp(extract_bgp_peers(io.BytesIO(xml_reply)))
+
+    results = {}
+    outcomes = {}
+    for (path, function) in (('json', from_json), ('xml', from_xml)):
+        timings = []
+        for _ in range(repeat):
+            timer_start = time.perf_counter()
+            outcomes[path] = function()
+            timings.append(time.perf_counter() - timer_start)
+        tracemalloc.start()
+        function()
+        (_, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[path] = {'seconds': min(timings), 'peak_bytes': peak}
+
+    if outcomes['json'] != outcomes['xml']:
+        raise Exception('The JSON and the XML paths give different results')
+    results['records'] = len(outcomes['json'])
+    return results
+
+
+if __name__ == '__main__':
+    """execute when the module is invoked from cli"""
+    reply_type, records, json_file, xml_file, repeat = get_args()
+
+    reply_types = ['isis', 'bgp'] if reply_type == 'both' else [reply_type]
+    for reply_type in reply_types:
+        if json_file:
+            with open(json_file) as reply_file:
+                json_reply = reply_file.read()
+            with open(xml_file, 'rb') as reply_file:
+                xml_reply = reply_file.read()
+        elif reply_type == 'isis':
+            (json_reply, xml_reply) = synthetic_isis_reply(records)
+        else:
+            (json_reply, xml_reply) = synthetic_bgp_reply(records)
+
+        results = benchmark(reply_type, json_reply, xml_reply, repeat)
+        print('{reply_type}: {records} records, JSON reply {json_size:.1f} MB, '
+              'XML reply {xml_size:.1f} MB'
+              .format(reply_type=reply_type, records=results['records'],
+                      json_size=len(json_reply) / 1e6, xml_size=len(xml_reply) / 1e6))
+        for path in ('json', 'xml'):
+            print('    {path:<5} {seconds:8.3f} seconds  {peak:8.1f} MB peak memory'
+                  .format(path=path, seconds=results[path]['seconds'],
+                          peak=results[path]['peak_bytes'] / 1e6))
@@ -30,6 +30,49 @@ python icinga_junos_isis_interface.py \
     -u heanet -p 'substiteWithActualPassword' \
     -d
 
+# example, through the NETCONF session broker (see pyez_core/netconf_broker.py);
+#          the check does not open its own NETCONF session, saves 2.5 to 3 seconds
+python icinga_junos_isis_interface.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -B /tmp/junos_netconf_broker.sock
+
+# example, reusing for 60 seconds the reply retrieved by another check (see
+#          pyez_core/rpc_cache.py); checks within that minute do not log in to the router
+python icinga_junos_isis_interface.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -C 60
+
+# example, XML reply instead of JSON, for routers with many IS-IS interfaces;
+#          only the fields needed are extracted (see pyez_core/xml_stream.py)
+python icinga_junos_isis_interface.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -x
+
+# example, comparing with the previous run (see pyez_core/isis_state.py); reports the
+#          adjacencies that went up/down since, the levels flapping, and only the
+#          inconsistent interfaces; only the interfaces that changed are evaluated
+python icinga_junos_isis_interface.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -S /tmp/junos_isis_state
+
+# example, also cross-checking the interfaces with 'show isis adjacency extensive', in
+#          the same NETCONF session; reports each neighbour, its state and hold time
+python icinga_junos_isis_interface.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -a
+
+# example, with a circuit breaker (see pyez_core/circuit_breaker.py); while the router
+#          is known to be unreachable, UNKNOWN at once, instead of waiting for the timeout
+python icinga_junos_isis_interface.py \
+    -H dist2-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -K /tmp/junos_circuit_breaker
+
 Note this:
 * the password has to be enclosed in single ''
 * the interfaces to query are to be writen separated by a single space, without ", or '
@@ -37,22 +80,38 @@ Note this:
   Example: "ge-0/0/0 ge-1/0/0"
 
 Version:
-    2021-05-27
+    2026-10-18
 
 This module has these functions:
 * get_args(). Parses the arguments passed by the user from CLI
 * get_isis_interface(). This does the actual work of logging to a router
   and issuing the "show isis interface extensive (<instance>)" command
+* parse_isis_interfaces(). Extracts the IS-IS interface information from the
+  reply of the command above
 * check_isis_consistency(). Applies logic to determine if the IS-IS interfaces
   configuration and status are consistent.
-* run_script(). Glues the two above. Gets the CLI arguments, passes them to the
-  working function and returns the outcome to the user.
+* run_script(). Glues the two above (evaluating the consistency over the compact
+  model of pyez_core/isis_model.py, or only its delta from the previous run with
+  pyez_core/isis_state.py; and cross-checking the adjacencies, if asked to).
+  Gets the CLI arguments, passes them to the working function and returns the
+  outcome to the user.
 * __if_main__. So that serves as initiator.
 """
 
 # imports
 # imports, Python standard modules
-from typing import Dict
+import os
+import sys
+
+# imports, this repository's shared PyEZ modules, in dl_python/pyez_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                os.pardir, os.pardir)))
+
+# typing is only imported by type checkers, not for --help: the annotations with
+# Dict are strings
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict
 
 # Type alias for JUNOS interface as a string
 junos_if = str
@@ -94,6 +153,45 @@ def get_args() -> tuple:
                         help='list of interfaces to query',
                         required=False,
                         type=str, nargs='+')
+    parser.add_argument('-B', '--broker',
+                        help='Unix socket of a running pyez_core.netconf_broker; '
+                             'if given, the RPC goes through it instead of a new NETCONF session',
+                        required=False,
+                        type=str)
+    parser.add_argument('-C', '--cache-ttl',
+                        help='Seconds a cached reply of a recent check is reused, '
+                             'instead of logging in to the router again. Default 0, no cache',
+                        required=False,
+                        default=0,
+                        type=float)
+    parser.add_argument('-x', '--xml',
+                        help='Retrieve the reply as XML, not JSON, and extract only the '
+                             'fields needed. Faster on routers with many interfaces',
+                        required=False,
+                        action='store_true')
+    parser.add_argument('-a', '--adjacencies',
+                        help='Also retrieve the IS-IS adjacencies, in the same session, and '
+                             'report the state and hold time of each neighbour',
+                        required=False,
+                        action='store_true')
+    parser.add_argument('-S', '--state-dir',
+                        help='Save the IS-IS state in this directory, and report what '
+                             'changed since the previous run, and only the inconsistent '
+                             'interfaces',
+                        required=False,
+                        type=str)
+    parser.add_argument('-K', '--breaker-dir',
+                        help='Keep the state of the circuit breaker of the router in this '
+                             'directory: while the router is known to be unreachable, '
+                             'return UNKNOWN at once instead of trying it',
+                        required=False,
+                        type=str)
+    parser.add_argument('-M', '--metrics-file',
+                        help='Also save the time spent in each phase of the check to this '
+                             'file: Prometheus textfile if it ends in .prom, JSON lines '
+                             'otherwise',
+                        required=False,
+                        type=str)
     parser.add_argument("-d", "--debug",
                         help="enable debug mode",
                         required=False,
@@ -118,11 +216,34 @@ def get_args() -> tuple:
         isis_interfaces = ''.join(args.interfaces).split()
     else:
         isis_interfaces = []
+    # if the broker socket is explicitly given, take it; otherwise use empty ''
+    if args.broker:
+        broker_socket = args.broker
+    else:
+        broker_socket = ''
+    cache_ttl = args.cache_ttl
+    xml = args.xml
+    adjacencies = args.adjacencies
+    # if the state directory is explicitly given, take it; otherwise use empty ''
+    if args.state_dir:
+        state_dir = args.state_dir
+    else:
+        state_dir = ''
+    # if the breaker directory is explicitly given, take it; otherwise use empty ''
+    if args.breaker_dir:
+        breaker_dir = args.breaker_dir
+    else:
+        breaker_dir = ''
+    # if the metrics file is explicitly given, take it; otherwise use empty ''
+    if args.metrics_file:
+        metrics_file = args.metrics_file
+    else:
+        metrics_file = ''
     debug = args.debug
 
     # Return all variable values
-    #return hostname, username, password, isis_instance, isis_interfaces, debug
-    return hostname, username, password, isis_instance, isis_interfaces, debug
+    return (hostname, username, password, isis_instance, isis_interfaces, broker_socket,
+            cache_ttl, xml, adjacencies, state_dir, breaker_dir, metrics_file, debug)
 
 
 def get_junos_isis_interfaces(ne: str,
@@ -130,7 +251,15 @@ def get_junos_isis_interfaces(ne: str,
                               os_password: str,
                               isis_interfaces: list = [],
                               isis_instance: str = '',
-                              debug_level: str = 'ERROR') -> Dict[junos_if, Dict[str, str]]:
+                              debug_level: str = 'ERROR',
+                              broker_socket: str = '',
+                              cache_ttl: float = 0,
+                              xml: bool = False,
+                              model: bool = False,
+                              adjacencies: bool = False,
+                              breaker_dir: str = '',
+                              timer=None,
+                              dev=None) -> 'Dict[junos_if, Dict[str, str]]':
     '''
     Returns dictionary of dictionaries.
     Each dicationary contains IS-IS interface information. See the format of
@@ -185,6 +314,33 @@ def get_junos_isis_interfaces(ne: str,
                                 Not enabled currently.
         debug_level(str)        Python logging level, if not set it defaults to 'WARNING'.
                                 Set to 'DEBUG' to see verbose execution.
+        broker_socket (str)     Unix socket of a running pyez_core.netconf_broker.
+                                If given, the RPC is sent through the broker, over
+                                the NETCONF session it keeps open with the NE,
+                                instead of opening a new session. Saves the 2.5 to 3
+                                seconds to open the session.
+        cache_ttl (float)       If not 0, a reply retrieved by another check less than
+                                cache_ttl seconds ago is used, without logging in to
+                                the NE; see pyez_core/rpc_cache.py.
+        xml (bool)              If True, the reply is retrieved as XML instead of
+                                JSON, and only the fields needed are extracted from
+                                it; see pyez_core/xml_stream.py. Saves the router
+                                rendering a large reply as JSON.
+        model (bool)            If True, returns the IS-IS interfaces as a list of
+                                IsisInterface, the compact typed model in
+                                pyez_core/isis_model.py, instead of the dictionary
+                                below. pyez_core.isis_model.to_dict() renders it as
+                                the dictionary.
+        adjacencies (bool)      If True, also issues "show isis adjacency extensive"
+                                in the same Netconf session, and returns a tuple:
+                                (the IS-IS interfaces, a list of IsisAdjacency of
+                                pyez_core/isis_model.py), to be joined by
+                                pyez_core.isis_model.cross_check_adjacencies().
+        timer (PhaseTimer)      pyez_core.telemetry.PhaseTimer, to which the time
+                                spent in dns, connect, auth, rpc and parse is added.
+        dev (Device)            Netconf session with the NE already open, e.g. by
+                                pyez_core/combined_check.py to run several checks in
+                                one session. Used instead of opening one, and left open.
 
     Returns:
         Dictionary.
@@ -224,10 +380,12 @@ def get_junos_isis_interfaces(ne: str,
         }
 
     How to use/onboarding/tweaks and possible modifications
-        The auto_probe value will set how long you want to wait for the NE to
-        repond to an NETCONF connection request. With the auto_prove you tune
+        The probe_timeout value passed to open_device() (auto_probe before) will set
+        how long you want to wait for the NE to
+        repond to an NETCONF connection request. With the probe you tune
         the timeout of NETCONF connection, NOT the timeout for the RPC command
-        they are different things.
+        they are different things. Both are taken from the latency history of the
+        NE (29 and 30 seconds until there is one), see pyez_core/latency.py
 
     Version:
         2021-04-08
@@ -276,13 +434,14 @@ def get_junos_isis_interfaces(ne: str,
     # imports
     #
     # imports, Python standard modules
-    import logging                          # for debugging
-    import socket                           # to resolve FQDN to IPv4
     import time                             # to time spans of code
-    # imports, Python third party modules
-    # Juniper's PyEZ
-    from jnpr.junos import Device
-    import jnpr.junos.exception as JUNOS_EXCEPTION
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_logging import get_logger
+    from pyez_core.isis_model import isis_adjacencies_from_reply, isis_interfaces_from_reply
+    from pyez_core.rpc_cache import RpcCache
+    from pyez_core.telemetry import PhaseTimer
+    # PyEZ is imported below, only if a Netconf session is to be opened; it takes
+    # longer to import than the rest of the check to run from the RPC cache
 
     #
     # Sanitize
@@ -318,19 +477,9 @@ def get_junos_isis_interfaces(ne: str,
                         .format(err=err))
 
     #
-    # Create a custom logger and set debug level
+    # Get the logger, with the handler shared by the checks of the process
     #
-    logger = logging.getLogger(get_junos_isis_interfaces.__qualname__)
-    logger.setLevel(logging.DEBUG)          # Gets annoyed DEBUG is not here!!
-    # Create handler(s) and set the debug level
-    c_handler = logging.StreamHandler()     # console handler
-    c_handler.setLevel(debug_level)
-    # Create formatter and apply formatter and handler
-    c_format = logging.Formatter(('%(asctime)s: %(funcName)s: '
-                                  'line: ' + '%(lineno)d: '
-                                  '%(levelname)s: %(message)s'))
-    c_handler.setFormatter(c_format)
-    logger.addHandler(c_handler)
+    logger = get_logger(get_junos_isis_interfaces.__qualname__, debug_level)
 
     #
     # time
@@ -338,133 +487,261 @@ def get_junos_isis_interfaces(ne: str,
     # timer to measure how long it takes to execute the whole function
     timer_script_start = time.perf_counter()    # start timer for whole script
 
+    # time spent in each phase, reported by the caller
+    if timer is None:
+        timer = PhaseTimer()
+
+    #
+    # Reuse the reply retrieved by a check that ran moments ago, if asked to
+    #
+    isis_rpc_kwargs = {'extensive': True}
+    if isis_instance:
+        isis_rpc_kwargs['instance'] = isis_instance
+    # the adjacencies, if asked for, are retrieved in the same session, in the same format
+    adjacency_rpc_kwargs = dict(isis_rpc_kwargs)
+    isis_adjacencies = None
+    # the cache keeps the JSON reply, or the fields extracted from the XML reply
+    if xml:
+        cache_rpc_kwargs = dict(isis_rpc_kwargs, format='xml')
+        cache_adjacency_rpc_kwargs = dict(adjacency_rpc_kwargs, format='xml')
+    else:
+        cache_rpc_kwargs = isis_rpc_kwargs
+        cache_adjacency_rpc_kwargs = adjacency_rpc_kwargs
+    rpc_cache = None
+    if cache_ttl:
+        rpc_cache = RpcCache(cache_ttl)
+        isis_interfaces = rpc_cache.get(ne, 'get_isis_interface_information', cache_rpc_kwargs)
+        if isis_interfaces is not None and adjacencies:
+            isis_adjacencies = rpc_cache.get(ne, 'get_isis_adjacency_information',
+                                             cache_adjacency_rpc_kwargs)
+            if isis_adjacencies is None:
+                # log in once, for both
+                isis_interfaces = None
+        if isis_interfaces is not None:
+            logger.debug('IS-IS interfaces of {ne} from the RPC cache, not logging in'
+                         .format(ne=ne))
+            with timer.phase('parse'):
+                if model:
+                    my_isis_interfaces = isis_interfaces_from_reply(isis_interfaces)
+                else:
+                    my_isis_interfaces = parse_isis_interfaces(isis_interfaces)
+                if adjacencies:
+                    return (my_isis_interfaces, isis_adjacencies_from_reply(isis_adjacencies))
+            return my_isis_interfaces
+
     #
     # Open Netconf session with the NE
     #
-    # timer to measure how long it takes to open Netconf session
-    timer_netconf_start = time.perf_counter()
-    try:
-        # ne_ipv4 = socket.getaddrinfo(ne, None, socket.AF_INET)[0][4][0]   # resolve FQDN to IPv4
-        # ne_ipv6 = socket.getaddrinfo(ne, None, socket.AF_INET6)[0][4][0]  # resolve FQDN to IPv6
-        # uncomment if want to deterministically use of IPv4 or IPv6 for NETCONF session
-        # ne_ip = ne_ipv4
-        #
-        # Deterministically, connect with IPv4
-        ne_ip = socket.gethostbyname(ne)
-
-        dev = Device(host=ne_ip, user=os_username, password=os_password, auto_probe=29)
-        # no need to gather facts, so to gain speed
-        dev.open(gather_facts=False)
-
-        # if debugging, report on parameters of the NETCONF connection
-        logger.debug('Netconf connection state with {ne} is {connect_status}. '
-                     'The connection is with IP: {ip}. '
-                     'The RPC timeout is {timeout_rpc} seconds. '
-                     'The user accessing the NE is {user}.'
-                     .format(ne=ne,
-                             connect_status=dev.connected,
-                             ip=dev.hostname,
-                             timeout_rpc=dev.timeout,
-                             user=dev.user))
-    except JUNOS_EXCEPTION.ConnectAuthError as err:
-        # case for incorrect username/password
-        related_information = ('https://github.com/Juniper/py-junos-eznc'
-                               '/issues/780 or '
-                               'https://pyez.readthedocs.io/en/latest/'
-                               'jnpr.junos.html#module-jnpr.junos.exception')
-        raise Exception('Cannot connect to device {ne}: {0}. '
-                        'Maybe the username/password used are incorrect?. '
-                        'Generated if the user-name, password is invalid. '
-                        'Check this, it may help: {related_information}'
-                        .format(err, ne=ne, related_information=related_information))
-    except JUNOS_EXCEPTION.ConnectRefusedError as err:
-        # possibly netconf is not enabled, or access to netconf is denied
-        # Note if the connection is on IPv4 or IPv6 and verifiy port/acl.
-        related_information = ('https://www.juniper.net/documentation/en_US/'
-                               'junos-pyez/topics/task/troubleshooting/'
-                               'junos-pyez-connection-errors-troubleshooting.html or '
-                               'https://pyez.readthedocs.io/en/latest/'
-                               'jnpr.junos.html#module-jnpr.junos.exception')
-        raise Exception('Cannot connect to device {ne}: {0}. '
-                        'Maybe an access list in the NE control plane '
-                        'to NETCONF port? or NETCONF not enabled?. '
-                        'Generated if the specified host denies the NETCONF; '
-                        'could be that the NETCONF service is not enabled, '
-                        'or the host has too many connections already. '
-                        'Check this, it may help: {related_information}'
-                        .format(err, ne=ne, related_information=related_information))
-    except JUNOS_EXCEPTION.ConnectTimeoutError as err:
-        # may be an ACL in an intermediate router in the the path to ne_ip
-        # Note if the connection is on IPv4 or IPv6 and verify port/acl.
-        related_information = ('https://github.com/Juniper/py-junos-eznc'
-                               '/issues/780')
-        raise Exception('Cannot connect to device {ne}: {0}. Maybe an access list '
-                        'along the path in an intermediate NE blocking the '
-                        'source IP and/or destination to NETCONF IP/port?. '
-                        'Could be also happen if the device is not ip '
-                        'reachable; bad ipaddr or just due to routing. '
-                        'Check this, it may help: {related_information}'
-                        .format(err, ne=ne, related_information=related_information))
-    except JUNOS_EXCEPTION.ProbeError as err:
-        # may be an ACL in an intermediate router in the the path to ne_ip
-        # Note if the connection is on IPv4 or IPv6 and verify port/acl.
-        related_information = ('https://github.com/Juniper/py-junos-eznc'
-                               '/issues/780 or '
-                               'https://pyez.readthedocs.io/en/latest/'
-                               'jnpr.junos.html#module-jnpr.junos.exception')
-        raise Exception('Cannot connect to device {ne}: {0}. Maybe an access list '
-                        'along the path in an intermediate NE blocking the '
-                        'source IP and/or destination to NETCONF IP/port?. '
-                        'or maybe the NE is sluggish and need more time?. '
-                        'Generated if auto_probe is enabled and the probe action fails. '
-                        'Check this, it may help: {related_information}'
-                        .format(err, ne=ne, related_information=related_information))
-    except Exception as err:
-        # catch all
-        related_information = ('https://pyez.readthedocs.io/en/latest/'
-                               'jnpr.junos.html#module-jnpr.junos.exception')
-        raise Exception('Error connecting to {ne}: {0}. Precise cause is unknown. '
-                        'Check this, it may help: {related_information}'
-                        .format(err, ne=ne, related_information=related_information))
-
-    # if debugging, report how long it took to open Netconf session with the NE
-    timer_netconf_end = time.perf_counter()
-    timer_netconf = timer_netconf_end - timer_netconf_start
-    logger.debug(('Time to open Netconf session with {ne} on {ne_ip}: '
-                 '{timer_netconf:0.2f} seconds'.format(ne=ne, ne_ip=ne_ip,
-                  timer_netconf=timer_netconf)))
+    # a session opened by the caller is used as it is, and left open
+    own_session = dev is None
+    if own_session:
+        # imports, Python third party modules
+        # Juniper's PyEZ
+        import jnpr.junos.exception as JUNOS_EXCEPTION
+        # imports, this repository's shared PyEZ modules
+        from pyez_core.circuit_breaker import RouterDownError
+        from pyez_core.combined_check import open_session
+
+        # timer to measure how long it takes to open Netconf session
+        timer_netconf_start = time.perf_counter()
+        try:
+            # ne_ipv4 = socket.getaddrinfo(ne, None, socket.AF_INET)[0][4][0]   # FQDN to IPv4
+            # ne_ipv6 = socket.getaddrinfo(ne, None, socket.AF_INET6)[0][4][0]  # FQDN to IPv6
+            # uncomment if want to deterministically use of IPv4 or IPv6 for NETCONF session
+            # ne_ip = ne_ipv4
+            #
+            # the address of the family that connected fastest, through the broker if
+            # given, with the timeouts of the NE for the RPCs to send; see open_session()
+            # of pyez_core/combined_check.py
+            rpc_names = ('get_isis_interface_information',)
+            if adjacencies:
+                rpc_names += ('get_isis_adjacency_information',)
+            dev = open_session(ne, os_username, os_password, timer, breaker_dir, rpc_names,
+                               broker_socket)
+
+            # if debugging, report on parameters of the NETCONF connection
+            logger.debug('Netconf connection state with {ne} is {connect_status}. '
+                         'The connection is with IP: {ip}. '
+                         'The RPC timeout is {timeout_rpc} seconds. '
+                         'The user accessing the NE is {user}.'
+                         .format(ne=ne,
+                                 connect_status=dev.connected,
+                                 ip=dev.hostname,
+                                 timeout_rpc=dev.timeout,
+                                 user=dev.user))
+        except RouterDownError:
+            # not tried, known to be unreachable; raised as it is, see
+            # pyez_core/circuit_breaker.py
+            raise
+        except JUNOS_EXCEPTION.ConnectAuthError as err:
+            # case for incorrect username/password
+            related_information = ('https://github.com/Juniper/py-junos-eznc'
+                                   '/issues/780 or '
+                                   'https://pyez.readthedocs.io/en/latest/'
+                                   'jnpr.junos.html#module-jnpr.junos.exception')
+            raise Exception('Cannot connect to device {ne}: {0}. '
+                            'Maybe the username/password used are incorrect?. '
+                            'Generated if the user-name, password is invalid. '
+                            'Check this, it may help: {related_information}'
+                            .format(err, ne=ne, related_information=related_information))
+        except JUNOS_EXCEPTION.ConnectRefusedError as err:
+            # possibly netconf is not enabled, or access to netconf is denied
+            # Note if the connection is on IPv4 or IPv6 and verifiy port/acl.
+            related_information = ('https://www.juniper.net/documentation/en_US/'
+                                   'junos-pyez/topics/task/troubleshooting/'
+                                   'junos-pyez-connection-errors-troubleshooting.html or '
+                                   'https://pyez.readthedocs.io/en/latest/'
+                                   'jnpr.junos.html#module-jnpr.junos.exception')
+            raise Exception('Cannot connect to device {ne}: {0}. '
+                            'Maybe an access list in the NE control plane '
+                            'to NETCONF port? or NETCONF not enabled?. '
+                            'Generated if the specified host denies the NETCONF; '
+                            'could be that the NETCONF service is not enabled, '
+                            'or the host has too many connections already. '
+                            'Check this, it may help: {related_information}'
+                            .format(err, ne=ne, related_information=related_information))
+        except JUNOS_EXCEPTION.ConnectTimeoutError as err:
+            # may be an ACL in an intermediate router in the the path to ne_ip
+            # Note if the connection is on IPv4 or IPv6 and verify port/acl.
+            related_information = ('https://github.com/Juniper/py-junos-eznc'
+                                   '/issues/780')
+            raise Exception('Cannot connect to device {ne}: {0}. Maybe an access list '
+                            'along the path in an intermediate NE blocking the '
+                            'source IP and/or destination to NETCONF IP/port?. '
+                            'Could be also happen if the device is not ip '
+                            'reachable; bad ipaddr or just due to routing. '
+                            'Check this, it may help: {related_information}'
+                            .format(err, ne=ne, related_information=related_information))
+        except JUNOS_EXCEPTION.ProbeError as err:
+            # may be an ACL in an intermediate router in the the path to ne_ip
+            # Note if the connection is on IPv4 or IPv6 and verify port/acl.
+            related_information = ('https://github.com/Juniper/py-junos-eznc'
+                                   '/issues/780 or '
+                                   'https://pyez.readthedocs.io/en/latest/'
+                                   'jnpr.junos.html#module-jnpr.junos.exception')
+            raise Exception('Cannot connect to device {ne}: {0}. Maybe an access list '
+                            'along the path in an intermediate NE blocking the '
+                            'source IP and/or destination to NETCONF IP/port?. '
+                            'or maybe the NE is sluggish and need more time?. '
+                            'Generated if auto_probe is enabled and the probe action fails. '
+                            'Check this, it may help: {related_information}'
+                            .format(err, ne=ne, related_information=related_information))
+        except Exception as err:
+            # catch all
+            related_information = ('https://pyez.readthedocs.io/en/latest/'
+                                   'jnpr.junos.html#module-jnpr.junos.exception')
+            raise Exception('Error connecting to {ne}: {0}. Precise cause is unknown. '
+                            'Check this, it may help: {related_information}'
+                            .format(err, ne=ne, related_information=related_information))
+
+        # if debugging, report how long it took to open Netconf session with the NE
+        timer_netconf_end = time.perf_counter()
+        timer_netconf = timer_netconf_end - timer_netconf_start
+        logger.debug(('Time to open Netconf session with {ne} on {ne_ip}: '
+                     '{timer_netconf:0.2f} seconds'.format(ne=ne, ne_ip=dev.hostname,
+                      timer_netconf=timer_netconf)))
 
     #
     # Issue the command and record responses
     #
     # timer to measure JUNOS command execution, to retrieve IS-IS interfaces
     timer_isis_interface_start = time.perf_counter()
-    if isis_instance:
-        # This is the case when the query is for a specific IS-IS instance
-        # this section is pending to develop. Not enabled for the time being.
-        logger.debug(('Issue command "show isis interface extensive instance '
-                      '{isis_instance}"'.format(isis_instance=isis_instance)))
-        # outcome is a dictionary
-        isis_interfaces = (dev.rpc.get_isis_interface_information({'format': 'json'},
-                                                                  extensive=True,
-                                                                  instance=isis_instance))
-    else:
-        # This is the case when the query is for the default IS-IS instance
-        logger.debug("Issue command 'show isis interface extensive'")
-        # outcome is a dictionary
-        isis_interfaces = (dev.rpc.get_isis_interface_information({'format': 'json'},
-                                                                  extensive=True))
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.rpc_pipeline import pipeline_requests
+    # the interfaces and, if asked for, the adjacencies, back-to-back in the same
+    # session: one more RPC, not one more login nor one more round trip; see
+    # pyez_core/rpc_pipeline.py
+    requests = [('get_isis_interface_information', isis_rpc_kwargs)]
+    if adjacencies:
+        requests.append(('get_isis_adjacency_information', adjacency_rpc_kwargs))
+    if xml:
+        # native XML replies, of which only the fields needed are extracted
+        from pyez_core.xml_stream import extract_isis_adjacencies, extract_isis_interfaces
+
+    def parse_reply(index: int, reply):
+        if not xml:
+            # outcome is a dictionary
+            return reply
+        if index == 0:
+            return extract_isis_interfaces(reply)
+        return extract_isis_adjacencies(reply)
+
+    for (rpc_name, rpc_kwargs) in requests:
+        logger.debug("Issue command '{command}{instance}'{xml}"
+                     .format(command=('show isis interface extensive'
+                                      if rpc_name == 'get_isis_interface_information'
+                                      else 'show isis adjacency extensive'),
+                             instance=(' instance ' + isis_instance) if isis_instance else '',
+                             xml=', XML reply' if xml else ''))
+    try:
+        replies = pipeline_requests(dev, requests, parse_reply, timer=timer,
+                                    rpc_format='xml' if xml else 'json')
+    finally:
+        # done with the NE. Leave orderly. Properly close the Netconf session.
+        if own_session:
+            dev.close()
+    isis_interfaces = replies[0]
+    if adjacencies:
+        isis_adjacencies = replies[1]
 
     # # if debugging, report how long it took to execute the command
     # to retrieve IS-IS interfaces
     timer_isis_interface_end = time.perf_counter()
     timer_isis_interface = timer_isis_interface_end - timer_isis_interface_start
     logger.debug(('Time to retrieve IS-IS interfaces in {ne} on {ne_ip}: '
-                 '{timer_netconf:0.2f} seconds'.format(ne=ne, ne_ip=ne_ip,
+                 '{timer_netconf:0.2f} seconds'.format(ne=ne, ne_ip=dev.hostname,
                   timer_netconf=timer_isis_interface)))
 
-    # done with the NE. Leave orderly. Properly close the Netconf session.
-    dev.close()
+    # for the checks that follow within cache_ttl seconds
+    if rpc_cache is not None:
+        rpc_cache.put(ne, 'get_isis_interface_information', cache_rpc_kwargs, isis_interfaces)
+        if adjacencies:
+            rpc_cache.put(ne, 'get_isis_adjacency_information', cache_adjacency_rpc_kwargs,
+                          isis_adjacencies)
+
+    # extract the IS-IS interface information from the reply
+    with timer.phase('parse'):
+        if model:
+            my_isis_interfaces = isis_interfaces_from_reply(isis_interfaces)
+        else:
+            my_isis_interfaces = parse_isis_interfaces(isis_interfaces)
+        if adjacencies:
+            my_isis_adjacencies = isis_adjacencies_from_reply(isis_adjacencies)
+
+    # if debugging, report how long it takes to execute the whole script
+    timer_script_end = time.perf_counter()
+    timer_script = timer_script_end - timer_script_start
+    logger.debug('Time to execute the function {this_function}, begin to end: '
+                 '{timer_whole_script:0.2f} seconds'
+                 .format(timer_whole_script=timer_script,
+                         this_function=get_junos_isis_interfaces.__qualname__))
+
+    # return dictionary of dictionaries and end
+    if adjacencies:
+        return (my_isis_interfaces, my_isis_adjacencies)
+    return my_isis_interfaces
+
+
+def parse_isis_interfaces(isis_interfaces_reply: dict) -> 'Dict[junos_if, Dict[str, str]]':
+    '''
+    Returns dictionary of dictionaries with the IS-IS interface information,
+    extracted from the JSON reply of the RPC get_isis_interface_information.
+
+    It is the parsing half of get_junos_isis_interfaces(), on its own so that
+    replies retrieved by other means (e.g. the asyncio transport in
+    pyez_core/async_netconf.py) are parsed the same way.
+
+    Args:
+        isis_interfaces_reply (dict)    Reply of
+                                        dev.rpc.get_isis_interface_information(
+                                            {'format': 'json'}, extensive=True)
+
+    Returns:
+        Dictionary, see get_junos_isis_interfaces()
+
+    Version:
+        2026-10-18
+    '''
 
     #
     # auxiliary variables and intializations
@@ -491,7 +768,7 @@ def get_junos_isis_interfaces(ne: str,
     my_isis_interfaces = {}
 
     # this is a list. Relevant information for IS-IS interface is at this level in the hierarchy
-    isis_interfaces = isis_interfaces['isis-interface-information'][0]['isis-interface']
+    isis_interfaces = isis_interfaces_reply['isis-interface-information'][0]['isis-interface']
 
     # iterate over the IS-IS interfaces to extract and package information
     for (i, isis_interface) in enumerate(isis_interfaces):
@@ -576,14 +853,6 @@ def get_junos_isis_interfaces(ne: str,
         # add this interface dictionary to the overall return dictionary
         my_isis_interfaces[my_isis_interface['interface_name']] = my_isis_interface
 
-    # if debugging, report how long it takes to execute the whole script
-    timer_script_end = time.perf_counter()
-    timer_script = timer_script_end - timer_script_start
-    logger.debug('Time to execute the function {this_function}, begin to end: '
-                 '{timer_whole_script:0.2f} seconds'
-                 .format(timer_whole_script=timer_script,
-                         this_function=get_junos_isis_interfaces.__qualname__))
-
     # return dictionary of dictionaries and end
     return my_isis_interfaces
 
@@ -732,8 +1001,9 @@ def check_isis_consistency(isis_interfaces: dict,
     # imports
     #
     # imports, Python standard modules
-    import logging                          # for debugging
     import time                             # to time spans of code
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_logging import get_logger
 
     #
     # Sanitize
@@ -753,19 +1023,9 @@ def check_isis_consistency(isis_interfaces: dict,
                         .format(err=err))
 
     #
-    # Create a custom logger and set debug level
+    # Get the logger, with the handler shared by the checks of the process
     #
-    logger = logging.getLogger(check_isis_consistency.__qualname__)
-    logger.setLevel(logging.DEBUG)          # Gets annoyed DEBUG is not here!!
-    # Create handler(s) and set the debug level
-    c_handler = logging.StreamHandler()     # console handler
-    c_handler.setLevel(debug_level)
-    # Create formatter and apply formatter and handler
-    c_format = logging.Formatter(('%(asctime)s: %(funcName)s: '
-                                  'line: ' + '%(lineno)d: '
-                                  '%(levelname)s: %(message)s'))
-    c_handler.setFormatter(c_format)
-    logger.addHandler(c_handler)
+    logger = get_logger(check_isis_consistency.__qualname__, debug_level)
 
     #
     # time
@@ -909,31 +1169,31 @@ def run_script(debug_level: str = 'ERROR') -> str:
           order rendered in the GUI.
     """
 
+    # Read arguments passed to the script. First, before importing anything else, so
+    # that --help and wrong arguments return at once; see pyez_core/import_budget.py
+    (ne, os_username, os_password, isis_instance, isis_interfaces,
+     broker_socket, cache_ttl, xml, adjacencies, state_dir, breaker_dir, metrics_file,
+     debug) = get_args()
+
     #
     # imports
     #
     # Python standard modules
-    import logging                          # for debugging
     #import socket      # in case IPv6 connectivity to Netconf port is blocked
-    import sys
     import time                             # to time spans of code
     from enum import Enum
     from pprint import pprint
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_logging import get_logger
+    from pyez_core.circuit_breaker import RouterDownError
+    from pyez_core.isis_model import (DEFAULT_MIN_HOLDTIME, cross_check_adjacencies,
+                                      evaluate_consistency, to_dict)
+    from pyez_core.telemetry import PhaseTimer
 
     #
-    # Create a custom logger and set debug level
+    # Get the logger, with the handler shared by the checks of the process
     #
-    logger = logging.getLogger(get_junos_isis_interfaces.__qualname__)
-    logger.setLevel(logging.DEBUG)          # Gets annoyed DEBUG is not here!!
-    # Create handler(s) and set the debug level
-    c_handler = logging.StreamHandler()     # console handler
-    c_handler.setLevel(debug_level)
-    # Create formatter and apply formatter and handler
-    c_format = logging.Formatter(('%(asctime)s: %(funcName)s: '
-                                  'line: ' + '%(lineno)d: '
-                                  '%(levelname)s: %(message)s'))
-    c_handler.setFormatter(c_format)
-    logger.addHandler(c_handler)
+    logger = get_logger(get_junos_isis_interfaces.__qualname__, debug_level)
 
     #
     # time
@@ -948,8 +1208,8 @@ def run_script(debug_level: str = 'ERROR') -> str:
         critical = 2
         unknown = 3
 
-    # Read arguments passed to the script
-    ne, os_username, os_password, isis_instance, isis_interfaces, debug = get_args()
+    # time spent in each phase of the check, rendered as perfdata
+    timer = PhaseTimer()
 
     # uncomment if it is necessary to deterministically use IPv4;
     # e.g. IPv6 connectivity to Netconf port is blocked
@@ -970,14 +1230,83 @@ def run_script(debug_level: str = 'ERROR') -> str:
                                                        os_password=os_password,
                                                        isis_instance=isis_instance,
                                                        isis_interfaces=isis_interfaces,
-                                                       debug_level=debug_level)
-        # check if the IS-IS interfaces and overall status is consistent
-        my_isis_consistency = check_isis_consistency(isis_interfaces=my_isis_interfaces,
-                                                     debug_level=debug_level)
+                                                       debug_level=debug_level,
+                                                       broker_socket=broker_socket,
+                                                       cache_ttl=cache_ttl,
+                                                       xml=xml,
+                                                       model=True,
+                                                       adjacencies=adjacencies,
+                                                       breaker_dir=breaker_dir,
+                                                       timer=timer)
+        if adjacencies:
+            (my_isis_interfaces, my_isis_adjacencies) = my_isis_interfaces
+        # check if the IS-IS interfaces and overall status is consistent;
+        # as check_isis_consistency() would, over the compact model
+        if state_dir:
+            # only the interfaces that changed since the previous run
+            from pyez_core.isis_state import IsisStateStore, describe_change, diff_state
+            state_store = IsisStateStore(state_dir)
+            with timer.phase('diff'):
+                isis_delta = diff_state(state_store.load(ne, isis_instance, isis_interfaces),
+                                        my_isis_interfaces)
+            state_store.save(ne, isis_instance, isis_interfaces, my_isis_interfaces,
+                             isis_delta)
+            isis_consistency = isis_delta.consistency
+        else:
+            isis_delta = None
+            isis_consistency = evaluate_consistency(my_isis_interfaces)
+        for (interface_name, level) in isis_consistency.inconsistent:
+            logger.debug('IS-IS interface {interface} level {level} configuration and '
+                         'status are: INCONSISTENT'
+                         .format(interface=interface_name, level=level))
+        if isis_delta is None:
+            my_isis_consistency = to_dict(my_isis_interfaces, isis_consistency)
+        else:
+            # only the inconsistent interfaces, and what changed
+            inconsistent_names = set(name for (name, _) in isis_consistency.inconsistent)
+            my_isis_consistency = to_dict([isis_interface
+                                           for isis_interface in my_isis_interfaces
+                                           if isis_interface.name in inconsistent_names],
+                                          isis_consistency)
+            my_isis_consistency['CHANGES'] = (
+                [describe_change(change) for change in isis_delta.changes]
+                if not isis_delta.first_run else 'first run, state saved')
+            my_isis_consistency['FLAPPING'] = ['{interface} level {level}'
+                                               .format(interface=interface, level=level)
+                                               for (interface, level) in isis_delta.flapping]
+        # each neighbour, joined with the interfaces
+        if adjacencies:
+            adjacency_check = cross_check_adjacencies(my_isis_interfaces, my_isis_adjacencies)
+            adjacency_faults = set(adjacency_check.down + adjacency_check.low_holdtime)
+            # in the compact output of -S, only the neighbours with a fault
+            my_isis_consistency['ADJACENCIES'] = [
+                '{interface} level {level} {neighbour}: {state}, hold time {holdtime} s'
+                '{transitions}'
+                .format(interface=adjacency.interface, level=adjacency.level,
+                        neighbour=adjacency.system_name, state=adjacency.state,
+                        holdtime=adjacency.holdtime,
+                        transitions=(', {transitions} transitions, last {last}'
+                                     .format(transitions=adjacency.transitions,
+                                             last=adjacency.last_transition)
+                                     if adjacency.transitions is not None else ''))
+                for adjacency in my_isis_adjacencies
+                if isis_delta is None or adjacency in adjacency_faults]
+            my_isis_consistency['ADJACENCY_MISMATCHES'] = [
+                '{interface} level {level}: {count} adjacencies, {up} neighbours Up'
+                .format(interface=interface, level=level, count=count, up=up)
+                for (interface, level, count, up) in adjacency_check.mismatched]
+        else:
+            adjacency_check = None
+    except RouterDownError as err:
+        # not tried: the state of IS-IS is unknown, not faulty
+        print('UNKNOWN: ' + str(err) + ' | ' + timer.report('isis', ne, metrics_file))
+        outcome = IcingaState.unknown
+        sys.exit(outcome.value)
     except Exception as err:
         # The following line will be rendered in the Icinga GUI
         # as visual aid to the operator
-        print('The following error prevents me from executing the script: ' + str(err))
+        print('The following error prevents me from executing the script: ' + str(err) +
+              ' | ' + timer.report('isis', ne, metrics_file))
         outcome = IcingaState.critical
         sys.exit(outcome.value)
 
@@ -992,6 +1321,12 @@ def run_script(debug_level: str = 'ERROR') -> str:
             }
             # so that the SUMMARY comes on top of the rendered output
             my_outcome_message.update(my_isis_consistency)
+            if my_isis_consistency.get('FLAPPING'):
+                outcome = IcingaState.warning
+                my_outcome_message['SUMMARY'] = (
+                    "The IS-IS interfaces/levels are consistent, but the adjacencies of "
+                    "the lines in 'FLAPPING' have gone up and down repeatedly in the "
+                    "last hour. Review the physical links and the IS-IS logs.")
         else:
             outcome = IcingaState.critical
             my_outcome_message = {
@@ -1012,6 +1347,23 @@ def run_script(debug_level: str = 'ERROR') -> str:
                        "the network. Review Icinga, and Icinga/network combination."
         }
 
+    # the neighbours: not Up is a fault; hold time running low, or adjacency counts
+    # that do not match the neighbours, a warning
+    if adjacency_check is not None and outcome != IcingaState.unknown:
+        if adjacency_check.down:
+            outcome = IcingaState.critical
+            my_outcome_message['SUMMARY'] += (
+                " There are IS-IS neighbours not Up; review the lines of 'ADJACENCIES' "
+                "that are not Up.")
+        elif ((adjacency_check.low_holdtime or adjacency_check.mismatched)
+              and outcome == IcingaState.ok):
+            outcome = IcingaState.warning
+            my_outcome_message['SUMMARY'] += (
+                " But IS-IS hellos are being missed (hold time of the neighbours below "
+                "{holdtime} s) or the adjacencies of an interface do not match its "
+                "neighbours; review 'ADJACENCIES' and 'ADJACENCY_MISMATCHES'."
+                .format(holdtime=DEFAULT_MIN_HOLDTIME))
+
     # if debugging, report how long it takes to execute the whole script
     timer_script_end = time.perf_counter()
     timer_script = timer_script_end - timer_script_start
@@ -1021,8 +1373,16 @@ def run_script(debug_level: str = 'ERROR') -> str:
                          this_function=run_script.__qualname__))
 
     # The following line will be rendered in the Icinga GUI
-    # as visual aid to the operator
+    # as visual aid to the operator; then the perfdata, graphed by Icinga
     pprint(my_outcome_message)
+    perfdata = timer.report('isis', ne, metrics_file)
+    if isis_delta is not None:
+        perfdata += " 'changes'={changes} 'flapping'={flapping}".format(
+            changes=len(isis_delta.changes), flapping=len(isis_delta.flapping))
+    if adjacency_check is not None:
+        perfdata += " 'neighbours'={neighbours} 'neighbours_down'={down}".format(
+            neighbours=len(my_isis_adjacencies), down=len(adjacency_check.down))
+    print('| ' + perfdata)
 
     # Integer returned by this function
     logger.debug('The integer value returned to Icinga is: {icinga_code}, '
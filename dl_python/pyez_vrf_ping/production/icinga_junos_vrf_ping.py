@@ -28,23 +28,88 @@ python -W ignore icinga_junos_vrf_ping.py \
        2001:0770:0100:6836::2 2001:0770:0100:6840::2 2001:0770:0100:6844::2" \
     -d
 
+OR, through the NETCONF session broker (see pyez_core/netconf_broker.py), so that the
+check does not open its own NETCONF session, saves 2.5 to 3 seconds:
+
+python icinga_junos_vrf_ping.py \
+    -H edge3-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38 87.44.68.42 87.44.68.46" \
+    -B /tmp/junos_netconf_broker.sock
+
+OR, for VRFs with many hosts, ping 4 hosts at a time over 4 NETCONF sessions:
+
+python icinga_junos_vrf_ping.py \
+    -H edge3-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38 87.44.68.42 87.44.68.46 \
+       2001:0770:0100:6836::2 2001:0770:0100:6840::2 2001:0770:0100:6844::2" \
+    -c 4
+
+OR, with a circuit breaker (see pyez_core/circuit_breaker.py): while the router is known
+to be unreachable, UNKNOWN at once, instead of waiting for the timeout:
+
+python icinga_junos_vrf_ping.py \
+    -H edge3-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -f testlab.2020081013 \
+    -l "87.44.68.38 87.44.68.42 87.44.68.46" \
+    -K /tmp/junos_circuit_breaker
+
+OR, several VRFs in one invocation, over one pool of NETCONF sessions (-c): each VRF with
+its hosts, on CLI as VRF=host,host... or in a JSON/YAML file as {"VRF": ["host", ...]};
+one result per VRF, CRITICAL if a host of any VRF does not reply:
+
+python icinga_junos_vrf_ping.py \
+    -H edge3-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -m "testlab.2020081013=87.44.68.38,87.44.68.42 testlab.2021011112=10.11.12.13" \
+    -c 4
+
+python icinga_junos_vrf_ping.py \
+    -H edge3-testlab.nn.hea.net \
+    -u heanet -p 'substiteWithActualPassword' \
+    -m /etc/icinga2/vrf_hosts/edge3-testlab.json \
+    -c 4
+
 Note this:
 * the password has to be enclosed in single ''
 * the IP addresses to ping are to be writen separated by a single space, without ", or '
   between them, but fully enclosed in ""
 
 Version:
-    2020-12-15
+    2026-10-18
 
 The module is organized in three functions
 * get_args(). Parses the arguments passed by the user from CLI
+* load_vrf_map(). Reads the VRFs and their hosts of -m, from CLI or a file
 * ping_vrf(). This does the actual work of logging to a router and pinging hosts from there
+* ping_vrfs(). The same, for several VRFs, each with its hosts, over one pool of sessions
+* parse_ping_result(). Reads success/failure from the reply of one ping
 * run_script(). Glues the two above. Gets the CLI arguments, passes them to the working function
   and returns the outcome to the user.
 * __if_main__. So that serves as initiator.
 """
 
 
+# imports
+# imports, Python standard modules
+import os
+import sys
+
+# typing is only imported by type checkers, not for --help: the annotations with
+# Dict are strings
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict
+
+# imports, this repository's shared PyEZ modules, in dl_python/pyez_core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                os.pardir, os.pardir)))
+
+
 def get_args() -> tuple:
     '''Parses arguments passed to the script on CLI'''
 
@@ -63,9 +128,33 @@ def get_args() -> tuple:
     parser.add_argument('-p', '--password', help='NETCONF Password in single quotes...',
                         required=True, type=str, nargs='+')
     parser.add_argument('-f', '--vrf', help='VRF name',
-                        required=True, type=str)
+                        required=False, type=str)
     parser.add_argument('-l', '--hosts', help='list of IP hosts to ping',
-                        required=True, nargs='+')    # works
+                        required=False, nargs='+')    # works
+    parser.add_argument('-m', '--vrf-map', help=('instead of -f and -l, several VRFs, each '
+                                                 'with its hosts: as VRF=host,host... or a '
+                                                 'JSON/YAML file mapping each VRF to its '
+                                                 'list of hosts'),
+                        required=False, nargs='+')
+    parser.add_argument('-c', '--concurrency', help=('how many pings in flight at the same '
+                                                     'time, each over its own NETCONF session. '
+                                                     'Default 1'),
+                        required=False, type=int, default=1)
+    parser.add_argument('-B', '--broker', help=('Unix socket of a running '
+                                                'pyez_core.netconf_broker; if given, the pings '
+                                                'go through it instead of a new NETCONF session'),
+                        required=False, type=str)
+    parser.add_argument('-K', '--breaker-dir', help=('keep the state of the circuit breaker '
+                                                     'of the router in this directory: while '
+                                                     'the router is known to be unreachable, '
+                                                     'return UNKNOWN at once instead of '
+                                                     'trying it'),
+                        required=False, type=str)
+    parser.add_argument('-M', '--metrics-file', help=('also save the time spent in each phase '
+                                                      'of the check to this file: Prometheus '
+                                                      'textfile if it ends in .prom, JSON '
+                                                      'lines otherwise'),
+                        required=False, type=str)
     parser.add_argument("-d", "--debug", help="enable debug mode",
                         required=False, action="store_true")
 
@@ -76,12 +165,106 @@ def get_args() -> tuple:
     hostname = args.hostname
     username = args.username
     password = args.password[0]         # because when using nargs='+', it returns a list
-    vrf = args.vrf
-    ips = ''.join(args.hosts).split()   # this is a list, each IP is an element
+    # either one VRF and its hosts, or the VRF map; not both
+    if args.vrf_map:
+        if args.vrf or args.hosts:
+            parser.error('-m/--vrf-map goes instead of -f/--vrf and -l/--hosts')
+        try:
+            vrf_hosts = load_vrf_map(' '.join(args.vrf_map).split())
+        except Exception as err:
+            parser.error('-m/--vrf-map: {err}'.format(err=err))
+        vrf = ''
+        ips = []
+    else:
+        if not (args.vrf and args.hosts):
+            parser.error('give -f/--vrf and -l/--hosts, or -m/--vrf-map')
+        vrf_hosts = {}
+        vrf = args.vrf
+        ips = ''.join(args.hosts).split()   # this is a list, each IP is an element
+    # if the broker socket is explicitly given, take it; otherwise use empty ''
+    if args.broker:
+        broker_socket = args.broker
+    else:
+        broker_socket = ''
+    if args.concurrency < 1:
+        parser.error('the concurrency has to be 1 or more')
+    concurrency = args.concurrency
+    # if the breaker directory is explicitly given, take it; otherwise use empty ''
+    if args.breaker_dir:
+        breaker_dir = args.breaker_dir
+    else:
+        breaker_dir = ''
+    # if the metrics file is explicitly given, take it; otherwise use empty ''
+    if args.metrics_file:
+        metrics_file = args.metrics_file
+    else:
+        metrics_file = ''
     debug = args.debug
 
     # Return all variable values
-    return hostname, username, password, vrf, ips, debug
+    return (hostname, username, password, vrf, ips, vrf_hosts, concurrency, broker_socket,
+            breaker_dir, metrics_file, debug)
+
+
+def load_vrf_map(items: list) -> 'Dict[str, list]':
+    '''
+    Returns the VRFs and their hosts to ping, {vrf: [host, ...]}, in the order given.
+
+    items is either one file, read as YAML if its name ends in .yaml or .yml
+    (requires PyYAML), otherwise as JSON, as {"vrf": ["host", ...]}; or a list of
+    'vrf=host,host...'. Raises Exception if not as such.
+
+    Version:
+        2026-10-18
+    '''
+
+    # imports, Python standard modules
+    import json
+    from collections import OrderedDict
+
+    if len(items) == 1 and os.path.isfile(items[0]):
+        path = items[0]
+        with open(path) as vrf_map_file:
+            if path.endswith(('.yaml', '.yml')):
+                # PyYAML is only needed if the map is in YAML
+                import yaml
+                vrf_map = yaml.safe_load(vrf_map_file)
+            else:
+                vrf_map = json.load(vrf_map_file, object_pairs_hook=OrderedDict)
+        if not isinstance(vrf_map, dict):
+            raise Exception('{path} does not map each VRF to its hosts'.format(path=path))
+        pairs = [(vrf, hosts.split() if isinstance(hosts, str) else hosts)
+                 for (vrf, hosts) in vrf_map.items()]
+    else:
+        pairs = []
+        for item in items:
+            (vrf, _, hosts) = item.partition('=')
+            pairs.append((vrf, hosts.replace(',', ' ').split()))
+
+    vrf_hosts = OrderedDict()
+    for (vrf, hosts) in pairs:
+        if not vrf or not hosts or not isinstance(hosts, list):
+            raise Exception('VRF without hosts: {vrf}'.format(vrf=vrf))
+        vrf_hosts.setdefault(str(vrf), []).extend(str(host) for host in hosts)
+    if not vrf_hosts:
+        raise Exception('no VRFs')
+    return vrf_hosts
+
+
+def parse_ping_result(outcome: dict) -> str:
+    '''Returns 'success' or 'failure' from the JSON reply of the ping RPC
+
+    Version:
+        2026-10-18
+    '''
+
+    results_dict = outcome['ping-results'][0]   # dictionary where we find the success/failure
+    # from pprint import pprint      # uncomment if you want to see the output
+    # pprint(results_dict)           # uncomment if you want to see the output
+
+    if 'ping-success' in results_dict:
+        return 'success'
+    return 'failure'
 
 
 def ping_vrf(ne: str,
@@ -89,7 +272,13 @@ def ping_vrf(ne: str,
              os_password: str,
              vrf: str,
              hosts: list,
-             debug_level: str = 'ERROR') -> dict:
+             debug_level: str = 'ERROR',
+             broker_socket: str = '',
+             concurrency: int = 1,
+             timer=None,
+             breaker_dir: str = '',
+             dev=None,
+             pipeline_depth: int = 4) -> dict:
     ''' Return success/failure for pinging a L3VPN host from within a vrf of a given NE
 
     This function logs into a router and issues a ping from within a vrf. It returns either
@@ -98,6 +287,9 @@ def ping_vrf(ne: str,
 
     Timing. When the outcome is success, it takes about 4.1 to 4.3 seconds to execute.
     When the outcome is failure, it takes between 13.4 and 13.6 seconds to execute.
+    That is per host, they add up one after the other. With concurrency=n, n hosts
+    are pinged at the same time, over n sessions with the NE; the time is roughly
+    divided by n, plus the time to open the extra sessions (done in parallel).
 
     Args:
     Required:
@@ -110,6 +302,30 @@ def ping_vrf(ne: str,
     Optional:
         debug_level(str)    Python logging level, if not set it defaults to 'WARNING'.
                             Set to 'DEBUG' to see verbose execution.
+        broker_socket (str) Unix socket of a running pyez_core.netconf_broker.
+                            If given, the pings are sent through the broker, over
+                            the NETCONF session it keeps open with the NE,
+                            instead of opening a new session.
+                            The broker executes one RPC at a time per NE, so with
+                            the broker the pings do not run concurrently.
+        concurrency (int)   How many pings to have in flight at the same time.
+                            Each one needs its own Netconf session, so this is also
+                            how many sessions are opened with the NE. Defaults to 1,
+                            one session, one host after the other. Keep it low
+                            (4 to 8) so to not overload the routing engine CPU.
+                            At most what the latency history of the NE allows,
+                            see pyez_core/latency.py.
+        timer (PhaseTimer)  pyez_core.telemetry.PhaseTimer, to which the time spent in
+                            dns, connect, auth (of the first session), rpc and parse
+                            (of all the pings, added up) is added.
+        dev (Device)        Netconf session with the NE already open, e.g. by
+                            pyez_core/combined_check.py to run several checks in one
+                            session. The pings go over it one after the other
+                            (concurrency is not used), and it is left open.
+        pipeline_depth(int) Over one session (concurrency 1, or dev), how many pings
+                            are sent ahead of their reply, and the replies parsed
+                            while the next pings run; 1, one at a time. See
+                            pyez_core/rpc_pipeline.py
 
     Returns:
         dictionary. The keys are the IP addresses in the hosts input variable. The values are
@@ -126,9 +342,7 @@ def ping_vrf(ne: str,
         Daniel Lete, daniel.lete@heanet.ie
 
     To-do:
-        improve speed (persistent session? ping fast?)
         remove name resolution? force to enter ip address??
-        parallel processing
 
     References:
         Using Junos PyEZ to Execute RPCs on Devices Running Junos OS
@@ -145,82 +359,222 @@ def ping_vrf(ne: str,
         Python Timer Functions: Three Ways to Monitor Your Code
         https://realpython.com/python-timer/#python-timers
     '''
+
+    return ping_vrfs(ne, os_username, os_password, {vrf: hosts}, debug_level, broker_socket,
+                     concurrency, timer, breaker_dir, dev, pipeline_depth)[vrf]
+
+
+def ping_vrfs(ne: str,
+              os_username: str,
+              os_password: str,
+              vrf_hosts: 'Dict[str, list]',
+              debug_level: str = 'ERROR',
+              broker_socket: str = '',
+              concurrency: int = 1,
+              timer=None,
+              breaker_dir: str = '',
+              dev=None,
+              pipeline_depth: int = 4) -> 'Dict[str, Dict[str, str]]':
+    '''
+    Return success/failure for pinging the hosts of several VRFs of a given NE
+
+    As ping_vrf(), for all the hosts of all the VRFs at once: all the pings are
+    scheduled over the same session, or pool of concurrency sessions, so that
+    checking the VRFs of many L3VPN customers takes one login (or concurrency
+    logins), not one per VRF.
+
+    Args:
+    Required:
+        ne (str)            Network Element, Juniper router to log to
+        os_username (str)   Username to log as in the router
+        os_password (str)   Password for the username above
+        vrf_hosts (dict)    The hosts to ping from each VRF, {vrf: [host, ...]}
+    Optional:
+        As ping_vrf(). concurrency is how many pings are in flight at the same time,
+        whatever their VRF.
+
+    Returns:
+        dictionary. The keys are the VRFs in vrf_hosts, in the same order; the values
+        are as returned by ping_vrf() for the hosts of that VRF, e.g.
+        {'testlab.2020081013': {'87.44.68.38': 'success', '87.44.68.42': 'failure'},
+         'testlab.2021011112': {'10.11.12.13': 'success'}}
+
+    Version:
+        2026-10-18
+
+    Requires:
+        Python 3.5
+        junos-eznc 2.5
+
+    Author:
+        Daniel Lete, daniel.lete@heanet.ie
+    '''
     #
     # imports
     #
     # imports, Python standard modules
-    import logging                          # for debugging
-    import socket                           # to resolve FQDN to IPv4
     import time                             # to time spans of code
-    # imports, Python third party modules
-    from jnpr.junos import Device           # this is Juniper's PyEz
+    from collections import OrderedDict
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.check_logging import get_logger
+    from pyez_core.telemetry import PhaseTimer
+    # PyEZ is imported below, only if a Netconf session is to be opened
 
     #
-    # Create a custom logger and set debug level
+    # Get the logger, with the handler shared by the checks of the process
     #
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)              # will get annoyed is not set to DEBUG here!!
-    # Create handler(s) and set the debug level
-    c_handler = logging.StreamHandler()         # console handler
-    c_handler.setLevel(debug_level)             # set debug level
-    c_format = logging.Formatter(('%(asctime)s: %(funcName)s: '
-                                  'line: ' + '%(lineno)d: %(levelname)s: %(message)s'))
-    c_handler.setFormatter(c_format)            # apply the formatter
-    logger.addHandler(c_handler)                # add handlers to the logger
+    logger = get_logger(__name__, debug_level)
 
     # timers are used to measure how long it takes to execute the code
     timer_script_start = time.perf_counter()    # start timer for whole script
     timer_netconf_start = time.perf_counter()   # start timer to open Netconf
+    if timer is None:
+        timer = PhaseTimer()                    # time spent in each phase, for the caller
 
     #
     # Compose the request and open Netconf session
     #
-    try:                                        # open Netconf session with the NE
-        # ne_ipv4 = socket.getaddrinfo(ne, None, socket.AF_INET)[0][4][0]     # resolve FQDN to IPv4
-        # ne_ipv6 = socket.getaddrinfo(ne, None, socket.AF_INET6)[0][4][0]    # resolve FQDN to IPv6
-        # ne_ip = ne_ipv6                        uncomment if want to ensure the use of IPv4 or IPv6
-        ne_ip = socket.gethostbyname(ne)
-        dev = Device(host=ne_ip, user=os_username, password=os_password)
-        dev.open(gather_facts=False)            # no need to gather facts, so to gain speed
-    except Exception as err:
-        raise Exception(err)                    # can't connect -> Exception
-
-    # if debugging, report how long it takes to open the Netconf session
-    timer_netconf_end = time.perf_counter()                     # end timer to open Netconf session
-    timer_netconf = timer_netconf_end - timer_netconf_start     # compute time open Netconf session
-    logger.debug(('Time to open Netconf session with {ne} on {ne_ip}: {timer_netconf:0.2f} seconds'
-                 .format(ne=ne, ne_ip=ne_ip, timer_netconf=timer_netconf)))
-
-    #
-    # issue the ping command and record responses
-    #
-    ping_results = {}       # initialize. This will be the return. It will be a dictionary
-
-    for host in hosts:      # iterate through the hosts, ping each and add to the return
+    # ne_ipv4 = socket.getaddrinfo(ne, None, socket.AF_INET)[0][4][0]     # resolve FQDN to IPv4
+    # ne_ipv6 = socket.getaddrinfo(ne, None, socket.AF_INET6)[0][4][0]    # resolve FQDN to IPv6
+    # ne_ip = ne_ipv6                        uncomment if want to ensure the use of IPv4 or IPv6
+    # a session opened by the caller is used as it is, and left open
+    own_session = dev is None
+    if not own_session:
+        concurrency = 1
+    else:
+        # imports, this repository's shared PyEZ modules
+        from pyez_core.circuit_breaker import RouterDownError
+        from pyez_core.combined_check import open_session
+        from pyez_core.latency import LatencyHistory
+
+        # timeouts, and pings in flight, from the latency history of the NE; see
+        # pyez_core/latency.py
+        tuning = LatencyHistory().tuning(ne, ('ping',), max(concurrency, pipeline_depth))
+        concurrency = min(concurrency, tuning.concurrency)
+        pipeline_depth = min(pipeline_depth, tuning.concurrency)
+
+        def open_extra_session():
+            '''Opens one more Netconf session with the NE and returns it; not timed, and
+            a failure does not trip the circuit breaker: the NE is up'''
+            return open_session(ne, os_username, os_password, PhaseTimer(),
+                                broker_socket=broker_socket, tuning=tuning)
+
+        try:                                        # open Netconf session with the NE
+            # the address of the family that connected fastest, through the broker if
+            # given; see open_session() of pyez_core/combined_check.py
+            dev = open_session(ne, os_username, os_password, timer, breaker_dir,
+                               broker_socket=broker_socket, tuning=tuning)
+        except RouterDownError:
+            raise                                   # not tried, see pyez_core/circuit_breaker.py
+        except Exception as err:
+            raise Exception(err)                    # can't connect -> Exception
+
+        # if debugging, report how long it takes to open the Netconf session
+        timer_netconf_end = time.perf_counter()                  # end timer to open Netconf session
+        timer_netconf = timer_netconf_end - timer_netconf_start  # time to open Netconf session
+        logger.debug(('Time to open Netconf session with {ne} on {ne_ip}: '
+                      '{timer_netconf:0.2f} seconds'
+                     .format(ne=ne, ne_ip=dev.hostname, timer_netconf=timer_netconf)))
+
+    def ping_host(dev, vrf: str, host: str) -> str:
+        '''Pings host from the vrf over the session dev, returns success or failure'''
         timer_command_start = time.perf_counter()               # start timer to ping host
 
         # execute command in NE, get the output as JSON
-        outcome = dev.rpc.ping({'format': 'json'}, routing_instance=vrf, host=host)
+        with timer.phase('rpc', 'ping'):
+            outcome = dev.rpc.ping({'format': 'json'}, routing_instance=vrf, host=host)
         # rapid ping takes the same amount of time to execute!! how come??
         # outcome = dev.rpc.ping({'format':'json'}, routing_instance=vrf, host=host, rapid=True)
 
-        results_dict = outcome['ping-results'][0]   # dictionary where we find the success/failure
-        # from pprint import pprint      # uncomment if you want to see the output
-        # pprint(results_dict)           # uncomment if you want to see the output
-
-        if 'ping-success' in results_dict:
-            ping_results[host] = 'success'
-            timer_command_end = time.perf_counter()                 # end timer to ping host
-        if 'ping-failure' in results_dict:
-            ping_results[host] = 'failure'
-            timer_command_end = time.perf_counter()                 # end timer to ping host
+        with timer.phase('parse'):
+            ping_result = parse_ping_result(outcome)
 
         # if debugging, report how long it takes to ping the host
+        timer_command_end = time.perf_counter()                     # end timer to ping host
         timer_command = timer_command_end - timer_command_start     # compute time to ping host
         logger.debug(('Time to ping host {host}: {timer_command:0.2f} seconds'
                      .format(host=host, timer_command=timer_command)))
+        return ping_result
 
-    dev.close()     # leave orderly. Properly close the Netconf session with the NE
+    #
+    # issue the ping command and record responses
+    #
+    # initialize. This will be the return. A dictionary per VRF, in the order given
+    ping_results = OrderedDict((vrf, {}) for vrf in vrf_hosts)
+    # every ping to issue, whatever its VRF
+    targets = [(vrf, host) for (vrf, hosts) in vrf_hosts.items() for host in hosts]
+
+    # no point in more sessions than hosts
+    concurrency = max(1, min(concurrency, len(targets)))
+
+    if concurrency == 1:
+        # imports, this repository's shared PyEZ modules
+        from pyez_core.rpc_pipeline import pipeline_rpcs
+
+        timer_pings_start = time.perf_counter()     # start timer to ping the hosts
+        try:
+            # the pings back-to-back over the session, each reply parsed while the
+            # next pings run; see pyez_core/rpc_pipeline.py
+            pings = pipeline_rpcs(dev, 'ping',
+                                  [{'routing_instance': vrf, 'host': host}
+                                   for (vrf, host) in targets],
+                                  lambda index, outcome: parse_ping_result(outcome),
+                                  depth=pipeline_depth, timer=timer)
+            for ((vrf, host), ping_result) in zip(targets, pings):     # add to the return
+                ping_results[vrf][host] = ping_result
+            logger.debug('Time to ping {count} hosts over one Netconf session: '
+                         '{timer_pings:0.2f} seconds'
+                         .format(count=len(targets),
+                                 timer_pings=time.perf_counter() - timer_pings_start))
+        finally:
+            if own_session:
+                dev.close()     # leave orderly. Properly close the Netconf session with the NE
+    else:
+        # A Netconf session executes one RPC at a time, so to have several pings in
+        # flight there is a pool of sessions, one per worker thread. A host is pinged
+        # by taking a free session from the pool and returning it once done; there are
+        # never more pings in flight than sessions.
+        import concurrent.futures
+        import queue
+
+        sessions = [dev]
+        session_pool = queue.Queue()
+        session_pool.put(dev)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                # open the rest of the sessions in parallel; if the NE refuses some
+                # (too many sessions?), carry on with the ones that did open
+                opening = [executor.submit(open_extra_session)
+                           for _ in range(concurrency - 1)]
+                for future in concurrent.futures.as_completed(opening):
+                    try:
+                        extra_dev = future.result()
+                    except Exception as err:
+                        logger.warning('Could not open an extra Netconf session with {ne}, '
+                                       'carry on with fewer: {err}'.format(ne=ne, err=err))
+                        continue
+                    sessions.append(extra_dev)
+                    session_pool.put(extra_dev)
+                logger.debug('Pinging {count} hosts in {vrfs} VRFs over {sessions} Netconf '
+                             'sessions'.format(count=len(targets), vrfs=len(vrf_hosts),
+                                               sessions=len(sessions)))
+
+                def ping_host_from_pool(target: tuple) -> str:
+                    pool_dev = session_pool.get()
+                    try:
+                        return ping_host(pool_dev, *target)
+                    finally:
+                        session_pool.put(pool_dev)
+
+                # merge the results in the same order as the hosts were given
+                for ((vrf, host), ping_result) in zip(targets,
+                                                      executor.map(ping_host_from_pool,
+                                                                   targets)):
+                    ping_results[vrf][host] = ping_result
+            finally:
+                for pool_dev in sessions:
+                    pool_dev.close()    # leave orderly. Properly close the Netconf sessions
 
     # if debugging, report how long it takes to execute the whole script
     timer_script_end = time.perf_counter()                  # end timer for whole script
@@ -230,27 +584,28 @@ def ping_vrf(ne: str,
 
     # from pprint import pprint     # uncomment if you want to see the final output
     # pprint(ping_results)          # command_outcome is a dictionary
-    # end, return outcome of each ping in a dictionaries
+    # end, return outcome of each ping in a dictionary per VRF
     # of the shape:
     #{
-    # '1.1.1.1': 'success',
-    # '10.11.12.13': 'failure',
-    # 'fd00:10:11:12::13': 'success'
+    # 'testlab.2020081013': {'1.1.1.1': 'success', '10.11.12.13': 'failure'},
+    # 'testlab.2021011112': {'fd00:10:11:12::13': 'success'}
     # }
-
-    # end, return outcome of each ping in a dictionary of the shape {$host: success/failure}
     return ping_results
 
 
 def run_script() -> str:
     """Invokes the other functions and returns outcome values to Icinga"""
 
+    # Read arguments passed to the script. First, before importing anything else, so
+    # that --help and wrong arguments return at once; see pyez_core/import_budget.py
+    (ne, os_username, os_password, vrf, hosts, vrf_hosts, concurrency, broker_socket,
+     breaker_dir, metrics_file, debug) = get_args()
+
     #
     # imports
     #
     # Python standard modules
     #import socket      # in case IPv6 connectivity to Netconf port is blocked
-    import sys
     from enum import Enum
 
     # to overcome message in Ubuntu 16.04
@@ -260,6 +615,9 @@ def run_script() -> str:
     # from cryptography.hazmat.backends import default_backend
     import warnings
     warnings.filterwarnings("ignore", category=DeprecationWarning)
+    # imports, this repository's shared PyEZ modules
+    from pyez_core.circuit_breaker import RouterDownError
+    from pyez_core.telemetry import PhaseTimer
 
     class IcingaState(Enum):    # Icinga Status values
         ok = 0
@@ -267,8 +625,8 @@ def run_script() -> str:
         critical = 2
         unknown = 3
 
-    # Read arguments passed to the script
-    ne, os_username, os_password, vrf, hosts, debug = get_args()
+    # time spent in each phase of the check, rendered as perfdata
+    timer = PhaseTimer()
 
     # uncomment if it is necessary to use IPv4; e.g. IPv6 connectivity to Netconf port is blocked
     # ne = (socket.gethostbyname(ne))
@@ -279,19 +637,67 @@ def run_script() -> str:
     else:
         debug_level = 'WARNING'
 
+    if vrf_hosts:
+        # all the hosts of all the VRFs over one pool of sessions, one aggregated result
+        try:
+            vrf_results = ping_vrfs(ne, os_username, os_password, vrf_hosts, debug_level,
+                                    broker_socket, concurrency, timer, breaker_dir)
+            hosts_down = {vrf: [host for (host, ping_result) in ping_results.items()
+                                if ping_result == 'failure']
+                          for (vrf, ping_results) in vrf_results.items()}
+            vrfs_down = [vrf for vrf in vrf_results if hosts_down[vrf]]
+            if vrfs_down:
+                outcome = IcingaState.critical
+                summary = ('{down} of {total} VRFs with hosts not replying: {vrfs}'
+                           .format(down=len(vrfs_down), total=len(vrf_results),
+                                   vrfs=', '.join('{vrf} ({hosts})'.format(
+                                       vrf=vrf, hosts=' '.join(hosts_down[vrf]))
+                                                  for vrf in vrfs_down)))
+            else:
+                outcome = IcingaState.ok
+                summary = ('{total} of {total} VRFs, all their hosts reply'
+                           .format(total=len(vrf_results)))
+
+            # The following lines will be rendered in the Icinga GUI for the check,
+            # the first line with the perfdata, then one line per VRF
+            print(summary + ' | ' +
+                  "'vrfs'={vrfs} 'vrfs_down'={vrfs_down} 'hosts'={hosts} 'hosts_down'={down} "
+                  .format(vrfs=len(vrf_results), vrfs_down=len(vrfs_down),
+                          hosts=sum(len(ping_results) for ping_results in vrf_results.values()),
+                          down=sum(len(hosts) for hosts in hosts_down.values())) +
+                  timer.report('vrf_ping', ne, metrics_file))
+            for (vrf, ping_results) in vrf_results.items():
+                print(vrf + ': ' + str(ping_results))
+        except RouterDownError as err:
+            # not tried: whether the hosts answer is unknown
+            print('UNKNOWN: ' + str(err) + ' | ' + timer.report('vrf_ping', ne, metrics_file))
+            outcome = IcingaState.unknown
+        except Exception as err:
+            # The following line will be rendered in the Icinga GUI for the check
+            print('The following error prevents me from executing the script: ' + str(err) +
+                  ' | ' + timer.report('vrf_ping', ne, metrics_file))
+            outcome = IcingaState.critical
+        sys.exit(outcome.value)     # will be given to Icinga to render green/red in GUI
+
     # go and ping
     try:
-        ping_results = ping_vrf(ne, os_username, os_password, vrf, hosts, debug_level)
+        ping_results = ping_vrf(ne, os_username, os_password, vrf, hosts, debug_level,
+                                broker_socket, concurrency, timer, breaker_dir)
         if 'failure' in ping_results.values():
             outcome = IcingaState.critical
         else:
             outcome = IcingaState.ok
 
         # The following line will be rendered in the Icinga GUI for the check
-        print(ping_results)
+        print(str(ping_results) + ' | ' + timer.report('vrf_ping', ne, metrics_file))
+    except RouterDownError as err:
+        # not tried: whether the hosts answer is unknown
+        print('UNKNOWN: ' + str(err) + ' | ' + timer.report('vrf_ping', ne, metrics_file))
+        outcome = IcingaState.unknown
     except Exception as err:
         # The following line will be rendered in the Icinga GUI for the check
-        print('The following error prevents me from executing the script: ' + str(err))
+        print('The following error prevents me from executing the script: ' + str(err) +
+              ' | ' + timer.report('vrf_ping', ne, metrics_file))
         outcome = IcingaState.critical
 
     # print(outcome.value)       # uncomment if debuging and want to see the integer value returned